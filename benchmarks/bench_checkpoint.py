@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Session checkpoint write and startup restore times.
+
+Times recording a session transition in the memory-mapped checkpoint,
+and what a restart pays to get the session back: opening and mapping the
+file, reading the boot ID, checking both records and restoring a running
+session from the latest one.
+
+Usage:
+    python benchmarks/bench_checkpoint.py [writes]
+"""
+
+import os
+import sys
+import tempfile
+import time as time_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.checkpoint import SessionCheckpoint
+from src.models.timer import SHORT_BREAK, Session, SessionState, TimerService
+
+
+def best_of(function, rounds=20):
+    best = None
+    for _ in range(rounds):
+        start = time_module.perf_counter()
+        function()
+        elapsed = time_module.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    service = TimerService()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.checkpoint")
+        checkpoint = SessionCheckpoint(path)
+        state = SessionState(SHORT_BREAK, 300, 240, True, 2, 900)
+
+        def write():
+            for _ in range(writes):
+                checkpoint.save(state)
+
+        elapsed = best_of(write, 3)
+        print(f"write: {elapsed / writes * 1e6:.2f} us per transition ({writes} writes)")
+        checkpoint.close()
+
+        def restore():
+            restored = SessionCheckpoint(path)
+            restored.restore(Session(service=service))
+            restored.close()
+
+        print(f"startup restore: {best_of(restore) * 1e3:.3f} ms (open, map, check and restore)")
+        print(f"file size: {os.path.getsize(path)} bytes")
+    service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Load and save times of a large timeline file in each codec.
+
+Builds a timeline of synthetic slot records and times a full save
+(serialize plus atomic write) and a full load (read plus deserialize) with
+the standard library ``json`` module, orjson when it is installed, and the
+columnar binary codec.
+
+Usage:
+    python benchmarks/bench_codecs.py [slots] [rounds]
+"""
+
+import os
+import sys
+import tempfile
+import time as time_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import serialization
+from src.models.serialization import BinaryCodec, JsonCodec
+from src.models.timeline_store import JsonTimelineStore
+
+PATTERNS = ["daily", "weekdays", "weekends"]
+
+
+def build_records(count):
+    records = []
+    for i in range(count):
+        minute = (i * 7) % 1440
+        pattern = PATTERNS[i % len(PATTERNS)]
+        records.append({
+            "id": f"{minute // 60:02d}{minute % 60:02d}_{5 + i % 25}_{pattern}_{i}",
+            "start_time": f"{minute // 60:02d}:{minute % 60:02d}",
+            "duration": 5 + i % 25,
+            "message": f"Break {i}",
+            "repeat_pattern": pattern,
+            "enabled": i % 5 != 0,
+        })
+    return records
+
+
+def time_codec(codec, path, records, rounds):
+    store = JsonTimelineStore(path)
+    store.codec = codec  # An instance rather than a registered name
+    save = load = 0.0
+    for _ in range(rounds):
+        start = time_module.perf_counter()
+        store.save_all(records)
+        save += time_module.perf_counter() - start
+        start = time_module.perf_counter()
+        loaded = store.load()
+        load += time_module.perf_counter() - start
+    assert loaded == records
+    return save / rounds, load / rounds, os.path.getsize(path)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    records = build_records(count)
+    codecs = [("stdlib json", JsonCodec(use_orjson=False))]
+    if serialization.orjson is not None:
+        codecs.append(("orjson", JsonCodec()))
+    codecs.append(("binary", BinaryCodec()))
+
+    print(f"{count} slots, averaged over {rounds} rounds")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, codec in codecs:
+            path = os.path.join(directory, f"timeline-{label.replace(' ', '-')}.json")
+            save, load, size = time_codec(codec, path, records, rounds)
+            print(f"  {label:<12} save {save * 1e3:8.1f} ms   load {load * 1e3:8.1f} ms   "
+                  f"{size / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
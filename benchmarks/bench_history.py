@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compliance query times over a large break history.
+
+Fills a history database with synthetic breaks, each scheduled, shown,
+started and then completed or skipped, and times daily and weekly
+statistics for the last month, the last year and the whole history, which
+read the day and week rollups, plus recording a single event (which
+updates them) and rebuilding the rollups from every event.
+
+Usage:
+    python benchmarks/bench_history.py [years] [breaks_per_day]
+"""
+
+import os
+import sys
+import tempfile
+import time as time_module
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.break_history import (COMPLETED, SCHEDULED, SHOWN, SKIPPED, STARTED,
+                                      BreakHistory)
+
+
+def fill(history, first_day, days, per_day):
+    events = []
+    for day in range(days):
+        start = datetime.combine(first_day + timedelta(days=day), datetime.min.time())
+        for i in range(per_day):
+            when = start + timedelta(hours=8, minutes=i * 30)
+            slot_id = f"slot_{i}"
+            outcome = COMPLETED if (day + i) % 3 else SKIPPED
+            started = when + timedelta(seconds=30 + i)
+            events.append((SCHEDULED, slot_id, when, "scheduled", 5, when))
+            events.append((SHOWN, slot_id, when, "scheduled", 5, when))
+            events.append((STARTED, slot_id, started, "scheduled", 5, when))
+            events.append((outcome, slot_id, started + timedelta(minutes=5), "scheduled", 5, when))
+    history.record_many(events)
+    return len(events)
+
+
+def best_of(function, rounds=5):
+    best = None
+    for _ in range(rounds):
+        start = time_module.perf_counter()
+        function()
+        elapsed = time_module.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    last_day = date.today()
+    first_day = last_day - timedelta(days=365 * years - 1)
+    with tempfile.TemporaryDirectory() as directory:
+        history = BreakHistory(os.path.join(directory, "history.db"))
+        count = fill(history, first_day, 365 * years, per_day)
+        ranges = [("last month", last_day - timedelta(days=30)),
+                  ("last year", last_day - timedelta(days=364)),
+                  ("all history", first_day)]
+        print(f"{count} events over {years} years")
+        for label, start in ranges:
+            daily = best_of(lambda: history.daily_compliance(start, last_day))
+            weekly = best_of(lambda: history.weekly_compliance(start, last_day))
+            print(f"  {label + ':':13} daily {daily * 1e3:8.3f} ms   weekly {weekly * 1e3:8.3f} ms")
+        record = best_of(lambda: history.record(SHOWN, "slot_0"))
+        print(f"  record one event:   {record * 1e3:8.3f} ms")
+        rebuild = best_of(history.rebuild_rollups, rounds=1)
+        print(f"  rebuild rollups:    {rebuild * 1e3:8.3f} ms")
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
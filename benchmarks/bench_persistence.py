@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""UI-thread cost of timeline edits with synchronous and debounced saving.
+
+Edits a timeline of pre-existing slots the way the timeline page does and
+measures how long each ``edit_break_slot`` call blocks its caller. The
+"before" run saves synchronously on every edit, as edits used to (with
+the atomic, fsynced write); the "after" run only requests a save from the background writer.
+
+Usage:
+    python benchmarks/bench_persistence.py [slots] [edits]
+"""
+
+import os
+import sys
+import tempfile
+import time as time_module
+from datetime import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.timeline_manager import TimelineManager
+
+
+def build_manager(path, count):
+    manager = TimelineManager(timeline_file=path)
+    with manager.transaction():
+        for i in range(count):
+            minute = (i * 7) % 1440
+            manager.add_break_slot(time(minute // 60, minute % 60), 5, f"Break {i}", "daily")
+    manager.flush()
+    return manager
+
+
+def time_edits(manager, edits):
+    slots = manager.get_all_break_slots()
+    start = time_module.perf_counter()
+    for i in range(edits):
+        manager.edit_break_slot(slots[i % len(slots)].id, message=f"Edited {i}")
+    elapsed = time_module.perf_counter() - start
+    return elapsed / edits
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        manager = build_manager(os.path.join(directory, "before.json"), count)
+        manager.request_save = manager.save_timeline  # Previous behaviour
+        before = time_edits(manager, edits)
+
+        manager = build_manager(os.path.join(directory, "after.json"), count)
+        after = time_edits(manager, edits)
+        flush_start = time_module.perf_counter()
+        manager.flush()
+        flush = time_module.perf_counter() - flush_start
+
+    print(f"{count} slots, {edits} edits")
+    print(f"  synchronous save: {before * 1e3:8.3f} ms per edit")
+    print(f"  debounced save:   {after * 1e3:8.3f} ms per edit")
+    print(f"  final flush:      {flush * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
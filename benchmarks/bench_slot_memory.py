@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Memory benchmark for break slot storage.
+
+Compares 100k slots stored as ``BreakSlot`` views over a shared ``SlotTable``
+with the same slots stored as plain objects carrying a ``__dict__``, the way
+``BreakSlot`` used to be laid out.
+
+Usage:
+    python benchmarks/bench_slot_memory.py [count]
+"""
+
+import os
+import sys
+import tracemalloc
+from datetime import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.slot_table import SlotTable
+from src.models.timeline_manager import BreakSlot
+
+PATTERNS = ("daily", "weekdays", "weekends")
+MESSAGES = ("Stretch", "Drink some water", "Look away from the screen", "")
+
+
+class DictSlot:
+    """Replica of the previous per-instance ``__dict__`` slot layout."""
+
+    def __init__(self, start_time, duration, message, repeat_pattern, enabled):
+        self.start_time = start_time
+        self.duration = duration
+        self.message = message
+        self.repeat_pattern = repeat_pattern
+        self.enabled = enabled
+        self.id = f"{start_time.hour:02d}{start_time.minute:02d}_{duration}_{repeat_pattern}"
+
+
+def slot_fields(i):
+    minute = i % 1440
+    # Rebuild strings per slot, as json.load would
+    return (time(minute // 60, minute % 60), 5 + i % 25, "".join(MESSAGES[i % 4]),
+            "".join(PATTERNS[i % 3]), i % 7 != 0)
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def build_dict_slots(count):
+    return [DictSlot(*slot_fields(i)) for i in range(count)]
+
+
+def build_table_slots(count):
+    table = SlotTable()
+    return table, [BreakSlot(*slot_fields(i), table=table) for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    legacy = measure(lambda: build_dict_slots(count))
+    compact = measure(lambda: build_table_slots(count))
+    print(f"{count} slots")
+    print(f"  dict objects:     {legacy / 1e6:8.2f} MB ({legacy / count:6.1f} B/slot)")
+    print(f"  SlotTable views:  {compact / 1e6:8.2f} MB ({compact / count:6.1f} B/slot)")
+    print(f"  reduction:        {1 - compact / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,24 @@
 from src.views.main_window import MainWindow
+from src.controllers.timer_controller import TimerController
 from src.models.timeline_manager import TimelineManager
-from src.models.settings import SettingsManager
+from src.models.settings import CONFIG_DIR, AppSettings, LockedSettingError, SettingsManager
+from src.models.coordination import WriterElection
+from src.models.clock import Clock, real_clock
+from src.models.clock_monitor import ClockMonitor
+from src.models.break_history import HISTORY_FILE, BreakHistory
+from src.models.checkpoint import CHECKPOINT_FILE, SessionCheckpoint
+from src.models.events import EventBus, tk_dispatcher
+from src.models.file_watcher import create_file_watcher
+from src.models.idle_monitor import IdleMonitor, create_idle_source
+from src.models.serialization import available_codecs, get_codec
+from src.models.timer import Session, TimerService, get_timer_service
 from src.utils.audio import AudioManager
 from src.utils.themes import ThemeManager
 from src.utils.platform import PlatformUtils
 from datetime import datetime, timedelta
+from typing import FrozenSet, Optional
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -13,17 +26,43 @@ logger = logging.getLogger(__name__)
 class AppController:
     """Main application controller."""
     
-    def __init__(self, timeline_file=None, settings_file=None) -> None:
-        """Initialize application controller."""
-        # Initialize managers
-        self.settings_manager = SettingsManager(settings_file=settings_file)
-        self.timeline_manager = TimelineManager(timeline_file=timeline_file)
+    def __init__(self, timeline_file=None, settings_file=None, clock: Optional[Clock] = None) -> None:
+        """Initialize application controller.
+        
+        Args:
+            timeline_file: Timeline file path, the default one if omitted
+            settings_file: Settings file path, the default one if omitted
+            clock: Clock for every timer and the scheduler, the system clock if omitted
+        """
+        self.clock = clock if clock is not None else real_clock
+        self.timer_service = get_timer_service() if clock is None else TimerService(clock)
+        # Only one running instance writes the configuration files; the others forward their changes
+        config_dir = os.path.dirname(os.path.abspath(settings_file)) if settings_file else CONFIG_DIR
+        self.election = WriterElection(os.path.join(config_dir, "writer.lock"))
+        self.election.start()
+        
+        # Initialize managers on a shared event bus
+        self.event_bus = EventBus()
+        self.settings_manager = SettingsManager(settings_file=settings_file, event_bus=self.event_bus,
+                                                election=self.election)
+        # Load settings first; they choose the timeline storage backend and file format
+        self.settings_manager.load()
+        file_format = self.settings_manager.get("file_format")
+        if file_format not in available_codecs():
+            file_format = None
+        if file_format:
+            self.settings_manager.codec = get_codec(file_format)
+        self.timeline_manager = TimelineManager(timeline_file=timeline_file, event_bus=self.event_bus,
+                                                backend=self.settings_manager.get("timeline_backend"),
+                                                codec=file_format, election=self.election, clock=self.clock)
+        self.break_history = BreakHistory(os.path.join(config_dir, HISTORY_FILE), self.clock)
         self.audio_manager = AudioManager(self.settings_manager)
         self.theme_manager = ThemeManager()
         self.platform_utils = PlatformUtils()
-        
-        # Load settings
-        self.settings_manager.load()
+        # The work/break session the views render
+        self.timer_controller = TimerController(self.settings_manager, self.event_bus, self.timer_service,
+                                                self.break_history)
+        self.checkpoint = SessionCheckpoint(os.path.join(config_dir, CHECKPOINT_FILE), self.clock)
         
         # Initialize UI
         self.main_window = MainWindow(self)
@@ -41,8 +80,97 @@ class AppController:
         theme = self.settings_manager.get("theme", "system")
         self.theme_manager.apply_theme(theme)
         
+        self.start_file_watcher()
+        # Notice suspend/resume and clock changes; timers and the scheduler catch up
+        self.clock_monitor = ClockMonitor(self.event_bus, self.timer_service, self.clock)
+        self.clock_monitor.start()
+        # Pause work while the user is away; an absence as long as a break counts as one
+        self.idle_monitor = None
+        idle_source = create_idle_source(self.clock)
+        if idle_source is not None:
+            self.idle_monitor = IdleMonitor(self.event_bus, idle_source, self.timer_service, self.clock)
+            self.idle_monitor.start()
+        self.election.dispatcher = tk_dispatcher(self.main_window)
+        self.election.subscribe(self.on_elected_writer)
+        if self.election.is_writer:
+            self.on_elected_writer()  # Pick up changes and a session left by an instance that exited
         logger.info("Application controller initialized")
     
+    def start_file_watcher(self) -> None:
+        """Reload the timeline and settings files when other programs rewrite them."""
+        self.file_watcher = create_file_watcher(dispatcher=tk_dispatcher(self.main_window))
+        try:
+            self.file_watcher.watch(self.timeline_manager.store.path,
+                                    lambda path: self.timeline_manager.reload_timeline())
+            journal_path = getattr(self.timeline_manager.store, 'journal_path', None)
+            if journal_path is not None:
+                # Edits another instance journaled never touch the snapshot
+                self.file_watcher.watch(journal_path, lambda path: self.timeline_manager.reload_timeline())
+            self.file_watcher.watch(self.settings_manager.settings_file, self.on_settings_file_changed)
+            self.file_watcher.watch(self.timeline_manager.spool.path,
+                                    lambda path: self.timeline_manager.apply_forwarded_changes())
+            self.file_watcher.watch(self.settings_manager.spool.path, self.on_settings_forwarded)
+        except OSError as e:
+            logger.error(f"Could not watch configuration files: {e}")
+            return
+        for path in self.settings_manager.system_files():
+            try:
+                self.file_watcher.watch(path, self.on_system_settings_changed)
+            except OSError:
+                break  # No system configuration directory
+        self.file_watcher.start()
+    
+    def on_settings_file_changed(self, path: str) -> None:
+        """Apply settings that another program changed on disk.
+        
+        Args:
+            path: Settings file path
+        """
+        self.apply_changed_settings(self.settings_manager.reload())
+    
+    def on_settings_forwarded(self, path: str) -> None:
+        """Apply settings that another running instance changed.
+        
+        Args:
+            path: Settings spool file path
+        """
+        self.apply_changed_settings(self.settings_manager.apply_forwarded_changes())
+    
+    def on_elected_writer(self) -> None:
+        """Start saving the configuration files after the writing instance exited.
+        
+        Also takes over the session checkpoint: the session the writer was
+        running, or one interrupted by a crash, is restored first, which
+        also carries on the checkpoint's record numbering.
+        """
+        self.timeline_manager.on_elected()
+        self.apply_changed_settings(self.settings_manager.on_elected())
+        # Only the writing instance keeps the checkpoint
+        self.checkpoint.restore(self.get_session())
+        self.checkpoint.attach(self.get_session())
+    
+    def on_system_settings_changed(self, path: str) -> None:
+        """Apply changed system defaults or admin policy.
+        
+        Args:
+            path: System settings file path
+        """
+        self.apply_changed_settings(self.settings_manager.reload_system())
+    
+    def apply_changed_settings(self, changed) -> None:
+        """Apply window-level settings that changed outside the settings dialogs.
+        
+        Args:
+            changed: Keys whose effective value changed
+        """
+        if "theme" in changed:
+            self.theme_manager.apply_theme(self.settings_manager.get("theme", "system"))
+        if "always_on_top" in changed and hasattr(self.main_window, 'attributes'):
+            try:
+                self.main_window.attributes('-topmost', self.settings_manager.get('always_on_top', False))
+            except Exception as e:
+                logger.error(f"Could not apply always on top: {e}")
+    
     def run(self) -> None:
         """Start the application."""
         logger.info("Starting Break Assistant application")
@@ -51,7 +179,18 @@ class AppController:
     def quit(self) -> None:
         """Quit the application."""
         logger.info("Quitting Break Assistant application")
-        self.settings_manager.save()
+        self.main_window.stop_timeline_monitor()
+        self.clock_monitor.stop()
+        if self.idle_monitor is not None:
+            self.idle_monitor.stop()
+        self.timer_controller.stop()
+        self.checkpoint.close()
+        self.file_watcher.stop()
+        # Write out, or forward to the writing instance, anything not saved yet
+        self.timeline_manager.flush()
+        self.settings_manager.flush()
+        self.election.stop()
+        self.break_history.close()
         self.main_window.quit()
     
     def get_timeline_manager(self) -> TimelineManager:
@@ -70,6 +209,66 @@ class AppController:
         """
         return self.settings_manager
     
+    def get_event_bus(self) -> EventBus:
+        """Get the event bus shared by the models.
+        
+        Returns:
+            Event bus instance
+        """
+        return self.event_bus
+    
+    def get_clock(self) -> Clock:
+        """Get the clock the application runs on.
+        
+        Returns:
+            Clock instance
+        """
+        return self.clock
+    
+    def get_timer_service(self) -> TimerService:
+        """Get the timer service that runs work and break countdowns.
+        
+        Returns:
+            Timer service instance
+        """
+        return self.timer_service
+    
+    def get_session(self) -> Session:
+        """Get the work/break session.
+        
+        Returns:
+            Session instance
+        """
+        return self.timer_controller.session
+    
+    def get_break_history(self) -> BreakHistory:
+        """Get the break history.
+        
+        Returns:
+            Break history instance
+        """
+        return self.break_history
+    
+    def record_break_event(self, kind: str, break_slot=None, source: Optional[str] = None,
+                           when: Optional[datetime] = None, occurrence: Optional[datetime] = None) -> None:
+        """Record what happened to a break in the history.
+        
+        Failures are logged rather than raised, so history problems never
+        get in the way of a break.
+        
+        Args:
+            kind: Event kind from ``src.models.break_history``
+            break_slot: Break the event is about; timeline slots carry an ID
+            source: What raised the break, e.g. "scheduled", "timer" or "manual"
+            when: Time of the event, now if omitted
+            occurrence: When the break was due, for the average start delay
+        """
+        try:
+            self.break_history.record(kind, getattr(break_slot, 'id', None), when, source,
+                                      getattr(break_slot, 'duration', None), occurrence)
+        except Exception as e:
+            logger.error(f"Could not record break event {kind}: {e}")
+    
     def get_audio_manager(self) -> AudioManager:
         """Get the audio manager.
         
@@ -96,7 +295,7 @@ class AppController:
     
     def get_next_break(self) -> tuple:
         """Get the next break from timeline."""
-        current_datetime = datetime.now()
+        current_datetime = self.clock.now()
         
         next_break = self.timeline_manager.get_next_break(current_datetime)
         
@@ -122,7 +321,7 @@ class AppController:
         self.play_notification_sound()
         
         # Show popup
-        popup = BreakPopup(self.main_window, self)
+        popup = BreakPopup(self.main_window, self, self.get_session())
         popup.set_break_info(break_slot, occurrence_time)
         # Popup is already visible from __init__
     
@@ -134,7 +333,7 @@ class AppController:
         """
         self.theme_manager.apply_theme(theme_name)
         self.settings_manager.set("theme", theme_name)
-        self.settings_manager.save()
+        self.settings_manager.request_save()
     
     def apply_transparency(self, enabled: bool) -> None:
         """Apply transparency setting.
@@ -143,7 +342,7 @@ class AppController:
             enabled: Whether transparency is enabled
         """
         self.settings_manager.set("transparency", enabled)
-        self.settings_manager.save()
+        self.settings_manager.request_save()
         # Note: Actual transparency implementation would go here
     
     def apply_always_on_top(self, enabled: bool) -> None:
@@ -153,26 +352,57 @@ class AppController:
             enabled: Whether window should always be on top
         """
         self.settings_manager.set("always_on_top", enabled)
-        self.settings_manager.save()
+        self.settings_manager.request_save()
         # Note: Actual always on top implementation would go here
     
     def get_settings(self) -> dict:
-        """Get current settings.
+        """Get a copy of the effective settings for editing.
         
         Returns:
             Settings dictionary
         """
-        return self.settings_manager.settings.copy()
+        return dict(self.settings_manager.resolved)
+    
+    def get_settings_snapshot(self) -> AppSettings:
+        """Get the current settings as a shared, validated snapshot.
+        
+        Returns:
+            Immutable typed settings; cheap to call repeatedly
+        """
+        return self.settings_manager.snapshot
+    
+    def get_locked_settings(self) -> FrozenSet[str]:
+        """Get the settings locked by the administrator.
+        
+        Returns:
+            Keys that must be shown read-only
+        """
+        return self.settings_manager.locked_keys()
     
     def save_settings(self, settings: dict) -> None:
         """Save settings.
         
+        Locked settings passed with their enforced value are ignored, so
+        dialogs can submit all their fields, and values equal to a system
+        default the user never overrode are not copied into the user file.
+        
         Args:
             settings: Settings dictionary
+            
+        Raises:
+            LockedSettingError: If a locked setting would change; nothing
+                is saved in that case
         """
+        rejected = sorted(key for key, value in settings.items()
+                          if self.settings_manager.is_locked(key) and self.settings_manager.get(key) != value)
+        if rejected:
+            raise LockedSettingError(f"Locked by the administrator: {', '.join(rejected)}")
+        user_settings = self.settings_manager.settings
         for key, value in settings.items():
+            if key not in user_settings and self.settings_manager.get(key) == value:
+                continue
             self.settings_manager.set(key, value)
-        self.settings_manager.save()
+        self.settings_manager.request_save()
     
     def load_settings(self) -> dict:
         """Load settings.
@@ -180,7 +410,7 @@ class AppController:
         Returns:
             Settings dictionary
         """
-        return self.settings_manager.settings.copy()
+        return dict(self.settings_manager.resolved)
     
     def get_platform(self) -> str:
         """Get current platform.
@@ -196,14 +426,5 @@ class AppController:
         Args:
             duration_seconds: Break duration in seconds
         """
-        # Update main window timer for break
-        if hasattr(self.main_window, 'timer_duration'):
-            self.main_window.timer_duration = duration_seconds
-            self.main_window.timer_remaining = duration_seconds
-            self.main_window.timer_running = False
-            self.main_window.start_button.configure(text="Start")
-            self.main_window.status_label.configure(text="Break time!")
-            self.main_window.update_timer_display()
-            
-            # Start the break timer
-            self.main_window.start_timer() 
\ No newline at end of file
+        # The main window follows the session into the break
+        self.get_session().begin_break(duration_seconds, start=True)
\ No newline at end of file
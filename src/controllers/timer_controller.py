@@ -1,4 +1,102 @@
+from typing import Optional
+from datetime import timedelta
+import logging
+
+from src.models.break_history import COMPLETED, STARTED, BreakHistory
+from src.models.events import EventBus, SettingChanged, UserIdle, UserReturned
+from src.models.settings import AppSettings
+from src.models.timer import WORK, Session, TimerService
+
+logger = logging.getLogger(__name__)
+
+# Settings that shape the work/break cycle
+SESSION_SETTINGS = ("work_duration", "break_duration", "long_break_duration", "sessions_before_long_break")
+
+
 class TimerController:
-    """Timer management controller."""
-    def __init__(self) -> None:
-        pass 
\ No newline at end of file
+    """Timer management controller.
+
+    Owns the work/break session the main window and break popup render,
+    and keeps its phase lengths in line with the settings. With idle
+    detection on, work pauses while the user is away, and an absence at
+    least as long as a break counts as one: it is recorded as a completed
+    break and the work period starts over.
+    """
+
+    def __init__(self, settings_manager, event_bus: EventBus,
+                 service: Optional[TimerService] = None, history: Optional[BreakHistory] = None) -> None:
+        """Initialize the controller with a paused session.
+
+        Args:
+            settings_manager: Settings manager providing the snapshot
+            event_bus: Bus for session, settings and idle events
+            service: Timer service the session runs on, the shared one if omitted
+            history: Break history to record breaks taken by being away in
+        """
+        self.settings_manager = settings_manager
+        self.history = history
+        self.session = Session(event_bus=event_bus, service=service, **self._lengths(settings_manager.snapshot))
+        self._paused_for_idle = False
+        self._unsubscribe = [
+            event_bus.subscribe(SettingChanged, self.on_setting_changed),
+            event_bus.subscribe(UserIdle, self.on_user_idle),
+            event_bus.subscribe(UserReturned, self.on_user_returned),
+        ]
+
+    def on_setting_changed(self, event: SettingChanged) -> None:
+        """Apply changed phase lengths to the session."""
+        if event.key in SESSION_SETTINGS:
+            logger.info(f"Session setting {event.key} changed to {event.new_value}")
+            self.session.configure(**self._lengths(self.settings_manager.snapshot))
+
+    def on_user_idle(self, event: UserIdle) -> None:
+        """Pause work while the user is away."""
+        if not self.settings_manager.snapshot.idle_detection:
+            return
+        if self.session.phase == WORK and self.session.pause() is not None:
+            logger.info(f"Work paused, user idle since {event.since:%H:%M}")
+            self._paused_for_idle = True
+
+    def on_user_returned(self, event: UserReturned) -> None:
+        """Credit an absence as long as a break, and carry on working."""
+        resume, self._paused_for_idle = self._paused_for_idle, False
+        if not self.settings_manager.snapshot.idle_detection:
+            return
+        if self.is_idle_break(event):
+            logger.info(f"Away for {event.idle:.0f}s, counted as a break")
+            self.record_idle_break(event)
+            self.session.end_break()
+            self.session.reset()
+        if resume:
+            self.session.start()
+
+    def is_idle_break(self, event: UserReturned) -> bool:
+        """Check whether an absence was long enough to count as a break."""
+        return event.idle >= self.settings_manager.snapshot.break_duration * 60
+
+    def record_idle_break(self, event: UserReturned) -> None:
+        """Record an absence in the break history as a break started and completed."""
+        if self.history is None:
+            return
+        minutes = round(event.idle / 60)
+        ended = event.since + timedelta(seconds=event.idle)
+        try:
+            self.history.record_many([(STARTED, None, event.since, "idle", minutes),
+                                      (COMPLETED, None, ended, "idle", minutes)])
+        except Exception as e:
+            logger.error(f"Could not record idle break: {e}")
+
+    def stop(self) -> None:
+        """Stop following the settings and the user, and pause the session."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self.session.pause()
+
+    @staticmethod
+    def _lengths(settings: AppSettings) -> dict:
+        return {
+            "work": settings.work_duration * 60,
+            "short_break": settings.break_duration * 60,
+            "long_break": settings.long_break_duration * 60,
+            "sessions_per_cycle": settings.sessions_before_long_break,
+        }
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 
@@ -8,11 +9,29 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from src.controllers.app_controller import AppController
+from src.models.break_history import HISTORY_FILE, BreakHistory
+from src.models.settings import CONFIG_DIR
 
-def main() -> None:
+def rebuild_stats() -> None:
+    """Recompute the break statistics from the recorded break history."""
+    history = BreakHistory(os.path.join(CONFIG_DIR, HISTORY_FILE))
+    try:
+        count = history.rebuild_rollups()
+    finally:
+        history.close()
+    print(f"Rebuilt break statistics from {count} recorded events")
+
+def main(argv=None) -> None:
     """Application entry point."""
+    parser = argparse.ArgumentParser(prog="break-assistant")
+    parser.add_argument("--rebuild-stats", action="store_true",
+                        help="recompute break statistics from the break history and exit")
+    args = parser.parse_args(argv)
+    if args.rebuild_stats:
+        rebuild_stats()
+        return
     app = AppController()
     app.run()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,333 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+import os
+import sqlite3
+import threading
+
+from src.models.clock import Clock, real_clock
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = "history.db"
+
+# Event kinds, in the order a break normally goes through them
+SCHEDULED = "scheduled"  # A timeline slot fell due
+SHOWN = "shown"          # A break popup was shown
+STARTED = "started"      # The break countdown was started
+COMPLETED = "completed"  # The break countdown ran out
+SKIPPED = "skipped"      # The popup was closed before the break completed
+SNOOZED = "snoozed"      # The break was extended by the snooze button
+EVENT_KINDS = (SCHEDULED, SHOWN, STARTED, COMPLETED, SKIPPED, SNOOZED)
+
+# Rollup periods
+DAY = "day"
+WEEK = "week"
+
+# Rollup counters after the per-kind counts, in column order
+ROLLUP_TOTALS = ("break_minutes", "delays", "delay_seconds")
+ROLLUP_COLUMNS = EVENT_KINDS + ROLLUP_TOTALS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS break_events (
+    id INTEGER PRIMARY KEY,
+    time TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    slot_id TEXT,
+    source TEXT,
+    duration INTEGER,
+    occurrence TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_break_events_time ON break_events (time);
+CREATE INDEX IF NOT EXISTS idx_break_events_slot ON break_events (slot_id, day);
+CREATE INDEX IF NOT EXISTS idx_break_events_occurrence ON break_events (occurrence, kind);
+CREATE TABLE IF NOT EXISTS break_rollups (
+    period TEXT NOT NULL,
+    start TEXT NOT NULL,
+    scheduled INTEGER NOT NULL DEFAULT 0,
+    shown INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    snoozed INTEGER NOT NULL DEFAULT 0,
+    break_minutes INTEGER NOT NULL DEFAULT 0,
+    delays INTEGER NOT NULL DEFAULT 0,
+    delay_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, start)
+) WITHOUT ROWID;
+"""
+
+# Event row as stored: time, day, kind, slot_id, source, duration, occurrence
+EventRow = Tuple[str, str, str, Optional[str], Optional[str], Optional[int], Optional[str]]
+Rollups = Dict[Tuple[str, str], List[int]]
+
+
+@dataclass(frozen=True)
+class Compliance:
+    """Break statistics for one day or week.
+
+    ``completed`` counts the breaks taken. ``delays`` counts the breaks
+    started after being due, and ``delay_seconds`` sums how late they
+    were started.
+    """
+    start: date
+    days: int = 1
+    scheduled: int = 0
+    shown: int = 0
+    started: int = 0
+    completed: int = 0
+    skipped: int = 0
+    snoozed: int = 0
+    break_minutes: int = 0
+    delays: int = 0
+    delay_seconds: int = 0
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Share of shown breaks that were completed, None if none were shown."""
+        if not self.shown:
+            return None
+        return min(1.0, self.completed / self.shown)
+
+    @property
+    def skip_rate(self) -> Optional[float]:
+        """Share of shown breaks that were skipped, None if none were shown."""
+        if not self.shown:
+            return None
+        return min(1.0, self.skipped / self.shown)
+
+    @property
+    def average_delay(self) -> Optional[float]:
+        """Average seconds from a break being due to it being started, None if none started."""
+        if not self.delays:
+            return None
+        return self.delay_seconds / self.delays
+
+
+def week_start(day: date) -> date:
+    """Get the Monday starting the ISO week of a day."""
+    return day - timedelta(days=day.weekday())
+
+
+class BreakHistory:
+    """Append-only record of what happened to each break, in SQLite.
+
+    Every event stores its local time and date. Alongside the events,
+    ``break_rollups`` holds one row of counters per day and per ISO week,
+    updated in the same transaction as each recorded event. Statistics
+    for any range therefore read one row per day or week, never the
+    events, and a year of weekly figures is about fifty rows however
+    long the history. Events are never updated or deleted, so
+    ``rebuild_rollups`` can always recompute the counters from them.
+    """
+
+    def __init__(self, path, clock: Optional[Clock] = None) -> None:
+        """Open or create the history database.
+
+        Args:
+            path: Path of the SQLite database file
+            clock: Clock that dates events recorded without a time, the system clock if omitted
+        """
+        self.path = path
+        self.clock = clock if clock is not None else real_clock
+        self._lock = threading.Lock()
+        # Scheduled breaks are recorded from the scheduler thread; the lock serializes access
+        self._connection = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def record(self, kind: str, slot_id: Optional[str] = None, when: Optional[datetime] = None,
+               source: Optional[str] = None, duration: Optional[int] = None,
+               occurrence: Optional[datetime] = None) -> None:
+        """Append one event and update the rollups.
+
+        Args:
+            kind: One of ``EVENT_KINDS``
+            slot_id: ID of the timeline slot, None for timer and manual breaks
+            when: Local time of the event, now if omitted
+            source: What raised the break, e.g. "scheduled", "timer" or "manual"
+            duration: Break length in minutes
+            occurrence: When the break was due; the first start of each
+                occurrence counts towards the average delay
+
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        self.record_many([(kind, slot_id, when, source, duration, occurrence)])
+
+    def record_many(self, events: Iterable[Tuple[Any, ...]]) -> None:
+        """Append several events in one transaction and update the rollups.
+
+        Args:
+            events: Tuples of (kind, slot_id, when, source, duration) and
+                optionally occurrence, as for ``record``
+
+        Raises:
+            ValueError: If a kind is unknown; nothing is recorded in that case
+        """
+        rows: List[EventRow] = []
+        now = None
+        for kind, slot_id, when, source, duration, *rest in events:
+            if kind not in EVENT_KINDS:
+                raise ValueError(f"Unknown break event: {kind}")
+            if when is None:
+                when = now = now or self.clock.now()
+            occurrence = rest[0] if rest else None
+            rows.append((when.isoformat(timespec="seconds"), when.date().isoformat(), kind, slot_id,
+                         source, duration, occurrence.isoformat(timespec="seconds") if occurrence else None))
+        with self._lock, self._connection:
+            seen = self._started_occurrences(rows)
+            rollups: Rollups = {}
+            for row in rows:
+                self._accumulate(rollups, row, seen)
+            self._connection.executemany(
+                "INSERT INTO break_events (time, day, kind, slot_id, source, duration, occurrence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._add_rollups(rollups)
+
+    def events(self, start: datetime, end: datetime, kind: Optional[str] = None,
+               slot_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the events in a time range, oldest first.
+
+        Args:
+            start: Start of the range, inclusive
+            end: End of the range, exclusive
+            kind: Only events of this kind
+            slot_id: Only events of this timeline slot
+
+        Returns:
+            Event dictionaries with ``time`` (datetime), ``kind``,
+            ``slot_id``, ``source``, ``duration`` and ``occurrence``
+            (datetime or None)
+        """
+        query = ("SELECT time, kind, slot_id, source, duration, occurrence FROM break_events "
+                 "WHERE time >= ? AND time < ?")
+        params: List[Any] = [start.isoformat(timespec="seconds"), end.isoformat(timespec="seconds")]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        if slot_id is not None:
+            query += " AND slot_id = ?"
+            params.append(slot_id)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY time, id", params).fetchall()
+        return [{"time": datetime.fromisoformat(row[0]), "kind": row[1], "slot_id": row[2],
+                 "source": row[3], "duration": row[4],
+                 "occurrence": datetime.fromisoformat(row[5]) if row[5] else None} for row in rows]
+
+    def daily_compliance(self, start: date, end: date) -> List[Compliance]:
+        """Get break statistics for each day in a range.
+
+        Args:
+            start: First day
+            end: Last day, inclusive
+
+        Returns:
+            One entry per day, including days without events
+        """
+        totals = self._read_rollups(DAY, start, end)
+        days = []
+        day = start
+        while day <= end:
+            days.append(Compliance(day, 1, *totals.get(day.isoformat(), ())))
+            day += timedelta(days=1)
+        return days
+
+    def weekly_compliance(self, start: date, end: date) -> List[Compliance]:
+        """Get break statistics for each ISO week (Monday to Sunday) in a range.
+
+        Args:
+            start: A day in the first week
+            end: A day in the last week, inclusive
+
+        Returns:
+            One entry per week, starting on its Monday
+        """
+        first, last = week_start(start), week_start(end)
+        totals = self._read_rollups(WEEK, first, last)
+        weeks = []
+        monday = first
+        while monday <= last:
+            weeks.append(Compliance(monday, 7, *totals.get(monday.isoformat(), ())))
+            monday += timedelta(days=7)
+        return weeks
+
+    def rebuild_rollups(self) -> int:
+        """Recompute every rollup from the recorded events.
+
+        Recovers the statistics if the rollups were damaged or lost.
+
+        Returns:
+            Number of events read
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "SELECT time, day, kind, slot_id, source, duration, occurrence FROM break_events ORDER BY id")
+            rollups: Rollups = {}
+            seen: Set[Tuple[Any, ...]] = set()
+            count = 0
+            for row in cursor:
+                self._accumulate(rollups, row, seen)
+                count += 1
+            self._connection.execute("DELETE FROM break_rollups")
+            self._add_rollups(rollups)
+        logger.info(f"Rebuilt break statistics from {count} events")
+        return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _started_occurrences(self, rows: List[EventRow]) -> Set[Tuple[Any, ...]]:
+        """Find which occurrences among the new start events were already started."""
+        seen: Set[Tuple[Any, ...]] = set()
+        for _, _, kind, slot_id, source, _, occurrence in rows:
+            if kind == STARTED and occurrence is not None:
+                started = self._connection.execute(
+                    "SELECT 1 FROM break_events WHERE occurrence = ? AND kind = ? "
+                    "AND slot_id IS ? AND source IS ? LIMIT 1",
+                    (occurrence, STARTED, slot_id, source)).fetchone()
+                if started:
+                    seen.add((occurrence, slot_id, source))
+        return seen
+
+    @staticmethod
+    def _accumulate(rollups: Rollups, row: EventRow, seen: Set[Tuple[Any, ...]]) -> None:
+        """Add one event to the day and week counters it belongs to."""
+        time, day, kind, slot_id, source, duration, occurrence = row
+        increments = [0] * len(ROLLUP_COLUMNS)
+        increments[EVENT_KINDS.index(kind)] = 1
+        if kind == COMPLETED:
+            increments[len(EVENT_KINDS)] = duration or 0
+        elif kind == STARTED and occurrence is not None and (occurrence, slot_id, source) not in seen:
+            seen.add((occurrence, slot_id, source))
+            delay = datetime.fromisoformat(time) - datetime.fromisoformat(occurrence)
+            increments[len(EVENT_KINDS) + 1] = 1
+            increments[len(EVENT_KINDS) + 2] = max(0, int(delay.total_seconds()))
+        for key in ((DAY, day), (WEEK, week_start(date.fromisoformat(day)).isoformat())):
+            totals = rollups.setdefault(key, [0] * len(ROLLUP_COLUMNS))
+            for i, value in enumerate(increments):
+                totals[i] += value
+
+    def _add_rollups(self, rollups: Rollups) -> None:
+        """Add counter increments to the stored rollups, creating missing rows."""
+        columns = ", ".join(ROLLUP_COLUMNS)
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_COLUMNS)
+        self._connection.executemany(
+            f"INSERT INTO break_rollups (period, start, {columns}) "
+            f"VALUES (?, ?{', ?' * len(ROLLUP_COLUMNS)}) "
+            f"ON CONFLICT (period, start) DO UPDATE SET {updates}",
+            [key + tuple(totals) for key, totals in rollups.items()])
+
+    def _read_rollups(self, period: str, start: date, end: date) -> Dict[str, Tuple[int, ...]]:
+        """Read the counters of one period kind, keyed by the period's first day."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT start, {', '.join(ROLLUP_COLUMNS)} FROM break_rollups "
+                f"WHERE period = ? AND start BETWEEN ? AND ?",
+                (period, start.isoformat(), end.isoformat())).fetchall()
+        return {row[0]: row[1:] for row in rows}
@@ -1,9 +1,91 @@
-from typing import List
+from typing import Callable, Optional
+from datetime import time
+
+from src.models.settings import AppSettings
+from src.models.timer import LONG_BREAK
+
+# Attributes a scheduled break copies from its timeline slot
+SLOT_ATTRIBUTES = ('start_time', 'duration', 'message', 'repeat_pattern', 'enabled', 'id')
+
+
+class BreakInfo:
+    """What a break popup shows: a timeline slot's details or a timer or manual break.
+
+    Durations are in minutes. ``scheduled`` tells timeline breaks from
+    the others; only those carry an ``id`` and a ``start_time``.
+    """
+
+    def __init__(self, duration: int, message: str, scheduled: bool = False, long: bool = False,
+                 id: Optional[str] = None, start_time: Optional[time] = None,
+                 repeat_pattern: Optional[str] = None, enabled: bool = True) -> None:
+        self.duration = duration
+        self.message = message
+        self.scheduled = scheduled
+        self.long = long
+        self.id = id
+        self.start_time = start_time
+        self.repeat_pattern = repeat_pattern
+        self.enabled = enabled
+
+    def __repr__(self) -> str:
+        return f"BreakInfo(duration={self.duration}, message={self.message!r}, scheduled={self.scheduled})"
+
 
 class BreakManager:
-    """Manages break scheduling and logic."""
-    def __init__(self) -> None:
-        self.breaks: List[int] = []
+    """Manages break scheduling and logic.
+
+    Works out the length and message of each kind of break from the
+    settings, so that the views only have to show them.
+    """
+
+    def __init__(self, get_settings: Callable[[], AppSettings]) -> None:
+        """Initialize the manager.
+
+        Args:
+            get_settings: Returns the current settings snapshot
+        """
+        self.get_settings = get_settings
+
+    def timer_break(self, phase: str) -> BreakInfo:
+        """Get the break that follows a finished work period.
+
+        Args:
+            phase: Break phase the session moved to
+
+        Returns:
+            Short or long break with the default message
+        """
+        settings = self.get_settings()
+        if phase == LONG_BREAK:
+            return BreakInfo(settings.long_break_duration, settings.default_break_message, long=True)
+        return BreakInfo(settings.break_duration, settings.default_break_message)
+
+    def manual_break(self) -> BreakInfo:
+        """Get the break started with the Break Now button."""
+        settings = self.get_settings()
+        return BreakInfo(settings.manual_break_duration, settings.break_message or 'Time for a break!')
+
+    def scheduled_break(self, slot) -> BreakInfo:
+        """Get the break for a timeline slot that fell due.
+
+        The slot's own message wins, then the preferences message, then a
+        default naming the duration; slots without a duration take the
+        default break duration.
+
+        Args:
+            slot: Timeline break slot
 
-    def schedule_next_break(self) -> None:
-        pass 
\ No newline at end of file
+        Returns:
+            Scheduled break with the slot's details
+        """
+        settings = self.get_settings()
+        values = {attr: getattr(slot, attr) for attr in SLOT_ATTRIBUTES if hasattr(slot, attr)}
+        duration = values.pop('duration', None)
+        if duration is None or duration <= 0:
+            duration = settings.break_duration
+        message = values.pop('message', None)
+        if not (message and message.strip()):
+            message = settings.break_message
+        if not message.strip():
+            message = f"Time for your {duration}-minute break!"
+        return BreakInfo(duration, message, scheduled=True, **values)
@@ -0,0 +1,236 @@
+from typing import Callable, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import threading
+
+from src.models.clock import Clock, real_clock
+from src.models.events import ClockEvent, EventBus, SettingsEvent, TimelineEvent
+
+logger = logging.getLogger(__name__)
+
+# Breaks that fell due this recently are still shown, e.g. right after startup
+GRACE_PERIOD = timedelta(seconds=30)
+# Longest uninterrupted sleep; bounds how late a wall-clock jump is noticed
+CLOCK_CHECK_INTERVAL = 60.0
+# Disagreement between wall and monotonic clocks treated as a clock jump
+CLOCK_JUMP_TOLERANCE = 2.0
+
+# What to do with breaks that fell due while suspended or skipped by a clock jump
+MISSED_SKIP = "skip"
+MISSED_FIRE_ONE = "one"
+MISSED_FIRE_LATEST = "latest"
+
+BreakCallback = Callable[[object, datetime], None]
+
+
+class BreakScheduler:
+    """Background thread that fires scheduled breaks at their exact time.
+
+    The thread computes the next occurrence from the timeline and sleeps on
+    a condition variable until it is due. It wakes early only when a
+    timeline or settings event arrives, and re-checks the wall clock at
+    least every ``CLOCK_CHECK_INTERVAL`` seconds so that clock changes and
+    suspend/resume, seen as the wall clock drifting away from the monotonic
+    one, reschedule the wait. Breaks that a forward jump passed over are
+    dropped, or the first or the latest of them fires, as the missed break
+    policy says.
+
+    ``poll`` does one round of that work without the thread, for
+    simulations that move a virtual clock themselves.
+    """
+
+    def __init__(self, timeline_manager, on_break_due: BreakCallback,
+                 on_next_break: Optional[Callable[[Optional[Tuple[object, datetime]]], None]] = None,
+                 event_bus: Optional[EventBus] = None,
+                 clock: Optional[Clock] = None,
+                 missed_policy: Optional[Callable[[], str]] = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            timeline_manager: Timeline manager providing ``get_next_break``
+            on_break_due: Called with (break_slot, occurrence_datetime) from
+                the scheduler thread when a break falls due
+            on_next_break: Called with the upcoming (break_slot,
+                occurrence_datetime) or None whenever it or the date changes
+            event_bus: Bus whose timeline, settings and clock events wake
+                the scheduler, the timeline manager's bus if omitted
+            clock: Clock to read and wait on, the system clock if omitted
+            missed_policy: Returns ``MISSED_SKIP``, ``MISSED_FIRE_ONE`` or
+                ``MISSED_FIRE_LATEST``; the latest missed break fires if omitted
+        """
+        self.timeline_manager = timeline_manager
+        self.on_break_due = on_break_due
+        self.on_next_break = on_next_break
+        self.events = event_bus if event_bus is not None else timeline_manager.events
+        self.clock = clock if clock is not None else real_clock
+        self._missed_policy = missed_policy
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._unsubscribers = []
+        self._stopped = False
+        self._changed = False
+        self._fired_until: Optional[datetime] = None
+        self._last_clock: Optional[Tuple[datetime, float]] = None
+        self._missed: Optional[Tuple[object, datetime]] = None
+        self._next_key = ()
+        self.wakeups = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the scheduler thread and subscribe to change events."""
+        if self.running:
+            return
+        self._stopped = False
+        self._unsubscribers = [
+            self.events.subscribe(TimelineEvent, self.wake),
+            self.events.subscribe(SettingsEvent, self.wake),
+            self.events.subscribe(ClockEvent, self.wake),
+        ]
+        self._thread = threading.Thread(target=self._run, name="BreakScheduler", daemon=True)
+        self._thread.start()
+        logger.info("Break scheduler started")
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Stop the scheduler thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def wake(self, event=None) -> None:
+        """Make the scheduler recompute its deadline now.
+
+        Args:
+            event: Change event that caused the wake-up, if any
+        """
+        with self._condition:
+            self._changed = True
+            self._condition.notify_all()
+
+    def poll(self) -> float:
+        """Fire the breaks that are due and report when to poll again.
+
+        Returns:
+            Seconds until the next break is due or the clock must be re-checked
+        """
+        while True:
+            with self._condition:
+                try:
+                    due, next_break, delay = self._plan()
+                except Exception as e:
+                    logger.error(f"Error planning next break: {e}")
+                    next_break, delay = None, CLOCK_CHECK_INTERVAL
+                if due is None:
+                    key = (next_break[0].id, next_break[1], self.clock.now().date()) if next_break else None
+                    notify_next = key != self._next_key
+                    self._next_key = key
+                    if notify_next and self.on_next_break is not None:
+                        self._call(self.on_next_break, next_break)
+                    return delay
+            # Run the callback without holding the lock so it may call wake()
+            self._call(self.on_break_due, *due)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+            delay = self.poll()
+            with self._condition:
+                if not self._changed and not self._stopped:
+                    self.clock.wait(self._condition, delay)
+                    self.wakeups += 1
+
+    def _plan(self) -> Tuple[Optional[Tuple[object, datetime]], Optional[Tuple[object, datetime]], float]:
+        """Work out what to do next; called with the condition held.
+
+        Returns:
+            Tuple of (due_break, next_break, seconds_to_sleep); due_break is
+            set when a break must fire now
+        """
+        now = self.clock.now()
+        monotonic = self.clock.monotonic()
+        self._check_clock(now, monotonic)
+        self._changed = False
+        if self._missed is not None:
+            missed, self._missed = self._missed, None
+            self._fired_until = missed[1]
+            logger.info(f"Firing break missed at {missed[1].strftime('%H:%M:%S')}")
+            return missed, None, 0.0
+
+        after = now - GRACE_PERIOD
+        if self._fired_until is not None and self._fired_until > after:
+            after = self._fired_until
+        next_break = self.timeline_manager.get_next_break(after)
+        if next_break is None:
+            return None, None, CLOCK_CHECK_INTERVAL
+        occurrence = next_break[1]
+        if occurrence <= now:
+            self._fired_until = occurrence
+            logger.info(f"Break due at {occurrence.strftime('%H:%M:%S')}")
+            return next_break, None, 0.0
+        return None, next_break, min((occurrence - now).total_seconds(), CLOCK_CHECK_INTERVAL)
+
+    def _check_clock(self, now: datetime, monotonic: float) -> None:
+        """Detect wall-clock jumps since the previous check."""
+        if self._last_clock is not None:
+            last_now, last_monotonic = self._last_clock
+            drift = (now - last_now).total_seconds() - (monotonic - last_monotonic)
+            if abs(drift) > CLOCK_JUMP_TOLERANCE:
+                logger.info(f"Wall clock jumped by {drift:+.0f}s, rescheduling")
+                if self._fired_until is not None and self._fired_until > now:
+                    # Breaks after the new time are upcoming again
+                    self._fired_until = now
+                elif drift > 0:
+                    self._missed = self._pick_missed(last_now, now)
+        self._last_clock = (now, monotonic)
+
+    def _pick_missed(self, last_now: datetime, now: datetime) -> Optional[Tuple[object, datetime]]:
+        """Choose which of the breaks a forward jump passed over should still fire.
+
+        Everything up to the previous check was already handled and breaks
+        within the grace period fire anyway, so the missed ones lie between.
+
+        Args:
+            last_now: Wall-clock time of the previous check
+            now: Wall-clock time after the jump
+
+        Returns:
+            Tuple of (break_slot, occurrence_datetime) to fire, or None
+        """
+        policy = self._missed_policy() if self._missed_policy is not None else MISSED_FIRE_LATEST
+        if policy == MISSED_SKIP:
+            return None
+        start = last_now
+        if self._fired_until is not None and self._fired_until > start:
+            start = self._fired_until
+        start += timedelta(microseconds=1)
+        end = now - GRACE_PERIOD + timedelta(microseconds=1)
+        chosen = None
+        for occurrence in self.timeline_manager.iter_occurrences(start, end):
+            chosen = occurrence
+            if policy == MISSED_FIRE_ONE:
+                break
+        if chosen is not None:
+            logger.info(f"Missed breaks while the clock jumped; policy {policy!r}")
+        return chosen
+
+    @staticmethod
+    def _call(callback: Callable, *args) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Error in break scheduler callback: {e}")
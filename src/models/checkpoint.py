@@ -0,0 +1,200 @@
+from typing import Callable, Optional, Tuple
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from src.models.clock import Clock, real_clock
+from src.models.events import SessionChanged
+from src.models.timer import PHASES, Session, SessionState
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint file name within the configuration directory
+CHECKPOINT_FILE = "session.checkpoint"
+
+_MAGIC = b"BASC"
+_VERSION = 1
+# Magic, version, sequence, phase, flags, duration, remaining, work remaining,
+# cycle, then the monotonic, boot and wall clocks and the boot ID when written
+_RECORD = struct.Struct("<4sBQBBdddIddd16s")
+_CRC = struct.Struct("<I")
+_SLOT_SIZE = _RECORD.size + _CRC.size
+_FILE_SIZE = 2 * _SLOT_SIZE
+
+_RUNNING = 0x1
+_WORK_REMAINING = 0x2
+_BOOTTIME = 0x4
+
+_BOOT_ID_FILE = "/proc/sys/kernel/random/boot_id"
+
+
+def read_boot_id() -> bytes:
+    """Get an ID that changes with every boot, where the system provides one.
+
+    Returns:
+        16 bytes, all zero if unknown
+    """
+    try:
+        with open(_BOOT_ID_FILE, "rb") as f:
+            return bytes.fromhex(f.read().strip().replace(b"-", b"").decode("ascii"))[:16].ljust(16, b"\0")
+    except (OSError, ValueError):
+        return bytes(16)
+
+
+class SessionCheckpoint:
+    """Crash-safe record of the work/break session, restored on the next start.
+
+    The state is packed into a small fixed-size record in a memory-mapped
+    file, written on every session transition but never on ticks, so a
+    write is a memory copy. The file holds two slots written in turn, each
+    with a sequence number and a CRC; a write torn by a crash fails its
+    check and the other slot, one transition older, is used instead.
+
+    Each record carries the monotonic, boot and wall clocks at writing, so
+    a running phase restores with the time that passed while the app was
+    not running taken off: by the boot clock, which counts suspend, when it
+    is still the same boot, and by the wall clock after a reboot.
+    """
+
+    def __init__(self, path, clock: Optional[Clock] = None, boot_id: Optional[bytes] = None) -> None:
+        """Open or create the checkpoint file.
+
+        Args:
+            path: Checkpoint file
+            clock: Clock to stamp records with, the system clock if omitted
+            boot_id: ID of this boot, read from the system if omitted
+        """
+        self.path = os.fspath(path)
+        self.clock = clock if clock is not None else real_clock
+        self.boot_id = boot_id if boot_id is not None else read_boot_id()
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._map: Optional[mmap.mmap] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size != _FILE_SIZE:
+                    os.ftruncate(fd, _FILE_SIZE)
+                self._map = mmap.mmap(fd, _FILE_SIZE)
+            finally:
+                os.close(fd)
+        except (OSError, ValueError) as e:
+            logger.error(f"Session checkpoints disabled, cannot map {self.path}: {e}")
+
+    def save(self, state: SessionState) -> None:
+        """Record a session state, stamped with the clocks now.
+
+        Args:
+            state: State to record
+        """
+        boottime = self.clock.boottime()
+        flags = ((_RUNNING if state.running else 0)
+                 | (_WORK_REMAINING if state.work_remaining is not None else 0)
+                 | (_BOOTTIME if boottime is not None else 0))
+        with self._lock:
+            if self._map is None:
+                return
+            self._sequence += 1
+            record = _RECORD.pack(_MAGIC, _VERSION, self._sequence, PHASES.index(state.phase), flags,
+                                  state.duration, state.remaining, state.work_remaining or 0.0, state.cycle,
+                                  self.clock.monotonic(), boottime or 0.0, self.clock.now().timestamp(),
+                                  self.boot_id)
+            offset = (self._sequence % 2) * _SLOT_SIZE
+            self._map[offset:offset + _SLOT_SIZE] = record + _CRC.pack(zlib.crc32(record))
+            self.writes += 1
+
+    def load(self) -> Optional[SessionState]:
+        """Get the last recorded state as it stands now.
+
+        A running phase has the time since it was recorded taken off its
+        remaining time, down to zero if it ran out meanwhile.
+
+        Returns:
+            Session state, or None if nothing valid was recorded
+        """
+        with self._lock:
+            if self._map is None:
+                return None
+            latest = None
+            for slot in range(2):
+                fields = self._read_slot(slot)
+                if fields is not None and (latest is None or fields[2] > latest[2]):
+                    latest = fields
+            if latest is None:
+                return None
+            self._sequence = latest[2]
+        (_, _, _, phase, flags, duration, remaining, work_remaining, cycle,
+         monotonic, boottime, wall, boot_id) = latest
+        running = bool(flags & _RUNNING)
+        if running:
+            remaining = max(0.0, remaining - self._elapsed(flags, monotonic, boottime, wall, boot_id))
+        return SessionState(PHASES[phase], duration, remaining, running, cycle,
+                            work_remaining if flags & _WORK_REMAINING else None)
+
+    def restore(self, session: Session) -> Optional[SessionState]:
+        """Put a session back into the last recorded state.
+
+        Args:
+            session: Session to restore
+
+        Returns:
+            Session state after restoring, or None if nothing was recorded
+        """
+        state = self.load()
+        if state is None:
+            return None
+        logger.info(f"Restoring {state.phase} session with {state.remaining:.0f}s left")
+        return session.restore(state)
+
+    def attach(self, session: Session) -> None:
+        """Record every transition of a session from now on.
+
+        Args:
+            session: Session to follow
+        """
+        self.detach()
+        self._unsubscribe = session.events.subscribe(SessionChanged, lambda event: self.save(event.state))
+
+    def detach(self) -> None:
+        """Stop recording transitions."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def close(self) -> None:
+        """Stop recording and unmap the file; the last record stays on disk."""
+        self.detach()
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+    def _read_slot(self, slot: int) -> Optional[Tuple]:
+        offset = slot * _SLOT_SIZE
+        data = self._map[offset:offset + _SLOT_SIZE]
+        record = data[:_RECORD.size]
+        if _CRC.unpack_from(data, _RECORD.size)[0] != zlib.crc32(record):
+            return None
+        fields = _RECORD.unpack(record)
+        if fields[0] != _MAGIC or fields[1] != _VERSION or fields[3] >= len(PHASES):
+            return None
+        if min(fields[5], fields[6], fields[7]) < 0:
+            return None
+        return fields
+
+    def _elapsed(self, flags: int, monotonic: float, boottime: float, wall: float, boot_id: bytes) -> float:
+        """Seconds since a record was written, by the best clock both share."""
+        if boot_id == self.boot_id and any(boot_id):
+            now_boottime = self.clock.boottime()
+            if flags & _BOOTTIME and now_boottime is not None:
+                elapsed = now_boottime - boottime
+            else:
+                elapsed = self.clock.monotonic() - monotonic
+        else:
+            elapsed = self.clock.now().timestamp() - wall
+        return max(0.0, elapsed)
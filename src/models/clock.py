@@ -0,0 +1,191 @@
+from typing import Optional, Set
+from datetime import datetime, timedelta
+import threading
+import time
+
+
+class Clock:
+    """Source of time for the timers, the break scheduler and the views.
+
+    Components take a clock instead of calling ``datetime.now``,
+    ``time.monotonic`` or ``time.sleep`` themselves, so that tests and
+    simulations can hold time still or move it at will. Waiting is part of
+    the interface for the same reason: threads that sleep until a deadline
+    wait on their condition variable through the clock, and a virtual
+    clock wakes them whenever it moves.
+    """
+
+    def now(self) -> datetime:
+        """Get the local wall-clock time."""
+        raise NotImplementedError
+
+    def monotonic(self) -> float:
+        """Get monotonic time in seconds; it stands still while suspended."""
+        raise NotImplementedError
+
+    def boottime(self) -> Optional[float]:
+        """Get monotonic time in seconds that keeps counting while suspended.
+
+        Returns:
+            Seconds, or None where there is no such clock
+        """
+        return None
+
+    def sleep(self, seconds: float) -> None:
+        """Block the calling thread for a while.
+
+        Args:
+            seconds: Clock seconds to sleep
+        """
+        raise NotImplementedError
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float] = None) -> None:
+        """Wait on a condition variable the caller holds until notified or timed out.
+
+        Like ``Condition.wait`` the wait may end early, so callers re-check
+        their deadline afterwards.
+
+        Args:
+            condition: Condition variable, acquired by the caller
+            timeout: Clock seconds to wait at most, forever if None
+        """
+        raise NotImplementedError
+
+
+class RealClock(Clock):
+    """The system clocks."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def boottime(self) -> Optional[float]:
+        if not hasattr(time, "CLOCK_BOOTTIME"):
+            return None
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float] = None) -> None:
+        condition.wait(timeout)
+
+
+# Shared system clock; components use it when given no clock
+real_clock = RealClock()
+
+
+class FrozenClock(Clock):
+    """Clock that always reads the same time.
+
+    Sleeping returns at once and waits only end when the condition is
+    notified, since no timeout can ever run out.
+    """
+
+    def __init__(self, now: datetime, monotonic: float = 0.0, boottime: bool = True) -> None:
+        """Initialize the clock.
+
+        Args:
+            now: Wall-clock time to report
+            monotonic: Monotonic time to report
+            boottime: Whether there is a boot clock; it starts equal to the monotonic one
+        """
+        self._lock = threading.Lock()
+        self._now = now
+        self._monotonic = monotonic
+        self._boottime = monotonic if boottime else None
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return self._monotonic
+
+    def boottime(self) -> Optional[float]:
+        with self._lock:
+            return self._boottime
+
+    def sleep(self, seconds: float) -> None:
+        pass
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float] = None) -> None:
+        condition.wait()
+
+
+class VirtualClock(FrozenClock):
+    """Clock that only moves when told to, as far as it is told.
+
+    ``run`` lets time pass while awake, ``suspend`` passes time asleep and
+    ``step`` sets the wall clock, as NTP or the user would. Whenever the
+    clock moves, every thread waiting through it is woken to re-check its
+    deadline, so threaded components follow virtual time without any
+    real waiting. Sleeping moves the clock by the time slept.
+    """
+
+    def __init__(self, now: datetime, monotonic: float = 0.0, boottime: bool = True) -> None:
+        super().__init__(now, monotonic, boottime)
+        self._waiting: Set[threading.Condition] = set()
+
+    def run(self, seconds: float) -> None:
+        """Let time pass while awake.
+
+        Args:
+            seconds: Seconds to move every clock forward
+        """
+        self._move(seconds, seconds, seconds)
+
+    def suspend(self, seconds: float) -> None:
+        """Let time pass while suspended; the monotonic clock stands still.
+
+        Args:
+            seconds: Seconds spent asleep
+        """
+        self._move(seconds, 0.0, seconds)
+
+    def step(self, seconds: float) -> None:
+        """Set the wall clock forward or back.
+
+        Args:
+            seconds: Seconds to move the wall clock by
+        """
+        self._move(seconds, 0.0, 0.0)
+
+    def run_until(self, monotonic: float) -> None:
+        """Let time pass while awake up to a monotonic time.
+
+        Args:
+            monotonic: Monotonic time to move to; ignored if already past
+        """
+        with self._lock:
+            seconds = monotonic - self._monotonic
+        if seconds > 0:
+            self.run(seconds)
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.run(seconds)
+
+    def wait(self, condition: threading.Condition, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            self._waiting.add(condition)
+        try:
+            condition.wait()
+        finally:
+            with self._lock:
+                self._waiting.discard(condition)
+
+    def _move(self, wall: float, monotonic: float, boottime: float) -> None:
+        with self._lock:
+            self._now += timedelta(seconds=wall)
+            self._monotonic += monotonic
+            if self._boottime is not None:
+                self._boottime += boottime
+            waiting = list(self._waiting)
+        # The waiter holds its condition until it waits, so this cannot be missed
+        for condition in waiting:
+            with condition:
+                condition.notify_all()
@@ -0,0 +1,303 @@
+from typing import Optional, Tuple
+from datetime import datetime
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import socket
+import threading
+try:
+    from jeepney import MatchRule
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    MatchRule = None
+
+from src.models.break_scheduler import CLOCK_CHECK_INTERVAL, CLOCK_JUMP_TOLERANCE
+from src.models.clock import Clock, real_clock
+from src.models.events import ClockJumped, EventBus
+from src.models.timer import TimerService, get_timer_service
+
+logger = logging.getLogger(__name__)
+
+# How often the clocks are compared when logind cannot announce sleep
+CHECK_INTERVAL = CLOCK_CHECK_INTERVAL
+
+CLOCK_REALTIME = 0
+TFD_CLOEXEC = 0o2000000
+TFD_TIMER_ABSTIME = 1
+TFD_TIMER_CANCEL_ON_SET = 2
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+class ClockSetWatcher:
+    """Blocks until the wall clock is set, without waking up in between.
+
+    Uses a Linux timerfd armed on the wall clock with
+    ``TFD_TIMER_CANCEL_ON_SET``: it never expires, and reading it fails
+    with ``ECANCELED`` as soon as the clock is changed.
+    """
+
+    def __init__(self) -> None:
+        """Create and arm the timer.
+
+        Raises:
+            OSError: If timerfd is not available
+        """
+        path = ctypes.util.find_library("c")
+        if path is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(path, use_errno=True)
+        try:
+            self._settime = libc.timerfd_settime
+            self._settime.argtypes = [ctypes.c_int, ctypes.c_int,
+                                      ctypes.POINTER(_Itimerspec), ctypes.POINTER(_Itimerspec)]
+            fd = libc.timerfd_create(CLOCK_REALTIME, TFD_CLOEXEC)
+        except AttributeError as e:
+            raise OSError(f"No timerfd: {e}")
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_create failed")
+        self.fd = fd
+        self._wake_read, self._wake_write = os.pipe()
+        try:
+            self._arm()
+        except OSError:
+            self.close()
+            raise
+
+    def _arm(self) -> None:
+        spec = _Itimerspec()
+        spec.it_value.tv_sec = 2 ** (8 * ctypes.sizeof(ctypes.c_long) - 1) - 1
+        if self._settime(self.fd, TFD_TIMER_ABSTIME | TFD_TIMER_CANCEL_ON_SET, ctypes.byref(spec), None) < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_settime failed")
+
+    def wait(self) -> bool:
+        """Block until the wall clock is set or ``wake`` is called.
+
+        Returns:
+            True if the clock was set, False if woken
+        """
+        readable, _, _ = select.select([self.fd, self._wake_read], [], [])
+        if self._wake_read in readable:
+            return False
+        try:
+            os.read(self.fd, 8)
+        except OSError as e:
+            if e.errno != errno.ECANCELED:
+                raise
+        self._arm()
+        return True
+
+    def wake(self) -> None:
+        """Make a pending or future ``wait`` return False."""
+        os.write(self._wake_write, b"\0")
+
+    def close(self) -> None:
+        """Release the timer."""
+        for fd in (self.fd, self._wake_read, self._wake_write):
+            os.close(fd)
+
+
+class ClockMonitor:
+    """Detects suspend/resume and wall-clock steps and reconciles timers.
+
+    The wall, monotonic and boot clocks are read when logind announces that
+    the machine is about to sleep or has woken up, and when the wall clock
+    is set. Nothing is polled; only where logind cannot be reached are the
+    clocks also read every ``CHECK_INTERVAL`` seconds, so that sleep is
+    noticed at all. Monotonic time stops while suspended and boot
+    time does not, so the difference between their deltas is time spent
+    asleep. Where there is no boot clock, a forward gap only counts as
+    sleep after logind announced one. What remains of the wall-clock delta
+    is a clock step.
+
+    On a discontinuity the timer service is advanced over the sleep, so
+    work and break timers count it, and one ``ClockJumped`` event is
+    published for the break scheduler to deal with missed occurrences.
+    """
+
+    def __init__(self, event_bus: EventBus, service: Optional[TimerService] = None,
+                 clock: Optional[Clock] = None, interval: float = CHECK_INTERVAL) -> None:
+        """Initialize a stopped monitor.
+
+        Args:
+            event_bus: Bus to publish ``ClockJumped`` events on
+            service: Timer service to advance over sleep, the shared one if omitted
+            clock: Wall, monotonic and boot clocks, the system ones if omitted
+            interval: Seconds between checks when logind cannot be reached
+        """
+        self.events = event_bus
+        self._service = service
+        self.clock = clock if clock is not None else real_clock
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last: Optional[Tuple[datetime, float, Optional[float]]] = None
+        self._sleep_announced = False
+        self._handle = None
+        self._connection = None
+        self._sleep_rule = None
+        self._watcher: Optional[ClockSetWatcher] = None
+        self._threads = []
+        self._stopped = threading.Event()
+
+    @property
+    def service(self) -> TimerService:
+        """Timer service advanced over time spent suspended."""
+        if self._service is None:
+            self._service = get_timer_service()
+        return self._service
+
+    def start(self) -> None:
+        """Take a first reading and start checking on logind signals and clock changes."""
+        self._stopped.clear()
+        self.check()
+        self._connection = self._open_logind()
+        if self._connection is not None:
+            self._spawn(self._listen)
+        else:
+            self._schedule()
+        try:
+            self._watcher = ClockSetWatcher()
+        except OSError as e:
+            logger.debug(f"Cannot watch for wall-clock changes: {e}")
+        else:
+            self._spawn(self._watch_clock_set)
+
+    def stop(self) -> None:
+        """Stop checking."""
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._connection is not None:
+            try:
+                self._connection.sock.shutdown(socket.SHUT_RDWR)  # Ends the blocking receive
+            except OSError:
+                pass
+        if self._watcher is not None:
+            self._watcher.wake()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(1.0)
+        self._threads = []
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def prepare_for_sleep(self, sleeping: bool) -> Optional[ClockJumped]:
+        """Handle logind announcing sleep or wake-up.
+
+        Args:
+            sleeping: True just before suspending, False after resuming
+
+        Returns:
+            The published event, or None if the clocks agreed
+        """
+        logger.info("System is going to sleep" if sleeping else "System woke up")
+        # Read the clocks right before sleeping so that the gap is all sleep
+        event = self.check()
+        self._sleep_announced = sleeping
+        return event
+
+    def check(self) -> Optional[ClockJumped]:
+        """Compare the clocks with the previous reading and reconcile any discontinuity.
+
+        Returns:
+            The published event, or None if the clocks agreed
+        """
+        with self._lock:
+            now = self.clock.now()
+            monotonic = self.clock.monotonic()
+            boot = self.clock.boottime()
+            last, self._last = self._last, (now, monotonic, boot)
+            if last is None:
+                return None
+            last_now, last_monotonic, last_boot = last
+            elapsed = monotonic - last_monotonic
+            wall = (now - last_now).total_seconds()
+            if boot is not None:
+                suspended = max(0.0, (boot - last_boot) - elapsed)
+            elif self._sleep_announced:
+                suspended = max(0.0, wall - elapsed)
+            else:
+                suspended = 0.0
+            if suspended <= CLOCK_JUMP_TOLERANCE:
+                suspended = 0.0
+            stepped = wall - elapsed - suspended
+            if suspended == 0.0 and abs(stepped) <= CLOCK_JUMP_TOLERANCE:
+                return None
+            event = ClockJumped(last_now, now, suspended, stepped)
+            logger.info(f"Clock discontinuity: suspended {suspended:.0f}s, wall clock stepped {stepped:+.0f}s")
+            self.service.advance(suspended)
+        self.events.publish(event)
+        return event
+
+    def _schedule(self) -> None:
+        if not self._stopped.is_set():
+            self._handle = self.service.call_later(self.interval, self._on_interval)
+
+    def _on_interval(self) -> None:
+        self.check()
+        self._schedule()
+
+    def _spawn(self, target) -> None:
+        thread = threading.Thread(target=target, name="ClockMonitor", daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _open_logind(self):
+        """Subscribe to logind's PrepareForSleep signal.
+
+        Returns:
+            Connection with the signal matched, or None if logind cannot be reached
+        """
+        if MatchRule is None:
+            return None
+        rule = MatchRule(type="signal", sender="org.freedesktop.login1",
+                         interface="org.freedesktop.login1.Manager",
+                         path="/org/freedesktop/login1", member="PrepareForSleep")
+        try:
+            connection = open_dbus_connection(bus="SYSTEM")
+        except Exception as e:
+            logger.debug(f"Cannot listen for logind sleep signals: {e}")
+            return None
+        try:
+            connection.send_and_get_reply(message_bus.AddMatch(rule))
+        except Exception as e:
+            logger.debug(f"Cannot listen for logind sleep signals: {e}")
+            connection.close()
+            return None
+        self._sleep_rule = rule
+        return connection
+
+    def _listen(self) -> None:
+        """Check the clocks on logind's PrepareForSleep signal (listener thread)."""
+        connection = self._connection
+        try:
+            with connection.filter(self._sleep_rule) as queue:
+                while not self._stopped.is_set():
+                    message = connection.recv_until_filtered(queue)
+                    self.prepare_for_sleep(bool(message.body[0]))
+        except Exception as e:
+            if not self._stopped.is_set():
+                logger.error(f"Error listening for logind sleep signals: {e}")
+
+    def _watch_clock_set(self) -> None:
+        """Check the clocks whenever the wall clock is set (watcher thread)."""
+        try:
+            while not self._stopped.is_set() and self._watcher.wait():
+                self.check()
+        except OSError as e:
+            logger.error(f"Error watching for wall-clock changes: {e}")
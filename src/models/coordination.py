@@ -0,0 +1,236 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from src.models.events import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ".lock"
+SPOOL_SUFFIX = ".pending"
+
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(path, exclusive: bool = True) -> Iterator[None]:
+    """Hold an advisory lock coordinating access to a file between processes.
+
+    The lock is taken on a ``.lock`` file beside the target, since atomic
+    saves replace the target's inode. Locks are re-entrant per thread, so
+    a store can lock around a load that locks again. Where ``fcntl`` is
+    missing or the lock file cannot be created the block runs unlocked.
+
+    Args:
+        path: File to coordinate access to
+        exclusive: Writers pass True; readers pass False to share the lock
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = os.fspath(path) + LOCK_SUFFIX
+    held: Dict[str, list] = _held.__dict__.setdefault("locks", {})
+    entry = held.get(lock_path)
+    if entry is not None:
+        upgrade = exclusive and not entry[1]
+        if upgrade:
+            fcntl.flock(entry[0], fcntl.LOCK_EX)
+            entry[1] = True
+        entry[2] += 1
+        try:
+            yield
+        finally:
+            entry[2] -= 1
+            if upgrade:
+                fcntl.flock(entry[0], fcntl.LOCK_SH)
+                entry[1] = False
+        return
+    try:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError as e:
+        logger.debug(f"Cannot lock {path}: {e}")
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        held[lock_path] = [fd, exclusive, 1]
+        try:
+            yield
+        finally:
+            del held[lock_path]
+    finally:
+        os.close(fd)  # Releases the lock
+
+
+class WriterElection:
+    """Elects one process to persist the shared configuration files.
+
+    Every instance tries to take an exclusive ``flock`` on the same lock
+    file; the holder is the writer until it exits. The others wait for the
+    lock in a background thread blocked in the kernel, so when the writer
+    quits or crashes one of them takes over at once, without polling.
+    """
+
+    def __init__(self, lock_path, dispatcher: Optional[Dispatcher] = None) -> None:
+        """Initialize the election.
+
+        Args:
+            lock_path: Lock file shared by all instances
+            dispatcher: Runs election callbacks elsewhere, e.g. on the Tk
+                thread; they run on the waiting thread if omitted
+        """
+        self.lock_path = os.fspath(lock_path)
+        self.dispatcher = dispatcher
+        self.is_writer = False
+        self._fd: Optional[int] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Get called when this process becomes the writer after waiting.
+
+        Args:
+            callback: Called without arguments
+
+        Returns:
+            Function that cancels the subscription
+        """
+        self._callbacks.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+        return unsubscribe
+
+    def start(self) -> bool:
+        """Try to become the writer, waiting in the background if another process is.
+
+        Returns:
+            Whether this process is the writer now
+        """
+        if self.is_writer or self._thread is not None:
+            return self.is_writer
+        self._stopped = False
+        if fcntl is None:
+            self.is_writer = True  # No other instance can be coordinated with
+            return True
+        try:
+            self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.error(f"Cannot open writer lock {self.lock_path}, writing anyway: {e}")
+            self.is_writer = True
+            return True
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Another instance is saving the configuration; following its changes")
+            self._thread = threading.Thread(target=self._wait, name="WriterElection", daemon=True)
+            self._thread.start()
+            return False
+        self._become_writer()
+        return True
+
+    def stop(self) -> None:
+        """Give up the writer role, or stop waiting for it."""
+        self._stopped = True
+        self.is_writer = False
+        if self._thread is None and self._fd is not None:
+            os.close(self._fd)  # Releases the lock
+        # A waiting thread keeps its descriptor and releases it if it gets the lock
+        self._fd = None
+        self._thread = None
+
+    def _wait(self) -> None:
+        fd = self._fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError as e:
+            logger.error(f"Writer election failed: {e}")
+            return
+        if self._stopped:
+            os.close(fd)
+            return
+        self._thread = None
+        self._become_writer()
+        logger.info("This instance is now saving the configuration")
+        for callback in list(self._callbacks):
+            self._dispatch(callback)
+
+    def _become_writer(self) -> None:
+        self.is_writer = True
+        try:
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, f"{os.getpid()}\n".encode("ascii"))
+        except OSError:
+            pass  # The PID is informational only
+
+    def _dispatch(self, callback: Callable[[], None]) -> None:
+        def call() -> None:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in writer election callback: {e}")
+        if self.dispatcher is not None:
+            self.dispatcher(call)
+        else:
+            call()
+
+
+class ChangeSpool:
+    """Queue of changes other instances hand to the writer.
+
+    Entries are appended as fsynced JSON lines under the file lock and
+    taken out all at once by ``drain``, so concurrent appends and drains
+    never lose or split an entry.
+    """
+
+    def __init__(self, path) -> None:
+        """Initialize the spool.
+
+        Args:
+            path: Spool file
+        """
+        self.path = os.fspath(path)
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue entries for the writer.
+
+        Args:
+            entries: JSON-serializable change entries
+        """
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with file_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take every queued entry, oldest first.
+
+        Returns:
+            Entries; damaged lines are skipped
+        """
+        entries = []
+        with file_lock(self.path):
+            try:
+                f = open(self.path, "r+b")
+            except FileNotFoundError:
+                return entries
+            with f:
+                for raw in f:
+                    try:
+                        entries.append(json.loads(raw))
+                    except ValueError:
+                        logger.warning(f"Skipping damaged entry in {self.path}")
+                if entries or f.tell():
+                    f.truncate(0)
+        return entries
@@ -0,0 +1,181 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+Dispatcher = Callable[[Callable[[], None]], None]
+
+
+class ChangeEvent:
+    """Base class for model change events."""
+
+
+class TimelineEvent(ChangeEvent):
+    """Base class for timeline change events."""
+
+
+@dataclass(frozen=True)
+class SlotAdded(TimelineEvent):
+    """A break slot was added."""
+    slot: Any
+
+
+@dataclass(frozen=True)
+class SlotEdited(TimelineEvent):
+    """A break slot was edited; its ID may have changed."""
+    slot: Any
+    previous_id: str
+
+
+@dataclass(frozen=True)
+class SlotDeleted(TimelineEvent):
+    """A break slot was deleted."""
+    slot: Any
+
+
+@dataclass(frozen=True)
+class TimelineReloaded(TimelineEvent):
+    """The whole timeline was reloaded from storage."""
+    slot_count: int
+
+
+class SettingsEvent(ChangeEvent):
+    """Base class for settings change events."""
+
+
+@dataclass(frozen=True)
+class SettingChanged(SettingsEvent):
+    """A single setting changed value."""
+    key: str
+    old_value: Any
+    new_value: Any
+
+
+@dataclass(frozen=True)
+class SettingsReloaded(SettingsEvent):
+    """All settings were reloaded from storage."""
+
+
+class ClockEvent(ChangeEvent):
+    """Base class for system clock events."""
+
+
+@dataclass(frozen=True)
+class ClockJumped(ClockEvent):
+    """The wall clock jumped, or the machine was suspended and resumed."""
+    previous: datetime
+    now: datetime
+    suspended: float
+    stepped: float
+
+
+class IdleEvent(ChangeEvent):
+    """Base class for user idle events."""
+
+
+@dataclass(frozen=True)
+class UserIdle(IdleEvent):
+    """No keyboard or mouse input for a while; the user seems to be away."""
+    since: datetime
+
+
+@dataclass(frozen=True)
+class UserReturned(IdleEvent):
+    """Input again after the user was idle for ``idle`` seconds."""
+    since: datetime
+    idle: float
+
+
+class SessionEvent(ChangeEvent):
+    """Base class for work/break session events."""
+
+
+@dataclass(frozen=True)
+class SessionChanged(SessionEvent):
+    """The session changed phase, or was started, paused or otherwise changed."""
+    transition: str
+    previous: Any
+    state: Any
+    missed: bool = False
+
+
+def tk_dispatcher(widget) -> Dispatcher:
+    """Build a dispatcher that runs callbacks on a widget's Tk thread.
+
+    Args:
+        widget: Any Tk widget
+
+    Returns:
+        Dispatcher scheduling callbacks with ``widget.after(0, ...)``
+    """
+    def dispatch(callback: Callable[[], None]) -> None:
+        try:
+            widget.after(0, callback)
+        except Exception as e:
+            # The widget was destroyed; its subscribers are stale
+            logger.debug(f"Dropped event for destroyed widget: {e}")
+    return dispatch
+
+
+class EventBus:
+    """Publish/subscribe hub for typed change events.
+
+    Subscribers register for an event class and receive instances of it and
+    of its subclasses, e.g. subscribing to ``TimelineEvent`` covers every
+    slot change. A dispatcher can be given per subscription to marshal the
+    callback onto another thread, typically the Tk main loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty event bus."""
+        self._subscribers: Dict[type, List[Tuple[Callable[[Any], None], Optional[Dispatcher]]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[ChangeEvent], callback: Callable[[Any], None],
+                  dispatcher: Optional[Dispatcher] = None) -> Callable[[], None]:
+        """Subscribe to an event class.
+
+        Args:
+            event_type: Event class to receive, including subclasses
+            callback: Called with each event
+            dispatcher: Runs the call elsewhere, e.g. ``tk_dispatcher(widget)``;
+                the callback runs on the publishing thread if omitted
+
+        Returns:
+            Function that cancels the subscription
+        """
+        entry = (callback, dispatcher)
+        with self._lock:
+            self._subscribers.setdefault(event_type, []).append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                entries = self._subscribers.get(event_type, [])
+                if entry in entries:
+                    entries.remove(entry)
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Deliver an event to every matching subscriber.
+
+        Args:
+            event: Event to deliver
+        """
+        with self._lock:
+            targets = [entry for cls in type(event).__mro__
+                       for entry in self._subscribers.get(cls, ())]
+        for callback, dispatcher in targets:
+            if dispatcher is None:
+                self._deliver(callback, event)
+            else:
+                dispatcher(lambda callback=callback: self._deliver(callback, event))
+
+    @staticmethod
+    def _deliver(callback: Callable[[Any], None], event: ChangeEvent) -> None:
+        try:
+            callback(event)
+        except Exception as e:
+            logger.error(f"Error handling {type(event).__name__}: {e}")
@@ -0,0 +1,346 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from src.models.events import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after the last change before a file counts as rewritten
+SETTLE_DELAY = 0.1
+# Seconds between stat() checks when inotify is unavailable
+POLL_INTERVAL = 2.0
+
+# From <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+FileCallback = Callable[[str], None]
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+def file_signature(path) -> FileSignature:
+    """Identify a file's current version without reading it.
+
+    Atomic saves replace the inode and in-place writes change the size or
+    modification time, so two different versions practically never share
+    a signature.
+
+    Args:
+        path: File to check
+
+    Returns:
+        Tuple of (inode, size, mtime in ns), or None if the file is missing
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+def inotify_available() -> bool:
+    """Check whether inotify can be used on this system."""
+    return _libc is not None
+
+
+class FileWatcher:
+    """Calls back when watched files are rewritten.
+
+    Changes are coalesced: a callback runs once a file has been quiet for
+    ``SETTLE_DELAY`` seconds, so a writer that truncates and writes, or
+    writes a temporary file and renames it, triggers a single call.
+    Subclasses provide the change notifications.
+    """
+
+    def __init__(self, dispatcher: Optional[Dispatcher] = None, settle: float = SETTLE_DELAY) -> None:
+        """Initialize the watcher.
+
+        Args:
+            dispatcher: Runs callbacks elsewhere, e.g. on the Tk thread;
+                they run on the watcher thread if omitted
+            settle: Quiet period in seconds before a change is reported
+        """
+        self.dispatcher = dispatcher
+        self.settle = settle
+        self._callbacks: Dict[str, List[FileCallback]] = {}
+        self._dirty: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the watcher thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, path, callback: FileCallback) -> Callable[[], None]:
+        """Get called with the path whenever a file is created, changed or replaced.
+
+        Args:
+            path: File to watch; its directory must exist
+            callback: Called with the absolute path
+
+        Returns:
+            Function that stops this callback
+        """
+        path = os.path.abspath(os.fspath(path))
+        with self._lock:
+            first = path not in self._callbacks
+            self._callbacks.setdefault(path, []).append(callback)
+        if first:
+            self._add_path(path)
+
+        def unwatch() -> None:
+            with self._lock:
+                callbacks = self._callbacks.get(path, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unwatch
+
+    def start(self) -> None:
+        """Start the watcher thread."""
+        if self.running:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Stop the watcher thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stopped = True
+        self._interrupt()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _mark_dirty(self, path: str) -> None:
+        self._dirty[path] = time.monotonic() + self.settle
+
+    def _next_timeout(self, idle: Optional[float]) -> Optional[float]:
+        """Seconds until the earliest settled change, or ``idle`` if none is pending."""
+        if not self._dirty:
+            return idle
+        return max(0.0, min(self._dirty.values()) - time.monotonic())
+
+    def _report_settled(self) -> None:
+        now = time.monotonic()
+        for path in [path for path, deadline in self._dirty.items() if deadline <= now]:
+            del self._dirty[path]
+            with self._lock:
+                callbacks = list(self._callbacks.get(path, []))
+            for callback in callbacks:
+                self._dispatch(callback, path)
+
+    def _dispatch(self, callback: FileCallback, path: str) -> None:
+        def call() -> None:
+            try:
+                callback(path)
+            except Exception as e:
+                logger.error(f"Error handling change to {path}: {e}")
+        if self.dispatcher is not None:
+            self.dispatcher(call)
+        else:
+            call()
+
+    def _add_path(self, path: str) -> None:
+        raise NotImplementedError
+
+    def _interrupt(self) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class InotifyWatcher(FileWatcher):
+    """File watcher driven by Linux inotify through ctypes.
+
+    Each watched file's directory is watched rather than the file itself,
+    since atomic saves rename a new inode over the old one. The thread
+    blocks in ``select`` on the inotify descriptor and does no work while
+    nothing changes.
+    """
+
+    def __init__(self, dispatcher: Optional[Dispatcher] = None, settle: float = SETTLE_DELAY) -> None:
+        """Initialize the watcher.
+
+        Args:
+            dispatcher: Runs callbacks elsewhere, e.g. on the Tk thread
+            settle: Quiet period in seconds before a change is reported
+
+        Raises:
+            OSError: If inotify is unavailable
+        """
+        super().__init__(dispatcher, settle)
+        if _libc is None:
+            raise OSError("inotify is not available")
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._wake_r, self._wake_w = os.pipe()
+        self._directories: Dict[str, int] = {}
+        self._names: Dict[Tuple[int, str], str] = {}
+
+    def _add_path(self, path: str) -> None:
+        directory, name = os.path.split(path)
+        with self._lock:
+            wd = self._directories.get(directory)
+            if wd is None:
+                wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+                self._directories[directory] = wd
+            self._names[(wd, name)] = path
+
+    def _interrupt(self) -> None:
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped:
+                readable, _, _ = select.select([self._fd, self._wake_r], [], [], self._next_timeout(None))
+                if self._wake_r in readable:
+                    os.read(self._wake_r, 64)
+                if self._fd in readable:
+                    self._read_events()
+                self._report_settled()
+        except Exception as e:
+            logger.error(f"File watcher stopped: {e}")
+        finally:
+            self._close()
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\x00"))
+            offset += length
+            with self._lock:
+                if mask & IN_Q_OVERFLOW:
+                    paths = list(self._names.values())
+                else:
+                    paths = [self._names[(wd, name)]] if (wd, name) in self._names else []
+            for path in paths:
+                self._mark_dirty(path)
+
+    def _close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        with self._lock:
+            self._directories = {}
+            self._names = {}
+        self._fd = -1
+
+
+class PollingWatcher(FileWatcher):
+    """File watcher that compares ``file_signature`` at a fixed interval.
+
+    Used where inotify is unavailable; changes are noticed up to
+    ``interval`` seconds late.
+    """
+
+    def __init__(self, dispatcher: Optional[Dispatcher] = None, settle: float = SETTLE_DELAY,
+                 interval: float = POLL_INTERVAL) -> None:
+        """Initialize the watcher.
+
+        Args:
+            dispatcher: Runs callbacks elsewhere, e.g. on the Tk thread
+            settle: Quiet period in seconds before a change is reported
+            interval: Seconds between checks
+        """
+        super().__init__(dispatcher, settle)
+        self.interval = interval
+        self._signatures: Dict[str, FileSignature] = {}
+        self._condition = threading.Condition()
+
+    def _add_path(self, path: str) -> None:
+        with self._lock:
+            self._signatures[path] = file_signature(path)
+
+    def _interrupt(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            with self._lock:
+                paths = list(self._signatures)
+            for path in paths:
+                signature = file_signature(path)
+                if signature != self._signatures[path]:
+                    self._signatures[path] = signature
+                    self._mark_dirty(path)
+            self._report_settled()
+            with self._condition:
+                if not self._stopped:
+                    self._condition.wait(self._next_timeout(self.interval))
+
+
+def create_file_watcher(dispatcher: Optional[Dispatcher] = None,
+                        poll_interval: float = POLL_INTERVAL) -> FileWatcher:
+    """Create the best file watcher for this system.
+
+    Args:
+        dispatcher: Runs callbacks elsewhere, e.g. on the Tk thread
+        poll_interval: Check interval if polling has to be used
+
+    Returns:
+        ``InotifyWatcher`` on Linux, ``PollingWatcher`` elsewhere
+    """
+    if inotify_available():
+        try:
+            return InotifyWatcher(dispatcher)
+        except OSError as e:
+            logger.warning(f"Falling back to polling for file changes: {e}")
+    return PollingWatcher(dispatcher, interval=poll_interval)
@@ -0,0 +1,423 @@
+from typing import Optional
+from datetime import datetime, timedelta
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import threading
+import time
+try:
+    from jeepney import DBusAddress, Properties
+    from jeepney.io.blocking import open_dbus_connection
+except ImportError:
+    DBusAddress = None
+
+from src.models.clock import Clock, real_clock
+from src.models.events import EventBus, UserIdle, UserReturned
+from src.models.timer import TimerService, get_timer_service
+
+logger = logging.getLogger(__name__)
+
+# Seconds without input after which the user counts as away
+IDLE_THRESHOLD = 120.0
+# Poll bounds; while the user is away returns are noticed within IDLE_POLL seconds
+MIN_POLL = 1.0
+MAX_POLL = IDLE_THRESHOLD
+IDLE_POLL = 2.0
+
+PROC_INTERRUPTS = "/proc/interrupts"
+# Interrupt lines of keyboards, mice and the USB controllers they hang off
+INPUT_INTERRUPTS = re.compile(r"i8042|hid|usb|[eoux]hci", re.IGNORECASE)
+
+
+class IdleSource:
+    """Tells how long the user has not touched the keyboard or mouse."""
+
+    name = "none"
+
+    def idle_seconds(self) -> Optional[float]:
+        """Get the seconds since the last input.
+
+        Returns:
+            Seconds, or None if the source failed this time
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the source's connection, if it has one."""
+
+
+def _load_library(name: str) -> ctypes.CDLL:
+    path = ctypes.util.find_library(name)
+    if path is None:
+        raise OSError(f"lib{name} not found")
+    return ctypes.CDLL(path)
+
+
+class _XDisplay:
+    """Connection to the X server named by ``DISPLAY``."""
+
+    def __init__(self) -> None:
+        if not os.environ.get("DISPLAY"):
+            raise OSError("No X display")
+        if os.environ.get("XDG_SESSION_TYPE") == "wayland":
+            # Through XWayland only input to X clients would count
+            raise OSError("Wayland session")
+        self.x11 = _load_library("X11")
+        try:
+            self.x11.XOpenDisplay.restype = ctypes.c_void_p
+            self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            self.x11.XDefaultRootWindow.restype = ctypes.c_ulong
+            self.x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+            self.x11.XFree.argtypes = [ctypes.c_void_p]
+        except AttributeError as e:
+            raise OSError(f"Unusable libX11: {e}")
+        self.display = self.x11.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("Cannot open the X display")
+
+    def close(self) -> None:
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+class _XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [("window", ctypes.c_ulong), ("state", ctypes.c_int), ("kind", ctypes.c_int),
+                ("til_or_since", ctypes.c_ulong), ("idle", ctypes.c_ulong), ("eventMask", ctypes.c_ulong)]
+
+
+class XScreenSaverIdleSource(IdleSource):
+    """Idle time from the X server's MIT-SCREEN-SAVER extension (libXss)."""
+
+    name = "XScreenSaver"
+
+    def __init__(self) -> None:
+        """Connect to the X server.
+
+        Raises:
+            OSError: If there is no X display or no screen saver extension
+        """
+        self._x = _XDisplay()
+        try:
+            self._xss = _load_library("Xss")
+            self._xss.XScreenSaverQueryExtension.argtypes = [
+                ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+            self._xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+            self._xss.XScreenSaverQueryInfo.argtypes = [
+                ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XScreenSaverInfo)]
+            event_base, error_base = ctypes.c_int(), ctypes.c_int()
+            if not self._xss.XScreenSaverQueryExtension(self._x.display, ctypes.byref(event_base),
+                                                        ctypes.byref(error_base)):
+                raise OSError("No MIT-SCREEN-SAVER extension")
+        except (OSError, AttributeError) as e:
+            self._x.close()
+            raise OSError(e)
+        self._root = self._x.x11.XDefaultRootWindow(self._x.display)
+        self._info = self._xss.XScreenSaverAllocInfo()
+
+    def idle_seconds(self) -> Optional[float]:
+        if not self._xss.XScreenSaverQueryInfo(self._x.display, self._root, self._info):
+            return None
+        return self._info.contents.idle / 1000
+
+    def close(self) -> None:
+        if self._info:
+            self._x.x11.XFree(self._info)
+            self._info = None
+        self._x.close()
+
+
+class _XSyncValue(ctypes.Structure):
+    _fields_ = [("hi", ctypes.c_int), ("lo", ctypes.c_uint)]
+
+
+class _XSyncSystemCounter(ctypes.Structure):
+    _fields_ = [("name", ctypes.c_char_p), ("counter", ctypes.c_ulong), ("resolution", _XSyncValue)]
+
+
+class XSyncIdleSource(IdleSource):
+    """Idle time from the X server's IDLETIME system counter (SYNC extension in libXext)."""
+
+    name = "XSync"
+
+    def __init__(self) -> None:
+        """Connect to the X server and find its idle counter.
+
+        Raises:
+            OSError: If there is no X display, SYNC extension or IDLETIME counter
+        """
+        self._x = _XDisplay()
+        try:
+            self._counter = self._find_counter()
+        except (OSError, AttributeError) as e:
+            self._x.close()
+            raise OSError(e)
+
+    def _find_counter(self) -> int:
+        xext = self._xext = _load_library("Xext")
+        int_pointer = ctypes.POINTER(ctypes.c_int)
+        xext.XSyncQueryExtension.argtypes = [ctypes.c_void_p, int_pointer, int_pointer]
+        xext.XSyncInitialize.argtypes = [ctypes.c_void_p, int_pointer, int_pointer]
+        xext.XSyncListSystemCounters.restype = ctypes.POINTER(_XSyncSystemCounter)
+        xext.XSyncListSystemCounters.argtypes = [ctypes.c_void_p, int_pointer]
+        xext.XSyncFreeSystemCounterList.argtypes = [ctypes.POINTER(_XSyncSystemCounter)]
+        xext.XSyncQueryCounter.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XSyncValue)]
+        first, second = ctypes.c_int(), ctypes.c_int()
+        display = self._x.display
+        if not (xext.XSyncQueryExtension(display, ctypes.byref(first), ctypes.byref(second))
+                and xext.XSyncInitialize(display, ctypes.byref(first), ctypes.byref(second))):
+            raise OSError("No SYNC extension")
+        count = ctypes.c_int()
+        counters = xext.XSyncListSystemCounters(display, ctypes.byref(count))
+        if not counters:
+            raise OSError("No SYNC system counters")
+        try:
+            for i in range(count.value):
+                if counters[i].name == b"IDLETIME":
+                    return counters[i].counter
+        finally:
+            xext.XSyncFreeSystemCounterList(counters)
+        raise OSError("No IDLETIME counter")
+
+    def idle_seconds(self) -> Optional[float]:
+        value = _XSyncValue()
+        if not self._xext.XSyncQueryCounter(self._x.display, self._counter, ctypes.byref(value)):
+            return None
+        return ((value.hi << 32) | value.lo) / 1000
+
+    def close(self) -> None:
+        self._x.close()
+
+
+class LogindIdleSource(IdleSource):
+    """Idle time from systemd-logind's ``IdleHint`` on the session, over D-Bus.
+
+    The desktop sets the hint after its own idle delay, so this notices
+    absence later than the X sources, but works under Wayland too.
+    """
+
+    name = "logind"
+
+    def __init__(self) -> None:
+        """Connect to the system bus.
+
+        Raises:
+            OSError: If ``jeepney`` is not installed or logind cannot be reached
+        """
+        if DBusAddress is None:
+            raise OSError("jeepney is not installed")
+        self._address = DBusAddress("/org/freedesktop/login1/session/auto", bus_name="org.freedesktop.login1",
+                                    interface="org.freedesktop.login1.Session")
+        try:
+            self._connection = open_dbus_connection(bus="SYSTEM")
+        except Exception as e:
+            raise OSError(f"Cannot connect to the system bus: {e}")
+        if self._query() is None:
+            self.close()
+            raise OSError("No logind session")
+
+    def _query(self) -> Optional[float]:
+        try:
+            reply = self._connection.send_and_get_reply(Properties(self._address).get_all(), timeout=1.0)
+            properties = {name: value for name, (_, value) in reply.body[0].items()}
+            if not properties["IdleHint"]:
+                return 0.0
+            # Microseconds on CLOCK_MONOTONIC, which time.monotonic reads on Linux
+            return max(0.0, time.monotonic() - properties["IdleSinceHintMonotonic"] / 1e6)
+        except Exception as e:
+            logger.debug(f"Cannot read the logind idle hint: {e}")
+            return None
+
+    def idle_seconds(self) -> Optional[float]:
+        return self._query()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class InterruptsIdleSource(IdleSource):
+    """Idle time guessed from input device interrupt counts in ``/proc/interrupts``.
+
+    The counts only tell whether there was input between two polls, so
+    the idle time is that since the last poll that saw them change. USB
+    controllers also interrupt for devices other than keyboards and mice,
+    which makes this the source of last resort.
+    """
+
+    name = "/proc/interrupts"
+
+    def __init__(self, path: str = PROC_INTERRUPTS, clock: Optional[Clock] = None) -> None:
+        """Take a first reading.
+
+        Args:
+            path: Interrupt statistics file
+            clock: Clock to time idle stretches with, the system clock if omitted
+
+        Raises:
+            OSError: If the file cannot be read or lists no input devices
+        """
+        self.path = path
+        self.clock = clock if clock is not None else real_clock
+        self._count = self._read()
+        if self._count is None:
+            raise OSError(f"No input device interrupts in {path}")
+        self._changed = self.clock.monotonic()
+
+    def _read(self) -> Optional[int]:
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        total = None
+        for line in lines[1:]:
+            fields = line.split()
+            counts = []
+            for field in fields[1:]:
+                if not field.isdigit():
+                    break
+                counts.append(int(field))
+            if INPUT_INTERRUPTS.search(" ".join(fields[1 + len(counts):])):
+                total = (total or 0) + sum(counts)
+        return total
+
+    def idle_seconds(self) -> Optional[float]:
+        count = self._read()
+        if count is None:
+            return None
+        now = self.clock.monotonic()
+        if count != self._count:
+            self._count = count
+            self._changed = now
+        return now - self._changed
+
+
+def create_idle_source(clock: Optional[Clock] = None) -> Optional[IdleSource]:
+    """Create the best idle source for this system.
+
+    Args:
+        clock: Clock for sources that time idle stretches themselves
+
+    Returns:
+        XScreenSaver, XSync, logind or ``/proc/interrupts`` source, the
+        first that works, or None if none does
+    """
+    factories = (XScreenSaverIdleSource, XSyncIdleSource, LogindIdleSource,
+                 lambda: InterruptsIdleSource(clock=clock))
+    for factory in factories:
+        try:
+            source = factory()
+        except OSError as e:
+            logger.debug(f"Idle source unavailable: {e}")
+            continue
+        logger.info(f"Detecting idle time with {source.name}")
+        return source
+    logger.warning("No way to detect idle time on this system")
+    return None
+
+
+class IdleMonitor:
+    """Notices when the user goes away from the computer and comes back.
+
+    The idle source is polled on the timer service. While the user is
+    active, nothing can happen before they have been idle for the whole
+    threshold, so the next poll waits out what is left of it: someone
+    typing away is polled about once every ``IDLE_THRESHOLD`` seconds.
+    While they are away, polls come every ``IDLE_POLL`` seconds so that
+    their return is noticed quickly.
+
+    Going away publishes ``UserIdle``; coming back publishes
+    ``UserReturned`` with how long the absence lasted.
+    """
+
+    def __init__(self, event_bus: EventBus, source: IdleSource, service: Optional[TimerService] = None,
+                 clock: Optional[Clock] = None, threshold: float = IDLE_THRESHOLD) -> None:
+        """Initialize a stopped monitor.
+
+        Args:
+            event_bus: Bus to publish idle events on
+            source: Where the idle time comes from
+            service: Timer service to poll on, the shared one if omitted
+            clock: Clock to date absences with, the system clock if omitted
+            threshold: Seconds without input after which the user counts as away
+        """
+        self.events = event_bus
+        self.source = source
+        self._service = service
+        self.clock = clock if clock is not None else real_clock
+        self.threshold = threshold
+        self.polls = 0
+        self._lock = threading.Lock()
+        self._since: Optional[datetime] = None
+        self._last_idle = 0.0
+        self._handle = None
+        self._stopped = True
+
+    @property
+    def service(self) -> TimerService:
+        """Timer service the polls are scheduled on."""
+        if self._service is None:
+            self._service = get_timer_service()
+        return self._service
+
+    @property
+    def idle(self) -> bool:
+        """Whether the user is away."""
+        return self._since is not None
+
+    def start(self) -> None:
+        """Start polling."""
+        self._stopped = False
+        self._on_poll()
+
+    def stop(self) -> None:
+        """Stop polling and release the source."""
+        self._stopped = True
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self.source.close()
+
+    def poll(self) -> float:
+        """Read the idle time once, publishing an event if the user left or came back.
+
+        Returns:
+            Seconds until the next poll is due
+        """
+        idle = self.source.idle_seconds()
+        self.polls += 1
+        if idle is None:
+            return MAX_POLL
+        event = None
+        with self._lock:
+            now = self.clock.now()
+            if self._since is None:
+                if idle >= self.threshold:
+                    self._since = now - timedelta(seconds=idle)
+                    event = UserIdle(self._since)
+            elif idle < self._last_idle or idle < self.threshold:
+                # Input since the last poll; the absence ended idle seconds ago
+                event = UserReturned(self._since, (now - self._since).total_seconds() - idle)
+                self._since = None
+            self._last_idle = idle
+            away = self._since is not None
+        if event is not None:
+            logger.info(f"User {'went idle' if away else 'returned'} ({idle:.0f}s without input)")
+            self.events.publish(event)
+        if away:
+            return IDLE_POLL
+        return min(MAX_POLL, max(MIN_POLL, self.threshold - idle))
+
+    def _on_poll(self) -> None:
+        if self._stopped:
+            return
+        try:
+            delay = self.poll()
+        except Exception as e:
+            logger.error(f"Error reading idle time: {e}")
+            delay = MAX_POLL
+        if not self._stopped:
+            self._handle = self.service.call_later(delay, self._on_poll)
@@ -0,0 +1,182 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+import heapq
+import itertools
+import threading
+
+# Every repeat pattern recurs within a week, so a slot with no occurrence in
+# the next eight days never occurs again.
+LOOKAHEAD_DAYS = 8
+
+
+def next_slot_occurrence(slot, after: datetime) -> Optional[datetime]:
+    """Get the first occurrence of a break slot strictly after a moment.
+
+    Args:
+        slot: Break slot to expand
+        after: Moment to search from
+
+    Returns:
+        Occurrence datetime or None if the slot never occurs
+    """
+    day = after.date()
+    for offset in range(LOOKAHEAD_DAYS):
+        occurrence = datetime.combine(day + timedelta(days=offset), slot.start_time)
+        if occurrence > after and slot.is_active_today(occurrence):
+            return occurrence
+    return None
+
+
+def iter_slot_occurrences(slot, start: datetime, end: datetime) -> Iterator[datetime]:
+    """Lazily yield the occurrences of one break slot in ``[start, end)``.
+
+    Args:
+        slot: Break slot to expand
+        start: First moment of the range (inclusive)
+        end: Last moment of the range (exclusive)
+
+    Yields:
+        Occurrence datetimes in chronological order
+    """
+    if not slot.enabled:
+        return
+    day = start.date()
+    while True:
+        occurrence = datetime.combine(day, slot.start_time)
+        if occurrence >= end:
+            return
+        if occurrence >= start and slot.is_active_today(occurrence):
+            yield occurrence
+        day += timedelta(days=1)
+
+
+def iter_occurrences(slots: Iterable, start: datetime,
+                     end: datetime) -> Iterator[Tuple[object, datetime]]:
+    """Lazily merge the occurrences of many break slots in ``[start, end)``.
+
+    Only one pending occurrence per slot is held at a time, so memory stays
+    proportional to the number of slots however long the range is.
+
+    Args:
+        slots: Break slots to expand
+        start: First moment of the range (inclusive)
+        end: Last moment of the range (exclusive)
+
+    Returns:
+        Iterator of (break_slot, occurrence_datetime) tuples in chronological order
+    """
+    streams = [zip(itertools.repeat(slot), iter_slot_occurrences(slot, start, end))
+               for slot in slots]
+    return heapq.merge(*streams, key=lambda item: item[1])
+
+
+class OccurrenceQueue:
+    """Heap of upcoming break occurrences keyed by time.
+
+    Each enabled slot has exactly one entry, its next occurrence. Popping an
+    entry re-arms the slot with its following occurrence, so peeking at the
+    next break is O(1) and moving past a break is O(log n). The heap is only
+    rebuilt when it has been invalidated, the day rolls over, or the clock
+    moves backwards.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty, stale queue."""
+        self._heap: List[Tuple[datetime, int, object]] = []
+        self._counter = itertools.count()
+        self.lock = threading.RLock()
+        self._stale = True
+        self._built_for: Optional[date] = None
+        self._position: Optional[datetime] = None
+        self.size = 0
+
+    def invalidate(self) -> None:
+        """Mark the queue for rebuilding on next use."""
+        with self.lock:
+            self._stale = True
+
+    def needs_rebuild(self, current_datetime: datetime) -> bool:
+        """Check whether the queue must be rebuilt before answering for a moment.
+
+        Args:
+            current_datetime: Moment the caller is asking about
+
+        Returns:
+            True if the queue is stale for that moment
+        """
+        return (self._stale
+                or self._built_for != current_datetime.date()
+                or (self._position is not None and current_datetime < self._position))
+
+    def rebuild(self, slots: Iterable, current_datetime: datetime) -> None:
+        """Rebuild the heap with each slot's next occurrence after a moment.
+
+        Args:
+            slots: Break slots to schedule
+            current_datetime: Moment to schedule from
+        """
+        with self.lock:
+            heap = []
+            count = 0
+            for slot in slots:
+                count += 1
+                if not slot.enabled:
+                    continue
+                occurrence = next_slot_occurrence(slot, current_datetime)
+                if occurrence is not None:
+                    heap.append((occurrence, next(self._counter), slot))
+            heapq.heapify(heap)
+            self._heap = heap
+            self.size = count
+            self._stale = False
+            self._built_for = current_datetime.date()
+            self._position = current_datetime
+
+    def peek(self) -> Optional[Tuple[object, datetime]]:
+        """Get the earliest pending occurrence without consuming it.
+
+        Returns:
+            Tuple of (break_slot, occurrence_datetime) or None if empty
+        """
+        with self.lock:
+            if not self._heap:
+                return None
+            occurrence, _, slot = self._heap[0]
+            return slot, occurrence
+
+    def pop(self) -> Optional[Tuple[object, datetime]]:
+        """Consume the earliest occurrence and re-arm its slot.
+
+        Returns:
+            Tuple of (break_slot, occurrence_datetime) or None if empty
+        """
+        with self.lock:
+            if not self._heap:
+                return None
+            occurrence, _, slot = self._heap[0]
+            following = next_slot_occurrence(slot, occurrence)
+            if following is not None:
+                heapq.heapreplace(self._heap, (following, next(self._counter), slot))
+            else:
+                heapq.heappop(self._heap)
+            if self._position is None or occurrence > self._position:
+                self._position = occurrence
+            return slot, occurrence
+
+    def advance(self, current_datetime: datetime) -> List[Tuple[object, datetime]]:
+        """Consume every occurrence at or before a moment.
+
+        Args:
+            current_datetime: Moment to advance to
+
+        Returns:
+            List of (break_slot, occurrence_datetime) tuples that fell due,
+            oldest first
+        """
+        with self.lock:
+            due = []
+            while self._heap and self._heap[0][0] <= current_datetime:
+                due.append(self.pop())
+            if self._position is None or current_datetime > self._position:
+                self._position = current_datetime
+            return due
@@ -0,0 +1,168 @@
+from typing import Any, Callable, Optional
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after the last change before a background write starts
+SAVE_DEBOUNCE = 0.5
+# Longest a change may wait while changes keep arriving
+SAVE_MAX_DELAY = 5.0
+
+
+def atomic_write(path, data: bytes) -> None:
+    """Replace a file's contents so readers see either the old or new version.
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over the target, so a crash mid-write never leaves a
+    truncated file behind.
+
+    Args:
+        path: File to write
+        data: Complete new contents
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or "."
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def atomic_write_json(path, obj: Any) -> None:
+    """Atomically write an object as indented JSON.
+
+    Args:
+        path: File to write
+        obj: JSON-serializable object
+    """
+    atomic_write(path, json.dumps(obj, indent=2).encode("utf-8"))
+
+
+def _fsync_directory(directory: str) -> None:
+    """Persist a rename by syncing its directory where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class DebouncedWriter:
+    """Coalesces save requests and performs them on a background thread.
+
+    ``request()`` only records that a write is due, so callers on the UI
+    thread pay almost nothing per change. The writer thread runs the write
+    once no request has arrived for ``delay`` seconds, or after
+    ``max_delay`` seconds under a constant stream of requests, and exits
+    when idle. ``flush()`` and ``write_now()`` write synchronously; writes
+    never overlap.
+    """
+
+    def __init__(self, write: Callable[[], None], delay: float = SAVE_DEBOUNCE,
+                 max_delay: float = SAVE_MAX_DELAY, name: str = "DebouncedWriter") -> None:
+        """Initialize the writer.
+
+        Args:
+            write: Performs the actual write, reading the current state
+            delay: Debounce window in seconds
+            max_delay: Upper bound on how long a request can be deferred
+            name: Name of the background thread
+        """
+        self._write = write
+        self.delay = delay
+        self.max_delay = max_delay
+        self.name = name
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pending = False
+        self._first_request = 0.0
+        self._deadline = 0.0
+        self.writes = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether a requested write has not happened yet."""
+        return self._pending
+
+    def request(self) -> None:
+        """Ask for a write after the debounce window."""
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._pending = True
+                self._first_request = now
+            self._deadline = min(now + self.delay, self._first_request + self.max_delay)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            else:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """Perform a pending write now, waiting for one already in progress."""
+        with self._write_lock:
+            with self._condition:
+                if not self._pending:
+                    return
+                self._pending = False
+                self._condition.notify()
+            self._perform()
+
+    def write_now(self) -> None:
+        """Write immediately, absorbing any pending request."""
+        with self._write_lock:
+            with self._condition:
+                self._pending = False
+                self._condition.notify()
+            self._perform()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._pending:
+                    self._thread = None
+                    return
+            with self._write_lock:
+                with self._condition:
+                    if not self._pending:
+                        continue
+                    self._pending = False
+                self._perform()
+
+    def _perform(self) -> None:
+        try:
+            self._write()
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Error in {self.name}: {e}")
@@ -0,0 +1,303 @@
+from typing import Any, Dict, List, Optional
+from array import array
+import json
+import struct
+import sys
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BINARY_MAGIC = b"BAB\x01"
+# Lists of at least this many same-keyed dicts are stored column by column
+TABLE_MIN_ROWS = 4
+
+_LENGTH = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class Codec:
+    """Base class for file serialization formats."""
+
+    name = ""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize an object to bytes."""
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize bytes produced by ``dumps``."""
+        raise NotImplementedError
+
+    def matches(self, data: bytes) -> bool:
+        """Check whether data looks like this codec's output."""
+        return False
+
+
+class JsonCodec(Codec):
+    """Indented JSON, through orjson when it is importable."""
+
+    name = "json"
+
+    def __init__(self, use_orjson: bool = True) -> None:
+        """Initialize the codec.
+
+        Args:
+            use_orjson: Use orjson if installed; stdlib ``json`` otherwise
+        """
+        self.use_orjson = use_orjson and orjson is not None
+
+    def dumps(self, obj: Any) -> bytes:
+        if self.use_orjson:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        if self.use_orjson:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def matches(self, data: bytes) -> bool:
+        return data.lstrip()[:1] in (b"{", b"[")
+
+
+class BinaryCodec(Codec):
+    """Compact msgpack-style binary format.
+
+    Values are tagged: ``N``/``T``/``F`` for None and booleans, ``i`` for
+    64-bit ints, ``d`` for doubles, ``s`` for UTF-8 strings, ``l`` for
+    lists and ``m`` for dicts. Lists of dicts sharing the same keys, such
+    as the slots of a timeline, become a ``t`` table stored column by
+    column: integer columns as packed int64 arrays, booleans as bytes and
+    strings as one NUL-separated blob. Whole columns are then converted by
+    C routines instead of value by value, which is what makes large files
+    fast to load and save.
+    """
+
+    name = "binary"
+
+    def dumps(self, obj: Any) -> bytes:
+        out: List[bytes] = [BINARY_MAGIC]
+        self._encode(obj, out)
+        return b"".join(out)
+
+    def loads(self, data: bytes) -> Any:
+        if not data.startswith(BINARY_MAGIC):
+            raise ValueError("Not a binary settings or timeline file")
+        value, offset = self._decode(memoryview(data), len(BINARY_MAGIC))
+        if offset != len(data):
+            raise ValueError("Trailing data after binary value")
+        return value
+
+    def matches(self, data: bytes) -> bool:
+        return data.startswith(BINARY_MAGIC)
+
+    def _encode(self, obj: Any, out: List[bytes]) -> None:
+        if obj is None:
+            out.append(b"N")
+        elif obj is True:
+            out.append(b"T")
+        elif obj is False:
+            out.append(b"F")
+        elif isinstance(obj, int):
+            if _INT_MIN <= obj <= _INT_MAX:
+                out.append(b"i" + _INT.pack(obj))
+            else:
+                encoded = str(obj).encode("ascii")
+                out.append(b"I" + _LENGTH.pack(len(encoded)) + encoded)
+        elif isinstance(obj, float):
+            out.append(b"d" + _FLOAT.pack(obj))
+        elif isinstance(obj, str):
+            encoded = obj.encode("utf-8")
+            out.append(b"s" + _LENGTH.pack(len(encoded)) + encoded)
+        elif isinstance(obj, dict):
+            out.append(b"m" + _LENGTH.pack(len(obj)))
+            for key, value in obj.items():
+                if not isinstance(key, str):
+                    raise TypeError(f"Dict keys must be strings, not {type(key).__name__}")
+                self._encode(key, out)
+                self._encode(value, out)
+        elif isinstance(obj, (list, tuple)):
+            if not self._encode_table(obj, out):
+                out.append(b"l" + _LENGTH.pack(len(obj)))
+                for value in obj:
+                    self._encode(value, out)
+        else:
+            raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+    def _encode_table(self, rows, out: List[bytes]) -> bool:
+        if len(rows) < TABLE_MIN_ROWS or type(rows[0]) is not dict:
+            return False
+        keys = rows[0].keys()
+        if not keys or not all(type(row) is dict and row.keys() == keys for row in rows):
+            return False
+        out.append(b"t" + _LENGTH.pack(len(rows)) + _LENGTH.pack(len(keys)))
+        for key in list(keys):
+            self._encode(key, out)
+            self._encode_column([row[key] for row in rows], out)
+        return True
+
+    def _encode_column(self, column: List[Any], out: List[bytes]) -> None:
+        types = set(map(type, column))
+        if types == {int} and _INT_MIN <= min(column) and max(column) <= _INT_MAX:
+            values = array("q", column)
+            if sys.byteorder != "little":
+                values.byteswap()
+            out.append(b"i" + values.tobytes())
+            return
+        if types == {bool}:
+            out.append(b"b" + bytes(column))
+            return
+        if types == {str}:
+            joined = "\x00".join(column)
+            # A NUL inside a value would split it, so those columns fall through
+            if joined.count("\x00") == len(column) - 1:
+                encoded = joined.encode("utf-8")
+                out.append(b"s" + _LENGTH.pack(len(encoded)) + encoded)
+                return
+        out.append(b"v")
+        for value in column:
+            self._encode(value, out)
+
+    def _decode(self, data: memoryview, offset: int):
+        tag = data[offset:offset + 1].tobytes()
+        offset += 1
+        if tag == b"N":
+            return None, offset
+        if tag == b"T":
+            return True, offset
+        if tag == b"F":
+            return False, offset
+        if tag == b"i":
+            return _INT.unpack_from(data, offset)[0], offset + 8
+        if tag == b"d":
+            return _FLOAT.unpack_from(data, offset)[0], offset + 8
+        if tag in (b"s", b"I"):
+            length = _LENGTH.unpack_from(data, offset)[0]
+            offset += 4
+            text = str(data[offset:offset + length], "utf-8")
+            return (text if tag == b"s" else int(text)), offset + length
+        if tag == b"l":
+            count = _LENGTH.unpack_from(data, offset)[0]
+            offset += 4
+            values = []
+            for _ in range(count):
+                value, offset = self._decode(data, offset)
+                values.append(value)
+            return values, offset
+        if tag == b"m":
+            count = _LENGTH.unpack_from(data, offset)[0]
+            offset += 4
+            result: Dict[str, Any] = {}
+            for _ in range(count):
+                key, offset = self._decode(data, offset)
+                result[key], offset = self._decode(data, offset)
+            return result, offset
+        if tag == b"t":
+            return self._decode_table(data, offset)
+        raise ValueError(f"Unknown binary tag {tag!r} at byte {offset - 1}")
+
+    def _decode_table(self, data: memoryview, offset: int):
+        rows, width = _LENGTH.unpack_from(data, offset)[0], _LENGTH.unpack_from(data, offset + 4)[0]
+        offset += 8
+        keys = []
+        columns = []
+        for _ in range(width):
+            key, offset = self._decode(data, offset)
+            column, offset = self._decode_column(data, offset, rows)
+            keys.append(key)
+            columns.append(column)
+        return [dict(zip(keys, row)) for row in zip(*columns)], offset
+
+    def _decode_column(self, data: memoryview, offset: int, rows: int):
+        kind = data[offset:offset + 1].tobytes()
+        offset += 1
+        if kind == b"i":
+            column = array("q")
+            column.frombytes(data[offset:offset + rows * 8])
+            if sys.byteorder != "little":
+                column.byteswap()
+            return column.tolist(), offset + rows * 8
+        if kind == b"b":
+            return [byte == 1 for byte in data[offset:offset + rows]], offset + rows
+        if kind == b"s":
+            length = _LENGTH.unpack_from(data, offset)[0]
+            offset += 4
+            return str(data[offset:offset + length], "utf-8").split("\x00"), offset + length
+        if kind == b"v":
+            column = []
+            for _ in range(rows):
+                value, offset = self._decode(data, offset)
+                column.append(value)
+            return column, offset
+        raise ValueError(f"Unknown column kind {kind!r} at byte {offset - 1}")
+
+
+_CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """Make a codec available by name and to format detection.
+
+    Args:
+        codec: Codec instance
+    """
+    _CODECS[codec.name] = codec
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """Get a registered codec.
+
+    Args:
+        name: Codec name, the default JSON codec if omitted
+
+    Returns:
+        Codec instance
+
+    Raises:
+        ValueError: If no codec has that name
+    """
+    try:
+        return _CODECS[name or JsonCodec.name]
+    except KeyError:
+        raise ValueError(f"Unknown file format: {name}")
+
+
+def available_codecs() -> List[str]:
+    """Get the names of the registered codecs."""
+    return list(_CODECS)
+
+
+def detect_codec(data: bytes, preferred: Optional[Codec] = None) -> Codec:
+    """Work out which codec wrote some data.
+
+    Args:
+        data: File contents
+        preferred: Codec to use if it claims the data, ahead of the
+            registered ones
+
+    Returns:
+        Matching codec, JSON if none claims the data
+    """
+    if preferred is not None and preferred.matches(data):
+        return preferred
+    for codec in _CODECS.values():
+        if codec.matches(data):
+            return codec
+    return get_codec()
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize data in any registered format."""
+    return detect_codec(data).loads(data)
+
+
+def dumps(obj: Any, codec: Optional[str] = None) -> bytes:
+    """Serialize an object with a named codec, JSON by default."""
+    return get_codec(codec).dumps(obj)
+
+
+register_codec(JsonCodec())
+register_codec(BinaryCodec())
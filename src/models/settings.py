@@ -1,20 +1,239 @@
-import json
+import logging
 import os
-from typing import Any, Dict
+import threading
+from dataclasses import dataclass, fields
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from src.models.coordination import SPOOL_SUFFIX, ChangeSpool, WriterElection, file_lock
+from src.models.events import EventBus, SettingChanged, SettingsReloaded
+from src.models.file_watcher import file_signature
+from src.models.persistence import DebouncedWriter, atomic_write
+from src.models.serialization import detect_codec, get_codec, loads
+
+logger = logging.getLogger(__name__)
 
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "break-assistant")
 os.makedirs(CONFIG_DIR, exist_ok=True)
+# Site-wide defaults and admin policy, e.g. pushed by configuration management
+SYSTEM_CONFIG_DIR = "/etc/break-assistant"
+POLICY_FILE = "policy.json"
+# Settings layers from lowest to highest precedence
+LAYERS = ("system", "user", "policy")
+
+SETTING_DEFAULTS: Dict[str, Any] = {
+    "work_duration": 25,
+    "break_duration": 5,
+    "manual_break_duration": 15,
+    "volume": 50,
+    "auto_start": False,
+    "sound_enabled": True,
+    "system_notifications": True,
+    "transparency": False,
+    "always_on_top": False,
+    "theme": "system",
+    "break_message": "",
+    "default_break_message": "Time for your break!",
+    "timeline_backend": None,
+    "file_format": None,
+    "missed_break_policy": "latest",
+    "restart_work_after_sleep": True,
+    "long_break_duration": 15,
+    "sessions_before_long_break": 4,
+    "idle_detection": True,
+}
+
+# Inclusive bounds for numeric settings; out-of-range values are clamped
+SETTING_RANGES = {
+    "work_duration": (1, 24 * 60),
+    "break_duration": (1, 24 * 60),
+    "manual_break_duration": (1, 24 * 60),
+    "volume": (0, 100),
+    "long_break_duration": (1, 24 * 60),
+    # Work periods per cycle, the last one followed by a long break; 0 means never
+    "sessions_before_long_break": (0, 100),
+}
+
+# Allowed values for choice settings; anything else falls back to the default
+SETTING_CHOICES = {
+    # Scheduled breaks missed while suspended: drop them, show the first one or the latest one
+    "missed_break_policy": ("skip", "one", "latest"),
+}
+
+_TRUE_STRINGS = {"1", "true", "yes", "on"}
+_FALSE_STRINGS = {"0", "false", "no", "off", ""}
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """Validated, immutable view of the known settings.
+    
+    Built once per settings version by ``SettingsManager.snapshot`` and
+    shared by every reader, so hot paths read typed attributes instead of
+    copying the settings dict and re-parsing values.
+    """
+    
+    __slots__ = tuple(SETTING_DEFAULTS)
+    
+    work_duration: int
+    break_duration: int
+    manual_break_duration: int
+    volume: int
+    auto_start: bool
+    sound_enabled: bool
+    system_notifications: bool
+    transparency: bool
+    always_on_top: bool
+    theme: str
+    break_message: str
+    default_break_message: str
+    timeline_backend: Optional[str]
+    file_format: Optional[str]
+    missed_break_policy: str
+    restart_work_after_sleep: bool
+    long_break_duration: int
+    sessions_before_long_break: int
+    idle_detection: bool
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AppSettings':
+        """Validate raw settings, replacing unusable values with defaults.
+        
+        Args:
+            data: Settings as loaded from file; unknown keys are ignored
+            
+        Returns:
+            Settings snapshot
+        """
+        values = {}
+        for field in fields(cls):
+            default = SETTING_DEFAULTS[field.name]
+            value = _coerce(data.get(field.name, default), default, SETTING_RANGES.get(field.name))
+            if field.name in SETTING_CHOICES and value not in SETTING_CHOICES[field.name]:
+                value = default
+            values[field.name] = value
+        return cls(**values)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the snapshot to a settings dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _normalize(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize numeric settings to int where possible."""
+    for key in ["work_duration", "break_duration", "volume"]:
+        if key in settings:
+            try:
+                settings[key] = int(settings[key])
+            except (ValueError, TypeError):
+                # If conversion fails, set to a safe default
+                if key == "work_duration":
+                    settings[key] = 25
+                elif key == "break_duration":
+                    settings[key] = 5
+                elif key == "volume":
+                    settings[key] = 50
+    return settings
+
+
+def _coerce(value: Any, default: Any, bounds=None) -> Any:
+    """Convert a raw setting to the type of its default."""
+    if isinstance(default, bool):
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in _TRUE_STRINGS:
+                return True
+            if lowered in _FALSE_STRINGS:
+                return False
+            return default
+        return bool(value) if isinstance(value, (bool, int, float)) else default
+    if isinstance(default, int):
+        try:
+            number = int(value)
+        except (ValueError, TypeError, OverflowError):
+            return default
+        if bounds is not None:
+            number = min(max(number, bounds[0]), bounds[1])
+        return number
+    if isinstance(default, str):
+        return value if isinstance(value, str) else default
+    # Optional strings such as the storage backend
+    return value if value is None or isinstance(value, str) else default
+
+
+class LockedSettingError(ValueError):
+    """Raised when changing a setting the administrator has locked."""
+
 
 class SettingsManager:
-    """Handles loading, saving, and managing user settings."""
+    """Handles loading, saving, and managing user settings.
     
-    def __init__(self, settings_file=None) -> None:
-        self.settings: Dict[str, Any] = {}
+    Settings resolve through three layers, later ones winning:
+    
+    1. System defaults from ``/etc/break-assistant/*.json``, in name order
+    2. The user's settings file
+    3. Admin policy from ``/etc/break-assistant/policy.json``; its keys are
+       locked and cannot be changed by the user
+    
+    The layers are merged once into a cached resolved dict, so ``get`` is a
+    single lookup. Replacing a layer invalidates the merge; ``set`` updates
+    it in place. Only the user layer is ever saved, and only by the
+    instance the ``election`` picked; others forward their changes to it.
+    """
+    
+    def __init__(self, settings_file=None, event_bus: Optional[EventBus] = None,
+                 codec: Optional[str] = None, system_dir=SYSTEM_CONFIG_DIR,
+                 election: Optional[WriterElection] = None) -> None:
+        self._layers: Dict[str, Dict[str, Any]] = {name: {} for name in LAYERS}
+        self._resolved: Optional[Dict[str, Any]] = None
+        self.system_dir = system_dir
+        self.election = election
+        self.events = event_bus if event_bus is not None else EventBus()
+        # Format to save in; the loaded file's format is kept if not set
+        self.codec = get_codec(codec) if codec else None
+        self._detected = None
+        self._file_signature = None  # Version of the file last read or written here
+        self.version = 0
+        self._snapshot: Optional[AppSettings] = None
+        self._snapshot_version = -1
+        self._forward_ops: List[Dict[str, Any]] = []  # Changes still to hand to the writer
+        self._forward_lock = threading.Lock()
+        self._writer = DebouncedWriter(self._write_settings, name="SettingsWriter")
         if settings_file:
             self.settings_file = settings_file
         else:
             self.settings_file = os.path.join(CONFIG_DIR, "settings.json")
     
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """The user's own settings, as saved to the settings file."""
+        return self._layers["user"]
+    
+    @settings.setter
+    def settings(self, settings: Dict[str, Any]) -> None:
+        self._layers["user"] = settings
+        self._resolved = None
+    
+    @property
+    def is_writer(self) -> bool:
+        """Whether this instance saves the settings file itself rather than forwarding changes."""
+        return self.election is None or self.election.is_writer
+    
+    @property
+    def spool(self) -> ChangeSpool:
+        """Queue through which other instances hand setting changes to the writer."""
+        return ChangeSpool(os.fspath(self.settings_file) + SPOOL_SUFFIX)
+    
+    @property
+    def resolved(self) -> Dict[str, Any]:
+        """Effective settings after merging all layers; do not modify."""
+        resolved = self._resolved
+        if resolved is None:
+            resolved = {}
+            for name in LAYERS:
+                resolved.update(self._layers[name])
+            self._resolved = resolved
+        return resolved
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting value.
         
@@ -25,43 +244,250 @@ class SettingsManager:
         Returns:
             Setting value or default
         """
-        return self.settings.get(key, default)
+        return self.resolved.get(key, default)
+    
+    def is_locked(self, key: str) -> bool:
+        """Check whether the admin policy fixes a setting.
+        
+        Args:
+            key: Setting key
+            
+        Returns:
+            True if users cannot change the setting
+        """
+        return key in self._layers["policy"]
+    
+    def locked_keys(self) -> FrozenSet[str]:
+        """Get the settings fixed by the admin policy."""
+        return frozenset(self._layers["policy"])
+    
+    @property
+    def snapshot(self) -> AppSettings:
+        """Typed, immutable settings for the current version.
+        
+        The snapshot is rebuilt only after a change, so repeated reads are
+        free and readers can share it. Compare ``version`` to detect
+        changes cheaply. Changes must go through ``set``, ``load`` or
+        ``reload`` to be seen.
+        """
+        snapshot = self._snapshot
+        version = self.version
+        if snapshot is None or self._snapshot_version != version:
+            snapshot = AppSettings.from_dict(self.resolved)
+            self._snapshot = snapshot
+            self._snapshot_version = version
+        return snapshot
     
     def set(self, key: str, value: Any) -> None:
-        """Set a setting value.
+        """Set a setting value, publishing ``SettingChanged`` if it differs.
+        
+        Setting a locked key to its enforced value is a no-op.
         
         Args:
             key: Setting key
             value: Setting value
+            
+        Raises:
+            LockedSettingError: If the key is locked to another value
         """
+        policy = self._layers["policy"]
+        if key in policy:
+            if policy[key] == value:
+                return
+            raise LockedSettingError(f"Setting '{key}' is locked by the administrator")
+        changed = key not in self.settings or self.settings[key] != value
+        old_value = self.get(key)
         self.settings[key] = value
+        if self._resolved is not None:
+            self._resolved[key] = value
+        if changed:
+            if not self.is_writer:
+                with self._forward_lock:
+                    self._forward_ops.append({"op": "set", "key": key, "value": value})
+            self.version += 1
+            self.events.publish(SettingChanged(key, old_value, value))
     
     def load(self) -> None:
-        """Load settings from file and normalize numeric values to int."""
+        """Load system, user and policy settings and normalize numeric values to int."""
+        self._layers["system"], self._layers["policy"] = self._read_system_layers()
         try:
+            self._file_signature = file_signature(self.settings_file)
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    self.settings = json.load(f)
-                # Normalize numeric settings to int if possible
-                for key in ["work_duration", "break_duration", "volume"]:
-                    if key in self.settings:
-                        try:
-                            self.settings[key] = int(self.settings[key])
-                        except (ValueError, TypeError):
-                            # If conversion fails, set to a safe default
-                            if key == "work_duration":
-                                self.settings[key] = 25
-                            elif key == "break_duration":
-                                self.settings[key] = 5
-                            elif key == "volume":
-                                self.settings[key] = 50
+                self.settings = self._read_file()
         except Exception:
             self.settings = {}
+        self._resolved = None
+        self.version += 1
+        self.events.publish(SettingsReloaded())
+    
+    def reload(self) -> List[str]:
+        """Pick up changes another program made to the settings file.
+        
+        Publishes ``SettingChanged`` for each key whose effective value
+        differs, so listeners update only what changed. Nothing is read if
+        the file is still the version last loaded or saved here, and an
+        unreadable or missing file leaves the settings alone.
+        
+        Returns:
+            Keys that changed
+        """
+        signature = file_signature(self.settings_file)
+        if signature is None or signature == self._file_signature:
+            return []
+        try:
+            settings = self._read_file()
+        except Exception:
+            return []
+        self._file_signature = signature
+        return self._replace_layers(user=settings)
+    
+    def reload_system(self) -> List[str]:
+        """Re-read the system defaults and admin policy.
+        
+        Returns:
+            Keys whose effective value changed
+        """
+        system, policy = self._read_system_layers()
+        return self._replace_layers(system=system, policy=policy)
+    
+    def system_files(self) -> List[str]:
+        """Get the system layer files to watch, including a policy file yet to be created."""
+        policy_path = os.path.join(self.system_dir, POLICY_FILE)
+        try:
+            names = sorted(os.listdir(self.system_dir))
+        except OSError:
+            return [policy_path]
+        paths = [os.path.join(self.system_dir, name) for name in names
+                 if name.endswith(".json") and name != POLICY_FILE]
+        return paths + [policy_path]
+    
+    def _replace_layers(self, **layers: Dict[str, Any]) -> List[str]:
+        """Swap in new layer contents and announce effective changes."""
+        old = self.resolved
+        self._layers.update(layers)
+        self._resolved = None
+        new = self.resolved
+        changed = [key for key in {**old, **new}
+                   if key not in old or key not in new or old[key] != new[key]]
+        if changed:
+            self.version += 1
+        for key in changed:
+            self.events.publish(SettingChanged(key, old.get(key), new.get(key)))
+        return changed
+    
+    def _read_system_layers(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Read the system defaults and policy, skipping unreadable files.
+        
+        Returns:
+            Tuple of (defaults, policy)
+        """
+        defaults: Dict[str, Any] = {}
+        policy: Dict[str, Any] = {}
+        for path in self.system_files():
+            try:
+                with open(path, 'rb') as f:
+                    data = loads(f.read())
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error(f"Ignoring unreadable system settings {path}: {e}")
+                continue
+            if not isinstance(data, dict):
+                logger.error(f"Ignoring system settings {path}: not an object")
+                continue
+            layer = policy if os.path.basename(path) == POLICY_FILE else defaults
+            layer.update(_normalize(data))
+        return defaults, policy
+    
+    def _read_file(self) -> Dict[str, Any]:
+        """Read and normalize the settings file."""
+        with file_lock(self.settings_file, exclusive=False), open(self.settings_file, 'rb') as f:
+            raw = f.read()
+        self._detected = detect_codec(raw, self.codec)
+        return _normalize(self._detected.loads(raw))
     
     def save(self) -> None:
-        """Save settings to file."""
+        """Save settings to file now, replacing it atomically."""
+        self._writer.write_now()
+    
+    def request_save(self) -> None:
+        """Save settings to file from the background writer after a short quiet period."""
+        self._writer.request()
+    
+    def flush(self) -> None:
+        """Write any pending settings changes now."""
+        self._writer.flush()
+    
+    def apply_forwarded_changes(self) -> List[str]:
+        """Apply and save the setting changes other instances forwarded.
+        
+        Only the writing instance takes changes off the queue. Changes to
+        settings the administrator has since locked are dropped.
+        
+        Returns:
+            Keys that changed
+        """
+        if not self.is_writer:
+            return []
+        try:
+            entries = self.spool.drain()
+        except Exception as e:
+            logger.error(f"Error reading forwarded settings: {e}")
+            return []
+        version = self.version
+        changed = []
+        for entry in entries:
+            key = entry.get("key")
+            if entry.get("op") != "set" or not isinstance(key, str):
+                continue
+            old_value = self.get(key)
+            try:
+                self.set(key, entry.get("value"))
+            except LockedSettingError as e:
+                logger.warning(f"Dropping forwarded setting: {e}")
+                continue
+            if self.get(key) != old_value and key not in changed:
+                changed.append(key)
+        if self.version != version:
+            self.request_save()
+        return changed
+    
+    def on_elected(self) -> List[str]:
+        """Take over saving the settings file after the previous writer exited.
+        
+        Returns:
+            Keys changed by forwarded changes that were still queued
+        """
+        changed = self.apply_forwarded_changes()
+        with self._forward_lock:
+            pending, self._forward_ops = self._forward_ops, []
+        if pending:
+            self.request_save()  # Changes made here that were never forwarded
+        return changed
+    
+    def _forward_changes(self) -> None:
+        """Queue the changes made here for the instance that writes the file."""
+        with self._forward_lock:
+            ops, self._forward_ops = self._forward_ops, []
+        if not ops:
+            return
+        pid = os.getpid()
+        try:
+            self.spool.append([dict(op, pid=pid) for op in ops])
+        except Exception as e:
+            logger.error(f"Error forwarding settings: {e}")
+            with self._forward_lock:
+                self._forward_ops[:0] = ops
+    
+    def _write_settings(self) -> None:
+        if not self.is_writer:
+            self._forward_changes()
+            return
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            codec = self.codec or self._detected or get_codec()
+            data = codec.dumps(dict(self.settings))
+            with file_lock(self.settings_file):
+                atomic_write(self.settings_file, data)
+            self._file_signature = file_signature(self.settings_file)
         except Exception:
             pass 
\ No newline at end of file
@@ -0,0 +1,276 @@
+from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import logging
+import math
+import random
+import time as time_module
+
+from src.models.break_history import COMPLETED, SCHEDULED, SHOWN, SKIPPED, SNOOZED, STARTED, BreakHistory
+from src.models.break_scheduler import BreakScheduler
+from src.models.clock import VirtualClock
+from src.models.events import SessionChanged
+from src.models.settings import AppSettings
+from src.models.timer import BREAK_PHASES, FINISH, LONG_BREAK, WORK, Session, TimerHandle, TimerService
+
+logger = logging.getLogger(__name__)
+
+# Simulations start at midnight on a Monday unless given a clock
+SIMULATION_START = datetime(2024, 1, 8)
+
+# What the simulated user does with a break popup
+START = "start"
+SNOOZE = "snooze"
+SKIP = "skip"
+
+# Minutes the popup's snooze button adds to a break
+SNOOZE_MINUTES = 5
+
+
+class SimulatedUser:
+    """Someone working on weekdays who answers break popups at random, reproducibly.
+
+    Popups shown while the user is away are answered when they are back.
+    """
+
+    def __init__(self, work_start: time = time(9, 0), work_end: time = time(17, 0),
+                 response_delay: float = 20.0, snooze_rate: float = 0.1, skip_rate: float = 0.1,
+                 seed: int = 0) -> None:
+        """Initialize the user.
+
+        Args:
+            work_start: When the working day starts
+            work_end: When the working day ends
+            response_delay: Seconds taken to answer a popup
+            snooze_rate: Share of popups snoozed before starting the break
+            skip_rate: Share of popups skipped
+            seed: Seed for the choices
+        """
+        self.work_start = work_start
+        self.work_end = work_end
+        self.response_delay = response_delay
+        self.snooze_rate = snooze_rate
+        self.skip_rate = skip_rate
+        self._random = random.Random(seed)
+
+    def at_desk(self, when: datetime) -> bool:
+        """Check whether the user is working at a time."""
+        return when.weekday() < 5 and self.work_start <= when.time() < self.work_end
+
+    def next_change(self, when: datetime) -> datetime:
+        """Get when the user next arrives or leaves after a time."""
+        if self.at_desk(when):
+            return datetime.combine(when.date(), self.work_end)
+        day = when.date()
+        if when.time() >= self.work_start:
+            day += timedelta(days=1)
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return datetime.combine(day, self.work_start)
+
+    def respond(self) -> str:
+        """Choose what to do with a popup: ``START``, ``SNOOZE`` or ``SKIP``."""
+        choice = self._random.random()
+        if choice < self.skip_rate:
+            return SKIP
+        if choice < self.skip_rate + self.snooze_rate:
+            return SNOOZE
+        return START
+
+
+class _Popup:
+    """A break popup the simulated user has to deal with."""
+
+    __slots__ = ("slot", "occurrence", "source", "duration", "long", "answer", "done")
+
+    def __init__(self, slot, occurrence: datetime, source: str, duration: int, long: bool = False) -> None:
+        self.slot = slot
+        self.occurrence = occurrence
+        self.source = source
+        self.duration = duration
+        self.long = long
+        self.answer: Optional[TimerHandle] = None
+        self.done = False
+
+
+@dataclass
+class SimulationReport:
+    """What happened during a simulation.
+
+    The break counters are named after the history event kinds.
+    ``callbacks`` and ``polls`` count the timer callbacks run and the
+    scheduler rounds, the work the engine did.
+    """
+    scheduled: int = 0
+    shown: int = 0
+    started: int = 0
+    completed: int = 0
+    skipped: int = 0
+    snoozed: int = 0
+    work_sessions: int = 0
+    long_breaks: int = 0
+    callbacks: int = 0
+    polls: int = 0
+    simulated_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Simulated seconds per real second."""
+        return self.simulated_seconds / self.elapsed if self.elapsed > 0 else math.inf
+
+
+class Simulation:
+    """Replays timeline behaviour against a virtual clock, as fast as it can run.
+
+    The break scheduler and the work/break session run on a timer service
+    without a worker thread. The simulation jumps the clock from one
+    deadline to the next and runs what fell due, while a simulated user
+    works, answers popups, snoozes and skips the way the views let them. A
+    week takes well under a second, so this serves both as a correctness
+    harness and as a throughput benchmark for the scheduling engine.
+    """
+
+    def __init__(self, timeline_manager, settings: Optional[AppSettings] = None,
+                 user: Optional[SimulatedUser] = None, clock: Optional[VirtualClock] = None,
+                 history: Optional[BreakHistory] = None) -> None:
+        """Initialize the simulation.
+
+        Args:
+            timeline_manager: Timeline manager providing the scheduled breaks
+            settings: Settings to run with, the defaults if omitted
+            user: Simulated user, a default one if omitted
+            clock: Virtual clock to move, one starting at ``SIMULATION_START`` if omitted
+            history: Break history to record events in, if any
+        """
+        self.timeline_manager = timeline_manager
+        self.settings = settings if settings is not None else AppSettings.from_dict({})
+        self.user = user if user is not None else SimulatedUser()
+        self.clock = clock if clock is not None else VirtualClock(SIMULATION_START)
+        self.history = history
+        self.service = TimerService(self.clock, background=False)
+        self.scheduler = BreakScheduler(timeline_manager, self._on_scheduled_break, clock=self.clock,
+                                        missed_policy=lambda: self.settings.missed_break_policy)
+        self.session = Session(self.settings.work_duration * 60, self.settings.break_duration * 60,
+                               self.settings.long_break_duration * 60, self.settings.sessions_before_long_break,
+                               service=self.service)
+        self.session.events.subscribe(SessionChanged, self._on_session_changed)
+        self.report = SimulationReport()
+        # Like the main window, one popup at a time; a new break replaces it
+        self._popup: Optional[_Popup] = None
+        self._started = False
+
+    def run(self, days: float = 7) -> SimulationReport:
+        """Run the simulation.
+
+        Args:
+            days: Simulated days to run for
+
+        Returns:
+            Report covering this and any earlier runs
+        """
+        started = time_module.perf_counter()
+        end = self.clock.monotonic() + days * 86400
+        if not self._started:
+            self._started = True
+            self._plan_next_change()
+        next_poll = self.clock.monotonic()
+        while True:
+            if self.clock.monotonic() >= next_poll:
+                next_poll = self.clock.monotonic() + self.scheduler.poll()
+                self.report.polls += 1
+            self.report.callbacks += self.service.run_due()
+            deadline = self.service.next_deadline()
+            if deadline is None or deadline > next_poll:
+                deadline = next_poll
+            if deadline > end:
+                break
+            self.clock.run_until(deadline)
+        self.clock.run_until(end)
+        self.report.simulated_seconds += days * 86400
+        elapsed = time_module.perf_counter() - started
+        self.report.elapsed += elapsed
+        logger.info(f"Simulated {days:g} days in {elapsed:.3f}s")
+        return self.report
+
+    def _plan_next_change(self) -> None:
+        now = self.clock.now()
+        delay = (self.user.next_change(now) - now).total_seconds()
+        self.service.call_later(delay, self._on_arrive_or_leave)
+
+    def _on_arrive_or_leave(self) -> None:
+        if self.user.at_desk(self.clock.now()):
+            popup = self._popup
+            if popup is None:
+                self.session.start()
+            elif popup.answer is None:
+                self._expect_answer(popup)
+        elif self.session.phase == WORK:
+            self.session.reset()
+        self._plan_next_change()
+
+    def _on_scheduled_break(self, slot, occurrence: datetime) -> None:
+        popup = _Popup(slot, occurrence, "scheduled", slot.duration or self.settings.break_duration)
+        self._record(SCHEDULED, popup)
+        # Scheduled breaks pause the work timer, as in the main window
+        if self.session.phase == WORK:
+            self.session.pause()
+        self._show(popup)
+
+    def _on_session_changed(self, event: SessionChanged) -> None:
+        if event.transition != FINISH:
+            return
+        if event.previous.phase == WORK:
+            self.report.work_sessions += 1
+            long = event.state.phase == LONG_BREAK
+            if long:
+                self.report.long_breaks += 1
+            self._show(_Popup(None, self.clock.now(), "timer", round(event.state.duration / 60), long))
+        elif event.previous.phase in BREAK_PHASES and self._popup is not None:
+            self._popup.done = True
+            self._record(COMPLETED, self._popup)
+            self._close(self._popup)
+
+    def _show(self, popup: _Popup) -> None:
+        previous = self._popup
+        if previous is not None and not previous.done:
+            # The popup shows the new break instead, so the old one was skipped
+            if previous.answer is not None:
+                previous.answer.cancel()
+            self._record(SKIPPED, previous)
+        self._popup = popup
+        self.session.begin_break(popup.duration * 60, long=popup.long)
+        self._record(SHOWN, popup)
+        if self.user.at_desk(self.clock.now()):
+            self._expect_answer(popup)
+
+    def _expect_answer(self, popup: _Popup) -> None:
+        popup.answer = self.service.call_later(self.user.response_delay, lambda: self._answer(popup))
+
+    def _answer(self, popup: _Popup) -> None:
+        action = self.user.respond()
+        if action == SKIP:
+            popup.done = True
+            self._record(SKIPPED, popup)
+            self._close(popup)
+            return
+        if action == SNOOZE:
+            popup.duration += SNOOZE_MINUTES
+            self._record(SNOOZED, popup)
+        self._record(STARTED, popup)
+        self.session.begin_break(popup.duration * 60, long=popup.long, start=True)
+
+    def _close(self, popup: _Popup) -> None:
+        self._popup = None
+        self.session.end_break()
+        if not self.settings.auto_start:
+            # Closing the popup resets the work timer unless work resumes automatically
+            self.session.reset()
+        if self.user.at_desk(self.clock.now()):
+            self.session.start()
+
+    def _record(self, kind: str, popup: _Popup) -> None:
+        setattr(self.report, kind, getattr(self.report, kind) + 1)
+        if self.history is not None:
+            self.history.record(kind, getattr(popup.slot, 'id', None), self.clock.now(), popup.source,
+                                popup.duration, popup.occurrence)
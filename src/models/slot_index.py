@@ -0,0 +1,156 @@
+from typing import Iterable, List, Optional, Tuple
+from bisect import bisect_left, insort
+import heapq
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def slot_interval(slot) -> Optional[Tuple[int, int]]:
+    """Get the minute-of-day interval covered by a break slot.
+
+    Intervals are half-open ``[start, end)`` on a linear day, so a slot that
+    runs past midnight simply ends after minute 1440.
+
+    Args:
+        slot: Break slot to convert
+
+    Returns:
+        Tuple of (start_minute, end_minute) or None if the duration is invalid
+    """
+    try:
+        duration = int(slot.duration)
+    except (ValueError, TypeError):
+        return None
+    start = slot.start_minute
+    return start, start + duration
+
+
+class SlotIntervalIndex:
+    """Sorted interval index over enabled break slots.
+
+    Entries are kept sorted by start minute. Overlap queries bisect to the
+    window of slots that could reach the queried interval, which is bounded
+    by the longest slot in the index, so a lookup costs O(log n + k).
+    """
+
+    def __init__(self, slots: Iterable = ()) -> None:
+        """Initialize the index.
+
+        Args:
+            slots: Break slots to index
+        """
+        self._entries: List[Tuple[int, int, int, object]] = []
+        self._max_length = 0
+        self.rebuild(slots)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, slots: Iterable) -> None:
+        """Rebuild the index from scratch.
+
+        Args:
+            slots: Break slots to index
+        """
+        self._entries = []
+        self._max_length = 0
+        for slot in slots:
+            entry = self._make_entry(slot)
+            if entry is not None:
+                self._entries.append(entry)
+                self._max_length = max(self._max_length, entry[1] - entry[0])
+        self._entries.sort()
+
+    def add(self, slot) -> None:
+        """Add a break slot to the index. Disabled slots are ignored.
+
+        Args:
+            slot: Break slot to add
+        """
+        entry = self._make_entry(slot)
+        if entry is None:
+            return
+        insort(self._entries, entry)
+        self._max_length = max(self._max_length, entry[1] - entry[0])
+
+    def remove(self, slot) -> bool:
+        """Remove a break slot from the index.
+
+        The slot must still have the start time and duration it was indexed
+        with, so callers remove before mutating and add back afterwards.
+
+        Args:
+            slot: Break slot to remove
+
+        Returns:
+            True if the slot was found and removed
+        """
+        interval = slot_interval(slot)
+        if interval is None:
+            return False
+        start, end = interval
+        i = bisect_left(self._entries, (start, end, id(slot)))
+        if i < len(self._entries) and self._entries[i][3] is slot:
+            del self._entries[i]
+            return True
+        return False
+
+    def find_overlapping(self, start: int, end: int,
+                         exclude_id: Optional[str] = None) -> List[object]:
+        """Find indexed slots overlapping the interval ``[start, end)``.
+
+        Args:
+            start: Start minute
+            end: End minute
+            exclude_id: ID of slot to ignore
+
+        Returns:
+            List of overlapping break slots ordered by start time
+        """
+        lo = bisect_left(self._entries, (start - self._max_length,))
+        hi = bisect_left(self._entries, (end,))
+        overlapping = []
+        for entry_start, entry_end, _, slot in self._entries[lo:hi]:
+            if entry_end > start and entry_start < end:
+                if exclude_id and slot.id == exclude_id:
+                    continue
+                overlapping.append(slot)
+        return overlapping
+
+    def overlaps(self, start: int, end: int, exclude_id: Optional[str] = None) -> bool:
+        """Check whether any indexed slot overlaps ``[start, end)``.
+
+        Args:
+            start: Start minute
+            end: End minute
+            exclude_id: ID of slot to ignore
+
+        Returns:
+            True if overlap detected
+        """
+        return bool(self.find_overlapping(start, end, exclude_id))
+
+    def conflicting_pairs(self) -> List[Tuple[object, object]]:
+        """Find every pair of overlapping slots in a single sweep.
+
+        Returns:
+            List of (earlier_slot, later_slot) tuples
+        """
+        pairs = []
+        active: List[Tuple[int, int, int, object]] = []  # heap of (end, start, seq, slot)
+        for start, end, seq, slot in self._entries:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for _, _, _, other in sorted(active, key=lambda item: item[1:3]):
+                pairs.append((other, slot))
+            heapq.heappush(active, (end, start, seq, slot))
+        return pairs
+
+    @staticmethod
+    def _make_entry(slot) -> Optional[Tuple[int, int, int, object]]:
+        if not slot.enabled:
+            return None
+        interval = slot_interval(slot)
+        if interval is None:
+            return None
+        return interval[0], interval[1], id(slot), slot
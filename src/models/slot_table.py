@@ -0,0 +1,206 @@
+from typing import Dict, List
+from array import array
+from datetime import time
+
+from src.models.week_occupancy import PATTERN_DAY_MASKS
+
+
+class SlotTable:
+    """Struct-of-arrays storage for break slots.
+
+    Each slot is a row spread over parallel typed arrays: start minute,
+    duration, pattern code, message code and enabled flag. Messages and
+    repeat patterns are interned, so thousands of slots sharing a message
+    store it once. Rows freed by deleted slots are reused, which keeps row
+    numbers stable for the ``BreakSlot`` views pointing at them.
+
+    Values the compact columns cannot hold are kept in small side tables:
+    start times with seconds, and IDs that no longer match the generated
+    ``HHMM_duration_pattern`` form.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self.start_minutes = array('H')
+        self.durations = array('h')
+        self.pattern_codes = array('B')
+        self.message_codes = array('I')
+        self.enabled_flags = array('B')
+        self._patterns: List[str] = list(PATTERN_DAY_MASKS)
+        self._pattern_masks: List[int] = list(PATTERN_DAY_MASKS.values())
+        self._pattern_lookup: Dict[str, int] = {p: i for i, p in enumerate(self._patterns)}
+        self._messages: List[str] = [""]
+        self._message_lookup: Dict[str, int] = {"": 0}
+        self._precise_times: Dict[int, time] = {}
+        self._ids: Dict[int, str] = {}
+        self._free_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.start_minutes) - len(self._free_rows)
+
+    def add_row(self, start_time: time, duration: int, message: str = "",
+                repeat_pattern: str = "daily", enabled: bool = True) -> int:
+        """Store a slot and return its row number.
+
+        Args:
+            start_time: Start time of the break
+            duration: Duration in minutes
+            message: Custom message for this break
+            repeat_pattern: Repeat pattern
+            enabled: Whether this break slot is enabled
+
+        Returns:
+            Row number of the new slot
+
+        Raises:
+            ValueError: If the duration is not an integer or out of range
+        """
+        duration = self._check_duration(duration)
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self.durations[row] = duration
+            self.pattern_codes[row] = self._intern_pattern(repeat_pattern)
+            self.message_codes[row] = self._intern_message(message)
+            self.enabled_flags[row] = 1 if enabled else 0
+        else:
+            row = len(self.start_minutes)
+            self.start_minutes.append(0)
+            self.durations.append(duration)
+            self.pattern_codes.append(self._intern_pattern(repeat_pattern))
+            self.message_codes.append(self._intern_message(message))
+            self.enabled_flags.append(1 if enabled else 0)
+        self._write_start_time(row, start_time)
+        return row
+
+    def copy_row(self, source: 'SlotTable', row: int) -> int:
+        """Copy a row from another table, keeping its ID.
+
+        Args:
+            source: Table holding the row
+            row: Row number in the source table
+
+        Returns:
+            Row number in this table
+        """
+        new_row = self.add_row(source.get_start_time(row), source.durations[row],
+                               source.get_message(row), source.get_repeat_pattern(row),
+                               bool(source.enabled_flags[row]))
+        self.set_id(new_row, source.get_id(row))
+        return new_row
+
+    def release_row(self, row: int) -> None:
+        """Free a row for reuse.
+
+        Args:
+            row: Row number to free
+        """
+        self._precise_times.pop(row, None)
+        self._ids.pop(row, None)
+        self.message_codes[row] = 0
+        self._free_rows.append(row)
+
+    def get_start_minute(self, row: int) -> int:
+        return self.start_minutes[row]
+
+    def get_start_time(self, row: int) -> time:
+        precise = self._precise_times.get(row)
+        if precise is not None:
+            return precise
+        minute = self.start_minutes[row]
+        return time(minute // 60, minute % 60)
+
+    def set_start_time(self, row: int, value: time) -> None:
+        self._pin_id(row)
+        self._write_start_time(row, value)
+
+    def get_duration(self, row: int) -> int:
+        return self.durations[row]
+
+    def set_duration(self, row: int, value: int) -> None:
+        value = self._check_duration(value)
+        self._pin_id(row)
+        self.durations[row] = value
+
+    def get_message(self, row: int) -> str:
+        return self._messages[self.message_codes[row]]
+
+    def set_message(self, row: int, value: str) -> None:
+        self.message_codes[row] = self._intern_message(value)
+
+    def get_repeat_pattern(self, row: int) -> str:
+        return self._patterns[self.pattern_codes[row]]
+
+    def set_repeat_pattern(self, row: int, value: str) -> None:
+        self._pin_id(row)
+        self.pattern_codes[row] = self._intern_pattern(value)
+
+    def get_pattern_mask(self, row: int) -> int:
+        """Get the weekday bitmask of a row's repeat pattern (bit 0 = Monday)."""
+        return self._pattern_masks[self.pattern_codes[row]]
+
+    def get_enabled(self, row: int) -> bool:
+        return bool(self.enabled_flags[row])
+
+    def set_enabled(self, row: int, value: bool) -> None:
+        self.enabled_flags[row] = 1 if value else 0
+
+    def generate_id(self, row: int) -> str:
+        """Build the ``HHMM_duration_pattern`` ID from a row's current values."""
+        minute = self.start_minutes[row]
+        return f"{minute // 60:02d}{minute % 60:02d}_{self.durations[row]}_{self.get_repeat_pattern(row)}"
+
+    def get_id(self, row: int) -> str:
+        slot_id = self._ids.get(row)
+        return slot_id if slot_id is not None else self.generate_id(row)
+
+    def set_id(self, row: int, value: str) -> None:
+        if value == self.generate_id(row):
+            self._ids.pop(row, None)
+        else:
+            self._ids[row] = value
+
+    def nbytes(self) -> int:
+        """Get the size of the column arrays in bytes."""
+        return sum(column.itemsize * len(column) for column in
+                   (self.start_minutes, self.durations, self.pattern_codes,
+                    self.message_codes, self.enabled_flags))
+
+    def _pin_id(self, row: int) -> None:
+        # IDs are fixed when a slot is created, so keep the current one
+        # before changing a value it was generated from
+        if row not in self._ids:
+            self._ids[row] = self.generate_id(row)
+
+    def _write_start_time(self, row: int, value: time) -> None:
+        self.start_minutes[row] = value.hour * 60 + value.minute
+        if value.second or value.microsecond or value.tzinfo is not None:
+            self._precise_times[row] = value
+        else:
+            self._precise_times.pop(row, None)
+
+    def _intern_message(self, message: str) -> int:
+        code = self._message_lookup.get(message)
+        if code is None:
+            code = len(self._messages)
+            self._messages.append(message)
+            self._message_lookup[message] = code
+        return code
+
+    def _intern_pattern(self, pattern: str) -> int:
+        code = self._pattern_lookup.get(pattern)
+        if code is None:
+            code = len(self._patterns)
+            self._patterns.append(pattern)
+            self._pattern_masks.append(PATTERN_DAY_MASKS.get(pattern, 0))
+            self._pattern_lookup[pattern] = code
+        return code
+
+    @staticmethod
+    def _check_duration(duration) -> int:
+        try:
+            duration = int(duration)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid break duration: {duration!r}")
+        if not -32768 <= duration <= 32767:
+            raise ValueError(f"Break duration out of range: {duration}")
+        return duration
@@ -1,17 +1,37 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from contextlib import contextmanager
 from datetime import datetime, time, timedelta
-import json
 import logging
 import os
+import threading
+
+from src.models.clock import Clock, real_clock
+from src.models.coordination import SPOOL_SUFFIX, ChangeSpool, WriterElection
+from src.models.events import EventBus, SlotAdded, SlotDeleted, SlotEdited, TimelineReloaded
+from src.models.file_watcher import file_signature
+from src.models.persistence import DebouncedWriter
+from src.models.timeline_store import open_timeline_store
+from src.models.occurrence_queue import OccurrenceQueue, iter_occurrences
+from src.models.slot_index import SlotIntervalIndex, slot_interval
+from src.models.slot_table import SlotTable
+from src.models.week_occupancy import PATTERN_DAY_MASKS, WeekOccupancy
 
 logger = logging.getLogger(__name__)
 
 
 class BreakSlot:
-    """Represents a single break slot in the timeline."""
+    """Represents a single break slot in the timeline.
+    
+    A break slot is a lightweight view over one row of a ``SlotTable``.
+    Standalone slots own a private table; the timeline manager moves the
+    slots it holds into its shared table.
+    """
+    
+    __slots__ = ("_table", "_row", "__weakref__")
     
     def __init__(self, start_time: time, duration: int, message: str = "", 
-                 repeat_pattern: str = "daily", enabled: bool = True) -> None:
+                 repeat_pattern: str = "daily", enabled: bool = True,
+                 table: Optional[SlotTable] = None) -> None:
         """Initialize a break slot.
         
         Args:
@@ -20,17 +40,84 @@ class BreakSlot:
             message: Custom message for this break
             repeat_pattern: Repeat pattern ("daily", "weekdays", "weekends", "once")
             enabled: Whether this break slot is enabled
+            table: Slot table to store the slot in, a private one if omitted
+            
+        Raises:
+            ValueError: If the duration is not an integer or does not fit
+                the table's 16-bit column; the same goes for setting it later
         """
-        self.start_time = start_time
-        self.duration = duration
-        self.message = message
-        self.repeat_pattern = repeat_pattern
-        self.enabled = enabled
-        self.id = self._generate_id()
+        self._table = table if table is not None else SlotTable()
+        self._row = self._table.add_row(start_time, duration, message, repeat_pattern, enabled)
+    
+    @property
+    def start_time(self) -> time:
+        return self._table.get_start_time(self._row)
+    
+    @start_time.setter
+    def start_time(self, value: time) -> None:
+        self._table.set_start_time(self._row, value)
+    
+    @property
+    def start_minute(self) -> int:
+        """Start time as minutes after midnight."""
+        return self._table.start_minutes[self._row]
+    
+    @property
+    def duration(self) -> int:
+        return self._table.durations[self._row]
+    
+    @duration.setter
+    def duration(self, value: int) -> None:
+        self._table.set_duration(self._row, value)
+    
+    @property
+    def message(self) -> str:
+        return self._table.get_message(self._row)
+    
+    @message.setter
+    def message(self, value: str) -> None:
+        self._table.set_message(self._row, value)
+    
+    @property
+    def repeat_pattern(self) -> str:
+        return self._table.get_repeat_pattern(self._row)
+    
+    @repeat_pattern.setter
+    def repeat_pattern(self, value: str) -> None:
+        self._table.set_repeat_pattern(self._row, value)
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self._table.enabled_flags[self._row])
+    
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self._table.set_enabled(self._row, value)
+    
+    @property
+    def id(self) -> str:
+        return self._table.get_id(self._row)
+    
+    @id.setter
+    def id(self, value: str) -> None:
+        self._table.set_id(self._row, value)
     
     def _generate_id(self) -> str:
         """Generate unique ID for this break slot."""
-        return f"{self.start_time.hour:02d}{self.start_time.minute:02d}_{self.duration}_{self.repeat_pattern}"
+        return self._table.generate_id(self._row)
+    
+    def _attach(self, table: SlotTable) -> None:
+        """Move this slot's row into another table, keeping its ID.
+        
+        Args:
+            table: Table to move into
+        """
+        if table is self._table:
+            return
+        row = table.copy_row(self._table, self._row)
+        self._table.release_row(self._row)
+        self._table = table
+        self._row = row
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert break slot to dictionary."""
@@ -44,7 +131,7 @@ class BreakSlot:
         }
     
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'BreakSlot':
+    def from_dict(cls, data: Dict[str, Any], table: Optional[SlotTable] = None) -> 'BreakSlot':
         """Create break slot from dictionary."""
         start_time = datetime.strptime(data["start_time"], "%H:%M").time()
         try:
@@ -56,7 +143,8 @@ class BreakSlot:
             duration=duration,
             message=data.get("message", ""),
             repeat_pattern=data.get("repeat_pattern", "daily"),
-            enabled=data.get("enabled", True)
+            enabled=data.get("enabled", True),
+            table=table
         )
     
     def is_active_today(self, current_date: datetime) -> bool:
@@ -71,18 +159,8 @@ class BreakSlot:
         if not self.enabled:
             return False
         
-        if self.repeat_pattern == "daily":
-            return True
-        elif self.repeat_pattern == "weekdays":
-            return current_date.weekday() < 5  # Monday = 0, Friday = 4
-        elif self.repeat_pattern == "weekends":
-            return current_date.weekday() >= 5  # Saturday = 5, Sunday = 6
-        elif self.repeat_pattern == "once":
-            # For "once" pattern, we'd need to store the specific date
-            # This is a simplified implementation
-            return True
-        
-        return False
+        # Unknown patterns have no active days
+        return bool(self._table.get_pattern_mask(self._row) >> current_date.weekday() & 1)
     
     def get_next_occurrence(self, current_datetime: datetime) -> Optional[datetime]:
         """Get the next occurrence of this break slot.
@@ -154,13 +232,44 @@ class BreakSlot:
 class TimelineManager:
     """Manages custom break timeline and scheduling."""
     
-    def __init__(self, timeline_file=None) -> None:
+    def __init__(self, timeline_file=None, event_bus: Optional[EventBus] = None,
+                 backend: Optional[str] = None, codec: Optional[str] = None,
+                 election: Optional[WriterElection] = None, clock: Optional[Clock] = None) -> None:
         """Initialize timeline manager.
         
         Args:
             timeline_file: Path to timeline file
+            event_bus: Bus to publish change events on, a private one if omitted
+            backend: Storage backend, "json" or "sqlite"; chosen from the
+                file extension if omitted
+            codec: File format for JSON-backed timelines, e.g. "binary";
+                the existing file's format is kept if omitted
+            election: Decides whether this instance writes the file when
+                several run at once; it always writes if omitted
+            clock: Clock that dates journaled changes, the system clock if omitted
         """
-        self.break_slots: List[BreakSlot] = []
+        self.events = event_bus if event_bus is not None else EventBus()
+        self.clock = clock if clock is not None else real_clock
+        self.backend = backend
+        self.codec = codec
+        self.election = election
+        self._store = None
+        self._store_file = None
+        self._break_slots: List[BreakSlot] = []
+        self.slot_table = SlotTable()
+        self._interval_index: Optional[SlotIntervalIndex] = None
+        self._week_occupancy: Optional[WeekOccupancy] = None
+        self._slots_by_id: Dict[str, BreakSlot] = {}
+        self._index_size = 0
+        self._occurrence_queue = OccurrenceQueue()
+        self._undo_log: Optional[List[Callable[[], None]]] = None
+        self._touched_slots: List[BreakSlot] = []
+        self._pending_events: List[Any] = []
+        self._file_signature = None  # Version of the file last read or written here
+        self._forward_ops: List[Dict[str, Any]] = []  # Changes still to hand to the writer
+        self._forward_lock = threading.Lock()
+        self._following = False
+        self._writer = DebouncedWriter(self._write_timeline, name="TimelineWriter")
         if timeline_file:
             self.timeline_file = timeline_file
         else:
@@ -169,6 +278,268 @@ class TimelineManager:
             self.timeline_file = os.path.join(CONFIG_DIR, "timeline.json")
         self.load_timeline()
     
+    @property
+    def store(self):
+        """Storage backend for the current timeline file."""
+        if self._store is None or self._store_file != self.timeline_file:
+            if self._store is not None:
+                self._store.close()
+            self._store = open_timeline_store(self.timeline_file, self.backend, self.codec, self.clock)
+            self._store_file = self.timeline_file
+        return self._store
+    
+    @property
+    def is_writer(self) -> bool:
+        """Whether this instance saves the timeline itself rather than forwarding changes."""
+        return self.election is None or self.election.is_writer
+    
+    @property
+    def spool(self) -> ChangeSpool:
+        """Queue through which other instances hand slot changes to the writer."""
+        return ChangeSpool(os.fspath(self.timeline_file) + SPOOL_SUFFIX)
+    
+    @property
+    def break_slots(self) -> List[BreakSlot]:
+        """Break slots sorted by start time."""
+        return self._break_slots
+    
+    @break_slots.setter
+    def break_slots(self, slots: List[BreakSlot]) -> None:
+        with self._slots_lock:
+            self._break_slots = slots
+            self._invalidate_indexes()
+            self._ensure_indexes()
+    
+    @property
+    def _slots_lock(self):
+        """Lock held while the slot list changes and while the scheduler thread reads it."""
+        return self._occurrence_queue.lock
+    
+    def _invalidate_indexes(self) -> None:
+        """Drop derived lookup structures so they are rebuilt on next use."""
+        self._interval_index = None
+        self._week_occupancy = None
+        self._occurrence_queue.invalidate()
+    
+    def _ensure_indexes(self) -> None:
+        """Rebuild the id map and interval index if the slots changed underneath them."""
+        if self._interval_index is not None and self._index_size == len(self._break_slots):
+            return
+        self._slots_by_id = {}
+        for slot in self._break_slots:
+            self._register_slot(slot)
+        self._interval_index = SlotIntervalIndex(self._break_slots)
+        self._week_occupancy = None
+        self._index_size = len(self._break_slots)
+    
+    def _get_interval_index(self) -> SlotIntervalIndex:
+        """Get the interval index, rebuilding it if needed."""
+        self._ensure_indexes()
+        return self._interval_index
+    
+    def get_week_occupancy(self) -> WeekOccupancy:
+        """Get the compiled minute-of-week occupancy of the timeline.
+        
+        Compiled on first use and then updated incrementally as slots are
+        added, edited and deleted.
+        
+        Returns:
+            Week occupancy for all enabled slots
+        """
+        self._ensure_indexes()
+        if self._week_occupancy is None:
+            self._week_occupancy = WeekOccupancy(self._break_slots)
+        return self._week_occupancy
+    
+    def _index_slot(self, slot: BreakSlot) -> None:
+        """Add a slot to the interval index and occupancy, if compiled."""
+        self._interval_index.add(slot)
+        if self._week_occupancy is not None:
+            self._week_occupancy.add(slot)
+    
+    def _unindex_slot(self, slot: BreakSlot) -> None:
+        """Remove a slot from the interval index and occupancy, if compiled."""
+        self._interval_index.remove(slot)
+        if self._week_occupancy is not None:
+            self._week_occupancy.remove(slot)
+    
+    def _register_slot(self, slot: BreakSlot) -> None:
+        """Give a slot an ID that is unique in this timeline and map it.
+        
+        Slots with the same time, duration and pattern share a generated ID,
+        so later ones get a numeric suffix instead of shadowing the first.
+        
+        Args:
+            slot: Break slot to register
+        """
+        slot._attach(self.slot_table)
+        base_id = slot.id
+        slot_id = base_id
+        suffix = 2
+        while slot_id in self._slots_by_id and self._slots_by_id[slot_id] is not slot:
+            slot_id = f"{base_id}-{suffix}"
+            suffix += 1
+        slot.id = slot_id
+        self._slots_by_id[slot_id] = slot
+    
+    def _insert_slot(self, slot: BreakSlot) -> None:
+        """Put a slot into the timeline and its lookup structures, unsorted."""
+        with self._slots_lock:
+            self._ensure_indexes()
+            self._register_slot(slot)
+            self._break_slots.append(slot)
+            self._index_slot(slot)
+            self._index_size = len(self._break_slots)
+            self._occurrence_queue.invalidate()
+    
+    def _remove_slot(self, slot: BreakSlot) -> None:
+        """Take a slot out of the timeline and its lookup structures."""
+        with self._slots_lock:
+            self._ensure_indexes()
+            del self._slots_by_id[slot.id]
+            self._unindex_slot(slot)
+            self._break_slots.remove(slot)
+            slot._attach(SlotTable())  # Callers may still hold the removed slot
+            self._index_size = len(self._break_slots)
+            self._occurrence_queue.invalidate()
+    
+    def _restore_slot(self, slot: BreakSlot, slot_id: str, start_time: time, duration: int,
+                      message: str, repeat_pattern: str, enabled: bool) -> None:
+        """Put back the values and ID a slot had before an edit."""
+        with self._slots_lock:
+            self._unindex_slot(slot)
+            del self._slots_by_id[slot.id]
+            slot.start_time = start_time
+            slot.duration = duration
+            slot.message = message
+            slot.repeat_pattern = repeat_pattern
+            slot.enabled = enabled
+            slot.id = slot_id
+            self._slots_by_id[slot_id] = slot
+            self._index_slot(slot)
+            self._occurrence_queue.invalidate()
+    
+    @property
+    def in_transaction(self) -> bool:
+        """Whether mutations are currently being batched."""
+        return self._undo_log is not None
+    
+    def _emit(self, event: Any) -> None:
+        """Publish a change event, holding it back until commit inside a transaction."""
+        if self.in_transaction:
+            self._pending_events.append(event)
+        else:
+            self._publish_change(event)
+    
+    def _publish_change(self, event: Any) -> None:
+        """Publish a change event, noting it for the writer if another instance saves."""
+        if not self.is_writer and not self._following:
+            if isinstance(event, SlotAdded):
+                op = {"op": "add", "slot": event.slot.to_dict()}
+            elif isinstance(event, SlotEdited):
+                op = {"op": "edit", "id": event.previous_id, "slot": event.slot.to_dict()}
+            else:
+                op = {"op": "delete", "id": event.slot.id}
+            with self._forward_lock:
+                self._forward_ops.append(op)
+        self.events.publish(event)
+    
+    @contextmanager
+    def transaction(self) -> Iterator['TimelineManager']:
+        """Batch several mutations into one validated, persisted change.
+        
+        Inside the block, add/edit/delete skip their individual overlap
+        checks, sorting and saving. On exit the touched slots are checked
+        against the final timeline once, the slots are sorted once and a
+        single save is requested. If any check fails or the block raises, every
+        mutation is undone. Nested transactions join the outer one.
+        
+        Yields:
+            This timeline manager
+            
+        Raises:
+            ValueError: If the batched changes leave overlapping slots
+        """
+        if self.in_transaction:
+            yield self
+            return
+        
+        self._undo_log = []
+        self._touched_slots = []
+        self._pending_events = []
+        try:
+            yield self
+            conflicts = self._transaction_conflicts()
+            if conflicts:
+                raise ValueError("; ".join(conflicts))
+        except BaseException:
+            for undo in reversed(self._undo_log):
+                undo()
+            self._sort_slots()
+            raise
+        finally:
+            self._undo_log = None
+            self._touched_slots = []
+            events, self._pending_events = self._pending_events, []
+        
+        self._sort_slots()
+        self.request_save()
+        for event in events:
+            self._publish_change(event)
+    
+    def _transaction_conflicts(self) -> List[str]:
+        """Find overlaps involving slots added or edited in the current transaction."""
+        index = self._get_interval_index()
+        seen = set()
+        conflicts = []
+        for slot in self._touched_slots:
+            if self._slots_by_id.get(slot.id) is not slot:
+                continue  # Deleted later in the same transaction
+            interval = slot_interval(slot)
+            if interval is None:
+                continue
+            for other in index.find_overlapping(interval[0], interval[1], exclude_id=slot.id):
+                pair = frozenset((slot.id, other.id))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                first, second = sorted((slot, other), key=lambda s: s.start_minute)
+                conflicts.append(f"Break slot at {first.start_time.strftime('%H:%M')} overlaps with "
+                                 f"break slot at {second.start_time.strftime('%H:%M')}")
+        return conflicts
+    
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> List[Any]:
+        """Apply a list of changes as a single transaction.
+        
+        Each change is a dictionary with an ``action`` of ``"add"``,
+        ``"edit"`` or ``"delete"`` plus the keyword arguments of the
+        matching ``*_break_slot`` method.
+        
+        Args:
+            changes: Changes to apply in order
+            
+        Returns:
+            Result of each change, in order
+            
+        Raises:
+            ValueError: If a change is invalid or the result has overlaps;
+                nothing is applied in that case
+        """
+        actions = {
+            "add": self.add_break_slot,
+            "edit": self.edit_break_slot,
+            "delete": self.delete_break_slot,
+        }
+        results = []
+        with self.transaction():
+            for change in changes:
+                change = dict(change)
+                action = change.pop("action", None)
+                if action not in actions:
+                    raise ValueError(f"Unknown timeline change action: {action}")
+                results.append(actions[action](**change))
+        return results
+    
     def add_break_slot(self, start_time: time, duration: int, message: str = "",
                        repeat_pattern: str = "daily", enabled: bool = True) -> BreakSlot:
         """Add a new break slot to the timeline.
@@ -186,15 +557,22 @@ class TimelineManager:
         Raises:
             ValueError: If break slot overlaps with existing slots
         """
-        new_slot = BreakSlot(start_time, duration, message, repeat_pattern, enabled)
+        new_slot = BreakSlot(start_time, duration, message, repeat_pattern, enabled,
+                             table=self.slot_table)
         
-        # Check for overlaps
-        if self._has_overlap(new_slot):
+        # Check for overlaps; inside a transaction this waits for the commit
+        if not self.in_transaction and self._has_overlap(new_slot):
+            self.slot_table.release_row(new_slot._row)
             raise ValueError(f"Break slot at {start_time.strftime('%H:%M')} overlaps with existing slots")
         
-        self.break_slots.append(new_slot)
-        self._sort_slots()
-        self.save_timeline()
+        self._insert_slot(new_slot)
+        if self.in_transaction:
+            self._touched_slots.append(new_slot)
+            self._undo_log.append(lambda: self._remove_slot(new_slot))
+        else:
+            self._sort_slots()
+            self._save_slot_change(new_slot)
+        self._emit(SlotAdded(new_slot))
         
         logger.info(f"Added break slot: {start_time.strftime('%H:%M')} ({duration}min)")
         return new_slot
@@ -232,27 +610,41 @@ class TimelineManager:
         )
         
         # Check for overlaps (excluding the current slot)
-        if self._has_overlap(temp_slot, exclude_id=slot_id):
+        if not self.in_transaction and self._has_overlap(temp_slot, exclude_id=slot_id):
             raise ValueError(f"Break slot at {temp_slot.start_time.strftime('%H:%M')} overlaps with existing slots")
         
-        # Update slot
-        if start_time is not None:
-            slot.start_time = start_time
-        if duration is not None:
-            slot.duration = duration
-        if message is not None:
-            slot.message = message
-        if repeat_pattern is not None:
-            slot.repeat_pattern = repeat_pattern
-        if enabled is not None:
-            slot.enabled = enabled
+        previous = (slot.id, slot.start_time, slot.duration, slot.message,
+                    slot.repeat_pattern, slot.enabled)
         
-        # Regenerate ID if start time changed
-        if start_time is not None:
-            slot.id = slot._generate_id()
-        
-        self._sort_slots()
-        self.save_timeline()
+        # Update slot, re-indexing it under its new interval
+        with self._slots_lock:
+            self._unindex_slot(slot)
+            if start_time is not None:
+                slot.start_time = start_time
+            if duration is not None:
+                slot.duration = duration
+            if message is not None:
+                slot.message = message
+            if repeat_pattern is not None:
+                slot.repeat_pattern = repeat_pattern
+            if enabled is not None:
+                slot.enabled = enabled
+            
+            # Regenerate ID if start time changed
+            if start_time is not None:
+                del self._slots_by_id[slot.id]
+                slot.id = slot._generate_id()
+                self._register_slot(slot)
+            
+            self._index_slot(slot)
+            self._occurrence_queue.invalidate()
+        if self.in_transaction:
+            self._touched_slots.append(slot)
+            self._undo_log.append(lambda: self._restore_slot(slot, *previous))
+        else:
+            self._sort_slots()
+            self._save_slot_change(slot, previous_id=previous[0])
+        self._emit(SlotEdited(slot, previous[0]))
         
         logger.info(f"Updated break slot: {slot.start_time.strftime('%H:%M')} ({slot.duration}min)")
         return slot
@@ -266,14 +658,18 @@ class TimelineManager:
         Returns:
             True if slot was deleted, False if not found
         """
-        for i, slot in enumerate(self.break_slots):
-            if slot.id == slot_id:
-                deleted_slot = self.break_slots.pop(i)
-                self.save_timeline()
-                logger.info(f"Deleted break slot: {deleted_slot.start_time.strftime('%H:%M')}")
-                return True
+        slot = self.get_break_slot(slot_id)
+        if slot is None:
+            return False
         
-        return False
+        self._remove_slot(slot)
+        if self.in_transaction:
+            self._undo_log.append(lambda: self._insert_slot(slot))
+        else:
+            self._save_slot_change(deleted_id=slot.id)
+        self._emit(SlotDeleted(slot))
+        logger.info(f"Deleted break slot: {slot.start_time.strftime('%H:%M')}")
+        return True
     
     def get_break_slot(self, slot_id: str) -> Optional[BreakSlot]:
         """Get a break slot by ID.
@@ -284,10 +680,8 @@ class TimelineManager:
         Returns:
             Break slot or None if not found
         """
-        for slot in self.break_slots:
-            if slot.id == slot_id:
-                return slot
-        return None
+        self._ensure_indexes()
+        return self._slots_by_id.get(slot_id)
     
     def get_all_break_slots(self) -> List[BreakSlot]:
         """Get all break slots.
@@ -295,6 +689,7 @@ class TimelineManager:
         Returns:
             List of all break slots
         """
+        self._ensure_indexes()
         return self.break_slots.copy()
     
     def get_active_break_slots(self, current_datetime: datetime) -> List[BreakSlot]:
@@ -308,43 +703,101 @@ class TimelineManager:
         """
         return [slot for slot in self.break_slots if slot.is_active_today(current_datetime)]
     
+    def get_break_slots_between(self, start_time: time, end_time: time,
+                                weekdays: Optional[Iterable[int]] = None) -> List[BreakSlot]:
+        """Get enabled break slots overlapping a time range.
+        
+        Answered in SQL when the timeline is stored in SQLite.
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range (exclusive)
+            weekdays: Days to search, Monday being 0; every day if omitted
+            
+        Returns:
+            Matching break slots ordered by start time
+        """
+        start = start_time.hour * 60 + start_time.minute
+        end = end_time.hour * 60 + end_time.minute
+        store = self.store
+        if hasattr(store, "query_range"):
+            self.flush()
+            self._ensure_indexes()
+            slots = (self._slots_by_id.get(slot_id) for slot_id in store.query_range(start, end, weekdays))
+            return [slot for slot in slots if slot is not None]
+        
+        days_mask = 0b1111111 if weekdays is None else sum(1 << day for day in set(weekdays))
+        matches = []
+        for slot in self.break_slots:
+            interval = slot_interval(slot)
+            if (slot.enabled and interval is not None and interval[0] < end and interval[1] > start
+                    and PATTERN_DAY_MASKS.get(slot.repeat_pattern, 0) & days_mask):
+                matches.append(slot)
+        return matches
+    
+    def get_change_history(self) -> List[Dict[str, Any]]:
+        """Get the journaled slot changes, oldest first.
+        
+        Only the journal backend records history; other stores return an
+        empty list.
+        
+        Returns:
+            List of journal entries with time, op, id and slot
+        """
+        store = self.store
+        if not hasattr(store, "history"):
+            return []
+        return list(store.history())
+    
     def get_next_break(self, current_datetime: datetime) -> Optional[Tuple[BreakSlot, datetime]]:
         """Get the next break slot and its occurrence time.
         
+        Backed by an occurrence queue that is only rebuilt when the timeline
+        changes, so repeated calls cost a heap peek.
+        
         Args:
             current_datetime: Current date and time
             
         Returns:
             Tuple of (break_slot, occurrence_datetime) or None if no upcoming breaks
         """
-        active_slots = self.get_active_break_slots(current_datetime)
-        
-        next_break = None
-        next_occurrence = None
-        
-        for slot in active_slots:
-            # First try to get next occurrence today
-            occurrence = slot.get_next_occurrence(current_datetime)
-            if occurrence:
-                if next_occurrence is None or occurrence < next_occurrence:
-                    next_break = slot
-                    next_occurrence = occurrence
-                continue
+        queue = self.get_occurrence_queue(current_datetime)
+        with queue.lock:
+            queue.advance(current_datetime)
+            return queue.peek()
+    
+    def iter_occurrences(self, start: datetime, end: datetime) -> Iterator[Tuple[BreakSlot, datetime]]:
+        """Lazily walk every break occurrence in a date range.
+        
+        Per-slot recurrences are merged on a heap as they are consumed, so
+        week and month views can scan long ranges in constant memory.
+        
+        Args:
+            start: First moment of the range (inclusive)
+            end: Last moment of the range (exclusive)
             
-            # If no occurrence today, try tomorrow
-            occurrence = slot.get_next_occurrence_tomorrow(current_datetime)
-            try:
-                if occurrence and (next_occurrence is None or occurrence < next_occurrence):
-                    next_break = slot
-                    next_occurrence = occurrence
-            except (TypeError, ValueError):
-                # If there's a type error, skip this occurrence
-                continue
+        Returns:
+            Iterator of (break_slot, occurrence_datetime) tuples in chronological order
+        """
+        return iter_occurrences(list(self.break_slots), start, end)
+    
+    def get_occurrence_queue(self, current_datetime: datetime) -> OccurrenceQueue:
+        """Get the queue of upcoming occurrences, rebuilt for the given moment if stale.
         
-        if next_break and next_occurrence:
-            return (next_break, next_occurrence)
+        Called from the scheduler thread; the rebuild holds the same lock as
+        every change to the slot list, so it never sees one half done.
         
-        return None
+        Args:
+            current_datetime: Current date and time
+            
+        Returns:
+            Occurrence queue holding each enabled slot's next occurrence
+        """
+        queue = self._occurrence_queue
+        with queue.lock:
+            if queue.size != len(self._break_slots) or queue.needs_rebuild(current_datetime):
+                queue.rebuild(self._break_slots, current_datetime)
+        return queue
     
     def _has_overlap(self, new_slot: BreakSlot, exclude_id: Optional[str] = None) -> bool:
         """Check if a break slot overlaps with existing slots.
@@ -356,81 +809,268 @@ class TimelineManager:
         Returns:
             True if overlap detected
         """
-        try:
-            new_start = new_slot.start_time
-            new_duration = int(new_slot.duration)
-            new_end = self._add_minutes_to_time(new_start, new_duration)
-            
-            for slot in self.break_slots:
-                if exclude_id and slot.id == exclude_id:
-                    continue
-                
-                if not slot.enabled:
-                    continue
-                
-                slot_start = slot.start_time
-                slot_duration = int(slot.duration)
-                slot_end = self._add_minutes_to_time(slot_start, slot_duration)
-                
-                # Check for overlap
-                if (new_start < slot_end and new_end > slot_start):
-                    return True
-            
-            return False
-        except (ValueError, TypeError):
-            # If there's a type error, assume no overlap to avoid crashes
+        interval = slot_interval(new_slot)
+        if interval is None:
+            # If the duration is invalid, assume no overlap to avoid crashes
             return False
+        return self._get_interval_index().overlaps(interval[0], interval[1], exclude_id)
     
-    def _add_minutes_to_time(self, time_obj: time, minutes: int) -> time:
-        """Add minutes to a time object.
+    def find_overlapping_pairs(self) -> List[Tuple[BreakSlot, BreakSlot]]:
+        """Find every pair of conflicting break slots.
+        
+        Enabled slots are compared with each other in a single sweep; disabled
+        slots are checked against the enabled ones so they can be re-enabled
+        safely.
         
-        Args:
-            time_obj: Time object
-            minutes: Minutes to add
-            
         Returns:
-            New time object
+            List of (earlier_slot, later_slot) tuples
         """
-        try:
-            minutes_int = int(minutes)
-            datetime_obj = datetime.combine(datetime.today().date(), time_obj)
-            new_datetime = datetime_obj + timedelta(minutes=minutes_int)
-            return new_datetime.time()
-        except (ValueError, TypeError):
-            # If minutes is invalid, return original time
-            return time_obj
+        index = self._get_interval_index()
+        pairs = index.conflicting_pairs()
+        for slot in self.break_slots:
+            if slot.enabled:
+                continue
+            interval = slot_interval(slot)
+            if interval is None:
+                continue
+            for other in index.find_overlapping(interval[0], interval[1]):
+                pairs.append((other, slot) if other.start_time <= slot.start_time else (slot, other))
+        return pairs
     
     def _sort_slots(self) -> None:
         """Sort break slots by start time."""
-        self.break_slots.sort(key=lambda slot: slot.start_time)
+        with self._slots_lock:  # The list reads as empty while it is being sorted
+            self._break_slots.sort(key=lambda slot: slot.start_time)
     
     def load_timeline(self) -> None:
         """Load timeline from file."""
+        self.flush()  # Don't read back a file with unsaved changes pending
         self.break_slots = [] # Clear existing slots
         try:
-            with open(self.timeline_file, 'r') as f:
-                data = json.load(f)
-                self.break_slots = [BreakSlot.from_dict(slot_data) for slot_data in data.get("break_slots", [])]
-                self._sort_slots()
-                logger.info(f"Loaded {len(self.break_slots)} break slots from timeline")
+            store = self.store
+            self._file_signature = self._store_signature()
+            records = store.load()
+            table = SlotTable()
+            slots = [BreakSlot.from_dict(slot_data, table) for slot_data in records]
+            self.slot_table = table
+            self.break_slots = slots
+            if (store.incremental and self.is_writer
+                    and [slot.id for slot in slots] != [r.get("id") for r in records]):
+                # IDs are regenerated on load; rekey the rows so single-row updates find them
+                store.save_all([slot.to_dict() for slot in slots])
+            self._sort_slots()
+            logger.info(f"Loaded {len(self.break_slots)} break slots from timeline")
         except FileNotFoundError:
             logger.info("No timeline file found, starting with empty timeline")
         except Exception as e:
             logger.error(f"Error loading timeline: {e}")
             self.break_slots = []
+        self.events.publish(TimelineReloaded(len(self.break_slots)))
+    
+    def reload_timeline(self) -> List[Any]:
+        """Pick up changes another program made to the timeline file.
+        
+        Unlike ``load_timeline`` this keeps the existing slot objects: the
+        file is diffed against memory by slot ID, only added, edited and
+        deleted slots are touched, and each gets its own change event.
+        Nothing is read if the file is still the version this manager last
+        loaded or saved, and a missing file leaves the timeline alone.
+        
+        Returns:
+            Published change events, empty if nothing changed
+        """
+        store = self.store
+        signature = self._store_signature()
+        if signature is None or signature == self._file_signature:
+            return []
+        try:
+            records = store.load()
+        except Exception as e:
+            logger.error(f"Error reloading timeline: {e}")
+            return []
+        self._file_signature = signature
+        
+        table = SlotTable()
+        incoming: Dict[str, BreakSlot] = {}
+        for record in records:
+            slot = BreakSlot.from_dict(record, table)
+            base_id = slot.id
+            suffix = 2
+            while slot.id in incoming:
+                slot.id = f"{base_id}-{suffix}"
+                suffix += 1
+            incoming[slot.id] = slot
+        
+        self._ensure_indexes()
+        events: List[Any] = []
+        for slot_id, slot in list(self._slots_by_id.items()):
+            if slot_id not in incoming:
+                self._remove_slot(slot)
+                events.append(SlotDeleted(slot))
+        for slot_id, new_slot in incoming.items():
+            slot = self._slots_by_id.get(slot_id)
+            if slot is None:
+                self._insert_slot(new_slot)
+                events.append(SlotAdded(new_slot))
+            elif slot.to_dict() != new_slot.to_dict():
+                self._restore_slot(slot, slot_id, new_slot.start_time, new_slot.duration,
+                                   new_slot.message, new_slot.repeat_pattern, new_slot.enabled)
+                events.append(SlotEdited(slot, slot_id))
+        if (store.incremental and self.is_writer
+                and list(incoming) != [record.get("id") for record in records]):
+            store.save_all([slot.to_dict() for slot in incoming.values()])
+        if not events:
+            return []
+        
+        self._sort_slots()
+        logger.info(f"Reloaded timeline from disk: {len(events)} slot changes")
+        self._following = True  # These changes are already on disk
+        try:
+            for event in events:
+                self._emit(event)
+        finally:
+            self._following = False
+        return events
     
     def save_timeline(self) -> None:
-        """Save timeline to file."""
+        """Save timeline to file now, replacing it atomically."""
+        self._writer.write_now()
+    
+    def request_save(self) -> None:
+        """Save timeline to file from the background writer after a short quiet period."""
+        self._writer.request()
+    
+    def flush(self) -> None:
+        """Write any pending timeline changes now."""
+        self._writer.flush()
+    
+    def _write_timeline(self) -> None:
+        """Write the current slots to the timeline file, or forward the changes to the writer."""
+        if not self.is_writer:
+            self._forward_changes()
+            return
         try:
-            data = {
-                "break_slots": [slot.to_dict() for slot in self.break_slots]
-            }
-            with open(self.timeline_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"Saved {len(self.break_slots)} break slots to timeline")
+            records = [slot.to_dict() for slot in list(self.break_slots)]
+            self.store.save_all(records)
+            self._file_signature = self._store_signature()
+            logger.info(f"Saved {len(records)} break slots to timeline")
         except Exception as e:
             logger.error(f"Error saving timeline: {e}")
     
+    def _save_slot_change(self, slot: Optional[BreakSlot] = None, previous_id: Optional[str] = None,
+                          deleted_id: Optional[str] = None) -> None:
+        """Persist a single slot change.
+        
+        Stores with per-slot updates get one row written right away; the
+        JSON file is rewritten by the background writer instead.
+        
+        Args:
+            slot: Added or edited slot
+            previous_id: ID the edited slot was saved under
+            deleted_id: ID of a deleted slot
+        """
+        store = self.store
+        if not store.incremental or not self.is_writer:
+            self.request_save()
+            return
+        try:
+            if deleted_id is not None:
+                store.delete(deleted_id)
+            if slot is not None:
+                store.upsert(slot.to_dict(), previous_id)
+            self._file_signature = self._store_signature()
+        except Exception as e:
+            logger.error(f"Error saving break slot: {e}")
+    
+    def _store_signature(self):
+        """Identify the stored timeline's version, including a journal beside it.
+        
+        Returns:
+            Comparable signature, or None if nothing is stored yet
+        """
+        store = self.store
+        signature = file_signature(store.path)
+        journal_path = getattr(store, "journal_path", None)
+        if journal_path is None:
+            return signature
+        journal_signature = file_signature(journal_path)
+        if signature is None and journal_signature is None:
+            return None
+        return signature, journal_signature
+    
+    def _forward_changes(self) -> None:
+        """Queue the changes made here for the instance that writes the file."""
+        with self._forward_lock:
+            ops, self._forward_ops = self._forward_ops, []
+        if not ops:
+            return
+        pid = os.getpid()
+        try:
+            self.spool.append([dict(op, pid=pid) for op in ops])
+            logger.info(f"Forwarded {len(ops)} timeline changes to the writing instance")
+        except Exception as e:
+            logger.error(f"Error forwarding timeline changes: {e}")
+            with self._forward_lock:
+                self._forward_ops[:0] = ops
+    
+    def apply_forwarded_changes(self) -> int:
+        """Apply and save the slot changes other instances forwarded.
+        
+        Only the writing instance takes changes off the queue. Changes are
+        applied like the user's own edits and are idempotent, so one that
+        is already in the timeline, including one this instance forwarded
+        before it became the writer, is skipped; one that no longer fits,
+        e.g. because it now overlaps, is logged and dropped.
+        
+        Returns:
+            Number of changes applied
+        """
+        if not self.is_writer:
+            return 0
+        try:
+            entries = self.spool.drain()
+        except Exception as e:
+            logger.error(f"Error reading forwarded timeline changes: {e}")
+            return 0
+        applied = 0
+        for entry in entries:
+            try:
+                if self._apply_forwarded(entry):
+                    applied += 1
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Dropping forwarded timeline change {entry.get('op')}: {e}")
+        if applied:
+            logger.info(f"Applied {applied} timeline changes from other instances")
+        return applied
+    
+    def _apply_forwarded(self, entry: Dict[str, Any]) -> bool:
+        """Apply one forwarded change; returns whether anything changed."""
+        if entry["op"] == "delete":
+            return self.delete_break_slot(entry["id"])
+        incoming = BreakSlot.from_dict(entry["slot"])
+        fields = (incoming.start_time, incoming.duration, incoming.message,
+                  incoming.repeat_pattern, incoming.enabled)
+        slot = self.get_break_slot(entry["id"]) if entry["op"] == "edit" else None
+        if slot is None:
+            slot = self.get_break_slot(incoming.id)
+        if slot is None:
+            self.add_break_slot(*fields)
+            return True
+        if (slot.start_time, slot.duration, slot.message, slot.repeat_pattern, slot.enabled) == fields:
+            return False
+        start_time = incoming.start_time if incoming.start_time != slot.start_time else None
+        self.edit_break_slot(slot.id, start_time, incoming.duration, incoming.message,
+                             incoming.repeat_pattern, incoming.enabled)
+        return True
+    
+    def on_elected(self) -> None:
+        """Take over saving the timeline after the previous writer exited."""
+        self.apply_forwarded_changes()
+        with self._forward_lock:
+            pending, self._forward_ops = self._forward_ops, []
+        if pending:
+            self.request_save()  # Changes made here that were never forwarded
+    
     def validate_timeline(self) -> List[str]:
         """Validate the timeline and return any issues.
         
@@ -440,20 +1080,16 @@ class TimelineManager:
         errors = []
         
         # Check for overlapping slots
-        for i, slot1 in enumerate(self.break_slots):
-            if self._has_overlap(slot1, exclude_id=slot1.id):
-                errors.append(f"Break slot at {slot1.start_time.strftime('%H:%M')} overlaps with another slot")
+        for slot1, slot2 in self.find_overlapping_pairs():
+            errors.append(f"Break slot at {slot1.start_time.strftime('%H:%M')} overlaps with "
+                          f"break slot at {slot2.start_time.strftime('%H:%M')}")
         
-        # Check for invalid durations
+        # Check for invalid durations; slots only ever hold integer ones
         for slot in self.break_slots:
-            try:
-                duration = int(slot.duration)
-                if duration <= 0:
-                    errors.append(f"Break slot at {slot.start_time.strftime('%H:%M')} has invalid duration: {slot.duration}")
-                elif duration > 120:
-                    errors.append(f"Break slot at {slot.start_time.strftime('%H:%M')} has duration too long: {slot.duration} minutes")
-            except (ValueError, TypeError):
-                errors.append(f"Break slot at {slot.start_time.strftime('%H:%M')} has invalid duration type: {slot.duration}")
+            if slot.duration <= 0:
+                errors.append(f"Break slot at {slot.start_time.strftime('%H:%M')} has invalid duration: {slot.duration}")
+            elif slot.duration > 120:
+                errors.append(f"Break slot at {slot.start_time.strftime('%H:%M')} has duration too long: {slot.duration} minutes")
         
         # Check for invalid repeat patterns
         valid_patterns = ["daily", "weekdays", "weekends", "once"]
@@ -0,0 +1,517 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from src.models.clock import Clock, real_clock
+from src.models.coordination import file_lock
+from src.models.persistence import atomic_write
+from src.models.serialization import detect_codec, get_codec
+from src.models.week_occupancy import PATTERN_DAY_MASKS
+
+logger = logging.getLogger(__name__)
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+JOURNAL_SUFFIX = ".journal"
+# Journal size that triggers folding it into the snapshot
+COMPACT_THRESHOLD = 256 * 1024
+# Compacted journals kept for auditing, as .journal.1 (newest) to .journal.N
+JOURNAL_GENERATIONS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS break_slots (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT NOT NULL,
+    start_minute INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    pattern TEXT NOT NULL DEFAULT 'daily',
+    enabled INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_break_slots_start_minute ON break_slots (start_minute);
+CREATE INDEX IF NOT EXISTS idx_break_slots_pattern ON break_slots (pattern);
+CREATE INDEX IF NOT EXISTS idx_break_slots_enabled ON break_slots (enabled);
+CREATE TABLE IF NOT EXISTS slot_occurrences (
+    slot_id TEXT NOT NULL REFERENCES break_slots (id) ON DELETE CASCADE ON UPDATE CASCADE,
+    weekday INTEGER NOT NULL,
+    start_minute INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL,
+    PRIMARY KEY (slot_id, weekday)
+);
+CREATE INDEX IF NOT EXISTS idx_slot_occurrences_day_start ON slot_occurrences (weekday, start_minute);
+"""
+
+
+def _start_minute(start_time: str) -> int:
+    hours, minutes = start_time.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _record_id(record: Dict[str, Any]) -> str:
+    """Get a record's ID, generating the usual one for records without."""
+    slot_id = record.get("id")
+    if slot_id:
+        return slot_id
+    return f"{record['start_time'].replace(':', '')[:4]}_{record['duration']}_{record.get('repeat_pattern', 'daily')}"
+
+
+def _with_unique_ids(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield records with IDs made unique by numeric suffixes, as the manager does.
+
+    Files written before IDs were unique can repeat one or have none.
+    """
+    seen = set()
+    for record in records:
+        slot_id = base_id = _record_id(record)
+        suffix = 2
+        while slot_id in seen:
+            slot_id = f"{base_id}-{suffix}"
+            suffix += 1
+        seen.add(slot_id)
+        yield record if record.get("id") == slot_id else dict(record, id=slot_id)
+
+
+class JsonTimelineStore:
+    """Timeline storage as a single document, rewritten on every save.
+
+    The document is JSON by default but may use any registered codec; the
+    format is detected on load and kept on save unless a codec is given.
+    """
+
+    incremental = False
+
+    def __init__(self, path, codec: Optional[str] = None) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Path of the timeline file
+            codec: Name of the codec to save with, the file's current
+                format if omitted
+        """
+        self.path = path
+        self.codec = get_codec(codec) if codec else None
+        self._detected = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Read every slot record.
+
+        Returns:
+            List of slot dictionaries in stored order
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        with file_lock(self.path, exclusive=False), open(self.path, 'rb') as f:
+            raw = f.read()
+        self._detected = detect_codec(raw, self.codec)
+        data = self._detected.loads(raw)
+        return data.get("break_slots", [])
+
+    def save_all(self, records: List[Dict[str, Any]]) -> None:
+        """Replace the stored timeline.
+
+        Args:
+            records: Slot dictionaries to store
+        """
+        codec = self.codec or self._detected or get_codec()
+        data = codec.dumps({"break_slots": records})
+        with file_lock(self.path):
+            atomic_write(self.path, data)
+
+    def close(self) -> None:
+        """Release resources; nothing to do for JSON files."""
+
+
+class SqliteTimelineStore:
+    """Timeline storage in SQLite with per-slot updates and indexed queries.
+
+    Slots live in ``break_slots``, indexed by start minute, pattern and
+    enabled flag. Each enabled slot is also expanded into one
+    ``slot_occurrences`` row per active weekday, so questions such as
+    "breaks between 13:00 and 15:00 on weekdays" are answered by an index
+    range scan. Times use the same linear-day convention as the interval
+    index: a slot running past midnight ends after minute 1440 of its own
+    day.
+    """
+
+    incremental = True
+
+    def __init__(self, path) -> None:
+        """Open or create the database.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # The background writer saves from its own thread; the lock serializes access
+        self._connection = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Read every slot record.
+
+        Returns:
+            List of slot dictionaries ordered by position
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, start_time, duration, message, pattern, enabled "
+                "FROM break_slots ORDER BY position, start_minute").fetchall()
+        return [self._record(row) for row in rows]
+
+    def save_all(self, records: List[Dict[str, Any]]) -> None:
+        """Replace the stored timeline in one transaction.
+
+        Args:
+            records: Slot dictionaries to store
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM break_slots")
+            for position, record in enumerate(_with_unique_ids(records)):
+                self._upsert(record, position)
+
+    def upsert(self, record: Dict[str, Any], previous_id: Optional[str] = None) -> None:
+        """Insert or update a single slot.
+
+        Args:
+            record: Slot dictionary
+            previous_id: ID the slot was stored under, if it changed
+        """
+        with self._lock, self._connection:
+            if previous_id is not None and previous_id != record["id"]:
+                self._connection.execute("DELETE FROM break_slots WHERE id = ?", (previous_id,))
+            self._upsert(record)
+
+    def delete(self, slot_id: str) -> None:
+        """Delete a single slot.
+
+        Args:
+            slot_id: ID of the slot
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM break_slots WHERE id = ?", (slot_id,))
+
+    def query_range(self, start_minute: int, end_minute: int,
+                    weekdays: Optional[Iterable[int]] = None) -> List[str]:
+        """Find enabled slots overlapping a time range.
+
+        Args:
+            start_minute: Start of the range in minutes after midnight
+            end_minute: End of the range (exclusive)
+            weekdays: Days to search, Monday being 0; every day if omitted
+
+        Returns:
+            IDs of the matching slots ordered by start time
+        """
+        days = sorted(set(weekdays)) if weekdays is not None else list(range(7))
+        if not days:
+            return []
+        placeholders = ", ".join("?" for _ in days)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT o.slot_id FROM slot_occurrences o "
+                "JOIN break_slots s ON s.id = o.slot_id "
+                f"WHERE o.weekday IN ({placeholders}) AND o.start_minute < ? AND o.end_minute > ? "
+                "GROUP BY o.slot_id ORDER BY MIN(o.start_minute), s.position",
+                (*days, end_minute, start_minute)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _upsert(self, record: Dict[str, Any], position: Optional[int] = None) -> None:
+        start_minute = _start_minute(record["start_time"])
+        if position is None:
+            position = self._connection.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM break_slots").fetchone()[0]
+        self._connection.execute(
+            "INSERT INTO break_slots (id, position, start_time, start_minute, duration, message, pattern, enabled) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET start_time = excluded.start_time, "
+            "start_minute = excluded.start_minute, duration = excluded.duration, "
+            "message = excluded.message, pattern = excluded.pattern, enabled = excluded.enabled",
+            (record["id"], position, record["start_time"], start_minute, int(record["duration"]),
+             record.get("message", ""), record.get("repeat_pattern", "daily"),
+             1 if record.get("enabled", True) else 0))
+        self._connection.execute("DELETE FROM slot_occurrences WHERE slot_id = ?", (record["id"],))
+        if record.get("enabled", True):
+            mask = PATTERN_DAY_MASKS.get(record.get("repeat_pattern", "daily"), 0)
+            end_minute = start_minute + int(record["duration"])
+            self._connection.executemany(
+                "INSERT INTO slot_occurrences (slot_id, weekday, start_minute, end_minute) VALUES (?, ?, ?, ?)",
+                [(record["id"], day, start_minute, end_minute) for day in range(7) if mask >> day & 1])
+
+    @staticmethod
+    def _record(row) -> Dict[str, Any]:
+        slot_id, start_time, duration, message, pattern, enabled = row
+        return {
+            "id": slot_id,
+            "start_time": start_time,
+            "duration": duration,
+            "message": message,
+            "repeat_pattern": pattern,
+            "enabled": bool(enabled)
+        }
+
+
+class JournalTimelineStore:
+    """Timeline storage as a JSON snapshot plus an append-only change journal.
+
+    Each change appends one JSON line to ``<snapshot>.journal`` and fsyncs
+    it, so an edit costs one small write whatever the timeline size. Loading
+    reads the snapshot, which has the same format as ``timeline.json``, and
+    replays the journal over it. Once the journal passes
+    ``COMPACT_THRESHOLD`` bytes a background thread folds it into a new
+    snapshot; the last ``JOURNAL_GENERATIONS`` journals are kept as
+    ``.journal.1`` (newest) onwards for auditing.
+    Replaying is idempotent, so a crash at any point loses at most the line
+    being written. Loads, appends and compaction hold ``file_lock`` on the
+    snapshot, so another instance never replays a journal being rotated.
+    """
+
+    incremental = True
+
+    def __init__(self, path, compact_threshold: int = COMPACT_THRESHOLD,
+                 codec: Optional[str] = None, generations: int = JOURNAL_GENERATIONS,
+                 clock: Optional[Clock] = None) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Path of the snapshot
+            compact_threshold: Journal size in bytes that triggers compaction
+            codec: Name of the codec for the snapshot, its current format
+                if omitted
+            generations: Number of compacted journals to keep
+            clock: Clock that dates journal entries, the system clock if omitted
+        """
+        self.path = path
+        self.clock = clock if clock is not None else real_clock
+        self.journal_path = os.fspath(path) + JOURNAL_SUFFIX
+        self.compact_threshold = compact_threshold
+        self.generations = generations
+        self._snapshot = JsonTimelineStore(path, codec)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._journal = None
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Read the snapshot and replay the journal over it.
+
+        Returns:
+            List of slot dictionaries
+        """
+        with self._lock, file_lock(self.path, exclusive=False):
+            try:
+                records = self._snapshot.load()
+            except FileNotFoundError:
+                records = []
+            self._records = {record["id"]: record for record in _with_unique_ids(records)}
+            for entry in self._read_journal(self.journal_path, repair=True):
+                self._apply(entry)
+            return list(self._records.values())
+
+    def save_all(self, records: List[Dict[str, Any]]) -> None:
+        """Journal the differences between the stored timeline and new records.
+
+        Args:
+            records: Slot dictionaries to store
+        """
+        with self._lock:
+            new_ids = {record["id"] for record in records}
+            for slot_id in [slot_id for slot_id in self._records if slot_id not in new_ids]:
+                self.delete(slot_id)
+            for record in records:
+                if self._records.get(record["id"]) != record:
+                    self.upsert(record)
+
+    def upsert(self, record: Dict[str, Any], previous_id: Optional[str] = None) -> None:
+        """Journal an added or edited slot.
+
+        Args:
+            record: Slot dictionary
+            previous_id: ID the slot was stored under, if it changed
+        """
+        with self._lock:
+            key = previous_id if previous_id is not None else record["id"]
+            entry = {"op": "edit" if key in self._records else "add", "id": record["id"], "slot": record}
+            if previous_id is not None and previous_id != record["id"]:
+                entry["previous_id"] = previous_id
+            self._append(entry)
+
+    def delete(self, slot_id: str) -> None:
+        """Journal a deleted slot.
+
+        Args:
+            slot_id: ID of the slot
+        """
+        self._append({"op": "delete", "id": slot_id})
+
+    def history(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over journaled changes, oldest first.
+
+        Covers the kept journal generations and the live journal.
+
+        Yields:
+            Entries with ``time``, ``op`` (add, edit or delete), ``id`` and,
+            for additions and edits, the full ``slot``
+        """
+        with self._lock:
+            if self._journal is not None:
+                self._journal.flush()
+        for generation in range(self.generations, 0, -1):
+            yield from self._read_journal(f"{self.journal_path}.{generation}")
+        yield from self._read_journal(self.journal_path)
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot."""
+        with self._lock, file_lock(self.path):
+            self._snapshot.save_all(list(self._records.values()))
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                for generation in range(self.generations - 1, 0, -1):
+                    older = f"{self.journal_path}.{generation}"
+                    if os.path.exists(older):
+                        os.replace(older, f"{self.journal_path}.{generation + 1}")
+                if self.generations > 0:
+                    os.replace(self.journal_path, self.journal_path + ".1")
+                else:
+                    os.remove(self.journal_path)
+        logger.info(f"Compacted timeline journal into {self.path}")
+
+    def close(self) -> None:
+        """Wait for a running compaction and close the journal."""
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        entry = dict(time=self.clock.now().isoformat(timespec="seconds"), **entry)
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with file_lock(self.path):
+                if self._journal is None:
+                    self._journal = open(self.journal_path, "a", encoding="utf-8")
+                self._journal.write(line)
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self._apply(entry)
+            if self._journal.tell() >= self.compact_threshold and self._compactor is None:
+                self._compactor = threading.Thread(target=self._run_compaction,
+                                                   name="JournalCompactor", daemon=True)
+                self._compactor.start()
+
+    def _run_compaction(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error compacting timeline journal: {e}")
+        finally:
+            self._compactor = None
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        previous_id = entry.get("previous_id")
+        if previous_id is not None:
+            self._records.pop(previous_id, None)
+        if entry["op"] == "delete":
+            self._records.pop(entry["id"], None)
+        else:
+            self._records[entry["id"]] = entry["slot"]
+
+    @staticmethod
+    def _read_journal(path: str, repair: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield the entries of a journal file.
+
+        A torn last line left by a crash ends the replay; with ``repair``
+        it is cut off so new entries are not appended to it.
+        """
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for raw in f:
+                try:
+                    if not raw.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(raw)
+                except ValueError:
+                    logger.warning(f"Ignoring damaged timeline journal tail in {path} at byte {offset}")
+                    if repair:
+                        with open(path, "r+b") as damaged:
+                            damaged.truncate(offset)
+                    return
+                offset += len(raw)
+                yield entry
+
+
+def open_timeline_store(path, backend: Optional[str] = None, codec: Optional[str] = None,
+                        clock: Optional[Clock] = None):
+    """Open the storage backend for a timeline file.
+
+    SQLite is used for ``.db``/``.sqlite``/``.sqlite3`` paths or when the
+    backend is ``"sqlite"``. In the latter case a ``.json`` path is swapped
+    for a ``.db`` one next to it, and an existing JSON timeline there is
+    migrated on first use. The journal backend keeps using the JSON file
+    as its snapshot, and is also picked when a journal already exists
+    beside it so that journaled edits are never ignored.
+
+    Args:
+        path: Timeline file path
+        backend: ``"json"``, ``"sqlite"``, ``"journal"`` or None to decide
+            by extension
+        codec: Codec for JSON files and journal snapshots, see
+            ``src.models.serialization``
+        clock: Clock that dates journal entries, the system clock if omitted
+
+    Returns:
+        ``JsonTimelineStore``, ``SqliteTimelineStore`` or ``JournalTimelineStore``
+    """
+    root, extension = os.path.splitext(os.fspath(path))
+    if backend == "sqlite" and extension.lower() not in SQLITE_EXTENSIONS:
+        db_path = root + ".db"
+        if not os.path.exists(db_path) and os.path.exists(path):
+            migrate_json_to_sqlite(path, db_path)
+        return SqliteTimelineStore(db_path)
+    if backend != "json" and extension.lower() in SQLITE_EXTENSIONS:
+        return SqliteTimelineStore(path)
+    if backend == "journal" or os.path.exists(os.fspath(path) + JOURNAL_SUFFIX):
+        return JournalTimelineStore(path, codec=codec, clock=clock)
+    return JsonTimelineStore(path, codec)
+
+
+def migrate_json_to_sqlite(json_path, db_path) -> int:
+    """Copy a JSON timeline into a SQLite database.
+
+    Args:
+        json_path: Existing ``timeline.json``
+        db_path: Database to create or overwrite
+
+    Returns:
+        Number of slots migrated
+    """
+    records = JsonTimelineStore(json_path).load()
+    store = SqliteTimelineStore(db_path)
+    try:
+        store.save_all(records)
+    finally:
+        store.close()
+    logger.info(f"Migrated {len(records)} break slots from {json_path} to {db_path}")
+    return len(records)
@@ -1,18 +1,711 @@
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+import heapq
+import itertools
+import logging
+import math
+import threading
+
+from src.models.clock import Clock, real_clock
+from src.models.events import Dispatcher, EventBus, SessionChanged
+
+logger = logging.getLogger(__name__)
+
+# Session phases
+WORK = "work"
+SHORT_BREAK = "short_break"
+LONG_BREAK = "long_break"
+PHASES = (WORK, SHORT_BREAK, LONG_BREAK)
+BREAK_PHASES = (SHORT_BREAK, LONG_BREAK)
+
+# Session transitions, as reported by ``SessionChanged`` events
+START = "start"
+PAUSE = "pause"
+RESET = "reset"
+FINISH = "finish"            # The phase ran out and the next one began
+SKIP = "skip"                # The phase was cut short and the next one began
+EXTEND = "extend"
+BEGIN_BREAK = "begin_break"  # A break began out of turn, e.g. a scheduled one
+END_BREAK = "end_break"
+CONFIGURE = "configure"
+RESTORE = "restore"
+
+
+class TimerHandle:
+    """A callback scheduled on a ``TimerService``."""
+
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Prevent the callback from running."""
+        self.cancelled = True
+
+
+class TimerService:
+    """Single worker thread running callbacks at monotonic deadlines.
+
+    Deadlines sit on a heap and the worker sleeps on a condition variable
+    until the earliest one, so any number of timers share one thread and
+    wake it only when something is due. Cancelled handles are dropped
+    lazily when they reach the top of the heap.
+
+    The system monotonic clock stands still while the machine is suspended;
+    ``advance`` adds the time spent asleep so that every timer counts it.
+
+    Without a background thread nothing runs until the owner calls
+    ``run_due``, which lets a simulation move a virtual clock from one
+    deadline to the next.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None, background: bool = True) -> None:
+        """Initialize the service; the worker thread starts on first use.
+
+        Args:
+            clock: Clock to read and wait on, the system clock if omitted
+            background: Run callbacks on a worker thread; otherwise they
+                only run from ``run_due``
+        """
+        self.clock = clock if clock is not None else real_clock
+        self.background = background
+        self._offset = 0.0
+        self._skipped: Optional[Tuple[float, float]] = None
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def monotonic(self) -> float:
+        """Get the service time in seconds, including time added by ``advance``."""
+        return self.clock.monotonic() + self._offset
+
+    def advance(self, seconds: float) -> None:
+        """Move the service clock forward, e.g. over time spent suspended.
+
+        Callbacks whose deadline is skipped over run at once.
+
+        Args:
+            seconds: Seconds to add; ignored unless positive
+        """
+        if seconds <= 0:
+            return
+        with self._condition:
+            start = self.monotonic()
+            self._offset += seconds
+            self._skipped = (start, start + seconds)
+            self._condition.notify()
+
+    def skipped(self, deadline: float) -> bool:
+        """Check whether the last ``advance`` jumped over a deadline.
+
+        Args:
+            deadline: Service time in seconds
+
+        Returns:
+            True if the deadline passed while the clock was being advanced
+        """
+        return self._skipped is not None and self._skipped[0] < deadline <= self._skipped[1]
+
+    def call_at(self, deadline: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run a callback at a monotonic deadline.
+
+        Args:
+            deadline: Monotonic time in seconds
+            callback: Called on the worker thread
+
+        Returns:
+            Handle that can cancel the call
+        """
+        handle = TimerHandle(deadline, callback)
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._counter), handle))
+            if self.background and (self._thread is None or not self._thread.is_alive()):
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="TimerService", daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is handle:
+                self._condition.notify()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run a callback after a delay.
+
+        Args:
+            delay: Seconds from now
+            callback: Called on the worker thread
+
+        Returns:
+            Handle that can cancel the call
+        """
+        return self.call_at(self.monotonic() + delay, callback)
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the deadline of the earliest scheduled, uncancelled callback, if any."""
+        with self._condition:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def run_due(self) -> int:
+        """Run the callbacks that are due, in deadline order, on the calling thread.
+
+        Callbacks scheduled by the ones run are run too if already due.
+
+        Returns:
+            Number of callbacks run
+        """
+        count = 0
+        while True:
+            with self._condition:
+                self._drop_cancelled()
+                if not self._heap or self._heap[0][0] > self.monotonic():
+                    return count
+                handle = heapq.heappop(self._heap)[2]
+            self._call(handle)
+            count += 1
+
+    def pending(self) -> int:
+        """Get the number of scheduled, uncancelled callbacks."""
+        with self._condition:
+            return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    def stop(self) -> None:
+        """Stop the worker thread, dropping pending callbacks."""
+        with self._condition:
+            self._stopped = True
+            self._heap = []
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+        self._thread = None
+
+    def _drop_cancelled(self) -> None:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    self._drop_cancelled()
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - self.monotonic()
+                    if delay <= 0:
+                        handle = heapq.heappop(self._heap)[2]
+                        break
+                    self.clock.wait(self._condition, delay)
+            self._call(handle)
+
+    @staticmethod
+    def _call(handle: TimerHandle) -> None:
+        if handle.cancelled:
+            return
+        try:
+            handle.callback()
+        except Exception as e:
+            logger.error(f"Error in timer callback: {e}")
+
+
+_default_service: Optional[TimerService] = None
+_default_service_lock = threading.Lock()
+
+
+def get_timer_service() -> TimerService:
+    """Get the process-wide timer service shared by all timers."""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = TimerService()
+        return _default_service
+
 
 class Timer:
-    """Timer logic for work/break intervals."""
-    def __init__(self, duration: int, callback: Optional[Callable[[], None]] = None) -> None:
+    """Timer logic for work/break intervals.
+
+    Remaining time is derived from a monotonic deadline rather than counted
+    down, so it cannot drift however late ticks are delivered. Completion
+    and tick callbacks are scheduled on a ``TimerService``; pausing cancels
+    them and resuming re-arms them against a new deadline. A timer that ran
+    out while the machine was suspended is flagged as ``missed``.
+    """
+
+    def __init__(self, duration: int, callback: Optional[Callable[[], None]] = None,
+                 service: Optional[TimerService] = None,
+                 dispatcher: Optional[Dispatcher] = None) -> None:
+        """Initialize a stopped timer.
+
+        Args:
+            duration: Duration in seconds
+            callback: Called when the timer runs out
+            service: Timer service to schedule on, the shared one if omitted
+            dispatcher: Runs callbacks elsewhere, e.g. on the Tk thread;
+                they run on the service thread if omitted
+        """
         self.duration = duration
         self.callback = callback
-        self.remaining = duration
         self.running = False
+        self.missed = False
+        self.dispatcher = dispatcher
+        self._service = service
+        self._remaining: float = duration
+        self._deadline: Optional[float] = None
+        self._finish_handle: Optional[TimerHandle] = None
+        self._tick_subscriptions: List[list] = []
+        self._lock = threading.RLock()
+
+    @property
+    def service(self) -> TimerService:
+        """Timer service the timer schedules on."""
+        if self._service is None:
+            self._service = get_timer_service()
+        return self._service
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left, computed from the clock while running."""
+        with self._lock:
+            if self.running:
+                return max(0.0, self._deadline - self.service.monotonic())
+            return self._remaining
+
+    @remaining.setter
+    def remaining(self, value: float) -> None:
+        with self._lock:
+            self._remaining = value
+            if self.running:
+                self._arm()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds of the duration already used."""
+        return self.duration - self.remaining
 
     def start(self) -> None:
-        self.running = True
+        """Start or resume counting down from the remaining time."""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self.missed = False
+            self._arm()
 
     def stop(self) -> None:
-        self.running = False
+        """Pause the timer, keeping the remaining time."""
+        with self._lock:
+            if not self.running:
+                return
+            self._remaining = self.remaining
+            self.running = False
+            self._disarm()
+
+    pause = stop
+    resume = start
+
+    def cancel(self) -> None:
+        """Stop the timer and drop its tick subscriptions."""
+        with self._lock:
+            self.stop()
+            self._tick_subscriptions = []
 
     def reset(self) -> None:
-        self.remaining = self.duration 
\ No newline at end of file
+        """Restore the full duration; a running timer keeps running."""
+        self.remaining = self.duration
+
+    def subscribe_ticks(self, callback: Callable[[float], None],
+                        interval: float = 1.0) -> Callable[[], None]:
+        """Get called while running each time the remaining time crosses a multiple of an interval.
+
+        Ticks are aligned to the deadline, so with a one second interval
+        they land as the displayed seconds change.
+
+        Args:
+            callback: Called with the remaining seconds
+            interval: Tick cadence in seconds
+
+        Returns:
+            Function that cancels the subscription
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid tick interval: {interval}")
+        subscription = [callback, interval, None]
+        with self._lock:
+            self._tick_subscriptions.append(subscription)
+            if self.running:
+                self._arm_tick(subscription)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if subscription in self._tick_subscriptions:
+                    self._tick_subscriptions.remove(subscription)
+                if subscription[2] is not None:
+                    subscription[2].cancel()
+        return unsubscribe
+
+    def _arm(self) -> None:
+        """Schedule completion and ticks against a fresh deadline."""
+        self._disarm()
+        self._deadline = self.service.monotonic() + self._remaining
+        self._finish_handle = self.service.call_at(self._deadline, self._on_finish)
+        for subscription in self._tick_subscriptions:
+            self._arm_tick(subscription)
+
+    def _disarm(self) -> None:
+        if self._finish_handle is not None:
+            self._finish_handle.cancel()
+            self._finish_handle = None
+        for subscription in self._tick_subscriptions:
+            if subscription[2] is not None:
+                subscription[2].cancel()
+                subscription[2] = None
+
+    def _arm_tick(self, subscription: list) -> None:
+        callback, interval, _ = subscription
+        remaining = self._deadline - self.service.monotonic()
+        # Tolerate clock jitter so a tick landing on a boundary does not repeat it
+        steps = math.ceil(remaining / interval - 1e-3) - 1
+        if steps < 1:
+            subscription[2] = None
+            return
+        deadline = self._deadline - steps * interval
+        subscription[2] = self.service.call_at(deadline, lambda: self._on_tick(subscription))
+
+    def _on_tick(self, subscription: list) -> None:
+        with self._lock:
+            if not self.running or subscription not in self._tick_subscriptions:
+                return
+            remaining = self.remaining
+            self._arm_tick(subscription)
+        self._dispatch(lambda: subscription[0](remaining))
+
+    def _on_finish(self) -> None:
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self._remaining = 0
+            self.missed = self.service.skipped(self._deadline)
+            self._disarm()
+        if self.callback is not None:
+            self._dispatch(self.callback)
+
+    def _dispatch(self, call: Callable[[], None]) -> None:
+        if self.dispatcher is not None:
+            self.dispatcher(call)
+        else:
+            call()
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """Serializable snapshot of a work/break session.
+
+    ``remaining`` is the time left when the snapshot was taken; a running
+    session keeps counting down from there. ``cycle`` counts the work
+    periods finished since the last long break, and ``work_remaining``
+    keeps the work time left while a break interrupts a work period.
+    """
+    phase: str = WORK
+    duration: float = 0.0
+    remaining: float = 0.0
+    running: bool = False
+    cycle: int = 0
+    work_remaining: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the state to plain values, e.g. for JSON."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionState':
+        """Build a state from ``to_dict`` output.
+
+        Args:
+            data: State values
+
+        Returns:
+            Session state
+
+        Raises:
+            ValueError: If the phase is unknown or a time or count is negative
+        """
+        phase = data.get("phase", WORK)
+        if phase not in PHASES:
+            raise ValueError(f"Unknown session phase: {phase!r}")
+        work_remaining = data.get("work_remaining")
+        state = cls(phase, float(data.get("duration", 0.0)), float(data.get("remaining", 0.0)),
+                    bool(data.get("running", False)), int(data.get("cycle", 0)),
+                    None if work_remaining is None else float(work_remaining))
+        if min(state.duration, state.remaining, state.cycle, state.work_remaining or 0) < 0:
+            raise ValueError(f"Invalid session state: {data}")
+        return state
+
+
+class Session:
+    """Pomodoro-style cycle of work periods and breaks, independent of any UI.
+
+    Work periods alternate with short breaks, and the break after every
+    ``sessions_per_cycle``-th work period is a long one. The current phase
+    runs on a ``Timer``, so it ends exactly at its monotonic deadline and
+    reading the remaining time or ticking costs the same whatever its
+    length. Phases only change through the methods below or when the
+    deadline passes, and every change publishes one ``SessionChanged``
+    event with the states before and after for views to render.
+
+    Scheduled and manual breaks begin out of turn with ``begin_break``;
+    the work time left is kept and picked up again when the break ends.
+    """
+
+    def __init__(self, work: float = 25 * 60, short_break: float = 5 * 60, long_break: float = 15 * 60,
+                 sessions_per_cycle: int = 4, auto_start_breaks: bool = False,
+                 auto_start_work: bool = False, event_bus: Optional[EventBus] = None,
+                 service: Optional[TimerService] = None) -> None:
+        """Initialize a session paused at the start of a work period.
+
+        Args:
+            work: Work period length in seconds
+            short_break: Short break length in seconds
+            long_break: Long break length in seconds
+            sessions_per_cycle: Work periods per cycle; 0 means breaks are never long
+            auto_start_breaks: Start a break as soon as its work period ends
+            auto_start_work: Start work as soon as a break ends
+            event_bus: Bus to publish ``SessionChanged`` events on, a private one if omitted
+            service: Timer service to schedule on, the shared one if omitted
+        """
+        self.work = work
+        self.short_break = short_break
+        self.long_break = long_break
+        self.sessions_per_cycle = sessions_per_cycle
+        self.auto_start_breaks = auto_start_breaks
+        self.auto_start_work = auto_start_work
+        self.events = event_bus if event_bus is not None else EventBus()
+        self._lock = threading.RLock()
+        self._phase = WORK
+        self._cycle = 0
+        self._work_remaining: Optional[float] = None
+        self._timer = Timer(work, self._on_finish, service=service)
+
+    @property
+    def state(self) -> SessionState:
+        """Snapshot of the session now."""
+        with self._lock:
+            return SessionState(self._phase, self._timer.duration, self._timer.remaining,
+                                self._timer.running, self._cycle, self._work_remaining)
+
+    @property
+    def phase(self) -> str:
+        """Current phase: ``WORK``, ``SHORT_BREAK`` or ``LONG_BREAK``."""
+        return self._phase
+
+    @property
+    def running(self) -> bool:
+        """Whether the current phase is counting down."""
+        return self._timer.running
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left in the current phase."""
+        return self._timer.remaining
+
+    @property
+    def duration(self) -> float:
+        """Length of the current phase in seconds."""
+        return self._timer.duration
+
+    @property
+    def service(self) -> TimerService:
+        """Timer service the session schedules on."""
+        return self._timer.service
+
+    def start(self) -> Optional[SessionState]:
+        """Start or resume the current phase.
+
+        Returns:
+            New state, or None if already running
+        """
+        if self._timer.running:
+            return None
+        return self._transition(START, self._timer.start)
+
+    def pause(self) -> Optional[SessionState]:
+        """Pause the current phase, keeping the time left.
+
+        Returns:
+            New state, or None if not running
+        """
+        if not self._timer.running:
+            return None
+        return self._transition(PAUSE, self._timer.stop)
+
+    def reset(self) -> SessionState:
+        """Pause the current phase and restore its full length."""
+        def change() -> None:
+            self._timer.stop()
+            self._timer.reset()
+        return self._transition(RESET, change)
+
+    def skip(self) -> SessionState:
+        """End the current phase now and move on as if it had run out."""
+        return self._transition(SKIP, self._next_phase)
+
+    def extend(self, seconds: float) -> SessionState:
+        """Lengthen the current phase, e.g. to snooze a break.
+
+        Args:
+            seconds: Seconds to add to both the length and the time left
+        """
+        def change() -> None:
+            remaining = self._timer.remaining
+            self._timer.duration += seconds
+            self._timer.remaining = remaining + seconds
+        return self._transition(EXTEND, change)
+
+    def begin_break(self, duration: float, long: bool = False, start: bool = False) -> SessionState:
+        """Break out of turn; beginning one during a break replaces it.
+
+        Args:
+            duration: Break length in seconds
+            long: Whether it is a long break
+            start: Start counting down at once
+
+        Returns:
+            New state
+        """
+        def change() -> None:
+            if self._phase == WORK:
+                self._work_remaining = self._timer.remaining
+            self._enter(LONG_BREAK if long else SHORT_BREAK, duration, start)
+        return self._transition(BEGIN_BREAK, change)
+
+    def end_break(self) -> Optional[SessionState]:
+        """End the current break and return to work, paused.
+
+        Work interrupted by the break continues where it left off;
+        otherwise a full work period follows.
+
+        Returns:
+            New state, or None if not on a break
+        """
+        if self._phase == WORK:
+            return None
+        return self._transition(END_BREAK, lambda: self._enter(WORK, self.work, False, self._take_work_remaining()))
+
+    def configure(self, work: Optional[float] = None, short_break: Optional[float] = None,
+                  long_break: Optional[float] = None, sessions_per_cycle: Optional[int] = None) -> SessionState:
+        """Change phase lengths; a paused work period takes a new length at once.
+
+        Args:
+            work: Work period length in seconds
+            short_break: Short break length in seconds
+            long_break: Long break length in seconds
+            sessions_per_cycle: Work periods per cycle
+
+        Returns:
+            New state
+        """
+        def change() -> None:
+            if short_break is not None:
+                self.short_break = short_break
+            if long_break is not None:
+                self.long_break = long_break
+            if sessions_per_cycle is not None:
+                self.sessions_per_cycle = sessions_per_cycle
+            if work is not None:
+                self.work = work
+                if self._phase == WORK and not self._timer.running:
+                    self._enter(WORK, work, False)
+        return self._transition(CONFIGURE, change)
+
+    def restore(self, state: SessionState) -> SessionState:
+        """Put the session back into a saved state.
+
+        A running state resumes counting down from its remaining time, and
+        one with no time left moves on to the next phase at once, as a
+        missed ``FINISH`` like a phase that ran out while suspended.
+
+        Args:
+            state: State from ``state`` or ``SessionState.from_dict``
+
+        Returns:
+            State after restoring
+        """
+        ran_out = state.running and state.remaining <= 0
+
+        def change() -> None:
+            self._timer.stop()
+            self._phase = state.phase
+            self._cycle = state.cycle
+            self._work_remaining = state.work_remaining
+            self._timer.duration = state.duration
+            self._timer.remaining = max(0.0, state.remaining)
+            if state.running and not ran_out:
+                self._timer.start()
+        restored = self._transition(RESTORE, change)
+        if not ran_out:
+            return restored
+        with self._lock:
+            previous = self.state
+            self._next_phase()
+            state = self.state
+        self.events.publish(SessionChanged(FINISH, previous, state, True))
+        return state
+
+    def subscribe_ticks(self, callback: Callable[[float], None], interval: float = 1.0) -> Callable[[], None]:
+        """Get called with the time left as each interval of the running phase passes.
+
+        Args:
+            callback: Called with the remaining seconds
+            interval: Tick cadence in seconds
+
+        Returns:
+            Function that cancels the subscription
+        """
+        return self._timer.subscribe_ticks(callback, interval)
+
+    def _transition(self, name: str, change: Callable[[], None]) -> SessionState:
+        with self._lock:
+            previous = self.state
+            change()
+            state = self.state
+        self.events.publish(SessionChanged(name, previous, state))
+        return state
+
+    def _on_finish(self) -> None:
+        with self._lock:
+            if self._timer.running or self._timer.remaining > 0:
+                return  # The phase was changed while this callback was on its way
+            previous = self.state
+            missed = self._timer.missed
+            self._next_phase()
+            state = self.state
+        self.events.publish(SessionChanged(FINISH, previous, state, missed))
+
+    def _next_phase(self) -> None:
+        if self._phase != WORK:
+            self._enter(WORK, self.work, self.auto_start_work, self._take_work_remaining())
+            return
+        self._cycle += 1
+        if self.sessions_per_cycle and self._cycle >= self.sessions_per_cycle:
+            self._cycle = 0
+            self._enter(LONG_BREAK, self.long_break, self.auto_start_breaks)
+        else:
+            self._enter(SHORT_BREAK, self.short_break, self.auto_start_breaks)
+
+    def _enter(self, phase: str, duration: float, start: bool, remaining: Optional[float] = None) -> None:
+        self._timer.stop()
+        self._phase = phase
+        self._timer.duration = duration
+        self._timer.remaining = duration if remaining is None else remaining
+        if start:
+            self._timer.start()
+
+    def _take_work_remaining(self) -> float:
+        remaining, self._work_remaining = self._work_remaining, None
+        return remaining if remaining else self.work
@@ -0,0 +1,194 @@
+from typing import Iterable, Iterator, Tuple
+from datetime import datetime
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# Per-minute counters saturate here and at zero, in both storage backends
+MAX_COUNT = 255
+
+# Bit n is set when a pattern is active on weekday n (Monday = 0)
+PATTERN_DAY_MASKS = {
+    "daily": 0b1111111,
+    "weekdays": 0b0011111,
+    "weekends": 0b1100000,
+    "once": 0b1111111,  # No specific date is stored, so "once" behaves like daily
+}
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Get the minute of the week for a datetime, Monday 00:00 being 0."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _week_ranges(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Split a minute range into pieces that lie inside a single week."""
+    if end <= start:
+        return
+    if end - start >= MINUTES_PER_WEEK:
+        yield 0, MINUTES_PER_WEEK
+        return
+    offset = start - start % MINUTES_PER_WEEK
+    start -= offset
+    end -= offset
+    if end <= MINUTES_PER_WEEK:
+        yield start, end
+    else:
+        yield start, MINUTES_PER_WEEK
+        yield 0, end - MINUTES_PER_WEEK
+
+
+def slot_week_ranges(slot) -> Iterator[Tuple[int, int]]:
+    """Yield the minute-of-week ranges a break slot covers.
+
+    Args:
+        slot: Break slot to expand
+
+    Yields:
+        Half-open (start_minute, end_minute) ranges inside the week
+    """
+    if not slot.enabled:
+        return
+    try:
+        duration = int(slot.duration)
+    except (ValueError, TypeError):
+        return
+    if duration <= 0:
+        return
+    mask = PATTERN_DAY_MASKS.get(slot.repeat_pattern, 0)
+    start_of_day = slot.start_minute
+    for weekday in range(7):
+        if mask >> weekday & 1:
+            start = weekday * MINUTES_PER_DAY + start_of_day
+            yield from _week_ranges(start, start + duration)
+
+
+class WeekOccupancy:
+    """Compiled minute-of-week occupancy for a set of break slots.
+
+    Holds one counter per minute of the week recording how many enabled
+    slots cover it. Backed by a NumPy array when NumPy is installed and by a
+    ``bytearray`` otherwise; both support slice updates, so adding or
+    removing a slot touches only the minutes it covers.
+    """
+
+    def __init__(self, slots: Iterable = ()) -> None:
+        """Initialize occupancy from break slots.
+
+        Args:
+            slots: Break slots to compile
+        """
+        self.rebuild(slots)
+
+    @property
+    def uses_numpy(self) -> bool:
+        """Whether the counters are stored in a NumPy array."""
+        return np is not None
+
+    def rebuild(self, slots: Iterable) -> None:
+        """Recompile occupancy from scratch.
+
+        Args:
+            slots: Break slots to compile
+        """
+        if np is not None:
+            self._counts = np.zeros(MINUTES_PER_WEEK, dtype=np.uint8)
+        else:
+            self._counts = bytearray(MINUTES_PER_WEEK)
+        for slot in slots:
+            self.add(slot)
+
+    def add(self, slot) -> None:
+        """Mark the minutes covered by a slot.
+
+        Args:
+            slot: Break slot to add
+        """
+        for start, end in slot_week_ranges(slot):
+            self._shift(start, end, 1)
+
+    def remove(self, slot) -> None:
+        """Unmark the minutes covered by a slot.
+
+        The slot must still have the fields it was added with, so callers
+        remove before mutating and add back afterwards.
+
+        Args:
+            slot: Break slot to remove
+        """
+        for start, end in slot_week_ranges(slot):
+            self._shift(start, end, -1)
+
+    def is_break_at(self, minute: int) -> bool:
+        """Check whether a break is active at a minute of the week.
+
+        Args:
+            minute: Minute of the week, Monday 00:00 being 0
+
+        Returns:
+            True if any enabled slot covers that minute
+        """
+        return self._counts[minute % MINUTES_PER_WEEK] > 0
+
+    def free_minutes(self, start: int, end: int) -> int:
+        """Count break-free minutes in a window of the week.
+
+        Args:
+            start: First minute of the window (inclusive)
+            end: Last minute of the window (exclusive), may run past the week
+
+        Returns:
+            Number of minutes no slot covers
+        """
+        free = 0
+        for lo, hi in _week_ranges(start, end):
+            if np is not None:
+                free += int(np.count_nonzero(self._counts[lo:hi] == 0))
+            else:
+                free += self._counts[lo:hi].count(0)
+        return free
+
+    def overlap_minutes(self, slot) -> int:
+        """Count the minutes a slot would share with already compiled slots.
+
+        Unlike the interval index this honours repeat patterns, so a weekday
+        slot never clashes with a weekend one.
+
+        Args:
+            slot: Break slot to test, not yet added
+
+        Returns:
+            Number of minutes of the week that would be double-booked
+        """
+        shared = 0
+        for lo, hi in slot_week_ranges(slot):
+            shared += (hi - lo) - self.free_minutes(lo, hi)
+        return shared
+
+    def conflicting_minutes(self) -> int:
+        """Count the minutes of the week covered by more than one slot."""
+        if np is not None:
+            return int(np.count_nonzero(self._counts > 1))
+        return MINUTES_PER_WEEK - self._counts.count(0) - self._counts.count(1)
+
+    def as_array(self):
+        """Get the raw per-minute counters for bulk evaluation.
+
+        Returns:
+            NumPy array or bytearray of length ``MINUTES_PER_WEEK``
+        """
+        return self._counts
+
+    def _shift(self, start: int, end: int, delta: int) -> None:
+        if np is not None:
+            window = self._counts[start:end]
+            if delta < 0:
+                np.subtract(window, 1, out=window, where=window > 0)
+            else:
+                np.add(window, 1, out=window, where=window < MAX_COUNT)
+        else:
+            window = self._counts[start:end]
+            self._counts[start:end] = bytes(min(max(count + delta, 0), MAX_COUNT) for count in window)
@@ -9,6 +9,8 @@ class SettingsPage(ctk.CTkFrame):
         print("DEBUG: Entering SettingsPage.__init__")
         super().__init__(master)
         self.controller = controller
+        # Input widget and variable for each setting, so locked ones can be made read-only
+        self.setting_widgets = {}
         try:
             print("DEBUG: Calling setup_ui")
             self.setup_ui()
@@ -104,14 +106,17 @@ class SettingsPage(ctk.CTkFrame):
         self.sound_enabled_var = ctk.BooleanVar(value=True)
         sound_check = ctk.CTkCheckBox(notif_frame, text="Enable sound notifications", variable=self.sound_enabled_var)
         sound_check.grid(row=1, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['sound_enabled'] = (sound_check, self.sound_enabled_var)
         self.system_notif_var = ctk.BooleanVar(value=True)
         system_check = ctk.CTkCheckBox(notif_frame, text="Show system notifications", variable=self.system_notif_var)
         system_check.grid(row=2, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['system_notifications'] = (system_check, self.system_notif_var)
         volume_label = ctk.CTkLabel(notif_frame, text="Notification Volume:", wraplength=300)
         volume_label.grid(row=3, column=0, padx=(15, 10), pady=5, sticky="w")
         self.volume_var = ctk.IntVar(value=50)
         volume_slider = ctk.CTkSlider(notif_frame, from_=0, to=100, variable=self.volume_var, width=200)
         volume_slider.grid(row=3, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['volume'] = (volume_slider, self.volume_var)
         volume_display = ctk.CTkLabel(notif_frame, textvariable=self.volume_var)
         volume_display.grid(row=3, column=2, padx=(5, 15), pady=5)
     
@@ -127,13 +132,16 @@ class SettingsPage(ctk.CTkFrame):
         self.theme_var = ctk.StringVar(value="System")
         theme_menu = ctk.CTkOptionMenu(appearance_frame, values=["Light", "Dark", "System"], variable=self.theme_var, width=150)
         theme_menu.grid(row=1, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['theme'] = (theme_menu, self.theme_var)
         self.transparency_var = ctk.BooleanVar(value=False)
         transparency_check = ctk.CTkCheckBox(appearance_frame, text="Enable window transparency", variable=self.transparency_var)
         transparency_check.grid(row=2, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['transparency'] = (transparency_check, self.transparency_var)
         self.always_on_top_var = ctk.BooleanVar(value=False)
         on_top_check = ctk.CTkCheckBox(appearance_frame, text="Always on top", variable=self.always_on_top_var)
         on_top_check.grid(row=3, column=0, columnspan=2, padx=15, pady=5, sticky="w")
         on_top_check.configure(command=self.on_always_on_top_changed)
+        self.setting_widgets['always_on_top'] = (on_top_check, self.always_on_top_var)
     
     def create_buttons(self, parent, row):
         buttons_frame = ctk.CTkFrame(parent)
@@ -246,6 +254,21 @@ class SettingsPage(ctk.CTkFrame):
             self.theme_var.set('System')
             self.transparency_var.set(False)
             self.always_on_top_var.set(False)
+        self.apply_locked_settings()
+    
+    def apply_locked_settings(self) -> None:
+        """Show settings locked by the administrator with their enforced value, read-only."""
+        if not hasattr(self.controller, 'get_locked_settings'):
+            return
+        locked = self.controller.get_locked_settings()
+        if not locked:
+            return
+        settings = self.controller.get_settings()
+        for key, (widget, variable) in self.setting_widgets.items():
+            if key in locked:
+                variable.set(settings.get(key))
+                widget.configure(state="disabled")
+                print(f"DEBUG: {key} is locked by the administrator")
     
     def save_settings(self) -> None:
         try:
@@ -388,6 +411,7 @@ class SettingsPage(ctk.CTkFrame):
         self.theme_var.set("System")
         self.transparency_var.set(False)
         self.always_on_top_var.set(False)
+        self.apply_locked_settings()
     
     def cancel_settings(self) -> None:
         self.master.destroy()
@@ -72,8 +72,7 @@ class AudioManager:
             volume = 0.5  # Default volume (50%)
             if self.settings_manager:
                 try:
-                    v = self.settings_manager.get("volume", 50)
-                    volume = max(0, min(1, int(v) / 100))
+                    volume = self.settings_manager.snapshot.volume / 100
                 except Exception as e:
                     print(f"Failed to get volume from settings: {e}")
             print(f"[AUDIO DEBUG] Setting volume: {volume}")
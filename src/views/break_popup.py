@@ -1,13 +1,16 @@
 import customtkinter as ctk
-from datetime import datetime, timedelta
-import threading
-import time
+from datetime import timedelta
+import math
+from src.models.break_history import COMPLETED, SHOWN, SKIPPED, SNOOZED, STARTED
+from src.models.clock import Clock, real_clock
+from src.models.events import SessionChanged, tk_dispatcher
 from src.models.settings import SettingsManager
+from src.models.timer import BREAK_PHASES, FINISH
 
 class BreakPopup(ctk.CTkToplevel):
-    """Break notification popup."""
+    """Break notification popup; it shows and drives the break phase of the work/break session."""
     
-    def __init__(self, master, controller) -> None:
+    def __init__(self, master, controller, session=None) -> None:
         print("DEBUG: BreakPopup __init__ called")
         super().__init__(master)
         self.controller = controller
@@ -34,14 +37,51 @@ class BreakPopup(ctk.CTkToplevel):
             print("DEBUG: BreakPopup not viewable, skipping grab_set")
         self.break_slot = None
         self.occurrence_time = None
-        self.break_timer_running = False
-        self.break_timer_thread = None
+        # The break counts down in the session the main window shows
+        self.session = session if session is not None else master.session
+        dispatcher = tk_dispatcher(self)
+        self._unsubscribe = [
+            self.session.subscribe_ticks(lambda remaining: dispatcher(self.update_timer_display)),
+            self.session.events.subscribe(SessionChanged, self.on_session_changed, dispatcher),
+        ]
         self.break_start_time = None
-        self.break_remaining = 0
         self.break_completed = False  # Track if break finished
+        self.break_skipped = False
         self.setup_ui()
         self.protocol("WM_DELETE_WINDOW", self.on_window_close)
     
+    @property
+    def on_break(self) -> bool:
+        """Whether the session is in a break phase."""
+        return self.session.phase in BREAK_PHASES
+    
+    @property
+    def break_timer_running(self) -> bool:
+        """Whether the break countdown is running."""
+        return self.on_break and self.session.running
+    
+    @property
+    def break_remaining(self) -> int:
+        """Whole seconds left in the break, rounded up."""
+        if not self.on_break:
+            return 0
+        return math.ceil(self.session.remaining - 0.001)
+    
+    def on_session_changed(self, event: SessionChanged) -> None:
+        """Show the session, and complete the break when its phase runs out."""
+        if not self.winfo_exists():
+            return
+        if event.transition == FINISH and event.previous.phase in BREAK_PHASES:
+            self.break_finished()
+        elif self.on_break:
+            self.update_timer_display()
+    
+    def get_clock(self) -> Clock:
+        """Get the controller's clock, or the system clock without one."""
+        if hasattr(self.controller, 'get_clock'):
+            return self.controller.get_clock()
+        return real_clock
+    
     def setup_ui(self) -> None:
         """Setup user interface."""
         # Configure grid
@@ -120,6 +160,13 @@ class BreakPopup(ctk.CTkToplevel):
     
     def set_break_info(self, break_slot, occurrence_time, manual_break=False, was_timer_running=False) -> None:
         print(f"DEBUG: set_break_info called - manual_break={manual_break}, slot={break_slot}, occurrence_time={occurrence_time}")
+        # A new break replacing one that was never taken skips that one
+        if self.break_slot and not self.break_completed and not self.break_skipped:
+            self.break_skipped = True
+            self.record_event(SKIPPED)
+        self.break_completed = False
+        self.break_skipped = False
+        self.skip_button.configure(text="Skip", command=self.skip_break)
         self.break_slot = break_slot
         self.occurrence_time = occurrence_time
         self.manual_break = manual_break
@@ -130,9 +177,10 @@ class BreakPopup(ctk.CTkToplevel):
                 self.break_info_label.configure(text=message)
             else:
                 self.break_info_label.configure(text=f"Time for your {break_slot.duration}-minute break!")
-            self.break_remaining = break_slot.duration * 60
+            # The session waits in the break phase, paused, until the break starts
+            self.session.begin_break(break_slot.duration * 60, long=getattr(break_slot, 'long', False))
+            self.record_event(SHOWN)
             # Always reset timer and labels for default/scheduled popups
-            self.break_timer_running = False
             self.break_start_time = None
             self.start_time_label.configure(text="Start: --:--")
             self.end_time_label.configure(text="End: --:--")
@@ -158,6 +206,30 @@ class BreakPopup(ctk.CTkToplevel):
         else:
             self.break_info_label.configure(text="Time for your break!")
     
+    def show_restored_break(self, break_slot) -> None:
+        """Show the break the session was restored into, keeping its time left."""
+        self.break_slot = break_slot
+        self.occurrence_time = self.get_clock().now()
+        self.manual_break = False
+        self.was_timer_running = False
+        self.break_info_label.configure(text=break_slot.message)
+        state = self.session.state
+        if state.running:
+            # Started as long ago as the break has run
+            self.break_start_time = self.get_clock().now() - timedelta(seconds=state.duration - state.remaining)
+            end_time = self.break_start_time + timedelta(seconds=state.duration)
+            self.start_time_label.configure(text=f"Start: {self.break_start_time.strftime('%H:%M')}")
+            self.end_time_label.configure(text=f"End: {end_time.strftime('%H:%M')}")
+            self.start_button.configure(text="Pause", command=self.pause_break, state="normal")
+            self.stop_button.configure(state="normal")
+        elif state.remaining < state.duration:
+            self.start_button.configure(text="Resume", command=self.resume_break, state="normal")
+            self.stop_button.configure(state="normal")
+        else:
+            self.start_button.configure(text="Start Break", command=self.start_break, state="normal")
+            self.stop_button.configure(state="disabled")
+        self.update_timer_display()
+    
     # Removed calculate_next_break_time (no next break in popup)
     
     def auto_start_break(self) -> None:
@@ -172,9 +244,10 @@ class BreakPopup(ctk.CTkToplevel):
         """Start the break timer (always resets for Break Again)."""
         if self.break_slot:
             print("DEBUG: Starting break timer (reset)")
-            self.break_timer_running = True
-            self.break_remaining = self.break_slot.duration * 60
-            self.break_start_time = datetime.now()
+            self.session.begin_break(self.break_slot.duration * 60, long=getattr(self.break_slot, 'long', False),
+                                     start=True)
+            self.break_start_time = self.get_clock().now()
+            self.record_event(STARTED)
             self.start_button.configure(text="Pause", command=self.pause_break, state="normal")
             self.stop_button.configure(state="normal")
             self.skip_button.grid()
@@ -185,42 +258,38 @@ class BreakPopup(ctk.CTkToplevel):
             self.start_time_label.configure(text=f"Start: {start_time}")
             self.end_time_label.configure(text=f"End: {end_time}")
             self.update_timer_display()
-            self.break_timer_thread = threading.Thread(target=self.break_timer_loop, daemon=True)
-            self.break_timer_thread.start()
         else:
             print(f"DEBUG: Cannot start break - break_slot: {self.break_slot}")
     
     def pause_break(self) -> None:
         """Pause the break timer."""
         if self.break_timer_running:
-            self.break_timer_running = False
+            self.session.pause()
             self.start_button.configure(text="Resume", command=self.resume_break)
     
     def resume_break(self) -> None:
         """Resume the break timer."""
-        if not self.break_timer_running:
-            self.break_timer_running = True
+        if self.on_break and not self.break_timer_running:
+            self.session.start()
             self.start_button.configure(text="Pause", command=self.pause_break)
-            
-            # Restart timer thread
-            self.break_timer_thread = threading.Thread(target=self.break_timer_loop, daemon=True)
-            self.break_timer_thread.start()
     
     def stop_break(self) -> None:
         """Stop the break timer."""
-        self.break_timer_running = False
+        if self.on_break:
+            self.session.reset()
         self.start_button.configure(text="Start Break", command=self.start_break)
         self.stop_button.configure(state="disabled")
-        self.break_remaining = self.break_slot.duration * 60 if self.break_slot else 0
         self.update_timer_display()
         self.progress_bar.set(0)
     
     def snooze_break(self) -> None:
         """Snooze the break for 5 minutes."""
         if self.break_slot:
-            # Add 5 minutes to break duration
+            # Add 5 minutes to break duration, and to the time left if the break is on
             self.break_slot.duration += 5
-            self.break_remaining = self.break_slot.duration * 60
+            if self.on_break:
+                self.session.extend(5 * 60)
+            self.record_event(SNOOZED)
             
             # Update display
             self.break_info_label.configure(
@@ -233,18 +302,6 @@ class BreakPopup(ctk.CTkToplevel):
                 end_time = (self.break_start_time + timedelta(minutes=self.break_slot.duration)).strftime("%H:%M")
                 self.end_time_label.configure(text=f"End: {end_time}")
     
-    def break_timer_loop(self) -> None:
-        """Break timer loop running in separate thread."""
-        while self.break_timer_running and self.break_remaining > 0:
-            time.sleep(1)
-            self.break_remaining -= 1
-            # Update UI in main thread
-            if self.break_timer_running:
-                self.after(0, self.update_timer_display)
-        if self.break_timer_running:
-            # Break timer finished
-            self.after(0, self.break_finished)
-
     def update_timer_display(self) -> None:
         """Update timer display."""
         try:
@@ -256,7 +313,7 @@ class BreakPopup(ctk.CTkToplevel):
                 self.timer_label.configure(text=timer_text)
             # Update progress bar
             if self.break_slot and hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                total_seconds = self.break_slot.duration * 60
+                total_seconds = self.session.duration if self.on_break else self.break_slot.duration * 60
                 progress = 1 - (self.break_remaining / total_seconds)
                 self.progress_bar.set(progress)
             # Debug output for first few seconds and every 30 seconds
@@ -265,13 +322,12 @@ class BreakPopup(ctk.CTkToplevel):
                     print(f"DEBUG: Break timer: {timer_text} remaining ({self.break_remaining} seconds)")
         except Exception as e:
             print(f"DEBUG: Error updating timer display: {e}")
-            self.break_timer_running = False
 
     def break_finished(self) -> None:
         """Handle break completion."""
         print("DEBUG: Break timer finished")
-        self.break_timer_running = False
         self.break_completed = True
+        self.record_event(COMPLETED)
         # Only update widgets if they still exist
         if hasattr(self, 'start_button') and self.start_button.winfo_exists():
             self.start_button.configure(text="Break Again", command=self.start_break, state="normal")
@@ -309,11 +365,22 @@ class BreakPopup(ctk.CTkToplevel):
         print("DEBUG: close_break called")
         self._close_popup()
 
-    def _close_popup(self):
+    def close_idle_break(self) -> None:
+        """Close the popup for a break the user took by being away; work was already reset."""
+        self.break_completed = True
+        self._close_popup(after_break=False)
+
+    def _close_popup(self, after_break=True):
         """Unified method to close the popup safely."""
+        # Closing a break that never completed, by any button, counts as skipping it
+        if self.break_slot and not self.break_completed and not self.break_skipped:
+            self.break_skipped = True
+            self.record_event(SKIPPED)
         try:
-            # Stop the break timer
-            self.break_timer_running = False
+            # Stop following the session and end the break, back to work
+            for unsubscribe in self._unsubscribe:
+                unsubscribe()
+            self.session.end_break()
             print("DEBUG: Stopping break timer")
             
             # Release grab if we have it
@@ -324,7 +391,8 @@ class BreakPopup(ctk.CTkToplevel):
                 print(f"DEBUG: Could not release grab: {e}")
             
             # Handle post-break logic before destroying
-            self.handle_post_break_close()
+            if after_break:
+                self.handle_post_break_close()
             
             # Destroy the window
             self.destroy()
@@ -338,11 +406,22 @@ class BreakPopup(ctk.CTkToplevel):
             except Exception as e2:
                 print(f"DEBUG: Could not force destroy: {e2}")
 
+    def record_event(self, kind):
+        """Record what happened to this break in the controller's break history."""
+        if not hasattr(self.controller, 'record_break_event'):
+            return
+        if getattr(self, 'manual_break', False):
+            source = "manual"
+        elif getattr(self.break_slot, 'scheduled', False):
+            source = "scheduled"
+        else:
+            source = "timer"
+        self.controller.record_break_event(kind, self.break_slot, source, occurrence=self.occurrence_time)
+
     def should_auto_start(self):
         """Return True if auto start next session is enabled in settings."""
-        if hasattr(self.controller, 'get_settings'):
-            settings = self.controller.get_settings()
-            return bool(settings.get('auto_start', False))
+        if hasattr(self.controller, 'get_settings_snapshot'):
+            return self.controller.get_settings_snapshot().auto_start
         return False
 
     def handle_post_break_close(self):
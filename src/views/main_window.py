@@ -1,37 +1,38 @@
 import customtkinter as ctk
 from typing import Optional
-from datetime import datetime, timedelta
-import threading
-import time
+from datetime import timedelta
+import logging
+import math
+
+from src.models.break_history import SCHEDULED
+from src.models.break_manager import BreakManager
+from src.models.break_scheduler import BreakScheduler
+from src.models.clock import Clock, real_clock
+from src.models.events import SessionChanged, SettingChanged, TimelineEvent, UserReturned, tk_dispatcher
+from src.models.settings import AppSettings
+from src.models.timer import BREAK_PHASES, FINISH, RESTORE, SHORT_BREAK, WORK, Session, TimerService, get_timer_service
+
+logger = logging.getLogger(__name__)
 
 
 class MainWindow(ctk.CTk):
-    def show_break_notification(self):
-        """Show break popup when timer finishes (default break), always using duration from preferences/settings."""
+    def show_break_notification(self, phase: str = SHORT_BREAK):
+        """Show break popup when the work period finishes (default break), short or long as the session says."""
         try:
-            from src.views.break_popup import BreakPopup
-            settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-            break_duration = int(settings.get('break_duration', 1))
-            break_message = settings.get('default_break_message', 'Time for your break!')
+            settings = self.get_settings_snapshot()
+            break_slot = self.break_manager.timer_break(phase)
             
             # Show system notification if enabled
-            system_notifications = settings.get('system_notifications', True)
-            if system_notifications:
+            if settings.system_notifications:
                 try:
                     platform_utils = self.controller.get_platform_utils()
-                    platform_utils.show_system_notification("Break Time!", break_message)
+                    platform_utils.show_system_notification("Break Time!", break_slot.message)
                     print("DEBUG: System notification shown for default break")
                 except Exception as e:
                     print(f"DEBUG: Could not show system notification: {e}")
             
-            class DefaultBreakSlot:
-                duration = break_duration
-                scheduled = False
-                message = break_message
-            break_slot = DefaultBreakSlot()
-            occurrence_time = datetime.now()
-            popup = BreakPopup(self, self.controller)
-            popup.set_break_info(break_slot, occurrence_time, manual_break=False, was_timer_running=self.timer_running)
+            occurrence_time = self.get_clock().now()
+            self.show_break_popup(break_slot, occurrence_time, manual_break=False, was_timer_running=self.timer_running)
         except Exception as e:
             print(f"Error in show_break_notification: {e}")
     def start_break_now(self) -> None:
@@ -39,17 +40,14 @@ class MainWindow(ctk.CTk):
         Trigger a manual break popup immediately, always using duration and custom message from preferences/settings. Also pause work timer.
         """
         try:
-            from src.views.break_popup import BreakPopup
-            settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-            break_duration = int(settings.get('manual_break_duration', 15))
-            break_message = settings.get('break_message', 'Time for a break!')
+            settings = self.get_settings_snapshot()
+            break_slot = self.break_manager.manual_break()
             
             # Show system notification if enabled
-            system_notifications = settings.get('system_notifications', True)
-            if system_notifications:
+            if settings.system_notifications:
                 try:
                     platform_utils = self.controller.get_platform_utils()
-                    platform_utils.show_system_notification("Manual Break", break_message)
+                    platform_utils.show_system_notification("Manual Break", break_slot.message)
                     print("DEBUG: System notification shown for manual break")
                 except Exception as e:
                     print(f"DEBUG: Could not show system notification: {e}")
@@ -57,16 +55,48 @@ class MainWindow(ctk.CTk):
             # Pause work timer if running
             was_timer_running = self.timer_running
             self.stop_timer()
-            class ManualBreakSlot:
-                duration = break_duration
-                scheduled = False
-                message = break_message
-            break_slot = ManualBreakSlot()
-            occurrence_time = datetime.now()
-            popup = BreakPopup(self, self.controller)
-            popup.set_break_info(break_slot, occurrence_time, manual_break=True, was_timer_running=was_timer_running)
+            occurrence_time = self.get_clock().now()
+            self.show_break_popup(break_slot, occurrence_time, manual_break=True, was_timer_running=was_timer_running)
         except Exception as e:
             print(f"Error in start_break_now: {e}")
+    
+    def show_break_popup(self, break_slot, occurrence_time, manual_break=False, was_timer_running=False) -> None:
+        """Show a break in the break popup, reusing the open one if there is one.
+        
+        Args:
+            break_slot: Break to show
+            occurrence_time: When the break was due
+            manual_break: Whether the break was started with Break Now
+            was_timer_running: Whether the work timer was running when the break came up
+        """
+        popup = self.get_break_popup()
+        popup.set_break_info(break_slot, occurrence_time, manual_break=manual_break, was_timer_running=was_timer_running)
+    
+    def get_break_popup(self):
+        """Get the open break popup, opening one if there is none."""
+        from src.views.break_popup import BreakPopup
+        popup = self.break_popup
+        try:
+            if popup is None or not popup.winfo_exists():
+                popup = None
+        except Exception:
+            popup = None
+        if popup is None:
+            popup = self.break_popup = BreakPopup(self, self.controller, self.session)
+        return popup
+    
+    def show_restored_break(self, state) -> None:
+        """Reopen the break popup for a break the session was restored into after a restart.
+        
+        Args:
+            state: Restored session state
+        """
+        try:
+            break_slot = self.break_manager.timer_break(state.phase)
+            break_slot.duration = math.ceil(state.duration / 60)
+            self.get_break_popup().show_restored_break(break_slot)
+        except Exception as e:
+            print(f"Error in show_restored_break: {e}")
     """Main application window."""
     
     def __init__(self, controller) -> None:
@@ -81,14 +111,19 @@ class MainWindow(ctk.CTk):
         self.geometry("500x464")  # Match break popup width
         self.minsize(500, 464)  # Keep min width at 500
         
-        # Timer variables
-        self.timer_running = False
-        self.timer_thread = None
+        # The work/break session runs on the timer service; this window renders it
+        self.session = self.get_session()
+        self.break_manager = BreakManager(self.get_settings_snapshot)
+        self.break_popup = None
+        dispatcher = tk_dispatcher(self)
+        self.session.subscribe_ticks(lambda remaining: dispatcher(self.update_timer_display))
+        self.session.events.subscribe(SessionChanged, self.on_session_changed, dispatcher)
         self.current_break_slot = None
         self.next_break_time = None
         
         self.setup_ui()
         self.setup_timer()
+        self.subscribe_to_model_events()
         
         # Start timeline monitoring
         self.start_timeline_monitor()
@@ -182,42 +217,93 @@ class MainWindow(ctk.CTk):
 
     def setup_timer(self) -> None:
         """Setup timer functionality."""
-        settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-        try:
-            work_duration_raw = settings.get('work_duration', 20)
-            print(f"DEBUG: work_duration value: {work_duration_raw}, type: {type(work_duration_raw)}")
-            work_duration = int(work_duration_raw)
-        except (ValueError, TypeError):
-            work_duration = 20
-        self.timer_duration = work_duration * 60  # in seconds
-        self.timer_remaining = self.timer_duration
         self.timer_start_time = None
+        self.update_timer_display()
     
     def refresh_timer_settings(self) -> None:
-        """Refresh timer settings from saved preferences."""
+        """Show the session after its phase lengths changed in the preferences."""
         print("DEBUG: Refreshing timer settings...")
-        settings = self.controller.get_settings()
-        try:
-            work_duration_raw = settings.get('work_duration', 25)
-            print(f"DEBUG: Refreshing work_duration: {work_duration_raw}, type: {type(work_duration_raw)}")
-            work_duration = int(work_duration_raw)
-            
-            # Update timer duration
-            self.timer_duration = work_duration * 60  # in seconds
-            
-            # If timer is not running, reset to new duration
-            if not self.timer_running:
-                self.timer_remaining = self.timer_duration
-                self.update_timer_display()
-                print(f"DEBUG: Timer reset to {work_duration} minutes")
-            else:
-                print("DEBUG: Timer is running, duration will be updated on next reset")
-                
-        except (ValueError, TypeError) as e:
-            print(f"DEBUG: Error refreshing timer settings: {e}")
-            # Keep current settings if there's an error
+        # The timer controller already gave a paused work period the new length
+        self.update_timer_display()
+        self.refresh_next_break_label()
+    
+    def get_settings_snapshot(self) -> AppSettings:
+        """Get the controller's current settings snapshot, or the defaults without one."""
+        if hasattr(self.controller, 'get_settings_snapshot'):
+            return self.controller.get_settings_snapshot()
+        return AppSettings.from_dict({})
+    
+    def get_clock(self) -> Clock:
+        """Get the controller's clock, or the system clock without one."""
+        if hasattr(self.controller, 'get_clock'):
+            return self.controller.get_clock()
+        return real_clock
+    
+    def get_session(self) -> Session:
+        """Get the controller's work/break session, or a private one without one."""
+        if hasattr(self.controller, 'get_session'):
+            return self.controller.get_session()
+        settings = self.get_settings_snapshot()
+        return Session(settings.work_duration * 60, settings.break_duration * 60,
+                       settings.long_break_duration * 60, settings.sessions_before_long_break,
+                       service=self.get_timer_service())
+    
+    def get_timer_service(self) -> TimerService:
+        """Get the controller's timer service, or the shared one without one."""
+        if hasattr(self.controller, 'get_timer_service'):
+            return self.controller.get_timer_service()
+        return get_timer_service()
+    
+    def subscribe_to_model_events(self) -> None:
+        """Refresh the labels and timer when the timeline or settings change."""
+        get_event_bus = getattr(self.controller, 'get_event_bus', None)
+        if get_event_bus is None:
+            print("DEBUG: Event bus not available, model events not subscribed.")
+            return
+        event_bus = get_event_bus()
+        dispatcher = tk_dispatcher(self)
+        self._event_unsubscribers = [
+            event_bus.subscribe(TimelineEvent, self.on_timeline_changed, dispatcher),
+            event_bus.subscribe(SettingChanged, self.on_setting_changed, dispatcher),
+            event_bus.subscribe(UserReturned, self.on_user_returned, dispatcher),
+        ]
+    
+    def on_timeline_changed(self, event: TimelineEvent) -> None:
+        """Update the next break label after a timeline change."""
         self.refresh_next_break_label()
     
+    def on_user_returned(self, event: UserReturned) -> None:
+        """Close a waiting break popup when the user was away for as long as the break."""
+        settings = self.get_settings_snapshot()
+        if not settings.idle_detection or event.idle < settings.break_duration * 60:
+            return
+        popup = self.break_popup
+        try:
+            if popup is not None and popup.winfo_exists() and not popup.break_completed:
+                popup.close_idle_break()
+        except Exception as e:
+            logger.error(f"Could not close break popup after idle: {e}")
+    
+    def on_setting_changed(self, event: SettingChanged) -> None:
+        """Apply a changed work duration to the timer."""
+        if event.key == 'work_duration':
+            self.refresh_timer_settings()
+    
+    @property
+    def timer_running(self) -> bool:
+        """Whether a work period is counting down."""
+        return self.session.phase == WORK and self.session.running
+    
+    @property
+    def timer_duration(self) -> float:
+        """Length of the current session phase in seconds."""
+        return self.session.duration
+    
+    @property
+    def timer_remaining(self) -> float:
+        """Seconds left in the current session phase, read from the clock."""
+        return self.session.remaining
+    
     def toggle_timer(self) -> None:
         """Toggle timer start/stop."""
         if self.timer_running:
@@ -226,50 +312,49 @@ class MainWindow(ctk.CTk):
             self.start_timer()
     
     def start_timer(self) -> None:
-        """Start the timer."""
+        """Start the timer; starting work ends a break."""
         if not self.timer_running:
-            self.timer_running = True
-            self.timer_start_time = datetime.now()
-            self.start_button.configure(text="⏸️ Stop")
-            self.status_label.configure(text="💼 Working...", text_color=("#1565C0", "#42A5F5"))
-            
-            # Start timer thread
-            self.timer_thread = threading.Thread(target=self.timer_loop, daemon=True)
-            self.timer_thread.start()
+            self.session.end_break()
+            self.session.start()
+            self.timer_start_time = self.get_clock().now()
+            self.update_status()
     
     def stop_timer(self) -> None:
         """Stop the timer."""
         if self.timer_running:
-            self.timer_running = False
-            self.start_button.configure(text="▶️ Start Work")
-            self.status_label.configure(text="⏸️ Paused", text_color=("#F57C00", "#FF9800"))
+            self.session.pause()
+            self.update_status()
     
     def reset_timer(self) -> None:
         """Reset the timer."""
-        self.stop_timer()
-        self.timer_remaining = self.timer_duration
+        self.session.end_break()
+        self.session.reset()
         self.update_timer_display()
         self.progress_bar.set(0)
-        self.status_label.configure(text="🎯 Ready", text_color=("#2E7D32", "#4CAF50"))
+        self.update_status()
     
-    def timer_loop(self) -> None:
-        """Timer loop running in separate thread."""
-        while self.timer_running and int(self.timer_remaining) > 0:
-            time.sleep(1)
-            self.timer_remaining -= 1
-            
-            # Update UI in main thread
-            self.after(0, self.update_timer_display)
-        
-        if self.timer_running:
-            # Timer finished
-            self.after(0, self.timer_finished)
+    def update_status(self) -> None:
+        """Show the session phase in the status label and the start button."""
+        state = self.session.state
+        if state.phase != WORK:
+            self.start_button.configure(text="▶️ Start Work")
+            self.status_label.configure(text="🎉 Break time!", text_color=("#D32F2F", "#F44336"))
+        elif state.running:
+            self.start_button.configure(text="⏸️ Stop")
+            self.status_label.configure(text="💼 Working...", text_color=("#1565C0", "#42A5F5"))
+        elif state.remaining < state.duration:
+            self.start_button.configure(text="▶️ Start Work")
+            self.status_label.configure(text="⏸️ Paused", text_color=("#F57C00", "#FF9800"))
+        else:
+            self.start_button.configure(text="▶️ Start Work")
+            self.status_label.configure(text="🎯 Ready", text_color=("#2E7D32", "#4CAF50"))
     
     def update_timer_display(self) -> None:
         """Update timer display."""
         if not self.winfo_exists():  # Check if the window exists
             return
-        timer_remaining = int(self.timer_remaining)
+        # Round up so a tick delivered just after a second boundary shows that second
+        timer_remaining = math.ceil(self.timer_remaining - 0.001)
         timer_duration = int(self.timer_duration)
         minutes = timer_remaining // 60
         seconds = timer_remaining % 60
@@ -282,19 +367,30 @@ class MainWindow(ctk.CTk):
         else:
             self.progress_bar.set(0)
     
-    def timer_finished(self) -> None:
-        """Handle timer completion."""
-        self.timer_running = False
-        self.start_button.configure(text="▶️ Start Work")
-        self.status_label.configure(text="🎉 Break time!", text_color=("#D32F2F", "#F44336"))
-        
-        # Reset timer to prevent continuous triggering
-        self.timer_remaining = self.timer_duration
+    def on_session_changed(self, event: SessionChanged) -> None:
+        """Render the session, and raise a break when a work period runs out."""
+        if not self.winfo_exists():
+            return
+        if event.transition == FINISH and event.previous.phase == WORK:
+            self.timer_finished(event)
+        elif event.transition == RESTORE and event.state.phase in BREAK_PHASES and event.state.remaining > 0:
+            # The app was restarted during a break; still on it unless it ran out since
+            if self.session.phase == event.state.phase:
+                self.show_restored_break(event.state)
+        self.update_status()
         self.update_timer_display()
-        self.progress_bar.set(0)
+    
+    def timer_finished(self, event: SessionChanged) -> None:
+        """Handle timer completion."""
+        if event.missed and self.get_settings_snapshot().restart_work_after_sleep:
+            # The work period ran out while suspended; being away was the break
+            logger.info("Work timer ran out while suspended, starting a new work period")
+            self.session.end_break()
+            self.session.start()
+            return
         
         # Show break notification
-        self.show_break_notification()
+        self.show_break_notification(event.state.phase)
     
     def refresh_next_break_label(self):
         """Show only: Next Scheduled break: Today/Tomorrow at xx:xx (xmin/mins) or 'No break scheduled'."""
@@ -302,7 +398,7 @@ class MainWindow(ctk.CTk):
             next_break = self.controller.get_next_break()
             if next_break:
                 break_slot, occurrence_time = next_break
-                now = datetime.now()
+                now = self.get_clock().now()
                 if occurrence_time.date() == now.date():
                     date_str = "Today"
                 elif occurrence_time.date() == now.date() + timedelta(days=1):
@@ -321,145 +417,80 @@ class MainWindow(ctk.CTk):
             print(f"DEBUG: Error in refresh_next_break_label: {e}")
 
     def start_timeline_monitor(self) -> None:
-        """Start monitoring timeline for upcoming breaks (scheduled breaks)."""
+        """Start the scheduler that fires scheduled breaks at their exact time."""
         if not self.controller:
             print("DEBUG: Controller not available, timeline monitor not started.")
             return
-        def monitor_loop():
-            last_popup_timestamp = None
-            last_occurrence_time = None
-            last_break_id = None
-            
-            print("DEBUG: Timeline monitor started")
-            
-            while True:
-                try:
-                    # Get next break from timeline
-                    next_break = self.controller.get_next_break()
-                    
-                    if next_break:
-                        orig_break_slot, occurrence_time = next_break
-                        self.current_break_slot = orig_break_slot
-                        self.next_break_time = occurrence_time
-                        now = datetime.now()
-                        
-                        # Generate unique break ID
-                        break_id = getattr(orig_break_slot, 'id', None) or f"{occurrence_time.timestamp()}_{orig_break_slot.duration}"
-                        
-                        print(f"DEBUG: Next break found - ID: {break_id}, Time: {occurrence_time}, Now: {now}")
-                        
-                        # Reset popup tracking if this is a new break
-                        if last_occurrence_time is None or occurrence_time != last_occurrence_time or last_break_id != break_id:
-                            last_popup_timestamp = None
-                            last_occurrence_time = occurrence_time
-                            last_break_id = break_id
-                            print(f"DEBUG: New break detected, reset popup tracking")
-                        
-                        # Check if it's time to show the break (with 30-second tolerance)
-                        time_diff = (occurrence_time - now).total_seconds()
-                        if time_diff <= 30 and time_diff >= -30:  # Show break within 30 seconds of scheduled time
-                            occ_ts = occurrence_time.timestamp()
-                            if last_popup_timestamp != occ_ts:
-                                print(f"DEBUG: Time to show scheduled break! Time diff: {time_diff} seconds")
-                                
-                                # Prepare break slot with proper duration
-                                duration = getattr(orig_break_slot, 'duration', None)
-                                if duration is None or duration <= 0:
-                                    settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-                                    duration = int(settings.get('break_duration', 5))
-                                
-                                # Create a copy of the break slot with proper attributes
-                                class ScheduledBreakSlot:
-                                    def __init__(self):
-                                        self.scheduled = True
-                                
-                                break_slot = ScheduledBreakSlot()
-                                
-                                # Copy all attributes from original break slot
-                                for attr in ['start_time', 'duration', 'message', 'repeat_pattern', 'enabled', 'id']:
-                                    if hasattr(orig_break_slot, attr):
-                                        setattr(break_slot, attr, getattr(orig_break_slot, attr))
-                                
-                                # Ensure duration is set
-                                break_slot.duration = duration
-                                
-                                # For scheduled breaks, preserve the timeline custom message if it exists
-                                # Only use preferences message as fallback if no timeline message is set
-                                timeline_message = getattr(orig_break_slot, 'message', None)
-                                if timeline_message and timeline_message.strip():
-                                    # Use the custom message from timeline
-                                    break_slot.message = timeline_message
-                                    print(f"DEBUG: Using timeline custom message: {timeline_message}")
-                                else:
-                                    # No timeline message, use preferences message as fallback
-                                    settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-                                    preferences_message = settings.get('break_message', None)
-                                    if preferences_message and preferences_message.strip():
-                                        break_slot.message = preferences_message
-                                        print(f"DEBUG: Using preferences message as fallback: {preferences_message}")
-                                    else:
-                                        # No custom messages, use default
-                                        break_slot.message = f"Time for your {duration}-minute break!"
-                                        print(f"DEBUG: Using default message")
-                                
-                                # Show the scheduled break popup
-                                def show_scheduled_break():
-                                    try:
-                                        print("DEBUG: Creating scheduled BreakPopup")
-                                        
-                                        # Show system notification if enabled
-                                        settings = self.controller.get_settings() if hasattr(self.controller, 'get_settings') else {}
-                                        system_notifications = settings.get('system_notifications', True)
-                                        if system_notifications:
-                                            try:
-                                                platform_utils = self.controller.get_platform_utils()
-                                                # Use the custom message from the scheduled break if available
-                                                notification_message = getattr(break_slot, 'message', None)
-                                                if not notification_message or not notification_message.strip():
-                                                    notification_message = f"Time for your {break_slot.duration}-minute break!"
-                                                platform_utils.show_system_notification("Scheduled Break", notification_message)
-                                                print("DEBUG: System notification shown for scheduled break")
-                                            except Exception as e:
-                                                print(f"DEBUG: Could not show system notification: {e}")
-                                        
-                                        # Pause work timer if it's running when scheduled break appears
-                                        was_timer_running = self.timer_running
-                                        if self.timer_running:
-                                            print("DEBUG: Pausing work timer for scheduled break")
-                                            self.stop_timer()
-                                        
-                                        from src.views.break_popup import BreakPopup
-                                        popup = BreakPopup(self, self.controller)
-                                        popup.set_break_info(break_slot, occurrence_time, manual_break=False, was_timer_running=was_timer_running)
-                                        print("DEBUG: Scheduled BreakPopup created successfully")
-                                    except Exception as e:
-                                        print(f"DEBUG: Error creating scheduled break popup: {e}")
-                                
-                                # Schedule popup creation on main thread
-                                self.after(0, show_scheduled_break)
-                                last_popup_timestamp = occ_ts
-                                print(f"DEBUG: Scheduled break popup queued for display")
-                        else:
-                            if time_diff > 30:
-                                print(f"DEBUG: Break scheduled in {time_diff:.0f} seconds")
-                    else:
-                        print("DEBUG: No scheduled breaks found")
-                    
-                    # Update the next break label
-                    self.after(0, self.refresh_next_break_label)
-                    
-                    # Sleep for 5 seconds before checking again
-                    time.sleep(5)
-                    
-                except Exception as e:
-                    print(f"DEBUG: Timeline monitor error: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    time.sleep(30)  # Wait longer on error
+        print("DEBUG: Starting break scheduler for scheduled breaks")
+        self.break_scheduler = BreakScheduler(
+            self.controller.get_timeline_manager(),
+            on_break_due=self.on_scheduled_break_due,
+            on_next_break=self.on_next_break_changed,
+            clock=self.get_clock(),
+            missed_policy=lambda: self.get_settings_snapshot().missed_break_policy,
+        )
+        self.break_scheduler.start()
+    
+    def stop_timeline_monitor(self) -> None:
+        """Stop the break scheduler."""
+        scheduler = getattr(self, 'break_scheduler', None)
+        if scheduler is not None:
+            scheduler.stop()
+    
+    def on_next_break_changed(self, next_break) -> None:
+        """Track the upcoming break and refresh its label (scheduler thread)."""
+        if next_break:
+            self.current_break_slot, self.next_break_time = next_break
+        self.after(0, self.refresh_next_break_label)
+    
+    def on_scheduled_break_due(self, orig_break_slot, occurrence_time) -> None:
+        """Prepare and show the popup for a scheduled break (scheduler thread).
+        
+        Args:
+            orig_break_slot: Break slot that fell due
+            occurrence_time: When the break was scheduled
+        """
+        print(f"DEBUG: Time to show scheduled break at {occurrence_time}, now {self.get_clock().now()}")
+        if hasattr(self.controller, 'record_break_event'):
+            self.controller.record_break_event(SCHEDULED, orig_break_slot, "scheduled", occurrence_time,
+                                               occurrence=occurrence_time)
+        
+        # Timeline message first, then the preferences message, then a default
+        break_slot = self.break_manager.scheduled_break(orig_break_slot)
+        print(f"DEBUG: Scheduled break message: {break_slot.message}")
+        
+        # Show the scheduled break popup
+        def show_scheduled_break():
+            try:
+                print("DEBUG: Creating scheduled BreakPopup")
+                
+                # Show system notification if enabled
+                if self.get_settings_snapshot().system_notifications:
+                    try:
+                        platform_utils = self.controller.get_platform_utils()
+                        # Use the custom message from the scheduled break if available
+                        notification_message = getattr(break_slot, 'message', None)
+                        if not notification_message or not notification_message.strip():
+                            notification_message = f"Time for your {break_slot.duration}-minute break!"
+                        platform_utils.show_system_notification("Scheduled Break", notification_message)
+                        print("DEBUG: System notification shown for scheduled break")
+                    except Exception as e:
+                        print(f"DEBUG: Could not show system notification: {e}")
+                
+                # Pause work timer if it's running when scheduled break appears
+                was_timer_running = self.timer_running
+                if self.timer_running:
+                    print("DEBUG: Pausing work timer for scheduled break")
+                    self.stop_timer()
+                
+                self.show_break_popup(break_slot, occurrence_time, manual_break=False, was_timer_running=was_timer_running)
+                print("DEBUG: Scheduled BreakPopup created successfully")
+            except Exception as e:
+                print(f"DEBUG: Error creating scheduled break popup: {e}")
         
-        print("DEBUG: Starting timeline monitor thread for scheduled breaks")
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
+        # Schedule popup creation on main thread
+        self.after(0, show_scheduled_break)
+        print(f"DEBUG: Scheduled break popup queued for display")
     
     def force_refresh_next_break(self) -> None:
         """Force an immediate refresh of the next break label."""
@@ -468,13 +499,11 @@ class MainWindow(ctk.CTk):
             if next_break:
                 break_slot, occurrence_time = next_break
                 time_str = occurrence_time.strftime("%H:%M")
-                # Ensure scheduled attribute is present for timeline breaks
-                if not hasattr(break_slot, 'scheduled'):
-                    break_slot.scheduled = True
-                label_type = 'scheduled' if getattr(break_slot, 'scheduled', False) else 'default'
+                # Timeline breaks are scheduled unless they say otherwise
+                label_type = 'scheduled' if getattr(break_slot, 'scheduled', True) else 'default'
                 
                 # Check if the break is today or tomorrow
-                now = datetime.now()
+                now = self.get_clock().now()
                 if occurrence_time.date() == now.date():
                     date_str = "Today"
                 elif occurrence_time.date() == now.date() + timedelta(days=1):
@@ -497,7 +526,7 @@ class MainWindow(ctk.CTk):
             next_break = self.controller.get_next_break()
             if next_break:
                 break_slot, occurrence_time = next_break
-                now = datetime.now()
+                now = self.get_clock().now()
                 if occurrence_time.date() == now.date():
                     date_str = "Today"
                 elif occurrence_time.date() == now.date() + timedelta(days=1):
@@ -1,6 +1,13 @@
 import customtkinter as ctk
 from typing import Optional
-from src.models.settings import SettingsManager
+from src.models.settings import SETTING_DEFAULTS, SettingsManager
+
+# Choices for breaks that fell due while the computer was asleep
+MISSED_BREAK_LABELS = {
+    "skip": "Skip them",
+    "one": "Show the first one",
+    "latest": "Show the latest one",
+}
 
 class PreferencesPage(ctk.CTkFrame):
     """Preferences interface view - Timer settings only."""
@@ -9,6 +16,8 @@ class PreferencesPage(ctk.CTkFrame):
         print("DEBUG: Entering PreferencesPage.__init__")
         super().__init__(master)
         self.controller = controller
+        # Input widget for each setting, so locked ones can be made read-only
+        self.setting_widgets = {}
         try:
             print("DEBUG: Calling setup_ui")
             self.setup_ui()
@@ -112,22 +121,61 @@ class PreferencesPage(ctk.CTkFrame):
         self.work_duration_var = ctk.StringVar(value="20")
         work_entry = ctk.CTkEntry(timer_frame, textvariable=self.work_duration_var, width=100)
         work_entry.grid(row=1, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['work_duration'] = work_entry
         
         break_label = ctk.CTkLabel(timer_frame, text="Default Break Duration (minutes):", wraplength=300)
         break_label.grid(row=2, column=0, padx=(15, 10), pady=5, sticky="w")
         self.break_duration_var = ctk.StringVar(value="1")
         break_entry = ctk.CTkEntry(timer_frame, textvariable=self.break_duration_var, width=100)
         break_entry.grid(row=2, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['break_duration'] = break_entry
         
         # Add default break message input field
         default_break_message_label = ctk.CTkLabel(timer_frame, text="Default Break Message:", wraplength=300)
         default_break_message_label.grid(row=3, column=0, padx=(15, 10), pady=5, sticky="w")
         self.default_break_message_textbox = ctk.CTkTextbox(timer_frame, height=80)
         self.default_break_message_textbox.grid(row=3, column=1, padx=(0, 15), pady=5, sticky="ew")
+        self.setting_widgets['default_break_message'] = self.default_break_message_textbox
         
         self.auto_start_var = ctk.BooleanVar(value=False)
         auto_start_check = ctk.CTkCheckBox(timer_frame, text="Auto-start next session", variable=self.auto_start_var)
         auto_start_check.grid(row=4, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['auto_start'] = auto_start_check
+        
+        missed_label = ctk.CTkLabel(timer_frame, text="Breaks missed while asleep:", wraplength=300)
+        missed_label.grid(row=5, column=0, padx=(15, 10), pady=5, sticky="w")
+        self.missed_break_policy_var = ctk.StringVar(value=MISSED_BREAK_LABELS[SETTING_DEFAULTS['missed_break_policy']])
+        missed_menu = ctk.CTkOptionMenu(timer_frame, variable=self.missed_break_policy_var,
+                                        values=list(MISSED_BREAK_LABELS.values()))
+        missed_menu.grid(row=5, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['missed_break_policy'] = missed_menu
+        
+        self.restart_work_after_sleep_var = ctk.BooleanVar(value=SETTING_DEFAULTS['restart_work_after_sleep'])
+        restart_check = ctk.CTkCheckBox(timer_frame, text="Start a new work session if it ended while asleep",
+                                        variable=self.restart_work_after_sleep_var)
+        restart_check.grid(row=6, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['restart_work_after_sleep'] = restart_check
+        
+        long_break_label = ctk.CTkLabel(timer_frame, text="Long Break Duration (minutes):", wraplength=300)
+        long_break_label.grid(row=7, column=0, padx=(15, 10), pady=5, sticky="w")
+        self.long_break_duration_var = ctk.StringVar(value=str(SETTING_DEFAULTS['long_break_duration']))
+        long_break_entry = ctk.CTkEntry(timer_frame, textvariable=self.long_break_duration_var, width=100)
+        long_break_entry.grid(row=7, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['long_break_duration'] = long_break_entry
+        
+        sessions_label = ctk.CTkLabel(timer_frame, text="Work sessions before a long break (0 for never):",
+                                      wraplength=300)
+        sessions_label.grid(row=8, column=0, padx=(15, 10), pady=5, sticky="w")
+        self.sessions_before_long_break_var = ctk.StringVar(value=str(SETTING_DEFAULTS['sessions_before_long_break']))
+        sessions_entry = ctk.CTkEntry(timer_frame, textvariable=self.sessions_before_long_break_var, width=100)
+        sessions_entry.grid(row=8, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['sessions_before_long_break'] = sessions_entry
+        
+        self.idle_detection_var = ctk.BooleanVar(value=SETTING_DEFAULTS['idle_detection'])
+        idle_check = ctk.CTkCheckBox(timer_frame, text="Pause work while I'm away; count absences as long as a break as breaks",
+                                     variable=self.idle_detection_var)
+        idle_check.grid(row=9, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+        self.setting_widgets['idle_detection'] = idle_check
     
     def create_custom_message(self, parent, row):
         message_frame = ctk.CTkFrame(parent)
@@ -142,12 +190,14 @@ class PreferencesPage(ctk.CTkFrame):
         self.manual_break_duration_var = ctk.StringVar(value="15")
         custom_break_duration_entry = ctk.CTkEntry(message_frame, textvariable=self.manual_break_duration_var, width=100)
         custom_break_duration_entry.grid(row=1, column=1, padx=(0, 15), pady=5, sticky="w")
+        self.setting_widgets['manual_break_duration'] = custom_break_duration_entry
         
         # Custom break message
         message_label = ctk.CTkLabel(message_frame, text="Custom Break Message:", wraplength=300)
         message_label.grid(row=2, column=0, padx=(15, 10), pady=5, sticky="w")
         self.break_message_textbox = ctk.CTkTextbox(message_frame, height=100)
         self.break_message_textbox.grid(row=2, column=1, padx=(0, 15), pady=5, sticky="ew")
+        self.setting_widgets['break_message'] = self.break_message_textbox
 
     def create_buttons(self, parent, row):
         buttons_frame = ctk.CTkFrame(parent)
@@ -180,6 +230,8 @@ class PreferencesPage(ctk.CTkFrame):
             self.manual_break_duration_var.set("15")
             self.auto_start_var.set(False)
             self.break_message_textbox.insert("1.0", "Time for a break!")
+            self.set_sleep_defaults()
+            self.set_cycle_defaults()
             
             if settings:
                 print("DEBUG: work_duration type:", type(settings.get('work_duration')))
@@ -226,6 +278,17 @@ class PreferencesPage(ctk.CTkFrame):
                     self.auto_start_var.set(bool(settings.get('auto_start', False)))
                     print(f"DEBUG: Set auto_start to {settings.get('auto_start')}")
                 
+                if settings.get('missed_break_policy') in MISSED_BREAK_LABELS:
+                    self.missed_break_policy_var.set(MISSED_BREAK_LABELS[settings['missed_break_policy']])
+                if 'restart_work_after_sleep' in settings:
+                    self.restart_work_after_sleep_var.set(bool(settings['restart_work_after_sleep']))
+                if 'idle_detection' in settings:
+                    self.idle_detection_var.set(bool(settings['idle_detection']))
+                for key, var in (('long_break_duration', self.long_break_duration_var),
+                                 ('sessions_before_long_break', self.sessions_before_long_break_var)):
+                    if settings.get(key) is not None:
+                        var.set(str(settings[key]))
+                
                 if 'default_break_message' in settings:
                     self.default_break_message_textbox.delete("1.0", "end")
                     self.default_break_message_textbox.insert("1.0", settings['default_break_message'])
@@ -246,6 +309,41 @@ class PreferencesPage(ctk.CTkFrame):
             self.manual_break_duration_var.set("15")
             self.auto_start_var.set(False)
             self.break_message_textbox.insert("1.0", "Time for a break!")
+            self.set_sleep_defaults()
+            self.set_cycle_defaults()
+        self.apply_locked_settings()
+    
+    def apply_locked_settings(self) -> None:
+        """Show settings locked by the administrator with their enforced value, read-only."""
+        if not hasattr(self.controller, 'get_locked_settings'):
+            return
+        locked = self.controller.get_locked_settings()
+        if not locked:
+            return
+        settings = self.controller.get_settings()
+        variables = {
+            'work_duration': self.work_duration_var,
+            'break_duration': self.break_duration_var,
+            'manual_break_duration': self.manual_break_duration_var,
+            'auto_start': self.auto_start_var,
+            'restart_work_after_sleep': self.restart_work_after_sleep_var,
+            'idle_detection': self.idle_detection_var,
+            'long_break_duration': self.long_break_duration_var,
+            'sessions_before_long_break': self.sessions_before_long_break_var,
+        }
+        for key, widget in self.setting_widgets.items():
+            if key not in locked:
+                continue
+            value = settings.get(key)
+            if key in variables:
+                variables[key].set(bool(value) if isinstance(variables[key], ctk.BooleanVar) else str(value))
+            elif key == 'missed_break_policy':
+                self.missed_break_policy_var.set(MISSED_BREAK_LABELS.get(value, value))
+            else:
+                widget.configure(state="normal")
+                widget.delete("1.0", "end")
+                widget.insert("1.0", str(value))
+            widget.configure(state="disabled")
     
     def save_preferences(self) -> None:
         try:
@@ -265,6 +363,9 @@ class PreferencesPage(ctk.CTkFrame):
             work_duration = int(work_duration_str)
             break_duration = int(break_duration_str)
             manual_break_duration = int(manual_break_duration_str)
+            long_break_duration = int(self.long_break_duration_var.get().strip() or SETTING_DEFAULTS['long_break_duration'])
+            sessions_before_long_break = int(self.sessions_before_long_break_var.get().strip()
+                                             or SETTING_DEFAULTS['sessions_before_long_break'])
             
             # Validate ranges
             if work_duration < 1 or work_duration > 480:  # 1 minute to 8 hours
@@ -273,6 +374,10 @@ class PreferencesPage(ctk.CTkFrame):
                 raise ValueError("Break duration must be between 1 and 120 minutes")
             if manual_break_duration < 1 or manual_break_duration > 120:  # 1 minute to 2 hours
                 raise ValueError("Manual break duration must be between 1 and 120 minutes")
+            if long_break_duration < 1 or long_break_duration > 240:  # 1 minute to 4 hours
+                raise ValueError("Long break duration must be between 1 and 240 minutes")
+            if sessions_before_long_break < 0 or sessions_before_long_break > 100:
+                raise ValueError("Work sessions before a long break must be between 0 and 100")
             
             preferences = {
                 'work_duration': work_duration,
@@ -280,7 +385,12 @@ class PreferencesPage(ctk.CTkFrame):
                 'default_break_message': self.default_break_message_textbox.get("1.0", "end-1c"),
                 'manual_break_duration': manual_break_duration,
                 'auto_start': bool(self.auto_start_var.get()),
-                'break_message': self.break_message_textbox.get("1.0", "end-1c")
+                'break_message': self.break_message_textbox.get("1.0", "end-1c"),
+                'missed_break_policy': self.get_missed_break_policy(),
+                'restart_work_after_sleep': bool(self.restart_work_after_sleep_var.get()),
+                'idle_detection': bool(self.idle_detection_var.get()),
+                'long_break_duration': long_break_duration,
+                'sessions_before_long_break': sessions_before_long_break,
             }
             print(f"DEBUG: Saving preferences: {preferences}")
             self.controller.save_settings(preferences)
@@ -288,14 +398,7 @@ class PreferencesPage(ctk.CTkFrame):
             print("DEBUG: Closing preferences window...")
             import tkinter.messagebox as messagebox
             messagebox.showinfo("Success", "Preferences saved successfully!")
-            
-            # Refresh timer settings in main window
-            try:
-                if hasattr(self.controller, 'main_window_ref'):
-                    self.controller.main_window_ref.refresh_timer_settings()
-                    print("DEBUG: Timer settings refreshed")
-            except Exception as e:
-                print(f"DEBUG: Error refreshing timer settings: {e}")
+            # The main window picks up a changed work duration from the settings events
             
             self.master.destroy()
             print("DEBUG: Preferences window closed")
@@ -313,6 +416,28 @@ class PreferencesPage(ctk.CTkFrame):
         self.auto_start_var.set(False)
         self.break_message_textbox.delete("1.0", "end")
         self.break_message_textbox.insert("1.0", "Time for a break!")
+        self.set_sleep_defaults()
+        self.set_cycle_defaults()
+        self.apply_locked_settings()
+    
+    def set_sleep_defaults(self) -> None:
+        """Reset the suspend/resume and idle options to their defaults."""
+        self.missed_break_policy_var.set(MISSED_BREAK_LABELS[SETTING_DEFAULTS['missed_break_policy']])
+        self.restart_work_after_sleep_var.set(SETTING_DEFAULTS['restart_work_after_sleep'])
+        self.idle_detection_var.set(SETTING_DEFAULTS['idle_detection'])
+    
+    def set_cycle_defaults(self) -> None:
+        """Reset the long break options to their defaults."""
+        self.long_break_duration_var.set(str(SETTING_DEFAULTS['long_break_duration']))
+        self.sessions_before_long_break_var.set(str(SETTING_DEFAULTS['sessions_before_long_break']))
+    
+    def get_missed_break_policy(self) -> str:
+        """Get the missed break policy chosen in the menu."""
+        label = self.missed_break_policy_var.get()
+        for policy, policy_label in MISSED_BREAK_LABELS.items():
+            if policy_label == label:
+                return policy
+        return SETTING_DEFAULTS['missed_break_policy']
     
     def cancel_preferences(self) -> None:
         self.master.destroy()
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from typing import Optional, List, Callable
 from src.models.timeline_manager import TimelineManager, BreakSlot
+from src.models.events import TimelineEvent, tk_dispatcher
 from datetime import datetime, time
 import tkinter.messagebox as messagebox
 
@@ -18,6 +19,26 @@ class TimelinePage(ctk.CTkFrame):
         self.setup_ui()
         self.bind_all_mousewheel()
         self.refresh_timeline()
+        # Redraw whenever the timeline changes, whoever changed it
+        self._refresh_pending = False
+        self._unsubscribe_timeline = self.timeline_manager.events.subscribe(
+            TimelineEvent, self.on_timeline_changed, tk_dispatcher(self))
+    
+    def on_timeline_changed(self, event: TimelineEvent) -> None:
+        """Schedule one redraw for a burst of timeline events, e.g. a reload from disk."""
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        self.after_idle(self._refresh_from_event)
+    
+    def _refresh_from_event(self) -> None:
+        self._refresh_pending = False
+        self.refresh_timeline()
+    
+    def destroy(self) -> None:
+        """Stop listening for timeline changes and destroy the page."""
+        self._unsubscribe_timeline()
+        super().destroy()
     
     def bind_all_mousewheel(self):
         # Windows/macOS
@@ -227,10 +248,6 @@ ID: {slot.id}"""
         try:
             print(f"DEBUG: Adding break slot: {start_time}, {duration}, {message}, {repeat_pattern}")
             self.timeline_manager.add_break_slot(start_time, duration, message, repeat_pattern)
-            self.refresh_timeline()
-            if hasattr(self.controller, 'main_window_ref'):
-                print("DEBUG: Calling main_window_ref.force_refresh_next_break() after add_break_slot")
-                self.controller.main_window_ref.force_refresh_next_break()
         except ValueError as e:
             self.show_error("Error", str(e))
     
@@ -246,10 +263,6 @@ ID: {slot.id}"""
                 message=message,
                 repeat_pattern=repeat_pattern
             )
-            self.refresh_timeline()
-            if hasattr(self.controller, 'main_window_ref'):
-                print("DEBUG: Calling main_window_ref.force_refresh_next_break() after edit_break_slot")
-                self.controller.main_window_ref.force_refresh_next_break()
         except ValueError as e:
             self.show_error("Error", str(e))
     
@@ -264,10 +277,6 @@ ID: {slot.id}"""
                 self.selected_slot = None
                 self.edit_button.configure(state="disabled")
                 self.delete_button.configure(state="disabled")
-                self.refresh_timeline()
-                if hasattr(self.controller, 'main_window_ref'):
-                    print("DEBUG: Calling main_window_ref.force_refresh_next_break() after delete_selected_slot")
-                    self.controller.main_window_ref.force_refresh_next_break()
                 return True
         return False
     
@@ -0,0 +1,125 @@
+import pytest
+from datetime import date, datetime, timedelta
+from src.models.break_history import (COMPLETED, SCHEDULED, SHOWN, SKIPPED, SNOOZED, STARTED,
+                                      BreakHistory, Compliance, week_start)
+
+
+@pytest.fixture
+def history(temp_dir):
+    history = BreakHistory(temp_dir / "history.db")
+    yield history
+    history.close()
+
+
+def record_break(history, when, outcome, slot_id="0900_15_daily", duration=15, delay=60):
+    """Record a scheduled break that was shown, started and then completed or skipped."""
+    started = when + timedelta(seconds=delay)
+    history.record_many([
+        (SCHEDULED, slot_id, when, "scheduled", duration, when),
+        (SHOWN, slot_id, when, "scheduled", duration, when),
+        (STARTED, slot_id, started, "scheduled", duration, when),
+        (outcome, slot_id, started + timedelta(minutes=duration), "scheduled", duration, when),
+    ])
+
+
+class TestBreakHistory:
+    """Test cases for the break history store."""
+
+    def test_events_in_range(self, history):
+        """Test that events come back in time order and can be filtered."""
+        record_break(history, datetime(2024, 3, 4, 9, 0), COMPLETED)
+        history.record(SHOWN, when=datetime(2024, 3, 4, 12, 0), source="manual", duration=5)
+        events = history.events(datetime(2024, 3, 4), datetime(2024, 3, 5))
+        assert [event["kind"] for event in events] == [SCHEDULED, SHOWN, STARTED, COMPLETED, SHOWN]
+        assert events[-1] == {"time": datetime(2024, 3, 4, 12, 0), "kind": SHOWN, "slot_id": None,
+                              "source": "manual", "duration": 5, "occurrence": None}
+        assert events[0]["occurrence"] == datetime(2024, 3, 4, 9, 0)
+        assert len(history.events(datetime(2024, 3, 4), datetime(2024, 3, 5), kind=SHOWN)) == 2
+        assert len(history.events(datetime(2024, 3, 4), datetime(2024, 3, 5), slot_id="0900_15_daily")) == 4
+        assert history.events(datetime(2024, 3, 5), datetime(2024, 3, 6)) == []
+
+    def test_unknown_kind(self, history):
+        """Test that unknown event kinds are rejected without recording anything."""
+        with pytest.raises(ValueError):
+            history.record_many([(SHOWN, None, None, None, None), ("dismissed", None, None, None, None)])
+        assert history.daily_compliance(date.today(), date.today())[0].shown == 0
+
+    def test_daily_compliance(self, history):
+        """Test per-day counts, completed minutes and compliance rate."""
+        record_break(history, datetime(2024, 3, 4, 9, 0), COMPLETED)
+        record_break(history, datetime(2024, 3, 4, 14, 0), SKIPPED)
+        history.record(SNOOZED, "0900_15_daily", datetime(2024, 3, 4, 14, 5))
+        record_break(history, datetime(2024, 3, 6, 9, 0), COMPLETED, duration=10)
+        days = history.daily_compliance(date(2024, 3, 4), date(2024, 3, 6))
+        assert days[0] == Compliance(date(2024, 3, 4), 1, scheduled=2, shown=2, started=2,
+                                     completed=1, skipped=1, snoozed=1, break_minutes=15,
+                                     delays=2, delay_seconds=120)
+        assert days[0].rate == 0.5 and days[0].skip_rate == 0.5 and days[0].average_delay == 60
+        assert days[1] == Compliance(date(2024, 3, 5)) and days[1].rate is None
+        assert days[2].rate == 1.0 and days[2].break_minutes == 10
+
+    def test_weekly_compliance(self, history):
+        """Test that weeks run Monday to Sunday and cover partial ranges."""
+        record_break(history, datetime(2024, 3, 3, 9, 0), SKIPPED)     # Sunday
+        record_break(history, datetime(2024, 3, 4, 9, 0), COMPLETED)   # Monday
+        record_break(history, datetime(2024, 3, 10, 23, 0), COMPLETED)  # Sunday
+        record_break(history, datetime(2024, 12, 30, 9, 0), COMPLETED)  # ISO week 1 of 2025
+        weeks = history.weekly_compliance(date(2024, 3, 6), date(2024, 3, 6))
+        assert len(weeks) == 1
+        assert weeks[0].start == date(2024, 3, 4) and weeks[0].days == 7
+        assert (weeks[0].shown, weeks[0].completed, weeks[0].skipped) == (2, 2, 0)
+        assert [week.start for week in history.weekly_compliance(date(2024, 3, 1), date(2024, 3, 11))] == \
+            [date(2024, 2, 26), date(2024, 3, 4), date(2024, 3, 11)]
+        new_year = history.weekly_compliance(date(2025, 1, 1), date(2025, 1, 1))[0]
+        assert new_year.start == date(2024, 12, 30) and new_year.completed == 1
+
+    def test_persists(self, temp_dir):
+        """Test that history survives reopening the database."""
+        history = BreakHistory(temp_dir / "history.db")
+        record_break(history, datetime(2024, 3, 4, 9, 0), COMPLETED)
+        history.close()
+        reopened = BreakHistory(temp_dir / "history.db")
+        assert reopened.daily_compliance(date(2024, 3, 4), date(2024, 3, 4))[0].completed == 1
+        reopened.close()
+
+
+class TestRollups:
+    """Test cases for the incrementally maintained day and week rollups."""
+
+    def rollups(self, history):
+        return history._connection.execute("SELECT * FROM break_rollups ORDER BY period, start").fetchall()
+
+    def test_average_delay_counts_first_start(self, history):
+        """Test that restarting a break does not add another delay sample."""
+        due = datetime(2024, 3, 4, 9, 0)
+        record_break(history, due, COMPLETED, delay=30)
+        history.record(STARTED, "0900_15_daily", due + timedelta(minutes=20), "scheduled", 15, due)
+        record_break(history, datetime(2024, 3, 5, 9, 0), COMPLETED, delay=90)
+        history.record(STARTED, None, datetime(2024, 3, 5, 12, 0), "manual", 5)
+        week = history.weekly_compliance(due.date(), due.date())[0]
+        assert (week.started, week.delays, week.average_delay) == (4, 2, 60)
+
+    def test_rebuild_matches_incremental(self, history):
+        """Test that rebuilding from events reproduces the incremental rollups."""
+        first = datetime(2024, 1, 1, 9, 0)
+        for day in range(40):
+            for hour, outcome in ((9, COMPLETED), (14, SKIPPED)):
+                when = first + timedelta(days=day, hours=hour - 9)
+                record_break(history, when, outcome, delay=day * 10)
+                history.record(STARTED, "0900_15_daily", when + timedelta(hours=1), "scheduled", 15, when)
+        incremental = self.rollups(history)
+        assert len(incremental) == 40 + 6
+        history._connection.execute("UPDATE break_rollups SET completed = 999")
+        history._connection.execute("DELETE FROM break_rollups WHERE period = 'week'")
+        assert history.rebuild_rollups() == 40 * 2 * 5
+        assert self.rollups(history) == incremental
+
+    def test_weeks_match_days(self, history):
+        """Test that each week's counters equal the sum of its days."""
+        for day in range(0, 30, 2):
+            record_break(history, datetime(2024, 5, 1, 10, 0) + timedelta(days=day), COMPLETED)
+        start, end = date(2024, 5, 1), date(2024, 5, 31)
+        days = history.daily_compliance(week_start(start), week_start(end) + timedelta(days=6))
+        for i, week in enumerate(history.weekly_compliance(start, end)):
+            assert week.completed == sum(day.completed for day in days[i * 7:i * 7 + 7])
+            assert week.break_minutes == sum(day.break_minutes for day in days[i * 7:i * 7 + 7])
@@ -0,0 +1,42 @@
+import pytest
+from datetime import time
+from src.models.break_manager import BreakManager
+from src.models.settings import AppSettings
+from src.models.timeline_manager import BreakSlot
+from src.models.timer import LONG_BREAK, SHORT_BREAK
+
+
+@pytest.fixture
+def settings():
+    """Create settings with distinct break lengths and messages."""
+    return AppSettings.from_dict({"break_duration": 5, "long_break_duration": 20, "manual_break_duration": 10,
+                                  "default_break_message": "Stretch", "break_message": "Walk"})
+
+
+class TestBreakManager:
+    """Test cases for working out what each kind of break shows."""
+
+    def test_timer_breaks(self, settings):
+        """Test that breaks after work periods take the short or long length."""
+        manager = BreakManager(lambda: settings)
+        short, long = manager.timer_break(SHORT_BREAK), manager.timer_break(LONG_BREAK)
+        assert (short.duration, short.long, short.message) == (5, False, "Stretch")
+        assert (long.duration, long.long) == (20, True)
+        assert not short.scheduled
+
+    def test_manual_break(self, settings):
+        """Test that Break Now takes the manual length and the preferences message."""
+        info = BreakManager(lambda: settings).manual_break()
+        assert (info.duration, info.message) == (10, "Walk")
+
+    def test_scheduled_break_messages(self, settings):
+        """Test that the slot message wins over the preferences message, then the default."""
+        manager = BreakManager(lambda: settings)
+        slot = BreakSlot(time(10, 0), 15, "Tea", "daily")
+        info = manager.scheduled_break(slot)
+        assert (info.duration, info.message, info.id, info.start_time) == (15, "Tea", slot.id, time(10, 0))
+        assert info.scheduled
+        slot.message = ""
+        assert manager.scheduled_break(slot).message == "Walk"
+        blank = AppSettings.from_dict({"break_message": " "})
+        assert BreakManager(lambda: blank).scheduled_break(slot).message == "Time for your 15-minute break!"
@@ -0,0 +1,108 @@
+import pytest
+import threading
+import time as time_module
+from datetime import datetime, time, timedelta
+from src.models.break_scheduler import BreakScheduler
+from src.models.clock import RealClock
+
+START = datetime(2024, 1, 5, 9, 59, 59)
+
+
+class FakeClock(RealClock):
+    """Wall clock starting at START that follows the monotonic clock and can jump."""
+
+    def __init__(self):
+        self.origin = time_module.monotonic()
+        self.offset = timedelta(0)
+
+    def now(self):
+        return START + self.offset + timedelta(seconds=time_module.monotonic() - self.origin)
+
+    def jump(self, delta):
+        self.offset += delta
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def scheduler(timeline_manager, clock, fired):
+    event = threading.Event()
+
+    def on_break_due(slot, occurrence):
+        fired.append((slot, occurrence, clock.now()))
+        event.set()
+
+    scheduler = BreakScheduler(timeline_manager, on_break_due, clock=clock)
+    scheduler.fired_event = event
+    yield scheduler
+    scheduler.stop()
+
+
+class TestBreakScheduler:
+    """Test cases for BreakScheduler."""
+
+    def test_fires_on_time(self, timeline_manager, scheduler, fired):
+        """Test that a break fires within 100 ms of its start without polling."""
+        slot = timeline_manager.add_break_slot(time(10, 0), 15, "On time", "daily")
+        scheduler.start()
+        assert scheduler.fired_event.wait(3)
+        fired_slot, occurrence, fired_at = fired[0]
+        assert fired_slot is slot
+        assert occurrence == datetime(2024, 1, 5, 10, 0)
+        assert timedelta(0) <= fired_at - occurrence < timedelta(milliseconds=100)
+        assert scheduler.wakeups <= 2
+
+    def test_fires_recent_break_once(self, timeline_manager, scheduler, fired):
+        """Test that a break due within the grace period fires once on start."""
+        timeline_manager.add_break_slot(time(9, 59, 40), 5, "", "daily")
+        scheduler.start()
+        assert scheduler.fired_event.wait(1)
+        time_module.sleep(0.2)
+        assert [occurrence for _, occurrence, _ in fired] == [datetime(2024, 1, 5, 9, 59, 40)]
+
+    def test_timeline_change_wakes_scheduler(self, timeline_manager, scheduler, fired):
+        """Test that adding a slot while sleeping reschedules the wait."""
+        timeline_manager.add_break_slot(time(11, 0), 15, "", "daily")
+        scheduler.start()
+        time_module.sleep(0.1)
+        timeline_manager.add_break_slot(time(10, 0), 15, "Sooner", "daily")
+        assert scheduler.fired_event.wait(3)
+        assert fired[0][0].message == "Sooner"
+
+    def test_clock_jump_reschedules(self, timeline_manager, scheduler, clock, fired):
+        """Test that a wall-clock jump is noticed on the next wake-up."""
+        timeline_manager.add_break_slot(time(10, 30), 15, "Later", "daily")
+        scheduler.start()
+        time_module.sleep(0.1)
+        clock.jump(timedelta(minutes=30))
+        scheduler.wake()
+        assert scheduler.fired_event.wait(3)
+        assert fired[0][1] == datetime(2024, 1, 5, 10, 30)
+
+    def test_next_break_callback(self, timeline_manager, clock):
+        """Test that the upcoming break is reported when it changes."""
+        slot = timeline_manager.add_break_slot(time(12, 0), 15, "", "daily")
+        reported = []
+        reported_event = threading.Event()
+
+        def on_next_break(next_break):
+            reported.append(next_break)
+            reported_event.set()
+
+        scheduler = BreakScheduler(timeline_manager, lambda *args: None,
+                                   on_next_break=on_next_break, clock=clock)
+        scheduler.start()
+        try:
+            assert reported_event.wait(1)
+            assert reported == [(slot, datetime(2024, 1, 5, 12, 0))]
+        finally:
+            scheduler.stop()
+        assert not scheduler.running
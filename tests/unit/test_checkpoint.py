@@ -0,0 +1,116 @@
+import pytest
+from datetime import datetime
+from src.models.checkpoint import SessionCheckpoint
+from src.models.clock import VirtualClock
+from src.models.events import SessionChanged
+from src.models.timer import FINISH, LONG_BREAK, SHORT_BREAK, WORK, Session, SessionState, TimerService
+
+BOOT = b"boot-one".ljust(16, b"\0")
+OTHER_BOOT = b"boot-two".ljust(16, b"\0")
+
+
+@pytest.fixture
+def clock():
+    """Create a virtual clock at nine on a Monday."""
+    return VirtualClock(datetime(2024, 1, 8, 9, 0), monotonic=1000.0)
+
+
+@pytest.fixture
+def path(temp_dir):
+    """Path of the checkpoint file."""
+    return temp_dir / "session.checkpoint"
+
+
+class TestSessionCheckpoint:
+    """Test cases for recording and restoring the session across restarts."""
+
+    def test_paused_state_round_trip(self, path, clock):
+        """Test that a paused state comes back exactly, however long ago it was written."""
+        state = SessionState(LONG_BREAK, 900, 420.5, False, 3, 600)
+        checkpoint = SessionCheckpoint(path, clock, BOOT)
+        checkpoint.save(state)
+        checkpoint.close()
+        clock.run(3600)
+        assert SessionCheckpoint(path, clock, BOOT).load() == state
+        assert path.stat().st_size < 256
+
+    def test_running_state_counts_time_away(self, path, clock):
+        """Test that a running phase loses the time since writing, asleep or not, on the same boot."""
+        SessionCheckpoint(path, clock, BOOT).save(SessionState(WORK, 1500, 1200, True))
+        clock.run(100)
+        clock.suspend(200)
+        clock.step(-5000)  # The wall clock is not used on the same boot
+        assert SessionCheckpoint(path, clock, BOOT).load() == SessionState(WORK, 1500, 900, True)
+
+    def test_other_boot_uses_wall_clock(self, path, clock):
+        """Test that after a reboot the time away is measured on the wall clock."""
+        SessionCheckpoint(path, clock, BOOT).save(SessionState(SHORT_BREAK, 300, 250, True))
+        restarted = VirtualClock(clock.now(), monotonic=5.0)
+        restarted.step(60)
+        assert SessionCheckpoint(path, restarted, OTHER_BOOT).load().remaining == 190
+        restarted.step(-3600)
+        assert SessionCheckpoint(path, restarted, OTHER_BOOT).load().remaining == 250
+
+    def test_torn_write_falls_back(self, path, clock):
+        """Test that a corrupted record is ignored in favour of the one before it."""
+        checkpoint = SessionCheckpoint(path, clock, BOOT)
+        checkpoint.save(SessionState(WORK, 1500, 1500, False))
+        checkpoint.save(SessionState(WORK, 1500, 700, False))
+        checkpoint.close()
+        data = bytearray(path.read_bytes())
+        data[len(data) // 2 - 10] ^= 0xFF  # Second write went to the first slot
+        path.write_bytes(bytes(data))
+        assert SessionCheckpoint(path, clock, BOOT).load().remaining == 1500
+        path.write_bytes(b"\x00" * len(data))
+        assert SessionCheckpoint(path, clock, BOOT).load() is None
+
+    def test_restore_after_crash(self, path, clock):
+        """Test that transitions are recorded and a restart picks up where the session was."""
+        service = TimerService(clock, background=False)
+        session = Session(60, 10, 30, service=service)
+        session.subscribe_ticks(lambda remaining: None)
+        checkpoint = SessionCheckpoint(path, clock, BOOT)
+        checkpoint.attach(session)
+        session.start()
+        clock.run(20)
+        service.run_due()
+        assert checkpoint.writes == 1  # Ticks are not transitions
+        session.begin_break(30, start=True)
+        assert checkpoint.writes == 2
+        # The process dies; the new one starts 12 seconds later
+        clock.run(12)
+        restarted = Session(60, 10, 30, service=TimerService(clock, background=False))
+        state = SessionCheckpoint(path, clock, BOOT).restore(restarted)
+        assert (state.phase, state.remaining, state.running, state.work_remaining) == (SHORT_BREAK, 18, True, 40)
+
+    def test_phase_ran_out_while_away(self, path, clock):
+        """Test that a phase that ran out before the restart moves on, flagged as missed."""
+        SessionCheckpoint(path, clock, BOOT).save(SessionState(WORK, 60, 30, True, 1))
+        clock.run(45)
+        session = Session(60, 10, 30, service=TimerService(clock, background=False))
+        events = []
+        session.events.subscribe(SessionChanged, events.append)
+        state = SessionCheckpoint(path, clock, BOOT).restore(session)
+        assert (state.phase, state.cycle, state.running) == (SHORT_BREAK, 2, False)
+        assert [(event.transition, event.missed) for event in events] == [("restore", False), (FINISH, True)]
+
+    def test_handover_to_new_writer(self, path, clock):
+        """Test that an instance taking over as writer resumes and keeps checkpointing the session."""
+        writer = Session(60, 10, 30, service=TimerService(clock, background=False))
+        writer_checkpoint = SessionCheckpoint(path, clock, BOOT)
+        writer_checkpoint.attach(writer)
+        # The second instance maps the file at startup but does not write
+        standby = Session(60, 10, 30, service=TimerService(clock, background=False))
+        standby_checkpoint = SessionCheckpoint(path, clock, BOOT)
+        for _ in range(3):
+            writer.start()
+            writer.pause()
+        writer.start()
+        clock.run(15)
+        # The writer dies; the second instance is elected
+        standby_checkpoint.restore(standby)
+        standby_checkpoint.attach(standby)
+        assert (standby.phase, standby.running, standby.remaining) == (WORK, True, 45)
+        standby.pause()
+        clock.run(30)
+        assert SessionCheckpoint(path, clock, BOOT).load() == SessionState(WORK, 60, 45, False)
@@ -0,0 +1,61 @@
+import pytest
+import threading
+from datetime import datetime, timedelta
+from src.models.clock import FrozenClock, RealClock, VirtualClock
+
+START = datetime(2024, 1, 8, 9, 0)
+
+
+class TestClocks:
+    """Test cases for the clock implementations."""
+
+    def test_real_clock(self):
+        """Test that the real clock follows the system clocks."""
+        clock = RealClock()
+        before = clock.monotonic()
+        assert abs(clock.now() - datetime.now()) < timedelta(seconds=1)
+        assert clock.monotonic() >= before
+        boottime = clock.boottime()
+        assert boottime is None or boottime >= before
+
+    def test_frozen_clock(self):
+        """Test that a frozen clock never moves, even when slept on."""
+        clock = FrozenClock(START, monotonic=50.0, boottime=False)
+        clock.sleep(60)
+        assert (clock.now(), clock.monotonic(), clock.boottime()) == (START, 50.0, None)
+
+    def test_virtual_clock_moves(self):
+        """Test that running, suspending and stepping move the right clocks."""
+        clock = VirtualClock(START, monotonic=100.0)
+        clock.run(10)
+        clock.suspend(60)
+        clock.step(-5)
+        clock.sleep(5)
+        assert clock.now() == START + timedelta(seconds=70)
+        assert clock.monotonic() == 115
+        assert clock.boottime() == 175
+        clock.run_until(110)
+        assert clock.monotonic() == 115
+        clock.run_until(120)
+        assert clock.monotonic() == 120
+
+    def test_virtual_clock_wakes_waiters(self):
+        """Test that moving a virtual clock wakes a thread waiting through it."""
+        clock = VirtualClock(START)
+        condition = threading.Condition()
+        waiting = threading.Event()
+        woken = threading.Event()
+
+        def wait():
+            with condition:
+                waiting.set()
+                clock.wait(condition, 3600)
+            woken.set()
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        assert waiting.wait(1)
+        assert not woken.wait(0.1)
+        clock.run(1)
+        assert woken.wait(1)
+        thread.join(1)
@@ -0,0 +1,227 @@
+import pytest
+import socket
+import threading
+from datetime import datetime, time, timedelta
+from src.models.break_scheduler import MISSED_FIRE_LATEST, MISSED_FIRE_ONE, MISSED_SKIP, BreakScheduler
+from src.models.clock import VirtualClock
+from src.models.clock_monitor import CHECK_INTERVAL, ClockMonitor, ClockSetWatcher
+from src.models.events import ClockJumped, EventBus
+from src.models.timer import Timer, TimerService
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock(datetime(2024, 1, 8, 9, 0), monotonic=1000.0)
+
+
+@pytest.fixture
+def service(clock):
+    service = TimerService(clock)
+    yield service
+    service.stop()
+
+
+def make_monitor(clock, service, event_bus=None):
+    return ClockMonitor(event_bus or EventBus(), service=service, clock=clock)
+
+
+class TestClockMonitor:
+    """Test cases for detecting clock discontinuities."""
+
+    def test_steady_clocks(self, clock, service):
+        """Test that clocks moving together are not reported."""
+        monitor = make_monitor(clock, service)
+        assert monitor.check() is None
+        clock.run(300)
+        clock.step(1.5)
+        assert monitor.check() is None
+
+    def test_suspend(self, clock, service):
+        """Test that sleep is measured from the boot clock and advances the timers."""
+        events = EventBus()
+        published = []
+        events.subscribe(ClockJumped, published.append)
+        monitor = make_monitor(clock, service, events)
+        monitor.check()
+        clock.run(10)
+        clock.suspend(3600)
+        event = monitor.check()
+        assert published == [event]
+        assert (event.suspended, event.stepped) == (3600, 0)
+        assert event.now - event.previous == timedelta(seconds=3610)
+        assert service.monotonic() == clock.monotonic() + 3600
+
+    def test_wall_clock_step(self, clock, service):
+        """Test that a clock change is not mistaken for sleep."""
+        monitor = make_monitor(clock, service)
+        monitor.check()
+        clock.step(-1800)
+        event = monitor.check()
+        assert (event.suspended, event.stepped) == (0, -1800)
+        assert service.monotonic() == clock.monotonic()
+
+    def test_without_boot_clock(self):
+        """Test that without a boot clock only a gap announced by logind counts as sleep."""
+        clock = VirtualClock(datetime(2024, 1, 8, 9, 0), monotonic=1000.0, boottime=False)
+        service = TimerService(clock)
+        monitor = make_monitor(clock, service)
+        monitor.check()
+        clock.step(600)
+        event = monitor.check()
+        assert (event.suspended, event.stepped) == (0, 600)
+        assert service.monotonic() == clock.monotonic()
+        assert monitor.prepare_for_sleep(True) is None
+        clock.suspend(900)
+        assert monitor.prepare_for_sleep(False).suspended == 900
+        assert service.monotonic() == clock.monotonic() + 900
+        clock.step(-60)
+        assert monitor.check().stepped == -60
+        service.stop()
+
+
+class TestClockMonitorWakeups:
+    """Test cases for how often the monitor wakes up on its own."""
+
+    def test_no_polling_with_logind(self, clock, monkeypatch):
+        """Test that nothing is scheduled while logind announces sleep."""
+        service = TimerService(clock, background=False)
+        monitor = make_monitor(clock, service)
+        ours, theirs = socket.socketpair()
+        connection = type("Connection", (), {"sock": ours, "close": lambda self: ours.close()})()
+        monkeypatch.setattr(monitor, "_open_logind", lambda: connection)
+        monkeypatch.setattr(monitor, "_listen", lambda: None)
+        monitor.start()
+        try:
+            assert service.next_deadline() is None
+        finally:
+            monitor.stop()
+            theirs.close()
+        assert ours.fileno() == -1
+
+    def test_fallback_interval_without_logind(self, clock, monkeypatch):
+        """Test that without logind the clocks are compared once per check interval."""
+        service = TimerService(clock, background=False)
+        monitor = make_monitor(clock, service)
+        monkeypatch.setattr(monitor, "_open_logind", lambda: None)
+        monitor.start()
+        assert service.next_deadline() == clock.monotonic() + CHECK_INTERVAL
+        assert CHECK_INTERVAL >= 60
+        monitor.stop()
+        assert service.next_deadline() is None
+
+    def test_clock_set_watcher_wakes(self):
+        """Test that waiting for a clock change blocks until woken."""
+        try:
+            watcher = ClockSetWatcher()
+        except OSError:
+            pytest.skip("timerfd not available")
+        results = []
+        thread = threading.Thread(target=lambda: results.append(watcher.wait()))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        watcher.wake()
+        thread.join(2)
+        assert results == [False]
+        watcher.close()
+
+
+class TestTimersOverSuspend:
+    """Test cases for timers counting time spent suspended."""
+
+    def test_running_timer_counts_sleep(self, clock, service):
+        """Test that a running timer loses the time slept and a paused one does not."""
+        running = Timer(1500, service=service)
+        paused = Timer(1500, service=service)
+        running.start()
+        clock.run(100)
+        service.advance(600)
+        assert running.remaining == 800
+        assert paused.remaining == 1500
+
+    def test_timer_running_out_while_asleep(self, clock, service):
+        """Test that a timer that ran out while suspended fires at once, flagged as missed."""
+        finished = threading.Event()
+        timer = Timer(300, finished.set, service=service)
+        timer.start()
+        monitor = make_monitor(clock, service)
+        monitor.check()
+        clock.suspend(900)
+        monitor.check()
+        assert finished.wait(2)
+        assert timer.missed and timer.remaining == 0
+        timer.reset()
+        timer.start()
+        assert not timer.missed
+
+
+class TestMissedBreakPolicy:
+    """Test cases for breaks that fell due while suspended."""
+
+    @pytest.fixture
+    def fired(self):
+        return []
+
+    def start_scheduler(self, timeline_manager, clock, fired, policy):
+        event = threading.Event()
+        planned = threading.Event()
+
+        def on_break_due(slot, occurrence):
+            fired.append(occurrence)
+            event.set()
+
+        scheduler = BreakScheduler(timeline_manager, on_break_due, on_next_break=lambda _: planned.set(),
+                                   clock=clock, missed_policy=lambda: policy)
+        scheduler.fired_event = event
+        scheduler.start()
+        assert planned.wait(2)
+        return scheduler
+
+    def sleep_through_breaks(self, timeline_manager, clock, service, fired, policy):
+        """Suspend from 09:00 to 12:00 over three breaks, with one more due at 12:30."""
+        for hour, minute in ((9, 30), (10, 30), (11, 30), (12, 30)):
+            timeline_manager.add_break_slot(time(hour, minute), 5, "", "daily")
+        monitor = make_monitor(clock, service, timeline_manager.events)
+        monitor.check()
+        scheduler = self.start_scheduler(timeline_manager, clock, fired, policy)
+        clock.suspend(3 * 3600)
+        monitor.check()
+        return scheduler
+
+    @pytest.mark.parametrize("policy, expected", [
+        (MISSED_FIRE_ONE, datetime(2024, 1, 8, 9, 30)),
+        (MISSED_FIRE_LATEST, datetime(2024, 1, 8, 11, 30)),
+    ])
+    def test_fires_one_missed_break(self, timeline_manager, clock, service, fired, policy, expected):
+        """Test that only the chosen missed break fires, once."""
+        scheduler = self.sleep_through_breaks(timeline_manager, clock, service, fired, policy)
+        try:
+            assert scheduler.fired_event.wait(2)
+            threading.Event().wait(0.2)
+            assert fired == [expected]
+        finally:
+            scheduler.stop()
+
+    def test_skip(self, timeline_manager, clock, service, fired):
+        """Test that missed breaks are dropped and the next one still fires."""
+        scheduler = self.sleep_through_breaks(timeline_manager, clock, service, fired, MISSED_SKIP)
+        try:
+            assert not scheduler.fired_event.wait(0.3)
+            clock.run(1800)
+            scheduler.wake()
+            assert scheduler.fired_event.wait(2)
+            assert fired == [datetime(2024, 1, 8, 12, 30)]
+        finally:
+            scheduler.stop()
+
+    def test_break_within_grace_period_fires_normally(self, timeline_manager, clock, service, fired):
+        """Test that a break due just before waking up fires even when skipping."""
+        timeline_manager.add_break_slot(time(9, 59, 50), 5, "", "daily")
+        scheduler = self.start_scheduler(timeline_manager, clock, fired, MISSED_SKIP)
+        try:
+            clock.suspend(3600)
+            scheduler.wake()
+            assert scheduler.fired_event.wait(2)
+            assert fired == [datetime(2024, 1, 8, 9, 59, 50)]
+        finally:
+            scheduler.stop()
@@ -0,0 +1,283 @@
+import pytest
+import json
+import os
+import subprocess
+import sys
+import threading
+import time as clock
+from datetime import time
+from pathlib import Path
+
+pytest.importorskip("fcntl")
+
+from src.models.coordination import ChangeSpool, WriterElection, file_lock
+from src.models.settings import SettingsManager
+from src.models.timeline_manager import TimelineManager
+from src.models.timeline_store import JsonTimelineStore
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PROCESSES = 4
+ROUNDS = 25
+
+
+def run_workers(function, *args):
+    """Start one Python process per worker running ``function(index, *args)``."""
+    processes = []
+    for index in range(PROCESSES):
+        call = f"{function}({', '.join(repr(a) for a in (index,) + args)})"
+        code = f"from tests.unit.test_coordination import {function}; {call}"
+        processes.append(subprocess.Popen([sys.executable, "-c", code], cwd=REPO_ROOT,
+                                          stdout=subprocess.PIPE, stderr=subprocess.PIPE))
+    return processes
+
+
+def wait_for(processes):
+    for process in processes:
+        _, stderr = process.communicate(timeout=60)
+        assert process.returncode == 0, stderr.decode()
+
+
+def counter_worker(index, path):
+    """Increment a shared counter with an unprotected read-modify-write under the lock."""
+    for _ in range(ROUNDS):
+        with file_lock(path):
+            value = int(Path(path).read_text() or 0)
+            clock.sleep(0.001)
+            Path(path).write_text(str(value + 1))
+
+
+def store_worker(index, directory):
+    """Save and load a shared timeline while queueing entries on a shared spool."""
+    store = JsonTimelineStore(os.path.join(directory, "timeline.json"))
+    spool = ChangeSpool(os.path.join(directory, "timeline.json.pending"))
+    for n in range(ROUNDS):
+        spool.append([{"worker": index, "n": n}])
+        records = [{"id": f"w{index}_{i}", "start_time": "09:00", "duration": n} for i in range(50)]
+        store.save_all(records)
+        loaded = store.load()
+        assert len(loaded) == 50 and len({record["duration"] for record in loaded}) == 1
+
+
+def follower_worker(index, directory):
+    """Add slots as a following instance; they must reach the writer's file."""
+    election = WriterElection(os.path.join(directory, "writer.lock"))
+    assert not election.start()
+    manager = TimelineManager(timeline_file=os.path.join(directory, "timeline.json"), election=election)
+    for n in range(ROUNDS):
+        minute = 8 * 60 + (index * ROUNDS + n) * 2
+        manager.add_break_slot(time(minute // 60, minute % 60), 1, f"worker {index}")
+        if n % 5 == 4:
+            manager.save_timeline()
+    manager.save_timeline()
+    election.stop()
+
+
+class TestFileLock:
+    """Test cases for the advisory file lock."""
+
+    def test_excludes_other_holders(self, temp_dir):
+        """Test that a second holder waits until the lock is released."""
+        path = temp_dir / "timeline.json"
+        acquired = threading.Event()
+
+        def take_lock():
+            with file_lock(path):
+                acquired.set()
+
+        with file_lock(path):
+            thread = threading.Thread(target=take_lock)
+            thread.start()
+            assert not acquired.wait(0.2)
+        assert acquired.wait(2.0)
+        thread.join()
+
+    def test_reentrant(self, temp_dir):
+        """Test that a thread can nest locks, including upgrading a shared one."""
+        path = temp_dir / "timeline.json"
+        with file_lock(path, exclusive=False):
+            with file_lock(path):
+                with file_lock(path, exclusive=False):
+                    pass
+        with file_lock(path):
+            with file_lock(path):
+                pass
+        assert (temp_dir / "timeline.json.lock").exists()
+
+    def test_unwritable_directory_runs_unlocked(self, temp_dir):
+        """Test that a lock file that cannot be created does not block access."""
+        with file_lock(temp_dir / "missing" / "settings.json"):
+            pass
+
+    def test_processes_are_serialized(self, temp_dir):
+        """Test that concurrent read-modify-write cycles in several processes lose nothing."""
+        path = temp_dir / "counter"
+        path.write_text("0")
+        wait_for(run_workers("counter_worker", str(path)))
+        assert int(path.read_text()) == PROCESSES * ROUNDS
+
+
+class TestChangeSpool:
+    """Test cases for the spool of forwarded changes."""
+
+    def test_append_and_drain(self, temp_dir):
+        """Test that entries come out once, in order, and damaged lines are skipped."""
+        spool = ChangeSpool(temp_dir / "timeline.json.pending")
+        assert spool.drain() == []
+        spool.append([{"n": 1}, {"n": 2}])
+        with open(spool.path, "a") as f:
+            f.write("{torn\n")
+        spool.append([{"n": 3}])
+        assert spool.drain() == [{"n": 1}, {"n": 2}, {"n": 3}]
+        assert spool.drain() == []
+
+    def test_concurrent_processes(self, temp_dir):
+        """Test that saving, loading and spooling from several processes never tears or loses data."""
+        spool = ChangeSpool(temp_dir / "timeline.json.pending")
+        processes = run_workers("store_worker", str(temp_dir))
+        entries = []
+        while any(process.poll() is None for process in processes):
+            entries.extend(spool.drain())
+        wait_for(processes)
+        entries.extend(spool.drain())
+        assert sorted((e["worker"], e["n"]) for e in entries) == \
+            [(w, n) for w in range(PROCESSES) for n in range(ROUNDS)]
+        assert len(JsonTimelineStore(temp_dir / "timeline.json").load()) == 50
+
+
+class TestWriterElection:
+    """Test cases for electing the writing instance."""
+
+    def test_failover(self, temp_dir):
+        """Test that a waiting instance takes over once the writer stops."""
+        lock_path = temp_dir / "writer.lock"
+        leader = WriterElection(lock_path)
+        follower = WriterElection(lock_path)
+        elected = threading.Event()
+        follower.subscribe(elected.set)
+        assert leader.start()
+        assert not follower.start()
+        assert not elected.wait(0.1)
+        leader.stop()
+        assert elected.wait(2.0)
+        assert follower.is_writer and not leader.is_writer
+        assert lock_path.read_text() == f"{os.getpid()}\n"
+        follower.stop()
+
+    def test_stop_while_waiting(self, temp_dir):
+        """Test that an instance that stopped waiting is never elected."""
+        lock_path = temp_dir / "writer.lock"
+        leader = WriterElection(lock_path)
+        follower = WriterElection(lock_path)
+        calls = []
+        follower.subscribe(lambda: calls.append("elected"))
+        leader.start()
+        follower.start()
+        follower.stop()
+        leader.stop()
+        third = WriterElection(lock_path)
+        deadline = clock.monotonic() + 2.0
+        while not third.start() and clock.monotonic() < deadline:
+            third.stop()
+            clock.sleep(0.01)
+        assert third.is_writer and not follower.is_writer
+        assert calls == []
+        third.stop()
+
+
+class TestForwardedChanges:
+    """Test cases for following instances handing changes to the writer."""
+
+    def make_pair(self, temp_dir, make):
+        lock_path = temp_dir / "writer.lock"
+        leader_election = WriterElection(lock_path)
+        follower_election = WriterElection(lock_path)
+        assert leader_election.start() and not follower_election.start()
+        return make(leader_election), make(follower_election), leader_election, follower_election
+
+    def test_timeline_follower_forwards(self, temp_dir):
+        """Test that a follower's edits reach the file only through the writer."""
+        path = temp_dir / "timeline.json"
+        leader, follower, leader_election, follower_election = self.make_pair(
+            temp_dir, lambda election: TimelineManager(timeline_file=path, election=election))
+        try:
+            lunch = leader.add_break_slot(time(12, 0), 30, "Lunch")
+            leader.save_timeline()
+            follower.reload_timeline()
+            follower.add_break_slot(time(9, 0), 15, "Morning")
+            follower.edit_break_slot(lunch.id, start_time=time(13, 0))
+            follower.delete_break_slot(follower.add_break_slot(time(17, 0), 5).id)
+            follower.save_timeline()
+            assert len(json.loads(path.read_text())["break_slots"]) == 1
+
+            assert leader.apply_forwarded_changes() == 4
+            leader.save_timeline()
+            saved = json.loads(path.read_text())["break_slots"]
+            assert [(r["start_time"], r["message"]) for r in saved] == [("09:00", "Morning"), ("13:00", "Lunch")]
+            assert follower.reload_timeline() == []
+
+            follower.spool.append([{"op": "add", "slot": saved[0]}])
+            assert leader.apply_forwarded_changes() == 0
+        finally:
+            follower_election.stop()
+            leader_election.stop()
+
+    def test_unforwarded_changes_saved_on_election(self, temp_dir):
+        """Test that a follower elected writer saves changes it never forwarded."""
+        path = temp_dir / "timeline.json"
+        elected = threading.Event()
+        leader, follower, leader_election, follower_election = self.make_pair(
+            temp_dir, lambda election: TimelineManager(timeline_file=path, election=election))
+        follower_election.subscribe(elected.set)
+        follower.add_break_slot(time(9, 0), 15, "Morning")
+        leader_election.stop()
+        assert elected.wait(2.0)
+        follower.on_elected()
+        follower.flush()
+        assert [r["message"] for r in json.loads(path.read_text())["break_slots"]] == ["Morning"]
+        follower_election.stop()
+
+    def test_settings_follower_forwards(self, temp_dir):
+        """Test that forwarded settings are applied, except locked ones."""
+        path = temp_dir / "settings.json"
+        system_dir = temp_dir / "etc"
+        system_dir.mkdir()
+        (system_dir / "policy.json").write_text('{"sound_enabled": false}')
+
+        def make(election):
+            settings = SettingsManager(settings_file=path, system_dir=system_dir, election=election)
+            settings.load()
+            return settings
+
+        leader, follower, leader_election, follower_election = self.make_pair(temp_dir, make)
+        try:
+            follower.set("theme", "dark")
+            follower.spool.append([{"op": "set", "key": "sound_enabled", "value": True}])
+            follower.save()
+            assert not path.exists()
+            assert leader.apply_forwarded_changes() == ["theme"]
+            leader.flush()
+            assert json.loads(path.read_text()) == {"theme": "dark"}
+            assert follower.reload() == []
+        finally:
+            follower_election.stop()
+            leader_election.stop()
+
+    def test_followers_in_other_processes(self, temp_dir):
+        """Test that slots added by several following processes all end up in the file."""
+        path = temp_dir / "timeline.json"
+        election = WriterElection(temp_dir / "writer.lock")
+        assert election.start()
+        leader = TimelineManager(timeline_file=path, election=election)
+        leader.save_timeline()
+        try:
+            processes = run_workers("follower_worker", str(temp_dir))
+            while any(process.poll() is None for process in processes):
+                leader.apply_forwarded_changes()
+                clock.sleep(0.01)
+            wait_for(processes)
+            leader.apply_forwarded_changes()
+            leader.save_timeline()
+        finally:
+            election.stop()
+        assert len(leader.break_slots) == PROCESSES * ROUNDS
+        assert len(TimelineManager(timeline_file=path).break_slots) == PROCESSES * ROUNDS
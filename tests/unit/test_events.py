@@ -0,0 +1,117 @@
+import pytest
+from datetime import time
+from src.models.events import (EventBus, SettingChanged, SettingsReloaded, SlotAdded,
+                               SlotDeleted, SlotEdited, TimelineEvent, TimelineReloaded)
+
+
+class TestEventBus:
+    """Test cases for EventBus."""
+
+    def test_subscribers_receive_subclass_events(self):
+        """Test that subscribing to a base class covers its subclasses."""
+        bus = EventBus()
+        received = []
+        bus.subscribe(TimelineEvent, received.append)
+        bus.publish(TimelineReloaded(3))
+        bus.publish(SettingsReloaded())
+        assert received == [TimelineReloaded(3)]
+
+    def test_unsubscribe(self):
+        """Test that an unsubscribed callback is no longer called."""
+        bus = EventBus()
+        received = []
+        unsubscribe = bus.subscribe(TimelineReloaded, received.append)
+        unsubscribe()
+        unsubscribe()
+        bus.publish(TimelineReloaded(0))
+        assert received == []
+
+    def test_dispatcher_runs_callback(self):
+        """Test that a dispatcher decides where the callback runs."""
+        bus = EventBus()
+        queued = []
+        received = []
+        bus.subscribe(TimelineReloaded, received.append, dispatcher=queued.append)
+        bus.publish(TimelineReloaded(1))
+        assert received == []
+        queued.pop()()
+        assert received == [TimelineReloaded(1)]
+
+    def test_failing_subscriber_does_not_block_others(self):
+        """Test that an exception in one subscriber is contained."""
+        bus = EventBus()
+        received = []
+
+        def fail(event):
+            raise RuntimeError("boom")
+
+        bus.subscribe(TimelineReloaded, fail)
+        bus.subscribe(TimelineReloaded, received.append)
+        bus.publish(TimelineReloaded(2))
+        assert received == [TimelineReloaded(2)]
+
+
+class TestModelEvents:
+    """Test cases for events published by the managers."""
+
+    def test_timeline_mutations_publish_events(self, timeline_manager):
+        """Test that add, edit and delete publish matching events."""
+        received = []
+        timeline_manager.events.subscribe(TimelineEvent, received.append)
+        slot = timeline_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        old_id = slot.id
+        timeline_manager.edit_break_slot(slot.id, start_time=time(10, 0))
+        timeline_manager.delete_break_slot(slot.id)
+        timeline_manager.delete_break_slot("missing")
+        assert received == [SlotAdded(slot), SlotEdited(slot, old_id), SlotDeleted(slot)]
+
+    def test_failed_add_publishes_nothing(self, timeline_manager):
+        """Test that a rejected overlapping slot publishes no event."""
+        timeline_manager.add_break_slot(time(9, 0), 15, "", "daily")
+        received = []
+        timeline_manager.events.subscribe(TimelineEvent, received.append)
+        with pytest.raises(ValueError):
+            timeline_manager.add_break_slot(time(9, 5), 15, "", "daily")
+        assert received == []
+
+    def test_transaction_publishes_on_commit_only(self, timeline_manager):
+        """Test that transaction events are held until commit and dropped on rollback."""
+        received = []
+        timeline_manager.events.subscribe(TimelineEvent, received.append)
+        with timeline_manager.transaction():
+            timeline_manager.add_break_slot(time(9, 0), 15, "", "daily")
+            assert received == []
+        assert len(received) == 1
+
+        with pytest.raises(ValueError):
+            with timeline_manager.transaction():
+                timeline_manager.add_break_slot(time(13, 0), 15, "", "daily")
+                timeline_manager.add_break_slot(time(13, 5), 15, "", "daily")
+        assert len(received) == 1
+
+    def test_load_publishes_reloaded(self, timeline_manager):
+        """Test that loading the timeline publishes a reload event."""
+        timeline_manager.add_break_slot(time(9, 0), 15, "", "daily")
+        received = []
+        timeline_manager.events.subscribe(TimelineReloaded, received.append)
+        timeline_manager.load_timeline()
+        assert received == [TimelineReloaded(1)]
+
+    def test_setting_changed_only_on_new_value(self, settings_manager):
+        """Test that setting an unchanged value publishes nothing."""
+        received = []
+        settings_manager.events.subscribe(SettingChanged, received.append)
+        settings_manager.set("work_duration", 25)
+        settings_manager.set("work_duration", 25)
+        settings_manager.set("work_duration", 30)
+        assert received == [SettingChanged("work_duration", None, 25),
+                            SettingChanged("work_duration", 25, 30)]
+
+    def test_shared_bus(self, temp_dir):
+        """Test that managers given one bus publish on it."""
+        from src.models.settings import SettingsManager
+        from src.models.timeline_manager import TimelineManager
+        bus = EventBus()
+        settings = SettingsManager(settings_file=temp_dir / "settings.json", event_bus=bus)
+        timeline = TimelineManager(timeline_file=temp_dir / "timeline.json", event_bus=bus)
+        assert settings.events is bus and timeline.events is bus
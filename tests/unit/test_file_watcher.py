@@ -0,0 +1,202 @@
+import pytest
+import json
+import os
+import threading
+from datetime import time
+from src.models.events import SettingChanged, SlotAdded, SlotDeleted, SlotEdited, TimelineEvent
+from src.models.file_watcher import (InotifyWatcher, PollingWatcher, file_signature,
+                                     inotify_available)
+from src.models.persistence import atomic_write_json
+from src.models.settings import SettingsManager
+from src.models.timeline_manager import TimelineManager
+
+
+def make_watcher(kind):
+    if kind == "inotify":
+        if not inotify_available():
+            pytest.skip("inotify is not available")
+        return InotifyWatcher(settle=0.05)
+    return PollingWatcher(settle=0.05, interval=0.02)
+
+
+class Recorder:
+    """Collects watcher callbacks and lets tests wait for them."""
+
+    def __init__(self):
+        self.paths = []
+        self.event = threading.Event()
+
+    def __call__(self, path):
+        self.paths.append(path)
+        self.event.set()
+
+    def wait(self, timeout=3.0):
+        assert self.event.wait(timeout), "no change reported"
+        self.event.clear()
+
+
+@pytest.mark.parametrize("kind", ["inotify", "polling"])
+class TestFileWatcher:
+    """Test cases for both file watcher implementations."""
+
+    def test_reports_atomic_replace(self, temp_dir, kind):
+        """Test that renaming a new file over a watched one is reported."""
+        path = temp_dir / "timeline.json"
+        path.write_text("{}")
+        watcher = make_watcher(kind)
+        recorder = Recorder()
+        watcher.watch(path, recorder)
+        watcher.start()
+        try:
+            atomic_write_json(path, {"break_slots": []})
+            recorder.wait()
+            assert recorder.paths == [str(path)]
+        finally:
+            watcher.stop()
+        assert not watcher.running
+
+    def test_coalesces_and_filters(self, temp_dir, kind):
+        """Test that a burst of writes is one call and other files are ignored."""
+        path = temp_dir / "settings.json"
+        watcher = make_watcher(kind)
+        recorder = Recorder()
+        watcher.watch(path, recorder)
+        watcher.start()
+        try:
+            (temp_dir / "unrelated.json").write_text("{}")
+            with open(path, "w") as f:
+                for i in range(20):
+                    f.write(f"{i}\n")
+                    f.flush()
+            recorder.wait()
+            threading.Event().wait(0.2)
+            assert recorder.paths == [str(path)]
+        finally:
+            watcher.stop()
+
+    def test_unwatch(self, temp_dir, kind):
+        """Test that an unwatched callback is no longer called."""
+        path = temp_dir / "timeline.json"
+        watcher = make_watcher(kind)
+        removed = Recorder()
+        kept = Recorder()
+        unwatch = watcher.watch(path, removed)
+        watcher.watch(path, kept)
+        unwatch()
+        watcher.start()
+        try:
+            path.write_text("{}")
+            kept.wait()
+            assert removed.paths == []
+        finally:
+            watcher.stop()
+
+
+class TestTimelineReload:
+    """Test cases for diffing a rewritten timeline file into memory."""
+
+    def write_records(self, path, slots):
+        atomic_write_json(path, {"break_slots": slots})
+
+    def test_reload_publishes_only_differences(self, temp_dir):
+        """Test that reloading touches only added, edited and deleted slots."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path)
+        morning = manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        lunch = manager.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+        manager.add_break_slot(time(15, 0), 10, "Tea", "daily")
+        manager.save_timeline()
+        events = []
+        manager.events.subscribe(TimelineEvent, events.append)
+
+        records = [slot.to_dict() for slot in manager.break_slots]
+        records[1]["message"] = "Long lunch"
+        del records[2]
+        records.append({"start_time": "17:00", "duration": 5, "message": "Wrap up",
+                        "repeat_pattern": "weekdays", "enabled": True})
+        self.write_records(path, records)
+
+        returned = manager.reload_timeline()
+        assert returned == events
+        assert sorted(type(event).__name__ for event in events) == ["SlotAdded", "SlotDeleted", "SlotEdited"]
+        edited = next(event for event in events if isinstance(event, SlotEdited))
+        assert edited.slot is lunch and lunch.message == "Long lunch"
+        assert next(event for event in events if isinstance(event, SlotDeleted)).slot.message == "Tea"
+        assert next(event for event in events if isinstance(event, SlotAdded)).slot.message == "Wrap up"
+        assert manager.get_break_slot(morning.id) is morning
+        assert [slot.start_time for slot in manager.break_slots] == [time(9, 0), time(12, 0), time(17, 0)]
+        assert manager.get_break_slots_between(time(16, 0), time(18, 0))[0].message == "Wrap up"
+
+    def test_own_save_is_ignored(self, temp_dir):
+        """Test that the manager's own writes do not trigger a reload."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path)
+        manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        manager.save_timeline()
+        manager.store.load = lambda: pytest.fail("unchanged file was read")
+        assert manager.reload_timeline() == []
+
+    def test_unchanged_content_publishes_nothing(self, temp_dir):
+        """Test that rewriting identical slots produces no events."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path)
+        manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        manager.save_timeline()
+        self.write_records(path, json.loads(path.read_text())["break_slots"])
+        assert manager.reload_timeline() == []
+
+    def test_missing_or_corrupt_file_keeps_timeline(self, temp_dir):
+        """Test that a deleted or half-written file does not clear the timeline."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path)
+        manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        manager.save_timeline()
+        os.remove(path)
+        assert manager.reload_timeline() == []
+        path.write_text('{"break_slots": [')
+        assert manager.reload_timeline() == []
+        assert len(manager.break_slots) == 1
+
+    def test_watched_end_to_end(self, temp_dir):
+        """Test that a watcher drives reloads when the file is replaced."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path)
+        manager.save_timeline()
+        watcher = PollingWatcher(settle=0.02, interval=0.02)
+        done = threading.Event()
+        watcher.watch(path, lambda changed: manager.reload_timeline() and done.set())
+        watcher.start()
+        try:
+            self.write_records(path, [{"start_time": "10:00", "duration": 5}])
+            assert done.wait(3.0)
+        finally:
+            watcher.stop()
+        assert [slot.start_time for slot in manager.break_slots] == [time(10, 0)]
+
+
+class TestSettingsReload:
+    """Test cases for reloading a rewritten settings file."""
+
+    def test_reload_publishes_changed_keys(self, temp_dir):
+        """Test that only changed, added and removed keys are announced."""
+        path = temp_dir / "settings.json"
+        atomic_write_json(path, {"theme": "dark", "volume": 50, "sound": "bell"})
+        settings = SettingsManager(settings_file=path)
+        settings.load()
+        events = []
+        settings.events.subscribe(SettingChanged, events.append)
+
+        atomic_write_json(path, {"theme": "dark", "volume": "80", "work_duration": 45})
+        assert sorted(settings.reload()) == ["sound", "volume", "work_duration"]
+        assert settings.get("volume") == 80
+        assert {event.key: (event.old_value, event.new_value) for event in events} == {
+            "volume": (50, 80), "sound": ("bell", None), "work_duration": (None, 45)}
+
+    def test_own_save_is_ignored(self, temp_dir):
+        """Test that saving does not make the next reload re-read the file."""
+        path = temp_dir / "settings.json"
+        settings = SettingsManager(settings_file=path)
+        settings.set("theme", "light")
+        settings.save()
+        assert file_signature(path) is not None
+        assert settings.reload() == []
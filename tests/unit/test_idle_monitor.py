@@ -0,0 +1,170 @@
+import pytest
+from datetime import datetime, timedelta
+from src.controllers.timer_controller import TimerController
+from src.models.break_history import BreakHistory
+from src.models.clock import VirtualClock
+from src.models.events import EventBus, UserIdle, UserReturned
+from src.models.idle_monitor import IDLE_POLL, IdleMonitor, IdleSource, InterruptsIdleSource
+from src.models.settings import SettingsManager
+from src.models.timer import WORK, TimerService
+
+INTERRUPTS = """           CPU0       CPU1
+  1:         {keys}          0  IR-IO-APIC    1-edge      i8042
+  8:          0          0  IR-IO-APIC    8-edge      rtc0
+ 12:        {mouse}          5  IR-IO-APIC   12-edge      i8042
+LOC:     123456     654321   Local timer interrupts
+"""
+
+
+class ScriptedSource(IdleSource):
+    """Idle source for a user who types until ``leave`` and again from ``back`` on."""
+
+    name = "scripted"
+
+    def __init__(self, clock, leave=None, back=None):
+        self.clock = clock
+        self.leave = leave
+        self.back = back
+
+    def idle_seconds(self):
+        now = self.clock.monotonic()
+        if self.leave is None or now < self.leave:
+            return 0.0
+        if self.back is not None and now >= self.back:
+            return 0.0
+        return now - self.leave
+
+
+@pytest.fixture
+def clock():
+    """Create a virtual clock at nine on a Monday."""
+    return VirtualClock(datetime(2024, 1, 8, 9, 0))
+
+
+def run_for(clock, service, seconds):
+    """Move the clock, running every callback that falls due on the way."""
+    end = clock.monotonic() + seconds
+    while service.next_deadline() is not None and service.next_deadline() <= end:
+        clock.run_until(service.next_deadline())
+        service.run_due()
+    clock.run_until(end)
+
+
+class TestIdleMonitor:
+    """Test cases for noticing the user going away and coming back."""
+
+    def test_absence_published(self, clock):
+        """Test that leaving and returning publish one event each, dated from the input."""
+        service = TimerService(clock, background=False)
+        bus = EventBus()
+        events = []
+        bus.subscribe(UserIdle, events.append)
+        bus.subscribe(UserReturned, events.append)
+        monitor = IdleMonitor(bus, ScriptedSource(clock, leave=600, back=1500), service, clock, threshold=120)
+        monitor.start()
+        run_for(clock, service, 3600)
+        assert events[0] == UserIdle(datetime(2024, 1, 8, 9, 10))
+        assert events[1].since == datetime(2024, 1, 8, 9, 10)
+        # The return is noticed at the first poll after it
+        assert 900 <= events[1].idle <= 900 + IDLE_POLL
+        assert len(events) == 2
+        assert not monitor.idle
+        monitor.stop()
+        assert service.next_deadline() is None
+
+    def test_polling_backs_off_while_active(self, clock):
+        """Test that an active user is polled once per threshold and an absent one often."""
+        service = TimerService(clock, background=False)
+        monitor = IdleMonitor(EventBus(), ScriptedSource(clock), service, clock, threshold=120)
+        monitor.start()
+        run_for(clock, service, 8 * 3600)
+        assert monitor.polls <= 8 * 3600 / 120 + 1
+        monitor.source.leave = clock.monotonic()
+        polls = monitor.polls
+        run_for(clock, service, 600)
+        assert monitor.idle
+        assert monitor.polls - polls >= (600 - 120) / IDLE_POLL
+
+    def test_next_poll_waits_out_threshold(self, clock):
+        """Test that the next poll comes when the idle time could first reach the threshold."""
+        source = ScriptedSource(clock, leave=-100)
+        monitor = IdleMonitor(EventBus(), source, TimerService(clock, background=False), clock, threshold=120)
+        assert monitor.poll() == pytest.approx(20)
+        clock.run(20)
+        assert monitor.poll() == IDLE_POLL
+
+
+class TestInterruptsIdleSource:
+    """Test cases for guessing idle time from input interrupt counts."""
+
+    def test_idle_since_counts_changed(self, temp_dir, clock):
+        """Test that idle time runs from the last poll that saw input interrupts."""
+        path = temp_dir / "interrupts"
+        path.write_text(INTERRUPTS.format(keys=100, mouse=50))
+        source = InterruptsIdleSource(str(path), clock)
+        clock.run(30)
+        assert source.idle_seconds() == 30
+        path.write_text(INTERRUPTS.format(keys=100, mouse=51))
+        clock.run(10)
+        assert source.idle_seconds() == 0
+        clock.run(5)
+        assert source.idle_seconds() == 5
+
+    def test_no_input_devices(self, temp_dir):
+        """Test that a system without input device interrupts is refused."""
+        path = temp_dir / "interrupts"
+        path.write_text("           CPU0\n  8:          0  IR-IO-APIC    8-edge      rtc0\n")
+        with pytest.raises(OSError):
+            InterruptsIdleSource(str(path))
+        with pytest.raises(OSError):
+            InterruptsIdleSource(str(temp_dir / "missing"))
+
+
+class TestIdleBreaks:
+    """Test cases for pausing work and crediting breaks while the user is away."""
+
+    @pytest.fixture
+    def controller(self, temp_dir, clock):
+        """Create a timer controller with a 5 minute break, on a foreground service."""
+        bus = EventBus()
+        settings_manager = SettingsManager(settings_file=temp_dir / "settings.json", event_bus=bus)
+        settings_manager.set("break_duration", 5)
+        history = BreakHistory(temp_dir / "history.db", clock)
+        controller = TimerController(settings_manager, bus, TimerService(clock, background=False), history)
+        yield controller
+        history.close()
+
+    def test_short_absence_resumes_work(self, controller):
+        """Test that work pauses while away and carries on from where it stopped."""
+        session = controller.session
+        session.start()
+        since = datetime(2024, 1, 8, 9, 0)
+        controller.session.events.publish(UserIdle(since))
+        assert not session.running
+        remaining = session.remaining
+        controller.session.events.publish(UserReturned(since, 200))
+        assert session.running and session.remaining == remaining
+        assert controller.history.events(since, since + timedelta(days=1)) == []
+
+    def test_long_absence_counts_as_break(self, controller, clock):
+        """Test that an absence as long as a break is recorded as one and work starts over."""
+        session = controller.session
+        session.start()
+        clock.run(600)
+        since = clock.now()
+        session.events.publish(UserIdle(since))
+        session.events.publish(UserReturned(since, 420))
+        assert session.phase == WORK and session.running
+        assert session.remaining == session.duration
+        events = controller.history.events(since, since + timedelta(days=1))
+        assert [(e["kind"], e["source"], e["duration"]) for e in events] == [
+            ("started", "idle", 7), ("completed", "idle", 7)]
+        assert events[1]["time"] == since + timedelta(seconds=420)
+
+    def test_disabled(self, controller):
+        """Test that idle events are ignored with idle detection off."""
+        controller.settings_manager.set("idle_detection", False)
+        session = controller.session
+        session.start()
+        session.events.publish(UserIdle(datetime(2024, 1, 8, 9, 0)))
+        assert session.running
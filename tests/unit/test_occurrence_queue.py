@@ -0,0 +1,131 @@
+import pytest
+import threading
+from datetime import datetime, time
+from src.models.timeline_manager import BreakSlot
+from src.models.occurrence_queue import OccurrenceQueue, next_slot_occurrence
+
+# 2024-01-05 is a Friday
+FRIDAY_MORNING = datetime(2024, 1, 5, 8, 0)
+
+
+class TestOccurrenceQueue:
+    """Test cases for OccurrenceQueue."""
+
+    def test_next_slot_occurrence_skips_inactive_days(self):
+        """Test that a weekend slot seen on Friday lands on Saturday."""
+        slot = BreakSlot(time(10, 0), 15, "", "weekends")
+        assert next_slot_occurrence(slot, FRIDAY_MORNING) == datetime(2024, 1, 6, 10, 0)
+
+    def test_next_slot_occurrence_is_strictly_after(self):
+        """Test that an occurrence at the exact moment is not returned."""
+        slot = BreakSlot(time(8, 0), 15)
+        assert next_slot_occurrence(slot, FRIDAY_MORNING) == datetime(2024, 1, 6, 8, 0)
+
+    def test_peek_returns_earliest(self):
+        """Test that peek returns the earliest occurrence."""
+        queue = OccurrenceQueue()
+        lunch = BreakSlot(time(12, 0), 30)
+        morning = BreakSlot(time(9, 0), 5)
+        queue.rebuild([lunch, morning], FRIDAY_MORNING)
+        assert queue.peek() == (morning, datetime(2024, 1, 5, 9, 0))
+
+    def test_disabled_slots_skipped(self):
+        """Test that disabled slots are not queued."""
+        queue = OccurrenceQueue()
+        queue.rebuild([BreakSlot(time(9, 0), 5, enabled=False)], FRIDAY_MORNING)
+        assert queue.peek() is None
+
+    def test_pop_rearms_slot(self):
+        """Test that popping a slot queues its following occurrence."""
+        queue = OccurrenceQueue()
+        slot = BreakSlot(time(9, 0), 5, "", "weekdays")
+        queue.rebuild([slot], FRIDAY_MORNING)
+        assert queue.pop() == (slot, datetime(2024, 1, 5, 9, 0))
+        assert queue.peek() == (slot, datetime(2024, 1, 8, 9, 0))  # Monday
+
+    def test_advance_returns_due_occurrences(self):
+        """Test advancing past several occurrences."""
+        queue = OccurrenceQueue()
+        first = BreakSlot(time(9, 0), 5)
+        second = BreakSlot(time(10, 0), 5)
+        third = BreakSlot(time(11, 0), 5)
+        queue.rebuild([third, second, first], FRIDAY_MORNING)
+        due = queue.advance(datetime(2024, 1, 5, 10, 0))
+        assert due == [(first, datetime(2024, 1, 5, 9, 0)), (second, datetime(2024, 1, 5, 10, 0))]
+        assert queue.peek() == (third, datetime(2024, 1, 5, 11, 0))
+
+    def test_needs_rebuild(self):
+        """Test staleness on invalidation, day rollover and backwards clock."""
+        queue = OccurrenceQueue()
+        assert queue.needs_rebuild(FRIDAY_MORNING)
+        queue.rebuild([], FRIDAY_MORNING)
+        assert not queue.needs_rebuild(datetime(2024, 1, 5, 9, 0))
+        assert queue.needs_rebuild(datetime(2024, 1, 6, 9, 0))
+        assert queue.needs_rebuild(datetime(2024, 1, 5, 7, 0))
+        queue.invalidate()
+        assert queue.needs_rebuild(FRIDAY_MORNING)
+
+
+class TestTimelineManagerOccurrences:
+    """Test get_next_break through the occurrence queue."""
+
+    def test_get_next_break_tracks_edits(self, timeline_manager):
+        """Test that the cached queue follows add, edit and delete."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 5, "Morning", "daily")
+        assert timeline_manager.get_next_break(FRIDAY_MORNING) == (slot, datetime(2024, 1, 5, 9, 0))
+        
+        timeline_manager.edit_break_slot(slot.id, start_time=time(8, 30))
+        assert timeline_manager.get_next_break(FRIDAY_MORNING) == (slot, datetime(2024, 1, 5, 8, 30))
+        
+        timeline_manager.delete_break_slot(slot.id)
+        assert timeline_manager.get_next_break(FRIDAY_MORNING) is None
+
+    def test_get_next_break_moves_forward(self, timeline_manager):
+        """Test that passed occurrences roll over to the next day."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 5, "Morning", "daily")
+        timeline_manager.get_next_break(FRIDAY_MORNING)
+        assert timeline_manager.get_next_break(datetime(2024, 1, 5, 9, 30)) == (slot, datetime(2024, 1, 6, 9, 0))
+        # Asking about an earlier moment again rebuilds the queue
+        assert timeline_manager.get_next_break(FRIDAY_MORNING) == (slot, datetime(2024, 1, 5, 9, 0))
+
+    def test_changes_wait_for_rebuild(self, timeline_manager):
+        """Test that the slot list does not change while the scheduler thread rebuilds from it."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 5, "Morning", "daily")
+        queue = timeline_manager.get_occurrence_queue(FRIDAY_MORNING)
+        done = threading.Event()
+        
+        def edit():
+            timeline_manager.add_break_slot(time(8, 30), 5, "Early", "daily")
+            timeline_manager.delete_break_slot(slot.id)
+            done.set()
+        
+        with queue.lock:  # As held by a rebuild
+            thread = threading.Thread(target=edit)
+            thread.start()
+            assert not done.wait(0.2)
+            assert timeline_manager.break_slots == [slot]
+        thread.join(2)
+        assert done.is_set()
+        assert timeline_manager.get_next_break(FRIDAY_MORNING)[1] == datetime(2024, 1, 5, 8, 30)
+    
+    def test_iter_occurrences_over_week(self, timeline_manager):
+        """Test lazy expansion over a week in chronological order."""
+        weekday = timeline_manager.add_break_slot(time(9, 0), 5, "Weekday", "weekdays")
+        weekend = timeline_manager.add_break_slot(time(11, 0), 5, "Weekend", "weekends")
+        timeline_manager.add_break_slot(time(13, 0), 5, "Off", "daily", enabled=False)
+        
+        start = datetime(2024, 1, 5, 10, 0)  # Friday, after the weekday break
+        occurrences = list(timeline_manager.iter_occurrences(start, datetime(2024, 1, 9)))
+        
+        assert occurrences == [
+            (weekend, datetime(2024, 1, 6, 11, 0)),
+            (weekend, datetime(2024, 1, 7, 11, 0)),
+            (weekday, datetime(2024, 1, 8, 9, 0)),
+        ]
+
+    def test_iter_occurrences_is_lazy(self, timeline_manager):
+        """Test that a long range can be consumed incrementally."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 5, "Daily", "daily")
+        stream = timeline_manager.iter_occurrences(FRIDAY_MORNING, datetime(2124, 1, 1))
+        assert next(stream) == (slot, datetime(2024, 1, 5, 9, 0))
+        assert next(stream) == (slot, datetime(2024, 1, 6, 9, 0))
@@ -0,0 +1,115 @@
+import pytest
+import json
+import os
+import threading
+import time as time_module
+from datetime import time
+from src.models.persistence import DebouncedWriter, atomic_write, atomic_write_json
+from src.models.settings import SettingsManager
+from src.models.timeline_manager import TimelineManager
+
+
+class TestAtomicWrite:
+    """Test cases for atomic file replacement."""
+
+    def test_replaces_contents(self, temp_dir):
+        """Test that the target ends up with exactly the new contents."""
+        path = temp_dir / "data.json"
+        path.write_text("old contents that are longer than the new ones")
+        atomic_write_json(path, {"a": 1})
+        assert json.loads(path.read_text()) == {"a": 1}
+        assert os.listdir(temp_dir) == ["data.json"]
+
+    def test_failure_keeps_old_file(self, temp_dir, monkeypatch):
+        """Test that a failed write leaves the previous file and no temp files."""
+        path = temp_dir / "data.json"
+        path.write_text("{}")
+
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail)
+        with pytest.raises(OSError):
+            atomic_write(path, b"new")
+        assert path.read_text() == "{}"
+        assert os.listdir(temp_dir) == ["data.json"]
+
+    def test_keeps_permissions(self, temp_dir):
+        """Test that an existing file's mode survives the replacement."""
+        path = temp_dir / "data.json"
+        path.write_text("{}")
+        os.chmod(path, 0o600)
+        atomic_write(path, b"[]")
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+class TestDebouncedWriter:
+    """Test cases for DebouncedWriter."""
+
+    def test_burst_is_coalesced(self):
+        """Test that many requests in the debounce window cause one write."""
+        written = threading.Event()
+        writer = DebouncedWriter(written.set, delay=0.05)
+        for _ in range(100):
+            writer.request()
+        assert written.wait(1)
+        time_module.sleep(0.1)
+        assert writer.writes == 1
+        assert not writer.pending
+
+    def test_max_delay_bounds_deferral(self):
+        """Test that constant requests still get written after max_delay."""
+        writes = []
+        writer = DebouncedWriter(lambda: writes.append(1), delay=0.1, max_delay=0.15)
+        end = time_module.monotonic() + 0.4
+        while time_module.monotonic() < end:
+            writer.request()
+            time_module.sleep(0.01)
+        assert writes
+
+    def test_flush_writes_pending(self):
+        """Test that flush performs a pending write synchronously."""
+        writes = []
+        writer = DebouncedWriter(lambda: writes.append(1), delay=60)
+        writer.flush()
+        assert writes == []
+        writer.request()
+        writer.flush()
+        assert writes == [1]
+        assert not writer.pending
+
+
+class TestTimelinePersistence:
+    """Test cases for timeline saving through the background writer."""
+
+    def test_edits_are_saved_in_background(self, timeline_manager):
+        """Test that edits reach the file without an explicit save."""
+        timeline_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        timeline_manager.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+        assert timeline_manager._writer.pending
+        timeline_manager.flush()
+        
+        data = json.loads(open(timeline_manager.timeline_file).read())
+        assert [slot["message"] for slot in data["break_slots"]] == ["Morning", "Lunch"]
+
+    def test_new_manager_sees_flushed_changes(self, timeline_manager):
+        """Test that a flushed timeline loads in another manager."""
+        timeline_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        timeline_manager.flush()
+        other = TimelineManager(timeline_file=timeline_manager.timeline_file)
+        assert len(other.break_slots) == 1
+
+
+class TestSettingsPersistence:
+    """Test cases for settings saving through the background writer."""
+
+    def test_flush_writes_only_changes(self, temp_dir):
+        """Test that flushing without a requested save leaves the file alone."""
+        settings_file = temp_dir / "settings.json"
+        manager = SettingsManager(settings_file=settings_file)
+        manager.flush()
+        assert not settings_file.exists()
+        manager.set("theme", "dark")
+        manager.request_save()
+        manager.flush()
+        assert json.loads(settings_file.read_text())["theme"] == "dark"
@@ -0,0 +1,158 @@
+import pytest
+import json
+from datetime import time
+from src.models import serialization
+from src.models.serialization import (BINARY_MAGIC, BinaryCodec, JsonCodec, available_codecs,
+                                      detect_codec, dumps, get_codec, loads)
+from src.models.settings import SettingsManager
+from src.models.timeline_manager import TimelineManager
+from src.models.timeline_store import JsonTimelineStore
+
+
+SAMPLE = {
+    "break_slots": [
+        {"id": f"slot_{i}", "start_time": f"{9 + i % 8:02d}:{i % 60:02d}", "duration": 5 + i,
+         "label": "Stretch" if i % 2 else "Walk é", "repeat_pattern": "daily",
+         "enabled": bool(i % 3), "custom_days": None}
+        for i in range(10)
+    ],
+    "nested": {"ratio": 0.25, "negative": -3, "empty": [], "flags": [True, False, None]},
+}
+
+
+class TestCodecs:
+    """Test cases for the individual codecs."""
+
+    @pytest.mark.parametrize("codec", [JsonCodec(use_orjson=False), JsonCodec(), BinaryCodec()])
+    def test_round_trip(self, codec):
+        """Test that every codec returns what it was given."""
+        assert codec.loads(codec.dumps(SAMPLE)) == SAMPLE
+
+    def test_stdlib_json_output_is_indented(self):
+        """Test that the default output stays readable JSON."""
+        data = JsonCodec(use_orjson=False).dumps({"a": 1})
+        assert data == b'{\n  "a": 1\n}'
+
+    def test_binary_big_integers(self):
+        """Test that integers beyond 64 bits survive, alone and in a column."""
+        obj = {"big": 2 ** 70, "rows": [{"n": n} for n in (1, 2, 3, -2 ** 64)]}
+        codec = BinaryCodec()
+        assert codec.loads(codec.dumps(obj)) == obj
+
+    def test_binary_uses_columnar_table(self):
+        """Test that a list of same-keyed dicts is stored as a table."""
+        data = BinaryCodec().dumps(SAMPLE["break_slots"])
+        assert data.startswith(BINARY_MAGIC + b"t")
+        assert len(data) < len(json.dumps(SAMPLE["break_slots"]))
+
+    def test_binary_string_column_containing_nul(self):
+        """Test that strings containing NUL survive a table column."""
+        rows = [{"label": f"a\x00{i}"} for i in range(5)] + [{"label": ""}]
+        codec = BinaryCodec()
+        assert codec.loads(codec.dumps(rows)) == rows
+
+    def test_binary_mixed_column(self):
+        """Test that columns mixing types fall back to per-value encoding."""
+        rows = [{"value": value} for value in (1, "two", 3.0, None, True, [4])]
+        codec = BinaryCodec()
+        assert codec.loads(codec.dumps(rows)) == rows
+
+    def test_binary_rejects_unsupported_values(self):
+        """Test that unserializable values raise TypeError."""
+        with pytest.raises(TypeError):
+            BinaryCodec().dumps({"when": time(9, 0)})
+        with pytest.raises(TypeError):
+            BinaryCodec().dumps({1: "non-string key"})
+
+    def test_binary_rejects_corrupt_data(self):
+        """Test that truncated or foreign data raises ValueError."""
+        data = BinaryCodec().dumps({"a": "text"})
+        with pytest.raises(ValueError):
+            BinaryCodec().loads(b"{}")
+        with pytest.raises(ValueError):
+            BinaryCodec().loads(data + b"N")
+        with pytest.raises(ValueError):
+            BinaryCodec().loads(BINARY_MAGIC + b"?")
+
+
+class TestRegistry:
+    """Test cases for codec lookup and detection."""
+
+    def test_builtin_codecs(self):
+        """Test that JSON and binary are registered, JSON being the default."""
+        assert {"json", "binary"} <= set(available_codecs())
+        assert get_codec().name == "json"
+
+    def test_unknown_codec(self):
+        """Test that unknown names raise ValueError."""
+        with pytest.raises(ValueError):
+            get_codec("yaml")
+
+    def test_detection(self):
+        """Test that loads picks the codec from the data itself."""
+        assert detect_codec(dumps(SAMPLE, "binary")).name == "binary"
+        assert detect_codec(dumps(SAMPLE)).name == "json"
+        assert loads(dumps(SAMPLE, "binary")) == SAMPLE
+        assert loads(b'  {"a": 1}') == {"a": 1}
+
+    def test_works_without_orjson(self, monkeypatch):
+        """Test that JSON falls back to the standard library."""
+        monkeypatch.setattr(serialization, "orjson", None)
+        codec = JsonCodec()
+        assert not codec.use_orjson
+        assert codec.loads(codec.dumps(SAMPLE)) == SAMPLE
+
+
+class TestFileFormats:
+    """Test cases for timeline and settings files in other formats."""
+
+    def test_timeline_round_trip_in_binary(self, temp_dir):
+        """Test that a timeline saved as binary loads back identically."""
+        path = temp_dir / "timeline.json"
+        manager = TimelineManager(timeline_file=path, codec="binary")
+        manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        manager.add_break_slot(time(12, 0), 30, "Lunch", "weekdays", enabled=False)
+        manager.add_break_slot(time(15, 0), 10, "Café", "weekends")
+        manager.save_timeline()
+        assert path.read_bytes().startswith(BINARY_MAGIC)
+
+        reloaded = TimelineManager(timeline_file=path)
+        assert [slot.to_dict() for slot in reloaded.break_slots] == \
+            [slot.to_dict() for slot in manager.break_slots]
+
+    def test_detected_format_is_kept(self, temp_dir):
+        """Test that saving without a codec keeps the file's format."""
+        path = temp_dir / "timeline.json"
+        records = [{"id": "a", "start_time": "09:00", "duration": 5}]
+        JsonTimelineStore(path, "binary").save_all(records)
+        store = JsonTimelineStore(path)
+        assert store.load() == records
+        store.save_all(records)
+        assert path.read_bytes().startswith(BINARY_MAGIC)
+
+    def test_json_timeline_converts_to_binary(self, temp_dir):
+        """Test that an existing JSON timeline is rewritten in the requested format."""
+        path = temp_dir / "timeline.json"
+        records = [{"id": "a", "start_time": "09:00", "duration": 5}]
+        JsonTimelineStore(path).save_all(records)
+        assert json.loads(path.read_text()) == {"break_slots": records}
+        store = JsonTimelineStore(path, "binary")
+        assert store.load() == records
+        store.save_all(records)
+        assert loads(path.read_bytes()) == {"break_slots": records}
+        assert path.read_bytes().startswith(BINARY_MAGIC)
+
+    def test_settings_round_trip_in_binary(self, temp_dir):
+        """Test that settings saved as binary load back identically."""
+        path = temp_dir / "settings.json"
+        settings = SettingsManager(settings_file=path, codec="binary")
+        settings.set("work_duration", 50)
+        settings.set("theme", "dark")
+        settings.save()
+        assert path.read_bytes().startswith(BINARY_MAGIC)
+
+        reloaded = SettingsManager(settings_file=path)
+        reloaded.load()
+        assert reloaded.settings == {"work_duration": 50, "theme": "dark"}
+        reloaded.save()
+        assert path.read_bytes().startswith(BINARY_MAGIC)
@@ -1,5 +1,8 @@
 import pytest
-from src.models.settings import SettingsManager
+import json
+from dataclasses import FrozenInstanceError
+from src.models.events import SettingChanged
+from src.models.settings import SETTING_DEFAULTS, AppSettings, LockedSettingError, SettingsManager
 
 
 class TestSettingsManager:
@@ -21,4 +24,155 @@ class TestSettingsManager:
         """Test saving settings."""
         settings = SettingsManager()
         settings.save()
-        # This test will be updated when save() is implemented 
\ No newline at end of file
+        # This test will be updated when save() is implemented 
+
+
+class TestSettingsSnapshot:
+    """Test cases for the typed settings snapshot."""
+
+    def test_defaults(self):
+        """Test that an empty settings dict yields the defaults."""
+        snapshot = AppSettings.from_dict({})
+        assert snapshot.to_dict() == SETTING_DEFAULTS
+
+    def test_validation(self):
+        """Test that values are coerced, clamped or replaced by defaults once."""
+        snapshot = AppSettings.from_dict({
+            "work_duration": "40", "break_duration": "soon", "volume": 250,
+            "auto_start": "yes", "sound_enabled": "maybe", "theme": 3,
+            "timeline_backend": "sqlite", "unknown_key": 1,
+        })
+        assert snapshot.work_duration == 40
+        assert snapshot.break_duration == SETTING_DEFAULTS["break_duration"]
+        assert snapshot.volume == 100
+        assert snapshot.auto_start is True
+        assert snapshot.sound_enabled is True
+        assert snapshot.theme == "system"
+        assert snapshot.timeline_backend == "sqlite"
+
+    def test_choices(self):
+        """Test that choice settings outside their allowed values fall back to the default."""
+        assert AppSettings.from_dict({"missed_break_policy": "one"}).missed_break_policy == "one"
+        assert AppSettings.from_dict({"missed_break_policy": "all"}).missed_break_policy == \
+            SETTING_DEFAULTS["missed_break_policy"]
+        assert AppSettings.from_dict({"restart_work_after_sleep": "no"}).restart_work_after_sleep is False
+
+    def test_immutable_without_dict(self):
+        """Test that snapshots cannot be modified and carry no per-instance dict."""
+        snapshot = AppSettings.from_dict({})
+        with pytest.raises(FrozenInstanceError):
+            snapshot.work_duration = 1
+        assert not hasattr(snapshot, "__dict__")
+
+    def test_snapshot_is_shared_until_changed(self, temp_dir):
+        """Test that readers share one snapshot and changes bump the version."""
+        settings = SettingsManager(settings_file=temp_dir / "settings.json")
+        first = settings.snapshot
+        version = settings.version
+        assert settings.snapshot is first
+
+        settings.set("work_duration", 25)  # Same as the default, but newly set
+        settings.set("work_duration", 25)
+        assert settings.version == version + 1
+
+        settings.set("work_duration", 50)
+        assert settings.version == version + 2
+        assert settings.snapshot is not first
+        assert settings.snapshot.work_duration == 50
+        assert first.work_duration == 25
+
+    def test_load_bumps_version(self, temp_dir):
+        """Test that loading from file publishes a new snapshot."""
+        path = temp_dir / "settings.json"
+        path.write_text('{"break_duration": "7"}')
+        settings = SettingsManager(settings_file=path)
+        version = settings.version
+        settings.load()
+        assert settings.version > version
+        assert settings.snapshot.break_duration == 7
+
+
+class TestLayeredSettings:
+    """Test cases for system defaults, user settings and admin policy."""
+
+    def make_manager(self, temp_dir, system=None, policy=None, user=None):
+        system_dir = temp_dir / "etc"
+        system_dir.mkdir(exist_ok=True)
+        for name, data in (system or {}).items():
+            (system_dir / name).write_text(json.dumps(data))
+        if policy is not None:
+            (system_dir / "policy.json").write_text(json.dumps(policy))
+        user_file = temp_dir / "settings.json"
+        if user is not None:
+            user_file.write_text(json.dumps(user))
+        settings = SettingsManager(settings_file=user_file, system_dir=system_dir)
+        settings.load()
+        return settings
+
+    def test_precedence(self, temp_dir):
+        """Test that system files merge in name order, then user, then policy."""
+        settings = self.make_manager(
+            temp_dir,
+            system={"10-site.json": {"theme": "light", "volume": 30, "work_duration": 50},
+                    "20-team.json": {"volume": "40"}},
+            policy={"work_duration": 45},
+            user={"theme": "dark", "work_duration": 90})
+        assert settings.get("theme") == "dark"
+        assert settings.get("volume") == 40
+        assert settings.get("work_duration") == 45
+        assert settings.snapshot.work_duration == 45
+        assert settings.locked_keys() == {"work_duration"}
+        assert settings.settings == {"theme": "dark", "work_duration": 90}
+
+    def test_locked_keys_rejected(self, temp_dir):
+        """Test that locked keys cannot change but may be set to their value."""
+        settings = self.make_manager(temp_dir, policy={"auto_start": False})
+        settings.set("auto_start", False)
+        with pytest.raises(LockedSettingError):
+            settings.set("auto_start", True)
+        assert settings.get("auto_start") is False
+        assert "auto_start" not in settings.settings
+
+    def test_only_user_layer_saved(self, temp_dir):
+        """Test that system and policy values never reach the user file."""
+        settings = self.make_manager(temp_dir, system={"defaults.json": {"volume": 30}},
+                                     policy={"theme": "dark"})
+        settings.set("break_duration", 10)
+        settings.save()
+        assert json.loads((temp_dir / "settings.json").read_text()) == {"break_duration": 10}
+
+    def test_set_updates_resolved_view(self, temp_dir):
+        """Test that user changes show through the cached merge at once."""
+        settings = self.make_manager(temp_dir, system={"defaults.json": {"volume": 30}})
+        resolved = settings.resolved
+        settings.set("volume", 70)
+        assert settings.resolved is resolved
+        assert settings.get("volume") == 70
+
+    def test_reload_system_publishes_effective_changes(self, temp_dir):
+        """Test that a new policy announces only the values it changes."""
+        settings = self.make_manager(temp_dir, system={"defaults.json": {"volume": 30}},
+                                     user={"theme": "dark"})
+        events = []
+        settings.events.subscribe(SettingChanged, events.append)
+        version = settings.version
+        (temp_dir / "etc" / "policy.json").write_text(json.dumps({"theme": "dark", "volume": 10}))
+        assert settings.reload_system() == ["volume"]
+        assert [(event.key, event.old_value, event.new_value) for event in events] == [("volume", 30, 10)]
+        assert settings.version == version + 1
+        assert settings.is_locked("theme")
+
+    def test_unreadable_system_file_ignored(self, temp_dir):
+        """Test that a broken system file does not stop the others loading."""
+        settings = self.make_manager(temp_dir, system={"good.json": {"volume": 30}})
+        (temp_dir / "etc" / "bad.json").write_text("{")
+        settings.load()
+        assert settings.get("volume") == 30
+
+    def test_missing_system_dir(self, temp_dir):
+        """Test that settings work without any system configuration."""
+        settings = SettingsManager(settings_file=temp_dir / "settings.json",
+                                   system_dir=temp_dir / "missing")
+        settings.load()
+        assert settings.locked_keys() == frozenset()
+        assert settings.system_files() == [str(temp_dir / "missing" / "policy.json")]
@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime, time
+from src.models.break_history import BreakHistory
+from src.models.clock import VirtualClock
+from src.models.settings import AppSettings
+from src.models.simulation import SimulatedUser, Simulation
+
+
+class TestSimulation:
+    """Test cases for replaying the scheduling engine on a virtual clock."""
+
+    def test_week_of_scheduled_breaks(self, timeline_manager):
+        """Test that a week of breaks fires each occurrence once, answered as the user chose."""
+        timeline_manager.add_break_slot(time(10, 30), 10, "", "daily")
+        timeline_manager.add_break_slot(time(14, 0), 5, "", "weekdays")
+        user = SimulatedUser(snooze_rate=0, skip_rate=0)
+        settings = AppSettings.from_dict({"work_duration": 24 * 60})
+        report = Simulation(timeline_manager, settings, user).run(7)
+        assert report.scheduled == 7 + 5
+        # The weekend's breaks wait for the user; Sunday's replaces Saturday's in the popup
+        assert report.shown == 12
+        assert report.started == report.completed == 10
+        assert report.skipped == 1
+        assert report.snoozed == report.work_sessions == 0
+        assert report.simulated_seconds == 7 * 86400
+        assert report.elapsed < 5
+
+    def test_work_timer_breaks(self, timeline_manager):
+        """Test that the work timer raises breaks only while the user is at their desk."""
+        user = SimulatedUser(work_start=time(9, 0), work_end=time(11, 0), response_delay=0,
+                             snooze_rate=0, skip_rate=0)
+        settings = AppSettings.from_dict({"work_duration": 25, "break_duration": 5})
+        report = Simulation(timeline_manager, settings, user).run(1)
+        # 09:00-09:25 work, 09:25-09:30 break, and so on; the fourth break is a long one
+        assert report.work_sessions == report.completed == 4
+        assert report.long_breaks == 1
+        assert report.scheduled == 0
+
+    def test_reproducible_and_recorded(self, timeline_manager, temp_dir):
+        """Test that a seeded run is reproducible and its events land in the history."""
+        for hour in (10, 12, 15):
+            timeline_manager.add_break_slot(time(hour, 0), 10, "", "daily")
+        reports = []
+        for name in ("a.db", "b.db"):
+            history = BreakHistory(temp_dir / name)
+            report = Simulation(timeline_manager, history=history,
+                                user=SimulatedUser(snooze_rate=0.3, skip_rate=0.2, seed=7)).run(7)
+            totals = history.weekly_compliance(datetime(2024, 1, 8).date(), datetime(2024, 1, 14).date())[0]
+            history.close()
+            assert (totals.scheduled, totals.shown, totals.started, totals.completed, totals.skipped) == (
+                report.scheduled, report.shown, report.started, report.completed, report.skipped)
+            reports.append((report.shown, report.completed, report.snoozed, report.skipped))
+        assert reports[0] == reports[1]
+        assert reports[0][2] > 0 and reports[0][3] > 0
+
+    def test_runs_continue(self, timeline_manager):
+        """Test that running again carries on from where the clock stopped."""
+        timeline_manager.add_break_slot(time(10, 30), 10, "", "daily")
+        clock = VirtualClock(datetime(2024, 1, 8))
+        simulation = Simulation(timeline_manager, AppSettings.from_dict({"work_duration": 24 * 60}),
+                                SimulatedUser(snooze_rate=0, skip_rate=0), clock)
+        simulation.run(2)
+        report = simulation.run(3)
+        assert clock.now() == datetime(2024, 1, 13)
+        assert report.scheduled == report.completed == 5
@@ -0,0 +1,48 @@
+import pytest
+from datetime import time
+from src.models.timeline_manager import BreakSlot
+from src.models.slot_index import SlotIntervalIndex, slot_interval
+
+
+class TestSlotIntervalIndex:
+    """Test cases for SlotIntervalIndex."""
+
+    def test_slot_interval(self):
+        """Test conversion of a slot to minute bounds."""
+        assert slot_interval(BreakSlot(time(10, 30), 15)) == (630, 645)
+
+    def test_overlaps_and_adjacency(self):
+        """Test overlap queries treat intervals as half-open."""
+        index = SlotIntervalIndex([BreakSlot(time(10, 0), 30)])
+        assert index.overlaps(615, 620)
+        assert not index.overlaps(630, 640)  # Starts as the other ends
+        assert not index.overlaps(590, 600)
+
+    def test_disabled_slots_not_indexed(self):
+        """Test that disabled slots never conflict."""
+        index = SlotIntervalIndex([BreakSlot(time(10, 0), 30, enabled=False)])
+        assert len(index) == 0
+        assert not index.overlaps(600, 630)
+
+    def test_long_slot_found_from_far_query(self):
+        """Test that a long slot is found even when it starts well before the query."""
+        long_slot = BreakSlot(time(8, 0), 120)
+        index = SlotIntervalIndex([long_slot, BreakSlot(time(9, 0), 5), BreakSlot(time(9, 30), 5)])
+        assert long_slot in index.find_overlapping(595, 600)
+
+    def test_remove(self):
+        """Test removing a slot from the index."""
+        slot = BreakSlot(time(10, 0), 30)
+        index = SlotIntervalIndex([slot])
+        assert index.remove(slot)
+        assert not index.remove(slot)
+        assert not index.overlaps(600, 630)
+
+    def test_conflicting_pairs(self):
+        """Test the sweep reports every conflicting pair."""
+        a = BreakSlot(time(9, 0), 60)
+        b = BreakSlot(time(9, 10), 10)
+        c = BreakSlot(time(9, 15), 10)
+        d = BreakSlot(time(12, 0), 10)
+        pairs = SlotIntervalIndex([d, c, b, a]).conflicting_pairs()
+        assert set(pairs) == {(a, b), (a, c), (b, c)}
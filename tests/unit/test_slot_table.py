@@ -0,0 +1,82 @@
+import pytest
+from datetime import time
+from src.models.slot_table import SlotTable
+from src.models.timeline_manager import BreakSlot
+
+
+class TestSlotTable:
+    """Test cases for SlotTable and BreakSlot views over it."""
+
+    def test_views_read_and_write_rows(self):
+        """Test that a view reads and writes its row."""
+        table = SlotTable()
+        slot = BreakSlot(time(10, 30), 15, "Stretch", "weekdays", table=table)
+        assert len(table) == 1
+        assert table.start_minutes[slot._row] == 630
+        
+        slot.duration = 20
+        slot.enabled = False
+        slot.message = "Walk"
+        assert (slot.duration, slot.enabled, slot.message) == (20, False, "Walk")
+        assert table.durations[slot._row] == 20
+
+    def test_messages_are_interned(self):
+        """Test that equal messages share one stored string."""
+        table = SlotTable()
+        for hour in range(8, 18):
+            BreakSlot(time(hour, 0), 5, "Stretch", table=table)
+        assert table._messages.count("Stretch") == 1
+
+    def test_no_instance_dict(self):
+        """Test that slots carry no per-instance dictionary."""
+        slot = BreakSlot(time(10, 30), 15)
+        assert not hasattr(slot, "__dict__")
+        with pytest.raises(AttributeError):
+            slot.scheduled = True
+
+    def test_id_fixed_until_reassigned(self):
+        """Test that changing values keeps the ID until it is regenerated."""
+        slot = BreakSlot(time(10, 30), 15)
+        slot.duration = 20
+        assert slot.id == "1030_15_daily"
+        slot.id = slot._generate_id()
+        assert slot.id == "1030_20_daily"
+
+    def test_precise_start_time_preserved(self):
+        """Test that start times with seconds survive the minute column."""
+        slot = BreakSlot(time(10, 30, 15, 500), 15)
+        assert slot.start_time == time(10, 30, 15, 500)
+        assert slot.start_minute == 630
+
+    def test_invalid_duration_rejected(self):
+        """Test that non-integer durations are rejected."""
+        with pytest.raises(ValueError):
+            BreakSlot(time(10, 30), "abc")
+
+    def test_rows_are_reused(self):
+        """Test that released rows are reused and attach keeps the ID."""
+        table = SlotTable()
+        slot = BreakSlot(time(9, 0), 5, table=table)
+        slot.id = "custom"
+        
+        slot._attach(SlotTable())
+        assert len(table) == 0
+        assert slot.id == "custom"
+        
+        other = BreakSlot(time(12, 0), 30, table=table)
+        assert other._row == 0
+        assert other.id == "1200_30_daily"
+
+    def test_manager_moves_slots_into_its_table(self, timeline_manager):
+        """Test that the timeline manager stores its slots in one table."""
+        outside = BreakSlot(time(9, 0), 5, "Outside")
+        timeline_manager.break_slots = [outside]
+        added = timeline_manager.add_break_slot(time(10, 0), 5, "Added")
+        
+        assert outside._table is timeline_manager.slot_table
+        assert added._table is timeline_manager.slot_table
+        assert len(timeline_manager.slot_table) == 2
+        
+        timeline_manager.delete_break_slot(added.id)
+        assert len(timeline_manager.slot_table) == 1
+        assert added.message == "Added"  # Still readable after deletion
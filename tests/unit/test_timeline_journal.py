@@ -0,0 +1,147 @@
+import pytest
+import json
+import os
+from datetime import datetime, time
+from src.models.clock import VirtualClock
+from src.models.timeline_manager import TimelineManager
+from src.models.timeline_store import JournalTimelineStore, open_timeline_store
+
+
+@pytest.fixture
+def journal_manager(temp_dir):
+    """Create a TimelineManager backed by the journal store."""
+    manager = TimelineManager(timeline_file=temp_dir / "timeline.json", backend="journal")
+    yield manager
+    manager.store.close()
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestJournalTimelineStore:
+    """Test cases for JournalTimelineStore."""
+
+    def test_each_edit_appends_one_line(self, journal_manager):
+        """Test that edits append to the journal instead of rewriting the snapshot."""
+        slot = journal_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        journal_manager.edit_break_slot(slot.id, start_time=time(10, 0))
+        journal_manager.delete_break_slot(journal_manager.break_slots[0].id)
+        
+        store = journal_manager.store
+        assert not os.path.exists(journal_manager.timeline_file)
+        entries = read_lines(store.journal_path)
+        assert [entry["op"] for entry in entries] == ["add", "edit", "delete"]
+        assert entries[1]["previous_id"] == "0900_15_daily"
+        assert entries[1]["id"] == "1000_15_daily"
+        assert not journal_manager._writer.pending
+
+    def test_replay_on_startup(self, journal_manager):
+        """Test that a new manager rebuilds the timeline from the journal."""
+        slot = journal_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        journal_manager.add_break_slot(time(12, 0), 30, "Lunch", "weekdays")
+        journal_manager.edit_break_slot(slot.id, message="Early")
+        other = TimelineManager(timeline_file=journal_manager.timeline_file)
+        assert isinstance(other.store, JournalTimelineStore)
+        assert [(s.message, s.repeat_pattern) for s in other.break_slots] == [
+            ("Early", "daily"), ("Lunch", "weekdays")]
+        other.store.close()
+
+    def test_torn_tail_is_ignored_and_repaired(self, journal_manager):
+        """Test that a partially written last line does not break loading."""
+        journal_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        journal_path = journal_manager.store.journal_path
+        journal_manager.store.close()
+        with open(journal_path, "a") as f:
+            f.write('{"op": "add", "id": "10')
+        
+        store = JournalTimelineStore(journal_manager.timeline_file)
+        assert [r["message"] for r in store.load()] == ["Morning"]
+        store.delete("0900_15_daily")
+        assert [entry["op"] for entry in read_lines(journal_path)] == ["add", "delete"]
+        store.close()
+
+    def test_compaction(self, temp_dir):
+        """Test that a full journal is folded into the snapshot and kept for auditing."""
+        store = JournalTimelineStore(temp_dir / "timeline.json", compact_threshold=1)
+        store.load()
+        store.upsert({"id": "0900_15_daily", "start_time": "09:00", "duration": 15,
+                      "message": "", "repeat_pattern": "daily", "enabled": True})
+        store.close()
+        
+        assert json.loads((temp_dir / "timeline.json").read_text())["break_slots"][0]["id"] == "0900_15_daily"
+        assert not os.path.exists(store.journal_path)
+        assert [entry["op"] for entry in store.history()] == ["add"]
+        assert [r["id"] for r in JournalTimelineStore(temp_dir / "timeline.json").load()] == ["0900_15_daily"]
+
+    def test_transaction_journals_only_changes(self, journal_manager):
+        """Test that a committed transaction journals the changed slots only."""
+        journal_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        with journal_manager.transaction():
+            journal_manager.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+            journal_manager.add_break_slot(time(15, 0), 10, "Tea", "daily")
+        journal_manager.flush()
+        history = journal_manager.get_change_history()
+        assert [(entry["op"], entry["slot"]["message"]) for entry in history] == [
+            ("add", "Morning"), ("add", "Lunch"), ("add", "Tea")]
+
+    def test_existing_journal_selects_store(self, temp_dir):
+        """Test that a journal beside a JSON file is never ignored."""
+        (temp_dir / "timeline.json.journal").write_text("")
+        store = open_timeline_store(temp_dir / "timeline.json")
+        assert isinstance(store, JournalTimelineStore)
+
+    def test_duplicate_ids_in_snapshot_kept(self, temp_dir):
+        """Test that a legacy snapshot repeating an ID loads every slot, as the JSON backend does."""
+        records = [{"id": "0900_10_daily", "start_time": "09:00", "duration": 10, "message": message,
+                    "repeat_pattern": "daily", "enabled": True} for message in ("A", "B")]
+        path = temp_dir / "timeline.json"
+        path.write_text(json.dumps({"break_slots": records}))
+        json_manager = TimelineManager(timeline_file=path, backend="json")
+        journal_manager = TimelineManager(timeline_file=path, backend="journal")
+        expected = [("0900_10_daily", "A"), ("0900_10_daily-2", "B")]
+        assert [(s.id, s.message) for s in json_manager.break_slots] == expected
+        assert [(s.id, s.message) for s in journal_manager.break_slots] == expected
+        journal_manager.store.compact()
+        journal_manager.store.close()
+        reopened = TimelineManager(timeline_file=path, backend="journal")
+        assert [(s.id, s.message) for s in reopened.break_slots] == expected
+        reopened.store.close()
+
+    def test_compaction_keeps_generations(self, temp_dir):
+        """Test that compacted journals rotate and the oldest beyond the limit is dropped."""
+        store = JournalTimelineStore(temp_dir / "timeline.json", generations=2)
+        store.load()
+        for minute in range(3):
+            store.upsert({"id": f"09{minute:02d}_5_daily", "start_time": f"09:{minute:02d}", "duration": 5,
+                          "message": "", "repeat_pattern": "daily", "enabled": True})
+            store.compact()
+        assert os.path.exists(store.journal_path + ".2")
+        assert not os.path.exists(store.journal_path + ".3")
+        assert [entry["id"] for entry in store.history()] == ["0901_5_daily", "0902_5_daily"]
+        store.close()
+
+    def test_reload_picks_up_journaled_edits(self, temp_dir):
+        """Test that edits another instance journaled are reloaded though the snapshot is unchanged."""
+        path = temp_dir / "timeline.json"
+        writer = TimelineManager(timeline_file=path, backend="journal")
+        writer.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        writer.store.compact()
+        reader = TimelineManager(timeline_file=path, backend="journal")
+        writer.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+        assert [type(event).__name__ for event in reader.reload_timeline()] == ["SlotAdded"]
+        assert [s.message for s in reader.break_slots] == ["Morning", "Lunch"]
+        assert writer.reload_timeline() == []
+        writer.store.close()
+        reader.store.close()
+
+    def test_entries_dated_by_clock(self, temp_dir):
+        """Test that journal entries take their time from the manager's clock."""
+        clock = VirtualClock(datetime(2024, 1, 8, 9, 0))
+        manager = TimelineManager(timeline_file=temp_dir / "timeline.json", backend="journal", clock=clock)
+        manager.add_break_slot(time(10, 0), 15, "Coffee", "daily")
+        clock.run(90)
+        manager.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+        assert [entry["time"] for entry in manager.store.history()] == ["2024-01-08T09:00:00", "2024-01-08T09:01:30"]
+        manager.store.close()
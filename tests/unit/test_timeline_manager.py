@@ -57,6 +57,16 @@ class TestBreakSlot:
         assert slot.repeat_pattern == "daily"
         assert slot.enabled is True
 
+    def test_break_slot_invalid_duration(self):
+        """Test that a non-integer duration is rejected up front, but tolerated in files."""
+        with pytest.raises(ValueError):
+            BreakSlot(time(9, 0), "x")
+        slot = BreakSlot(time(9, 0), 15)
+        with pytest.raises(ValueError):
+            slot.duration = None
+        assert slot.duration == 15
+        assert BreakSlot.from_dict({"start_time": "09:00", "duration": "x"}).duration == 5
+
     def test_break_slot_is_active_today(self):
         """Test break slot active status for different patterns."""
         # Test daily pattern
@@ -249,4 +259,134 @@ class TestTimelineManager:
         # Check that slots are sorted
         assert timeline_manager.break_slots[0].start_time == time(9, 0)
         assert timeline_manager.break_slots[1].start_time == time(12, 0)
-        assert timeline_manager.break_slots[2].start_time == time(15, 0) 
\ No newline at end of file
+        assert timeline_manager.break_slots[2].start_time == time(15, 0) 
+
+    def test_edit_break_slot_reindexes_overlap(self, timeline_manager):
+        """Test that overlap checks follow a slot after it is moved."""
+        slot = timeline_manager.add_break_slot(time(10, 0), 30, "Moving", "daily")
+        timeline_manager.edit_break_slot(slot.id, start_time=time(14, 0))
+        
+        # The old position is free, the new one is taken
+        timeline_manager.add_break_slot(time(10, 0), 30, "Replacement", "daily")
+        with pytest.raises(ValueError, match="overlaps"):
+            timeline_manager.add_break_slot(time(14, 15), 10, "Clash", "daily")
+
+    def test_validate_timeline_reports_every_conflicting_pair(self, timeline_manager):
+        """Test that validation lists each overlapping pair once."""
+        timeline_manager.break_slots = [
+            BreakSlot(time(9, 0), 60, "A", "daily"),
+            BreakSlot(time(9, 15), 10, "B", "daily"),
+            BreakSlot(time(9, 30), 10, "C", "daily"),
+            BreakSlot(time(11, 0), 10, "D", "daily"),
+        ]
+        
+        pairs = timeline_manager.find_overlapping_pairs()
+        named = sorted((a.message, b.message) for a, b in pairs)
+        assert named == [("A", "B"), ("A", "C")]
+        
+        errors = timeline_manager.validate_timeline()
+        assert "Break slot at 09:00 overlaps with break slot at 09:15" in errors
+        assert "Break slot at 09:00 overlaps with break slot at 09:30" in errors
+
+    def test_duplicate_slots_get_unique_ids(self, timeline_manager):
+        """Test that identical slots no longer shadow each other by ID."""
+        timeline_manager.break_slots = [
+            BreakSlot(time(9, 0), 5, "First", "daily", enabled=False),
+            BreakSlot(time(9, 0), 5, "Second", "daily", enabled=False),
+        ]
+        
+        first, second = timeline_manager.get_all_break_slots()
+        assert first.id != second.id
+        assert timeline_manager.get_break_slot(first.id) is first
+        assert timeline_manager.get_break_slot(second.id) is second
+        
+        assert timeline_manager.delete_break_slot(second.id)
+        assert timeline_manager.get_break_slot(second.id) is None
+        assert timeline_manager.get_break_slot(first.id) is first
+
+    def test_id_lookup_follows_edit(self, timeline_manager):
+        """Test that the ID map follows a regenerated ID."""
+        slot = timeline_manager.add_break_slot(time(10, 30), 15, "Test break", "daily")
+        old_id = slot.id
+        
+        timeline_manager.edit_break_slot(old_id, start_time=time(11, 0))
+        
+        assert slot.id != old_id
+        assert timeline_manager.get_break_slot(old_id) is None
+        assert timeline_manager.get_break_slot(slot.id) is slot
+        assert timeline_manager.delete_break_slot(old_id) is False
+
+
+class TestTimelineTransactions:
+    """Test cases for batched timeline mutations."""
+
+    def test_transaction_saves_once(self, timeline_manager, monkeypatch):
+        """Test that a transaction sorts and persists once."""
+        saves = []
+        monkeypatch.setattr(timeline_manager, "request_save", lambda: saves.append(1))
+        
+        with timeline_manager.transaction():
+            for hour in (15, 9, 12):
+                timeline_manager.add_break_slot(time(hour, 0), 10, "", "daily")
+            assert saves == []
+        
+        assert saves == [1]
+        assert [s.start_time.hour for s in timeline_manager.break_slots] == [9, 12, 15]
+
+    def test_transaction_checks_final_state_only(self, timeline_manager):
+        """Test that intermediate overlaps are fine if the final state is valid."""
+        slot = timeline_manager.add_break_slot(time(10, 0), 30, "Old", "daily")
+        with timeline_manager.transaction():
+            timeline_manager.add_break_slot(time(10, 0), 30, "New", "daily")
+            timeline_manager.delete_break_slot(slot.id)
+        
+        assert [s.message for s in timeline_manager.break_slots] == ["New"]
+
+    def test_transaction_rolls_back_on_conflict(self, timeline_manager):
+        """Test that a conflicting batch leaves the timeline untouched."""
+        keep = timeline_manager.add_break_slot(time(9, 0), 15, "Keep", "daily")
+        move = timeline_manager.add_break_slot(time(12, 0), 15, "Move", "daily")
+        move_id = move.id
+        
+        with pytest.raises(ValueError, match="overlaps"):
+            with timeline_manager.transaction():
+                timeline_manager.delete_break_slot(keep.id)
+                timeline_manager.edit_break_slot(move.id, start_time=time(14, 0), duration=20)
+                timeline_manager.add_break_slot(time(14, 10), 15, "Clash", "daily")
+        
+        assert timeline_manager.break_slots == [keep, move]
+        assert move.id == move_id
+        assert (move.start_time, move.duration) == (time(12, 0), 15)
+        assert timeline_manager.get_break_slot(keep.id) is keep
+        assert timeline_manager.get_break_slot(move_id) is move
+        assert not timeline_manager._has_overlap(BreakSlot(time(14, 0), 30))
+        with pytest.raises(ValueError, match="overlaps"):
+            timeline_manager.add_break_slot(time(9, 5), 5, "", "daily")
+
+    def test_apply_changes(self, timeline_manager):
+        """Test applying a list of changes."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        added, edited, deleted = timeline_manager.apply_changes([
+            {"action": "add", "start_time": time(13, 0), "duration": 10},
+            {"action": "edit", "slot_id": slot.id, "message": "Early"},
+            {"action": "delete", "slot_id": "missing"},
+        ])
+        
+        assert added.start_time == time(13, 0)
+        assert edited.message == "Early"
+        assert deleted is False
+        with pytest.raises(ValueError, match="Unknown"):
+            timeline_manager.apply_changes([{"action": "rename"}])
+    
+    def test_apply_changes_rejects_disabled_overlap(self, timeline_manager):
+        """Test that a disabled slot overlapping an enabled one rolls the batch back."""
+        slot = timeline_manager.add_break_slot(time(10, 0), 30, "Coffee", "daily")
+        with pytest.raises(ValueError, match="overlaps"):
+            timeline_manager.add_break_slot(time(10, 10), 30, "", "daily", enabled=False)
+        with pytest.raises(ValueError, match="overlaps"):
+            timeline_manager.apply_changes([
+                {"action": "add", "start_time": time(10, 10), "duration": 30,
+                 "repeat_pattern": "daily", "enabled": False},
+            ])
+        
+        assert timeline_manager.break_slots == [slot]
@@ -0,0 +1,110 @@
+import pytest
+import json
+import sqlite3
+from datetime import time
+from src.models.timeline_manager import TimelineManager
+from src.models.timeline_store import (JsonTimelineStore, SqliteTimelineStore,
+                                       migrate_json_to_sqlite, open_timeline_store)
+
+
+def count_rows(path, table="break_slots"):
+    connection = sqlite3.connect(str(path))
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def sqlite_manager(temp_dir):
+    """Create a TimelineManager backed by SQLite."""
+    manager = TimelineManager(timeline_file=temp_dir / "timeline.db")
+    yield manager
+    manager.store.close()
+
+
+class TestTimelineStoreSelection:
+    """Test cases for choosing a storage backend."""
+
+    def test_selected_by_extension(self, temp_dir):
+        """Test that database extensions select SQLite."""
+        assert isinstance(open_timeline_store(temp_dir / "t.json"), JsonTimelineStore)
+        store = open_timeline_store(temp_dir / "t.sqlite3")
+        assert isinstance(store, SqliteTimelineStore)
+        store.close()
+
+    def test_sqlite_setting_migrates_json(self, temp_dir):
+        """Test that selecting SQLite for a JSON path migrates it to a .db file."""
+        json_path = temp_dir / "timeline.json"
+        json_path.write_text(json.dumps({"break_slots": [
+            {"id": "0900_15_daily", "start_time": "09:00", "duration": 15,
+             "message": "Morning", "repeat_pattern": "daily", "enabled": True},
+        ]}))
+        manager = TimelineManager(timeline_file=json_path, backend="sqlite")
+        assert manager.store.path == str(temp_dir / "timeline.db")
+        assert [slot.message for slot in manager.break_slots] == ["Morning"]
+        manager.store.close()
+
+
+class TestSqliteTimelineStore:
+    """Test cases for SqliteTimelineStore."""
+
+    def test_edits_are_single_row_upserts(self, sqlite_manager):
+        """Test that add/edit/delete reach the database without a full save."""
+        morning = sqlite_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        lunch = sqlite_manager.add_break_slot(time(12, 0), 30, "Lunch", "weekdays")
+        assert not sqlite_manager._writer.pending
+        assert count_rows(sqlite_manager.timeline_file) == 2
+        assert count_rows(sqlite_manager.timeline_file, "slot_occurrences") == 12
+
+        sqlite_manager.edit_break_slot(morning.id, start_time=time(8, 0), message="Early")
+        sqlite_manager.delete_break_slot(lunch.id)
+        records = sqlite_manager.store.load()
+        assert [(r["id"], r["message"]) for r in records] == [(morning.id, "Early")]
+        assert count_rows(sqlite_manager.timeline_file, "slot_occurrences") == 7
+
+    def test_reload_round_trip(self, sqlite_manager):
+        """Test that slots survive reopening the database."""
+        sqlite_manager.add_break_slot(time(9, 0), 15, "Morning", "weekends")
+        slot = sqlite_manager.add_break_slot(time(12, 0), 30, "Lunch", "daily")
+        sqlite_manager.edit_break_slot(slot.id, duration=20, enabled=False)
+        other = TimelineManager(timeline_file=sqlite_manager.timeline_file)
+        assert [(s.start_time, s.duration, s.repeat_pattern, s.enabled) for s in other.break_slots] == [
+            (time(9, 0), 15, "weekends", True), (time(12, 0), 20, "daily", False)]
+        # The regenerated ID of the edited slot is written back for later upserts
+        other.delete_break_slot(other.break_slots[1].id)
+        assert count_rows(sqlite_manager.timeline_file) == 1
+        other.store.close()
+
+    def test_range_query(self, sqlite_manager):
+        """Test breaks between 13:00 and 15:00 on weekdays."""
+        sqlite_manager.add_break_slot(time(12, 50), 15, "Overlaps start", "daily")
+        sqlite_manager.add_break_slot(time(14, 0), 10, "Weekend only", "weekends")
+        sqlite_manager.add_break_slot(time(14, 30), 10, "Weekday", "weekdays")
+        sqlite_manager.add_break_slot(time(15, 0), 10, "At end", "daily")
+        sqlite_manager.add_break_slot(time(13, 30), 10, "Disabled", "daily")
+        sqlite_manager.edit_break_slot(sqlite_manager.break_slots[1].id, enabled=False)
+
+        found = sqlite_manager.get_break_slots_between(time(13, 0), time(15, 0), range(5))
+        assert [slot.message for slot in found] == ["Overlaps start", "Weekday"]
+
+    def test_range_query_matches_json_fallback(self, sqlite_manager, timeline_manager):
+        """Test that the SQL and in-memory range queries agree."""
+        for manager in (sqlite_manager, timeline_manager):
+            manager.add_break_slot(time(9, 0), 15, "A", "weekdays")
+            manager.add_break_slot(time(10, 0), 15, "B", "weekends")
+            manager.add_break_slot(time(11, 0), 15, "C", "daily")
+        for days in (None, [5], [0, 6], []):
+            assert ([s.message for s in sqlite_manager.get_break_slots_between(time(8, 0), time(12, 0), days)]
+                    == [s.message for s in timeline_manager.get_break_slots_between(time(8, 0), time(12, 0), days)])
+
+    def test_migrator_keeps_duplicate_slots(self, temp_dir):
+        """Test that migrating a JSON file with repeated IDs keeps every slot."""
+        slot = {"id": "0900_15_daily", "start_time": "09:00", "duration": 15,
+                "message": "", "repeat_pattern": "daily", "enabled": True}
+        json_path = temp_dir / "timeline.json"
+        json_path.write_text(json.dumps({"break_slots": [slot, slot]}))
+        assert migrate_json_to_sqlite(json_path, temp_dir / "timeline.db") == 2
+        store = SqliteTimelineStore(temp_dir / "timeline.db")
+        assert [r["id"] for r in store.load()] == ["0900_15_daily", "0900_15_daily-2"]
+        store.close()
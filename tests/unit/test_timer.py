@@ -1,5 +1,13 @@
 import pytest
-from src.models.timer import Timer
+import threading
+import time
+from datetime import datetime
+from src.controllers.timer_controller import TimerController
+from src.models.clock import VirtualClock
+from src.models.events import EventBus, SessionChanged
+from src.models.settings import SettingsManager
+from src.models.timer import (BEGIN_BREAK, END_BREAK, FINISH, LONG_BREAK, SHORT_BREAK, WORK, Session,
+                              SessionState, Timer, TimerService)
 
 
 class TestTimer:
@@ -42,4 +50,235 @@ class TestTimer:
         timer = Timer(60)
         timer.remaining = 30
         timer.reset()
-        assert timer.remaining == 60 
\ No newline at end of file
+        assert timer.remaining == 60 
+
+    def test_remaining_follows_clock(self):
+        """Test that remaining time is computed from the service clock."""
+        clock = VirtualClock(datetime(2024, 1, 8, 9, 0), monotonic=1000.0)
+        service = TimerService(clock)
+        timer = Timer(60, service=service)
+        timer.start()
+        clock.run(12.5)
+        assert timer.remaining == 47.5
+        timer.stop()
+        clock.run(100)
+        assert timer.remaining == 47.5
+        timer.start()
+        clock.run(7.5)
+        assert timer.remaining == 40
+        timer.cancel()
+        assert service.pending() == 0
+        service.stop()
+
+    def test_callback_and_ticks(self):
+        """Test that ticks land on second boundaries and the callback fires once."""
+        service = TimerService()
+        finished = threading.Event()
+        ticks = []
+        timer = Timer(0.35, finished.set, service=service)
+        timer.subscribe_ticks(ticks.append, interval=0.1)
+        timer.start()
+        assert finished.wait(2)
+        assert not timer.running
+        assert timer.remaining == 0
+        assert [round(remaining, 1) for remaining in ticks] == [0.3, 0.2, 0.1]
+        service.stop()
+
+    def test_pause_cancels_pending_callback(self):
+        """Test that a paused timer does not fire and resumes where it left off."""
+        service = TimerService()
+        finished = threading.Event()
+        timer = Timer(0.2, finished.set, service=service)
+        timer.start()
+        timer.pause()
+        assert not finished.wait(0.4)
+        timer.resume()
+        assert finished.wait(1)
+        service.stop()
+
+    def test_many_timers_share_one_thread(self):
+        """Test that concurrent timers are driven by a single worker thread."""
+        service = TimerService()
+        done = []
+        timers = [Timer(0.05 * (i + 1), lambda i=i: done.append(i), service=service)
+                  for i in range(5)]
+        before = threading.active_count()
+        for timer in timers:
+            timer.start()
+        assert threading.active_count() <= before + 1
+        deadline = time.monotonic() + 2
+        while len(done) < 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert done == [0, 1, 2, 3, 4]
+        service.stop()
+
+
+    def test_virtual_clock_drives_worker(self):
+        """Test that moving a virtual clock wakes the worker thread to run what fell due."""
+        clock = VirtualClock(datetime(2024, 1, 8, 9, 0))
+        service = TimerService(clock)
+        finished = threading.Event()
+        Timer(3600, finished.set, service=service).start()
+        assert not finished.wait(0.1)
+        clock.run(3600)
+        assert finished.wait(2)
+        service.stop()
+
+    def test_foreground_service(self):
+        """Test that without a worker thread callbacks only run from run_due, in order."""
+        clock = VirtualClock(datetime(2024, 1, 8, 9, 0))
+        service = TimerService(clock, background=False)
+        calls = []
+        service.call_later(20, lambda: calls.append("late"))
+        service.call_later(10, lambda: service.call_later(0, lambda: calls.append("chained")))
+        service.call_later(5, lambda: calls.append("early")).cancel()
+        assert service.next_deadline() == 10
+        assert service.run_due() == 0
+        clock.run_until(service.next_deadline())
+        assert service.run_due() == 2
+        assert calls == ["chained"]
+        clock.run(10)
+        assert service.run_due() == 1
+        assert calls == ["chained", "late"]
+        assert service.next_deadline() is None
+        assert service._thread is None
+
+
+@pytest.fixture
+def clock():
+    """Create a virtual clock at nine on a Monday."""
+    return VirtualClock(datetime(2024, 1, 8, 9, 0))
+
+
+@pytest.fixture
+def service(clock):
+    """Create a timer service without a worker thread."""
+    return TimerService(clock, background=False)
+
+
+def run_for(clock, service, seconds):
+    """Move the clock, running every callback that falls due on the way."""
+    end = clock.monotonic() + seconds
+    while service.next_deadline() is not None and service.next_deadline() <= end:
+        clock.run_until(service.next_deadline())
+        service.run_due()
+    clock.run_until(end)
+
+
+class TestSession:
+    """Test cases for the work/break session engine."""
+
+    def test_cycle_ends_in_long_break(self, clock, service):
+        """Test that every fourth work period is followed by a long break."""
+        session = Session(60, 10, 30, sessions_per_cycle=2, auto_start_breaks=True,
+                          auto_start_work=True, service=service)
+        events = []
+        session.events.subscribe(SessionChanged, events.append)
+        session.start()
+        phases = []
+        for _ in range(4):
+            run_for(clock, service, session.remaining)
+            phases.append(session.phase)
+        assert phases == [SHORT_BREAK, WORK, LONG_BREAK, WORK]
+        assert session.running and session.state.cycle == 0
+        finishes = [event for event in events if event.transition == FINISH]
+        assert [event.previous.phase for event in finishes] == [WORK, SHORT_BREAK, WORK, LONG_BREAK]
+        assert clock.monotonic() == 60 + 10 + 60 + 30
+
+    def test_breaks_wait_without_auto_start(self, clock, service):
+        """Test that a finished work period leaves its break paused at full length."""
+        session = Session(60, 10, 30, service=service)
+        session.start()
+        run_for(clock, service, 100)
+        assert session.state == SessionState(SHORT_BREAK, 10, 10, False, 1)
+        assert session.skip().phase == WORK
+        assert session.remaining == 60
+
+    def test_break_out_of_turn_keeps_work(self, clock, service):
+        """Test that work interrupted by a break continues where it left off."""
+        session = Session(60, 10, 30, service=service)
+        session.start()
+        run_for(clock, service, 45)
+        state = session.begin_break(20, start=True)
+        assert (state.phase, state.remaining, state.work_remaining) == (SHORT_BREAK, 20, 15)
+        run_for(clock, service, 5)
+        state = session.end_break()
+        assert (state.phase, state.duration, state.remaining, state.running) == (WORK, 60, 15, False)
+        assert session.end_break() is None
+        assert session.reset().remaining == 60
+
+    def test_extend_snoozes(self, clock, service):
+        """Test that extending a phase adds to its length and the time left."""
+        session = Session(60, 10, 30, service=service)
+        session.begin_break(10, start=True)
+        run_for(clock, service, 4)
+        state = session.extend(300)
+        assert (state.duration, state.remaining) == (310, 306)
+        run_for(clock, service, 306)
+        assert session.phase == WORK
+
+    def test_configure_applies_to_paused_work(self, service):
+        """Test that new lengths apply to a paused work period at once and to breaks next time."""
+        session = Session(60, 10, 30, service=service)
+        session.configure(work=120, short_break=20)
+        assert (session.duration, session.remaining) == (120, 120)
+        session.start()
+        session.configure(work=90)
+        assert session.duration == 120
+        assert session.skip().duration == 20
+
+    def test_state_round_trip(self, clock, service):
+        """Test that a saved state restores the same session, still counting down."""
+        session = Session(60, 10, 30, service=service)
+        session.start()
+        run_for(clock, service, 20)
+        session.begin_break(30, long=True, start=True)
+        state = SessionState.from_dict(session.state.to_dict())
+        assert state == session.state
+        restored = Session(60, 10, 30, service=service)
+        events = []
+        restored.events.subscribe(SessionChanged, events.append)
+        restored.restore(state)
+        assert restored.state == state
+        run_for(clock, service, 30)
+        assert [event.transition for event in events] == ["restore", FINISH]
+        assert (restored.phase, restored.remaining) == (WORK, 40)
+
+    def test_invalid_state_rejected(self):
+        """Test that states with unknown phases or negative times are rejected."""
+        with pytest.raises(ValueError):
+            SessionState.from_dict({"phase": "lunch"})
+        with pytest.raises(ValueError):
+            SessionState.from_dict({"phase": WORK, "remaining": -1})
+
+    def test_events_carry_both_states(self, service):
+        """Test that each change publishes one event with the states before and after."""
+        bus = EventBus()
+        session = Session(60, 10, 30, event_bus=bus, service=service)
+        events = []
+        bus.subscribe(SessionChanged, events.append)
+        assert session.pause() is None
+        session.begin_break(10)
+        session.end_break()
+        assert [event.transition for event in events] == [BEGIN_BREAK, END_BREAK]
+        assert events[0].previous.phase == events[1].state.phase == WORK
+        assert events[0].state.phase == SHORT_BREAK
+
+
+class TestTimerController:
+    """Test cases for keeping the session in line with the settings."""
+
+    def test_session_follows_settings(self, temp_dir, service):
+        """Test that the session starts from the settings and picks up changed lengths."""
+        bus = EventBus()
+        settings_manager = SettingsManager(settings_file=temp_dir / "settings.json", event_bus=bus)
+        settings_manager.set("work_duration", 30)
+        controller = TimerController(settings_manager, bus, service)
+        session = controller.session
+        assert (session.work, session.remaining) == (30 * 60, 30 * 60)
+        settings_manager.set("long_break_duration", 20)
+        settings_manager.set("work_duration", 50)
+        assert (session.long_break, session.remaining) == (20 * 60, 50 * 60)
+        controller.stop()
+        settings_manager.set("work_duration", 10)
+        assert session.work == 50 * 60
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime, time
+from src.models import week_occupancy
+from src.models.timeline_manager import BreakSlot
+from src.models.week_occupancy import (MAX_COUNT, MINUTES_PER_DAY, MINUTES_PER_WEEK, WeekOccupancy,
+                                       minute_of_week)
+
+MONDAY_NINE = 9 * 60
+SATURDAY_NINE = 5 * MINUTES_PER_DAY + 9 * 60
+
+
+@pytest.fixture(params=["numpy", "bytearray"], autouse=True)
+def backend(request, monkeypatch):
+    """Run each test against both storage backends."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(week_occupancy, "np", None)
+    return request.param
+
+
+class TestWeekOccupancy:
+    """Test cases for WeekOccupancy."""
+
+    def test_minute_of_week(self):
+        """Test minute-of-week conversion (2024-01-01 is a Monday)."""
+        assert minute_of_week(datetime(2024, 1, 1, 0, 0)) == 0
+        assert minute_of_week(datetime(2024, 1, 6, 9, 0)) == SATURDAY_NINE
+
+    def test_patterns_mark_their_days(self):
+        """Test that repeat patterns only mark their own weekdays."""
+        occupancy = WeekOccupancy([BreakSlot(time(9, 0), 15, "", "weekdays")])
+        assert occupancy.is_break_at(MONDAY_NINE)
+        assert occupancy.is_break_at(MONDAY_NINE + 14)
+        assert not occupancy.is_break_at(MONDAY_NINE + 15)
+        assert not occupancy.is_break_at(SATURDAY_NINE)
+        assert occupancy.free_minutes(0, MINUTES_PER_WEEK) == MINUTES_PER_WEEK - 5 * 15
+
+    def test_slot_wraps_past_sunday_midnight(self):
+        """Test that a late Sunday slot spills into Monday morning."""
+        occupancy = WeekOccupancy([BreakSlot(time(23, 50), 20, "", "weekends")])
+        assert occupancy.is_break_at(MINUTES_PER_WEEK - 1)
+        assert occupancy.is_break_at(5)
+        assert not occupancy.is_break_at(10)
+
+    def test_add_remove_and_overlap(self):
+        """Test incremental updates and pattern-aware overlap."""
+        weekday = BreakSlot(time(9, 0), 30, "", "weekdays")
+        occupancy = WeekOccupancy([weekday])
+        assert occupancy.overlap_minutes(BreakSlot(time(9, 0), 30, "", "weekends")) == 0
+        assert occupancy.overlap_minutes(BreakSlot(time(9, 15), 30, "", "daily")) == 5 * 15
+        
+        clash = BreakSlot(time(9, 20), 10, "", "daily")
+        occupancy.add(clash)
+        assert occupancy.conflicting_minutes() == 5 * 10
+        occupancy.remove(clash)
+        assert occupancy.conflicting_minutes() == 0
+        occupancy.remove(weekday)
+        assert occupancy.free_minutes(0, MINUTES_PER_WEEK) == MINUTES_PER_WEEK
+
+    def test_counts_saturate(self):
+        """Test that counters stop at zero and at the maximum the same way in both backends."""
+        slot = BreakSlot(time(9, 0), 30, "", "daily")
+        occupancy = WeekOccupancy([])
+        occupancy.remove(slot)
+        assert occupancy.as_array()[MONDAY_NINE] == 0
+        assert not occupancy.is_break_at(MONDAY_NINE)
+        for _ in range(MAX_COUNT + 5):
+            occupancy.add(slot)
+        assert occupancy.as_array()[MONDAY_NINE] == MAX_COUNT
+        occupancy.remove(slot)
+        assert occupancy.as_array()[MONDAY_NINE] == MAX_COUNT - 1
+
+    def test_disabled_slots_ignored(self):
+        """Test that disabled slots occupy nothing."""
+        occupancy = WeekOccupancy([BreakSlot(time(9, 0), 30, enabled=False)])
+        assert not occupancy.is_break_at(MONDAY_NINE)
+
+
+class TestTimelineManagerOccupancy:
+    """Test occupancy maintained by TimelineManager."""
+
+    def test_occupancy_follows_edits(self, timeline_manager):
+        """Test that compiled occupancy is updated by add, edit and delete."""
+        slot = timeline_manager.add_break_slot(time(9, 0), 15, "Morning", "daily")
+        occupancy = timeline_manager.get_week_occupancy()
+        assert occupancy.is_break_at(MONDAY_NINE)
+        
+        timeline_manager.edit_break_slot(slot.id, start_time=time(10, 0))
+        assert not occupancy.is_break_at(MONDAY_NINE)
+        assert occupancy.is_break_at(MONDAY_NINE + 60)
+        
+        timeline_manager.delete_break_slot(slot.id)
+        assert occupancy.free_minutes(0, MINUTES_PER_WEEK) == MINUTES_PER_WEEK